@@ -5,7 +5,8 @@ import numpy.lib.recfunctions as recfn
 import re
 import csv
 import json
-import io
+from data_store import text_lines, fill_struct_array, text_array_key, \
+    read_array_cache, write_array_cache, group_rows
 
 
 class EIAData(object):
@@ -236,7 +237,173 @@ def json_interpreter(key_series):
     return interpreted_values
 
 
-def sd_mseg_percent(sd_array, sel, yrs):
+class ServDmdIndex(object):
+    """Grouped index of the commercial service demand data.
+
+    The rows of the service demand (KSDOUT) data are grouped once by
+    census division, building type, end use, and fuel type, and the
+    service demand values for the years of interest are converted once
+    into a 2-D array (with a row for each row of the data and a column
+    for each year), such that the data for each microsegment can be
+    gathered from the groups instead of found with a full scan of the
+    data. The generalized technology name for each description in the
+    data is also found only once.
+
+    Attributes:
+        groups (dict): Row indices (in ascending order) for each (census
+            division, building type, end use, fuel type) key.
+        descriptions (numpy.ndarray): Technology description of each row.
+        values (numpy.ndarray): Service demand by row and year.
+        names (dict): Generalized technology name for each description
+            (and for whether the description is for lighting), or None
+            for descriptions of rows to be removed.
+    """
+
+    def __init__(self, sd_array, yrs):
+        self.groups = group_rows(sd_array, ['r', 'b', 's', 'f'])
+        self.descriptions = sd_array['Description']
+        # Note that the recfn module introduces the
+        # structured_to_unstructured function to convert the structured
+        # array into a standard numpy array
+        self.values = recfn.structured_to_unstructured(
+            sd_array[[str(yr) for yr in yrs]], dtype='<f8')
+        self.names = {}
+
+    def tech_name(self, description, lighting):
+        """Find the generalized technology name for a description
+
+        Args:
+            description (str): Technology description from the service
+                demand data.
+            lighting (bool): True if the description is for lighting.
+
+        Returns:
+            The technology name, without scenario-specific text like
+            '2003 installed base', or None if the row with the
+            description should be removed (i.e., placeholder rows).
+        """
+
+        if (description, lighting) in self.names:
+            return self.names[(description, lighting)]
+
+        # Identify the technology name from the description using a
+        # regex set up to match any text '.+?' that appears before the
+        # first occurrence of one or more spaces followed by a 2 and
+        # three other numbers (i.e., 2009 or 2035)
+        tech_name = re.search(r'.+?(?=\s+2[0-9]{3})', description)
+
+        # Also check the special case where the technology name is so
+        # long that the year number is partially truncated at the end
+        # of the string
+        exc_tech_name = re.search(r'.+?(?=\s+2[0-9]{1,2}$)', description)
+
+        # If the regex matched, use the matching text, which describes
+        # the technology without scenario-specific text
+        if tech_name:
+            name = tech_name.group(0)
+        # Else check to see if the description indicates a placeholder
+        # row or is an empty string, in which case the row should be
+        # deleted before the technologies are summarized
+        elif re.search('placeholder', description) or \
+                re.search(r'^(?![\s\S])', description):
+            name = None
+        # Else check for a special case where the year in the
+        # technology name sought by the tech_name regex didn't match
+        # because the year in the name is partially truncated at
+        # the end of the technology name string
+        elif exc_tech_name:
+            name = exc_tech_name.group(0)
+        # Implicitly, if the text does not match either regex, it
+        # is assumed that it does not need to be edited or removed
+        else:
+            name = description
+
+        # Special filtering for lighting to drop special modifier text
+        # in the descriptions of linear fluorescent bulb types (e.g.,
+        # replace 'T8 F32 Commodity' with 'T8 F32') now that year
+        # details have been removed
+        if lighting and name is not None:
+            lf_name = re.search('^(T[0-9] F[0-9]{2})', name)
+            if lf_name:
+                name = lf_name.group(0)
+
+        self.names[(description, lighting)] = name
+        return name
+
+
+class CatgDataIndex(object):
+    """Grouped index of the commercial building data.
+
+    The rows of the commercial building (KDBOUT) data for the years of
+    interest are grouped once by section label, census division, and
+    building type, and, except for the square footage data, end use and
+    fuel type. The years (adjusted based on the pivot year) and data of
+    all rows are also converted once to the format output for a subset
+    of the data, such that each subset can be gathered from the groups
+    instead of found with a full scan of the data.
+
+    Attributes:
+        groups (dict): Row indices (in ascending order) for each (label,
+            census division, building type, end use, fuel type) key.
+        sqft_groups (dict): Row indices (in ascending order) for each
+            (label, census division, building type) key.
+        year_amount (numpy.ndarray): Year (as a string) and data of
+            each row.
+    """
+
+    def __init__(self, db_array, yrs):
+        # Adjust years reported based on the pivot year
+        year_amount = np.zeros(len(db_array), dtype=[
+            ('Year', db_array.dtype['Year']),
+            ('Amount', db_array.dtype['Amount'])])
+        year_amount['Year'] = db_array['Year'] + UsefulVars().pivot_year
+        year_amount['Amount'] = db_array['Amount']
+
+        # Include only those years that are common to all AEO data
+        # (based on the custom AEO metadata JSON)
+        rows = np.flatnonzero(np.in1d(year_amount['Year'], yrs))
+        self.groups = group_rows(
+            db_array, ['Label', 'Division', 'BldgType', 'EndUse', 'Fuel'],
+            rows)
+        self.sqft_groups = group_rows(
+            db_array, ['Label', 'Division', 'BldgType'], rows)
+
+        # Recast the year column as string type instead of integer, since
+        # the years will become keys in the dicts output to the JSON, and
+        # valid JSON cannot have integers are keys
+        self.year_amount = year_amount.astype(
+            [('Year', 'U4'), ('Amount', '<f8')])
+
+    def select(self, sel, section_label):
+        """Gather the data for a microsegment and section label
+
+        Args:
+            sel (list): A list of integers that specifies the desired
+                census division, building type, end use, and fuel type.
+            section_label (str): The name of the particular data to be
+                extracted.
+
+        Returns:
+            A numpy structured array with columns for only the year and
+            magnitude of the data corresponding to 'sel' and
+            'section_label'.
+        """
+
+        # Square footage data are specified by only census division
+        # and building type
+        if 'SurvFloorTotal' in section_label or \
+                'CMNewFloorSpace' in section_label:
+            rows = self.sqft_groups.get((section_label, sel[0], sel[1]))
+        else:
+            rows = self.groups.get(
+                (section_label, sel[0], sel[1], sel[2], sel[3]))
+        if rows is None:
+            rows = np.array([], dtype=int)
+
+        return self.year_amount[rows]
+
+
+def sd_mseg_percent(sd_array, sel, yrs, index=None):
     """Calculate technology-specific fractions of energy use in a microsegment.
 
     This function uses the technology type, vintage, and construction
@@ -260,6 +427,9 @@ def sd_mseg_percent(sd_array, sel, yrs):
             census division, building type, end use, and fuel type.
         yrs (list): A list of integers representing the range of years
             common to all of the AEO data, precalculated for speed.
+        index (ServDmdIndex, optional): A grouped index of 'sd_array'
+            for the years in 'yrs'; if not provided, the index is built
+            for this call only.
 
     Returns:
         A numpy array of the fractional contribution to energy in the
@@ -268,80 +438,34 @@ def sd_mseg_percent(sd_array, sel, yrs):
         technology names in the same order as the rows in the numpy array.
     """
 
-    # Convert the years list from a list of integers to a list of strings
-    yrs = [str(yr) for yr in yrs]
+    # Build the grouped index of the service demand data if it is not
+    # shared across calls (as it is when walking the full microsegments
+    # structure)
+    if index is None:
+        index = ServDmdIndex(sd_array, yrs)
 
-    # Filter service demand data based on the specified census
+    # Find the rows of service demand data for the specified census
     # division, building type, end use, and fuel type
-    filtered = sd_array[np.all([sd_array['r'] == sel[0],
-                                sd_array['b'] == sel[1],
-                                sd_array['s'] == sel[2],
-                                sd_array['f'] == sel[3]], axis=0)]
-
-    # Initialize list of rows to remove from 'filtered' based on a
-    # regex search of the 'Description' text
-    rows_to_remove = []
-
-    # Replace technology descriptions in the array 'filtered' with
-    # generalized names, removing any text describing the vintage or
-    # efficiency level and preparing to delete placeholder rows
-    # (placeholder rows are in the data as imported)
-    for idx, row in enumerate(filtered):
-
-        # Identify the technology name from the 'Description' column in
-        # the data using a regex set up to match any text '.+?' that
-        # appears before the first occurrence of one or more spaces
-        # followed by a 2 and three other numbers (i.e., 2009 or 2035)
-        tech_name = re.search(r'.+?(?=\s+2[0-9]{3})', row['Description'])
-
-        # Also check the special case where the technology name is so
-        # long that the year number is partially truncated at the end
-        # of the string
-        exc_tech_name = re.search(r'.+?(?=\s+2[0-9]{1,2}$)', row['Description'])
-
-        # If the regex matched, overwrite the original description with
-        # the matching text, which describes the technology without
-        # scenario-specific text like '2003 installed base'
-        if tech_name:
-            filtered['Description'][idx] = tech_name.group(0)
-        # Else check to see if the description indicates a placeholder
-        # row, which should be deleted before the technologies are
-        # summarized and returned from this function
-        elif re.search('placeholder', row['Description']):
-            rows_to_remove.append(idx)
-        # Else check to see if the description is an empty string,
-        # and if so, add it to the list of rows to remove
-        elif re.search(r'^(?![\s\S])', row['Description']):
-            rows_to_remove.append(idx)
-        # Else check for a special case where the year in the
-        # technology name sought by the tech_name regex didn't match
-        # because the year in the name is partially truncated at
-        # the end of the technology name string
-        elif exc_tech_name:
-            filtered['Description'][idx] = exc_tech_name.group(0)
-        # Implicitly, if the text does not match either regex, it
-        # is assumed that it does not need to be edited or removed
-
-    # Delete the placeholder rows from the filtered array
-    filtered = np.delete(filtered, rows_to_remove, 0)
-
-    # Special filtering for lighting to drop special modifier text
-    # in the descriptions of linear fluorescent bulb types (e.g.,
-    # replace 'T8 F32 Commodity' with 'T8 F32') now that year
-    # details have been removed
-    if sel[2] == CommercialTranslationDicts().endusedict['lighting']:
-        for idx, row in enumerate(filtered):
-            # Identify linear fluorescent types
-            tech_name = re.search('^(T[0-9] F[0-9]{2})', row['Description'])
-            if tech_name:
-                filtered['Description'][idx] = tech_name.group(0)
+    rows = index.groups.get((sel[0], sel[1], sel[2], sel[3]),
+                            np.array([], dtype=int))
+
+    # Replace technology descriptions with generalized names, removing
+    # any text describing the vintage or efficiency level, and remove
+    # placeholder rows (placeholder rows are in the data as imported)
+    lighting = sel[2] == CommercialTranslationDicts().endusedict['lighting']
+    names = [index.tech_name(desc, lighting)
+             for desc in index.descriptions[rows]]
+    keep = [idx for idx, name in enumerate(names) if name is not None]
+    rows = rows[keep]
+    names = np.array([names[idx] for idx in keep],
+                     dtype=index.descriptions.dtype)
 
     # Because different technologies are sometimes coded with the same
     # technology type number (especially in lighting, where lighting
     # types are often differentiated by vintage and technology type
     # numbers), technologies must be identified using the simplified
-    # names now recorded in the 'Description' field
-    technames = list(np.unique(filtered['Description']))
+    # names
+    technames = list(np.unique(names))
 
     # Truncate the technology names to 43 characters to match the
     # truncated strings used for the cost, performance, and lifetime data
@@ -351,19 +475,11 @@ def sd_mseg_percent(sd_array, sel, yrs):
     # will correspond to a single technology
     tval = np.zeros((len(trunc_technames), len(yrs)))
 
-    # Combine the data recorded for each unique technology
+    # Combine the data recorded for each unique technology, calculating
+    # the sum of all year columns and writing it to the appropriate
+    # row in the tval array
     for idx, name in enumerate(technames):
-
-        # Extract entries for a given technology type number
-        entries = filtered[filtered['Description'] == name]
-
-        # Calculate the sum of all year columns and write it to the
-        # appropriate row in the tval array (note that the recfn module
-        # introduces the structured_to_unstructured function to
-        # convert the structured array into a standard numpy array,
-        # which allows the use of the .sum() function)
-        tval[idx, ] = np.sum(recfn.structured_to_unstructured(
-            entries[yrs], dtype='<f8'), axis=0)
+        tval[idx, ] = np.sum(index.values[rows[names == name]], axis=0)
 
     # If at least one entry in tval is non-zero (tval.any() == True),
     # suppress any divide by zero warnings and calculate the percentage
@@ -377,7 +493,7 @@ def sd_mseg_percent(sd_array, sel, yrs):
     return (tval, trunc_technames)
 
 
-def catg_data_selector(db_array, sel, section_label, yrs):
+def catg_data_selector(db_array, sel, section_label, yrs, index=None):
     """Extracts a specified subset from the commercial building data array.
 
     This function generally extracts a subset of the data available in
@@ -397,6 +513,9 @@ def catg_data_selector(db_array, sel, section_label, yrs):
         section_label (str): The name of the particular data to be extracted.
         yrs (list): A list of integers representing the range of years
             common to all of the AEO data, precalculated for speed.
+        index (CatgDataIndex, optional): A grouped index of 'db_array'
+            for the years in 'yrs'; if not provided, the index is built
+            for this call only.
 
     Returns:
         A numpy structured array with columns for only the year and
@@ -404,42 +523,22 @@ def catg_data_selector(db_array, sel, section_label, yrs):
         The years are limited to only those that appear in 'yrs'.
     """
 
-    # Filter main EIA commercial data array based on the relevant
-    # section label, and then filter further based on the specified
-    # division, building type, end use, and fuel type - unless the
-    # section_label indicates square footage data, which are specified
-    # by only census division and building type
-    if 'SurvFloorTotal' in section_label or 'CMNewFloorSpace' in section_label:
-        filtered = db_array[np.all([db_array['Label'] == section_label,
-                                    db_array['Division'] == sel[0],
-                                    db_array['BldgType'] == sel[1]], axis=0)]
-    else:
-        filtered = db_array[np.all([db_array['Label'] == section_label,
-                                    db_array['Division'] == sel[0],
-                                    db_array['BldgType'] == sel[1],
-                                    db_array['EndUse'] == sel[2],
-                                    db_array['Fuel'] == sel[3]], axis=0)]
-
-    # Adjust years reported based on the pivot year
-    filtered['Year'] = filtered['Year'] + UsefulVars().pivot_year
+    # Build the grouped index of the data if it is not shared across
+    # calls (as it is when walking the full microsegments structure)
+    if index is None:
+        index = CatgDataIndex(db_array, yrs)
 
-    # Further reduce the data by including only those years that are
-    # common to all AEO data (based on the custom AEO metadata JSON)
-    filtered = filtered[np.in1d(filtered['Year'], yrs)]
+    # Select the data with the relevant section label, division,
+    # building type, end use, and fuel type - unless the section_label
+    # indicates square footage data, which are specified by only
+    # census division and building type; the data include only those
+    # years that are common to all AEO data, adjusted based on the
+    # pivot year, with the years given as strings
+    return index.select(sel, section_label)
 
-    # From the filtered data, select only the two needed columns,
-    # the year and the data
-    desired_cols = filtered[['Year', 'Amount']]
 
-    # Recast the year column as string type instead of integer, since
-    # the years will become keys in the dicts output to the JSON, and
-    # valid JSON cannot have integers are keys
-    desired_cols = desired_cols.astype([('Year', 'U4'), ('Amount', '<f8')])
-
-    return desired_cols
-
-
-def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs):
+def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs,
+                 catg_index=None, sd_index=None):
     """Restructure data for each terminal node in the microsegments JSON.
 
     At each leaf/terminal node in the microsegments JSON, this
@@ -474,6 +573,10 @@ def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs):
             that have service demand data.
         yrs (list): A list of integers representing the range of years
             common to all of the AEO data, precalculated for speed.
+        catg_index (CatgDataIndex, optional): A grouped index of
+            'db_array' shared across calls to this function.
+        sd_index (ServDmdIndex, optional): A grouped index of 'sd_array'
+            shared across calls to this function.
 
     Returns:
         A dict with data appropriate for the current location in the
@@ -495,7 +598,8 @@ def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs):
     # desired final format
     if 'demand' in key_series:
         # Get the data from KDBOUT
-        subset = catg_data_selector(db_array, idx_series, 'EndUseConsump', yrs)
+        subset = catg_data_selector(db_array, idx_series, 'EndUseConsump', yrs,
+                                    catg_index)
 
         # The thermal load data end uses are coded as text strings 'HT'
         # and 'CL' instead of numbers; the numbers in idx_series are
@@ -536,7 +640,8 @@ def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs):
         idx_series[2] = idx_series[4]
 
         # Extract the data from KDBOUT
-        subset = catg_data_selector(db_array, idx_series, 'MiscElConsump', yrs)
+        subset = catg_data_selector(db_array, idx_series, 'MiscElConsump', yrs,
+                                    catg_index)
 
         # Convert into dict with years as keys and energy as values
         final_dict = {'energy': dict(zip(subset['Year'],
@@ -545,15 +650,17 @@ def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs):
     elif 'new square footage' in key_series:
         # Extract the relevant data from KDBOUT
         subset = catg_data_selector(db_array, idx_series, 'CMNewFloorSpace',
-                                    yrs)
+                                    yrs, catg_index)
 
         # Convert into dict with years as keys and new square footage as values
         final_dict = dict(zip(subset['Year'],
                               subset['Amount']))
     elif 'total square footage' in key_series:
         # Extract the relevant data from KDBOUT
-        sub1 = catg_data_selector(db_array, idx_series, 'CMNewFloorSpace', yrs)
-        sub2 = catg_data_selector(db_array, idx_series, 'SurvFloorTotal', yrs)
+        sub1 = catg_data_selector(db_array, idx_series, 'CMNewFloorSpace', yrs,
+                                  catg_index)
+        sub2 = catg_data_selector(db_array, idx_series, 'SurvFloorTotal', yrs,
+                                  catg_index)
 
         # Combine the surviving floor space and new floor space
         # quantities and construct into final dict
@@ -561,11 +668,13 @@ def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs):
                               sub1['Amount'] + sub2['Amount']))
     elif idx_series[2] in sd_end_uses:
         # Extract the relevant data from KDBOUT
-        subset = catg_data_selector(db_array, idx_series, 'EndUseConsump', yrs)
+        subset = catg_data_selector(db_array, idx_series, 'EndUseConsump', yrs,
+                                    catg_index)
 
         # Get percentage contributions for each equipment type that
         # appears in the service demand data
-        [tech_pct, tech_names] = sd_mseg_percent(sd_array, idx_series, yrs)
+        [tech_pct, tech_names] = sd_mseg_percent(sd_array, idx_series, yrs,
+                                                 sd_index)
 
         # Declare empty list to store dicts generated for each technology
         tech_dict_list = []
@@ -588,7 +697,8 @@ def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs):
         # Regular case with no supply/demand separation or service demand data
 
         # Extract the desired data from the KDBOUT array
-        subset = catg_data_selector(db_array, idx_series, 'EndUseConsump', yrs)
+        subset = catg_data_selector(db_array, idx_series, 'EndUseConsump', yrs,
+                                    catg_index)
 
         # Convert into dict with years as keys and energy as values
         final_dict = {'energy': dict(zip(subset['Year'],
@@ -600,12 +710,13 @@ def data_handler(db_array, sd_array, load_array, key_series, sd_end_uses, yrs):
 
 
 def walk(db_array, sd_array, load_array, sd_end_uses, json_db,
-         years, key_list=[]):
+         years, key_list=[], catg_index=None, sd_index=None):
     """ Proceed recursively through the microsegment data structure
     (formatted as a nested dict) to each leaf/terminal node in the
     structure, constructing a list of the applicable keys that define
     the location of the terminal node and then call the appropriate
-    functions to process the imported data. """
+    functions to process the imported data (using grouped indices of
+    the data, if given, to select the data for each node). """
 
     # Explore data structure from current level
     for key, item in json_db.items():
@@ -614,7 +725,8 @@ def walk(db_array, sd_array, load_array, sd_end_uses, json_db,
         # again to advance another level deeper into the data structure
         if isinstance(item, dict):
             walk(db_array, sd_array, load_array,
-                 sd_end_uses, item, years, key_list + [key])
+                 sd_end_uses, item, years, key_list + [key],
+                 catg_index, sd_index)
 
         # If a leaf node has been reached, check if the second entry in
         # the key list is one of the recognized building types, and if
@@ -626,7 +738,8 @@ def walk(db_array, sd_array, load_array, sd_end_uses, json_db,
 
                 # Extract data from original data sources
                 data_dict = data_handler(db_array, sd_array, load_array,
-                                         leaf_node_keys, sd_end_uses, years)
+                                         leaf_node_keys, sd_end_uses, years,
+                                         catg_index, sd_index)
 
                 # Set dict key to extracted data
                 json_db[key] = data_dict
@@ -718,7 +831,8 @@ def dtype_array(data_file_path, delim_char=',', hl=None):
         return comb_dtypes
 
 
-def data_import(data_file_path, dtype_list, delim_char=',', hl=None, cols=[]):
+def data_import(data_file_path, dtype_list, delim_char=',', hl=None, cols=[],
+                cache=False):
     """Import data and convert to a numpy structured array.
 
     Read the contents of a data file with a header line and convert
@@ -727,6 +841,8 @@ def data_import(data_file_path, dtype_list, delim_char=',', hl=None, cols=[]):
     file. If specified, skip lines at the beginning of the file, for the
     case where informational content appears there instead. Also support
     capture of only the specified columns from the original data file.
+    The file is read in a single pass and the rows are converted a chunk
+    at a time, which limits memory use for the large AEO data files.
 
     Args:
         data_file_path (str): The full path to the data file to be imported.
@@ -739,12 +855,29 @@ def data_import(data_file_path, dtype_list, delim_char=',', hl=None, cols=[]):
         cols (list): A list of numbers representing the indices for the
             positions of the columns retained in the dtype definition
             (and thus the columns to include from each row of the data).
+        cache (bool, optional): If True, reuse (or write) a binary copy
+            of the imported data stored next to the file, keyed by the
+            file contents, the import settings, and the importer version.
 
     Returns:
         A numpy structured array of the imported data file with the
         columns specified by dtype_list.
     """
 
+    # Use the binary copy of the data imported previously, if the file
+    # contents and import settings are unchanged
+    if cache:
+        cache_key = text_array_key(data_file_path, [
+            dtype_list, delim_char, hl, list(cols)])
+        final_struct = read_array_cache(data_file_path, cache_key)
+        if final_struct is not None:
+            return final_struct
+
+    def replace_na(chunk, dtype_list):
+        """Replace 'NA' entries with 'nan' in a chunk of rows."""
+        return [tuple('nan' if entry == 'NA' else entry for entry in row)
+                for row in chunk], dtype_list
+
     # Open the target CSV formatted data file
     with open(data_file_path) as thefile:
         # For some cooking equipment descriptions in the service demand
@@ -752,31 +885,20 @@ def data_import(data_file_path, dtype_list, delim_char=',', hl=None, cols=[]):
         # the closing double-quote character in the description strings
         # while removing the " that denoted inches; by inserting an
         # escape character before the " denoting inches, the text will
-        # be handled correctly by csv.reader
+        # be handled correctly by csv.reader; any NULL characters are
+        # also removed from the lines as the file is read
         if re.match('.*KSDOUT', re.escape(data_file_path)):
-            cont = thefile.read().replace('11"', '11\\"')
-            thefile = io.StringIO(cont)
+            lines = text_lines(thefile, [('11"', '11\\"'), ('\0', '')])
+        else:
+            lines = text_lines(thefile)
 
         # This use of csv.reader assumes that the default setting of
         # quotechar '"' is appropriate; the skipinitialspace option
         # ensures proper reading of double-quoted text strings in the
         # AEO data that have the delimiter inside them (e.g., cooking
-        # equipment descriptions); the loop which csv.reader is called
-        # is used to detect NULL characters and act appropriately (by
-        # removing them prior to converting to a csv.reader object)
-        # if they are encountered
-        if '\0' in open(data_file_path).read():  # NULL bytes detected
-            filecont = csv.reader((x.replace('\0', '') for x in thefile),
-                                  delimiter=delim_char, skipinitialspace=True,
-                                  escapechar='\\')
-        else:  # No NULL bytes, proceed normally
-            filecont = csv.reader(thefile,
-                                  delimiter=delim_char, skipinitialspace=True,
-                                  escapechar='\\')
-
-        # Create list to be populated with tuples of each row of data
-        # from the data file
-        data = []
+        # equipment descriptions)
+        filecont = csv.reader(lines, delimiter=delim_char,
+                              skipinitialspace=True, escapechar='\\')
 
         # Skip first line of the file
         next(filecont)
@@ -790,37 +912,23 @@ def data_import(data_file_path, dtype_list, delim_char=',', hl=None, cols=[]):
             for i in range(0, hl+1):
                 next(filecont)
 
-        # Import the data, skipping lines that are not the correct length
-        for row in filecont:
-            if len(tuple(row)) == len(dtype_list):
-                data.append(tuple(row))
-            # If there are specific columns of interest specified, select
-            # only those columns from the row of data and append the result
-            elif cols:
-                shorter = [row[i] for i in cols]
-                data.append(tuple(shorter))
-
-        # Convert data into numpy structured array, using the
-        # try/catch in the case where the data include the string 'NA',
-        # which has to be changed to an 'nan' to be able to be coerced
-        # to a float or integer by np.array
-        try:
-            final_struct = np.array(data, dtype=dtype_list)
-        # Targeted error "ValueError: could not convert string to float: 'NA'"
-        except ValueError:
-            for i, row in enumerate(data):
-                row = list(row)  # Make row mutable
-                for k, entry in enumerate(row):
-                    # Replace 'NA' with 'nan'
-                    if entry == 'NA':
-                        row[k] = 'nan'
-                # Overwrite existing tuple with new tuple
-                data[i] = tuple(row)
-            # With the 'NA' strings replaced, create the numpy array as
-            # originally desired
-            final_struct = np.array(data, dtype=dtype_list)
-
-        return final_struct
+        # Import the data, skipping lines that are not the correct
+        # length; if there are specific columns of interest specified,
+        # select only those columns from the other rows of data
+        rows = (tuple(row) if len(row) == len(dtype_list) else
+                tuple(row[i] for i in cols)
+                for row in filecont if len(row) == len(dtype_list) or cols)
+
+        # Convert the data into a numpy structured array a chunk of
+        # rows at a time, for the case where the data include the
+        # string 'NA', changing it to 'nan' to be able to be coerced
+        # to a float or integer (targeted error "ValueError: could
+        # not convert string to float: 'NA'")
+        final_struct = fill_struct_array(rows, dtype_list, replace_na)
+
+    if cache:
+        write_array_cache(data_file_path, cache_key, final_struct)
+    return final_struct
 
 
 def str_cleaner(data_array, column_name, return_str_len=False):
@@ -965,17 +1073,18 @@ def main():
 
     # Import EIA AEO 'KSDOUT' service demand file
     serv_dtypes = dtype_array(eiadata.serv_dmd)
-    serv_data = data_import(eiadata.serv_dmd, serv_dtypes)
+    serv_data = data_import(eiadata.serv_dmd, serv_dtypes, cache=True)
     serv_data = str_cleaner(serv_data, 'Description')
 
     # Import EIA AEO 'KDBOUT' additional data file
     catg_dtypes = dtype_array(eiadata.catg_dmd)
-    catg_data = data_import(eiadata.catg_dmd, catg_dtypes)
+    catg_data = data_import(eiadata.catg_dmd, catg_dtypes, cache=True)
     catg_data = str_cleaner(catg_data, 'Label')
 
     # Import thermal loads data
     load_dtypes = dtype_array(handyvars.com_tloads, '\t')
-    load_data = data_import(handyvars.com_tloads, load_dtypes, '\t')
+    load_data = data_import(handyvars.com_tloads, load_dtypes, '\t',
+                            cache=True)
 
     # Not all end uses are broken down by equipment type and vintage in
     # KSDOUT; determine which end uses are present so that the service
@@ -996,9 +1105,13 @@ def main():
              handyvars.json_out, 'w') as jso:
             msjson = json.load(jsi)
 
-            # Proceed recursively through database structure
+            # Proceed recursively through database structure, grouping
+            # the commercial building and service demand data once
+            # rather than searching the full arrays for each leaf node
             result = walk(catg_data, serv_data, load_data,
-                          serv_data_end_uses, msjson, years)
+                          serv_data_end_uses, msjson, years,
+                          catg_index=CatgDataIndex(catg_data, years),
+                          sd_index=ServDmdIndex(serv_data, years))
 
             # Write the updated dict of data to a new JSON file
             json.dump(result, jso, indent=2)
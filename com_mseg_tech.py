@@ -3,9 +3,9 @@
 # Import commercial microsegments code to use some of its data
 # reading and processing functions
 import com_mseg as cm
+from data_store import group_rows
 
 import numpy as np
-import numpy.lib.recfunctions as recfn
 import re
 import warnings
 import json
@@ -150,32 +150,78 @@ def units_id(sel, flag):
     return theunits
 
 
-def tech_data_selector(tech_data, sel):
+class TechDataIndex(object):
+    """Grouped index of the technology data.
+
+    The rows of the technology cost, performance, and lifetime (ktek)
+    data are grouped once by census division or building type, end
+    use, and fuel type, and the technology "name" of each row is found
+    once for each unique technology name string, such that the data for
+    each microsegment can be gathered from the groups instead of found
+    with full scans of the data for every leaf node of the microsegments
+    JSON. (The service demand data are indexed in the same way by the
+    com_mseg 'ServDmdIndex' class.)
+
+    Attributes:
+        tech_groups (dict): Row indices (in ascending order) of the
+            technology data for each (census division or building type,
+            end use, fuel type) key.
+        tech_ids (numpy.ndarray): Technology "name" of each row of the
+            technology data (see 'tech_name_id'), or None for rows that
+            do not correspond to any technology.
+    """
+
+    def __init__(self, tech_data):
+        self.tech_groups = group_rows(tech_data, ['r', 's', 'f'])
+        names, name_inds = np.unique(
+            tech_data['technology name'], return_inverse=True)
+        self.tech_ids = np.array(
+            [tech_name_id(x) for x in names], dtype=object)[name_inds]
+
+    def tech_rows(self, sel):
+        """Find the rows of technology data for a microsegment.
+
+        Args:
+            sel (list): A list of integers indicating the microsegment.
+
+        Returns:
+            A numpy array of row indices into the technology data.
+        """
+
+        # Determine whether the data indicated in the 'r' column
+        # indicates building type or census division based on the end
+        # use indicated (building type for ventilation, lighting, and
+        # refrigeration)
+        if sel[2] in [4, 6, 7]:
+            tmp = sel[1]  # use building type
+        else:
+            tmp = sel[0]  # use census division
+
+        return self.tech_groups.get((tmp, sel[2], sel[3]),
+                                    np.array([], dtype=int))
+
+
+def tech_data_selector(tech_data, sel, index=None):
     """ From the full structured array of cost, performance, and
     lifetime data from the AEO, extract a group of data using numeric
     indices generated from the text indices at the leaf nodes of the
     input microsegments JSON. Each group of data extracted by this
     function will correspond to multiple technologies and performance
-    levels and will require further processing. """
-
-    # Determine whether the data indicated in the 'r' column indicates
-    # building type or census division based on the end use indicated
-    # (building type for ventilation, lighting, and refrigeration)
-    if sel[2] in [4, 6, 7]:
-        tmp = sel[1]  # use building type
-    else:
-        tmp = sel[0]  # use census division
+    levels and will require further processing. The data are gathered
+    using a grouped index of the data (TechDataIndex), which is built
+    here if it is not given. """
 
-    # Filter technology data based on the specified census
-    # division or building type, end use, and fuel type
-    filtered = tech_data[np.all([tech_data['r'] == tmp,
-                                 tech_data['s'] == sel[2],
-                                 tech_data['f'] == sel[3]], axis=0)]
+    # Build the grouped index of the data if it is not shared across
+    # calls (as it is when walking the full microsegments structure)
+    if index is None:
+        index = TechDataIndex(tech_data)
 
-    return filtered
+    # Select technology data based on the specified census division or
+    # building type, end use, and fuel type
+    return tech_data[index.tech_rows(sel)]
 
 
-def sd_data_selector(sd_data, sel, years):
+def sd_data_selector(sd_data, sel, years, index=None):
     """ From the full structured array of service demand data from the
     AEO, extract just the service demand data corresponding to the
     census division, building type, end use, and fuel type specified by
@@ -184,20 +230,26 @@ def sd_data_selector(sd_data, sel, years):
     summed across the three specified markets (column named 'd'), with
     rows for each technology and performance level combination and
     columns for each year, and 2) a list of technology names for
-    each row of the service demand numpy array (the other output). """
+    each row of the service demand numpy array (the other output). The
+    data are gathered using a grouped index of the data (the com_mseg
+    'ServDmdIndex'), which is built here if it is not given. """
+
+    # Build the grouped index of the data if it is not shared across
+    # calls (as it is when walking the full microsegments structure)
+    if index is None:
+        index = cm.ServDmdIndex(sd_data, years)
 
-    # Filter service demand data based on the specified census
+    # Find the rows of service demand data for the specified census
     # division, building type, end use, and fuel type
-    filtered = sd_data[np.all([sd_data['r'] == sel[0],
-                               sd_data['b'] == sel[1],
-                               sd_data['s'] == sel[2],
-                               sd_data['f'] == sel[3]], axis=0)]
+    rows = index.groups.get(
+        (sel[0], sel[1], sel[2], sel[3]), np.array([], dtype=int))
+    descriptions = index.descriptions[rows]
 
     # Identify each technology and performance level using the text
     # in the description field since the technology type and vintage
     # numeric codes are not well-matched to individual technology and
     # performance levels; remove empty strings from the list
-    technames = list(np.unique(filtered['Description']))
+    technames = list(np.unique(descriptions))
     technames = [x for x in technames if x != '']
 
     # Set up numpy array to store restructured data, in which each row
@@ -205,17 +257,10 @@ def sd_data_selector(sd_data, sel, years):
     sd = np.zeros((len(technames), len(years)))
 
     # Combine the service demand for the three markets ['d'] in the data
+    # by summing the year values of all entries for a given technology
+    # name and writing the sum to the appropriate row in the sd array
     for idx, name in enumerate(technames):
-
-        # Extract entries for a given technology name
-        entries = filtered[filtered['Description'] == name]
-
-        # Calculate the sum of all year columns and write it to the
-        # appropriate row in the sd array (note that the .view()
-        # function converts the structured array into a standard
-        # numpy array, which allows the use of the .sum() function)
-        sd[idx, ] = np.sum(recfn.structured_to_unstructured(
-            entries[list(map(str, years))], dtype='<f8'), axis=0)
+        sd[idx, ] = np.sum(index.values[rows[descriptions == name]], axis=0)
 
     # Note that each row in sd corresponds to a single performance
     # level for a single technology and the rows are in the same order
@@ -223,6 +268,49 @@ def sd_data_selector(sd_data, sel, years):
     return sd, technames
 
 
+def tech_name_id(tech_name_text):
+    """Identifies the technology "name" for a row of technology data.
+
+    Args:
+        tech_name_text (str): Text in the 'technology name' column
+            of a row of the EIA technology characteristics data.
+
+    Returns:
+        A string representing the technology "name" or descriptor that
+        does not include scenario-specific details like "2020 high" or
+        "2009 installed base", or None if the row is a placeholder row.
+    """
+
+    # Identify the technology name from the 'technology name' column
+    # in the data using a regex set up to match any text '.+?' that
+    # appears before the first occurrence of a space followed by a
+    # 2 and three other numbers (e.g., 2009 or 2035)
+    tech_name = re.search(r'.+?(?=\s2[0-9]{3})', tech_name_text)
+
+    # If the regex matched, check the matching text to see if it
+    # corresponds to a linear fluorescent lighting technology
+    # represented in the format 'T# F##', e.g., 'T8 F96'; if it does,
+    # use from the match just the 'T# F##' string without any
+    # additional modifier text (e.g., 'T8 F96 High Output'); if not,
+    # use the text that matched originally, which describes the
+    # technology without scenario-specific text like '2003 installed
+    # base'
+    if tech_name:
+        lfl_tech_name = re.search('^(T[0-9] F[0-9]{2})',
+                                  tech_name.group(0))
+        if lfl_tech_name:
+            return lfl_tech_name.group(0)
+        else:
+            return tech_name.group(0)
+    # Else, if the technology name is not from a placeholder row,
+    # use the entire name text (the technology might not have a year
+    # included as part of its name)
+    elif not re.search('placeholder', tech_name_text):
+        return tech_name_text
+    else:
+        return None
+
+
 def single_tech_selector(tech_array, specific_name):
     """Extracts a single technology from tech data for an entire microsegment.
 
@@ -246,52 +334,13 @@ def single_tech_selector(tech_array, specific_name):
         indicated by specific_name.
     """
 
-    # Initialize a list of rows to remove from the numpy array
-    # that do not correspond to the specified technology
-    rows_to_remove = []
-
-    for idx, row in enumerate(tech_array):
-        # Identify the technology name from the 'technology name' column
-        # in the data using a regex set up to match any text '.+?' that
-        # appears before the first occurrence of a space followed by a
-        # 2 and three other numbers (i.e., 2009 or 2035)
-        tech_name = re.search(r'.+?(?=\s2[0-9]{3})', row['technology name'])
-
-        # If the technology name regex returned a match, check if there
-        # is a match for a linear fluorescent lighting technology; in
-        # either case (either the linear fluorescent or the more
-        # generic technology name regex), if the match is not the same
-        # as the name passed to the function, remove the row
-        if tech_name:
-            # Test whether the technology name corresponds to a linear
-            # fluorescent lighting technology in the format 'T# F##',
-            # e.g., 'T8 F96', and if it does, extract just that string
-            # without any additional text (e.g., 'T8 F96 High Output')
-            lfl_tech_name = re.search('^(T[0-9] F[0-9]{2})',
-                                      tech_name.group(0))
-            if lfl_tech_name:
-                if lfl_tech_name.group(0) != specific_name:
-                    rows_to_remove.append(idx)
-            elif tech_name.group(0) != specific_name:
-                rows_to_remove.append(idx)
-        # If there's no match, the technology might not have a year
-        # included as part of its name, but it nonetheless should be
-        # checked to see if it matches the name passed to the function
-        # and removed if there is not a match
-        elif row['technology name'] != specific_name:
-            rows_to_remove.append(idx)
-        # Else check to see if the description indicates a placeholder
-        # row, which should be deleted before the technologies are
-        # summarized and returned from this function
-        elif re.search('placeholder', row['technology name']):
-            rows_to_remove.append(idx)
-        # Implicitly, if the text does not match any regex, it is
-        # assumed that it does not need to be edited or removed
-
-    # Delete the placeholder rows
-    result = np.delete(tech_array, rows_to_remove, 0)
-
-    return result
+    # Keep the rows with a technology "name" that matches the name
+    # passed to the function (placeholder rows, which have no name,
+    # are always removed)
+    keep = [tech_name_id(row['technology name']) == specific_name
+            for row in tech_array]
+
+    return tech_array[np.array(keep, dtype=bool)]
 
 
 def cost_perf_extractor(single_tech_array, sd_array, sd_names, years, flag):
@@ -568,39 +617,10 @@ def tech_names_extractor(tech_array):
         details like "2020 high" or "2009 installed base".
     """
 
-    # Create empty list to be populated with technology names
-    technames = []
-
-    for row in tech_array:
-        # Identify the technology name from the 'technology name' column
-        # in the data using a regex set up to match any text '.+?' that
-        # appears before the first occurrence of a space followed by a
-        # 2 and three other numbers (e.g., 2009 or 2035)
-        tech_name = re.search(r'.+?(?=\s2[0-9]{3})', row['technology name'])
-
-        # If the regex matched, check the matching text to see if it
-        # corresponds to a linear fluorescent lighting technology
-        # represented in the format 'T# F##', e.g., 'T8 F96'; if it does,
-        # extract from the match just the 'T# F##' string without any
-        # additional modifier text (e.g., 'T8 F96 High Output'); if not,
-        # add the text that matched originally, which describes the
-        # technology without scenario-specific text like '2003 installed
-        # base' to the technames list
-        if tech_name:
-            lfl_tech_name = re.search('^(T[0-9] F[0-9]{2})',
-                                      tech_name.group(0))
-            if lfl_tech_name:
-                technames.append(lfl_tech_name.group(0))
-            else:
-                technames.append(tech_name.group(0))
-        # Else, if the technology name is not from a placeholder row,
-        # add the entire name text to the technames list
-        else:
-            if not re.search('placeholder', row['technology name']):
-                technames.append(row['technology name'])
-
-    # Reduce the list to only the unique entries
-    technames = list(np.unique(technames))
+    # Identify the technology "name" of each row, excluding placeholder
+    # rows, and reduce the list to only the unique entries
+    technames = [tech_name_id(row['technology name']) for row in tech_array]
+    technames = list(np.unique([x for x in technames if x is not None]))
 
     return technames
 
@@ -731,7 +751,8 @@ def tpp_handler(tpp_data, sel, years):
 
 
 def mseg_technology_handler(
-        tech_data, sd_data, tpp_data, sf_data, sel, years, eu_map, cconv):
+        tech_data, sd_data, tpp_data, sf_data, sel, years, eu_map, cconv,
+        index=None, sd_index=None):
     """Restructures cost, performance, lifetime, and time preference data.
 
     Using external functions that process and reformat specific
@@ -773,6 +794,10 @@ def mseg_technology_handler(
         eu_map (dict): Mapping between end use names in cost conversion JSON
             and end use numbers in EIA raw technology cost data.
         cconv (dict): Factors for converting from unit costs to $/ft^2.
+        index (TechDataIndex, optional): A grouped index of 'tech_data'
+            used to gather the data for the microsegment.
+        sd_index (com_mseg.ServDmdIndex, optional): A grouped index of
+            'sd_data' used to gather the data for the microsegment.
 
     Returns:
         A dict that specifies the cost, performance, and lifetime on
@@ -786,10 +811,19 @@ def mseg_technology_handler(
     # Instantiate a master dict for this microsegment
     complete_mseg_tech_data = {}
 
+    # Build the grouped indices of the data if they are not shared
+    # across calls (as they are when walking the full microsegments
+    # structure)
+    if index is None:
+        index = TechDataIndex(tech_data)
+    if sd_index is None:
+        sd_index = cm.ServDmdIndex(sd_data, years)
+
     # From the imported EIA data, extract the technology and service
     # demand data for the microsegment identified by 'sel'
-    filtered_tech_data = tech_data_selector(tech_data, sel)
-    (filtered_sd_data, sd_names_list) = sd_data_selector(sd_data, sel, years)
+    filtered_tech_data = tech_data_selector(tech_data, sel, index)
+    (filtered_sd_data, sd_names_list) = sd_data_selector(
+        sd_data, sel, years, sd_index)
 
     # Use the 'units_id' function to extract the performance units for
     # the microsegment specified by 'sel' (the same function can also
@@ -801,8 +835,11 @@ def mseg_technology_handler(
     conv_factors = cost_conversion_factor(sel, eu_map, cconv, years)
 
     # Identify the names (as strings) of all of the technologies
-    # included in this microsegment
-    tech_names_list = tech_names_extractor(filtered_tech_data)
+    # included in this microsegment (using the technology "names"
+    # already found for each row in the grouped index)
+    tech_ids = index.tech_ids[index.tech_rows(sel)]
+    tech_names_list = list(np.unique(
+        [x for x in tech_ids if x is not None]))
 
     # Preallocate a list of non-matching technology names for this microsegment
     mseg_non_matching_names = []
@@ -814,7 +851,7 @@ def mseg_technology_handler(
     for tech in tech_names_list:
         # Extract the cost, performance, and lifetime data specific
         # to a single technology, given by 'tech'
-        single_tech_data = single_tech_selector(filtered_tech_data, tech)
+        single_tech_data = filtered_tech_data[tech_ids == tech]
 
         # Extract the cost data in a dict format with 'typical' and
         # 'best' cost cases
@@ -904,7 +941,7 @@ def mseg_technology_handler(
 
 
 def walk(tech_data, serv_data, tpp_data, db_data, years, json_db, eu_map,
-         cconv, key_list=[], no_match_names=[]):
+         cconv, key_list=[], no_match_names=[], index=None, sd_index=None):
     """Recursively explore the JSON structure and add the appropriate data.
 
     Note that this walk function and the data processing function
@@ -938,6 +975,10 @@ def walk(tech_data, serv_data, tpp_data, db_data, years, json_db, eu_map,
         no_match_names (list): A list of names of technologies found in
              the cost, performance, and lifetime data, but not in the
              service demand data.
+        index (TechDataIndex, optional): A grouped index of 'tech_data'
+            used to gather the data for each leaf node.
+        sd_index (com_mseg.ServDmdIndex, optional): A grouped index of
+            'serv_data' used to gather the data for each leaf node.
 
     Returns:
         A complete and populated dict structure for the JSON database,
@@ -951,7 +992,8 @@ def walk(tech_data, serv_data, tpp_data, db_data, years, json_db, eu_map,
         # again to advance another level deeper into the data structure
         if isinstance(item, dict):
             walk(tech_data, serv_data, tpp_data, db_data,
-                 years, item, eu_map, cconv, key_list + [key])
+                 years, item, eu_map, cconv, key_list + [key],
+                 index=index, sd_index=sd_index)
 
         # If a leaf node has been reached, check if the second entry in
         # the key list is one of the recognized building types and that
@@ -973,7 +1015,7 @@ def walk(tech_data, serv_data, tpp_data, db_data, years, json_db, eu_map,
                     # Extract data from original data sources
                     data_dict, non_matching_names = mseg_technology_handler(
                         tech_data, serv_data, tpp_data, db_data,
-                        mseg_codes, years, eu_map, cconv)
+                        mseg_codes, years, eu_map, cconv, index, sd_index)
 
                     # Set dict key to extracted data
                     json_db[key] = data_dict
@@ -1139,17 +1181,20 @@ def main():
     col_indices, tech_dtypes = dtype_reducer(tech_dtypes,
                                              handyvars.columns_to_keep)
     tech_data = cm.data_import(eiadata.cpl_data, tech_dtypes, ',',
-                               handyvars.cpl_data_skip_lines, col_indices)
+                               handyvars.cpl_data_skip_lines, col_indices,
+                               cache=True)
     tech_data = cm.str_cleaner(tech_data, 'technology name')
 
     # Import EIA AEO 'KSDOUT' service demand data
     serv_dtypes = cm.dtype_array(cm.EIAData().serv_dmd)
-    serv_data = cm.data_import(cm.EIAData().serv_dmd, serv_dtypes)
+    serv_data = cm.data_import(cm.EIAData().serv_dmd, serv_dtypes,
+                               cache=True)
     serv_data, tval = cm.str_cleaner(serv_data, 'Description', True)
 
     # Import EIA AEO 'KDBOUT' additional data file
     catg_dtypes = cm.dtype_array(cm.EIAData().catg_dmd)
-    catg_data = cm.data_import(cm.EIAData().catg_dmd, catg_dtypes)
+    catg_data = cm.data_import(cm.EIAData().catg_dmd, catg_dtypes,
+                               cache=True)
     catg_data = cm.str_cleaner(catg_data, 'Label')
 
     # Import EIA AEO 'kprem' time preference premium data
@@ -1173,10 +1218,14 @@ def main():
              handyvars.json_out, 'w') as jso:
             msjson = json.load(jsi)
 
-            # Proceed recursively through database structure
+            # Proceed recursively through database structure, grouping
+            # the technology and service demand data once rather than
+            # searching the full arrays for each leaf node
             result, nmtn = walk(tech_data, serv_data, tpp_data, catg_data,
                                 years, msjson, handyvars.eu_map,
-                                handyvars.cconv)
+                                handyvars.cconv,
+                                index=TechDataIndex(tech_data),
+                                sd_index=cm.ServDmdIndex(serv_data, years))
 
             # Print warning message to the standard out with a unique
             # (i.e., non-repeating) list of technologies that didn't have
@@ -4070,6 +4070,31 @@ class TechnologyDataHandlerTest(CommonUnitTest):
                 self.cconv)
             self.dict_check(mseg_dict, self.tech_master_dict[idx])
 
+    # Test that the same dicts are produced when the technology and
+    # service demand data are gathered using a grouped index of the data
+    def test_conversion_using_grouped_index(self):
+        cmt.UsefulVars.trunc_len = 43
+        index = cmt.TechDataIndex(self.tech_data)
+        sd_index = cmt.cm.ServDmdIndex(self.sd_data, self.tmp_yrs)
+        unique_data_to_select = []
+        for an_mseg in self.data_to_select:
+            if an_mseg not in unique_data_to_select:
+                unique_data_to_select.append(an_mseg)
+
+        for idx, selected in enumerate(unique_data_to_select):
+            mseg_dict, non_matched_names = cmt.mseg_technology_handler(
+                self.tech_data,
+                self.sd_data,
+                self.prem_data,
+                self.db_data,
+                selected,
+                self.tmp_yrs,
+                self.eu_map,
+                self.cconv,
+                index,
+                sd_index)
+            self.dict_check(mseg_dict, self.tech_master_dict[idx])
+
 
 class ChoiceModelParametersExtractionTest(CommonUnitTest):
     """ Test the successful extraction of the time preference premiums
@@ -916,6 +916,18 @@ class PercentageCalculationTest(CommonUnitTest):
         self.assertTrue(
             (np.round(self.e - self.sd_percentages[2], decimals=5) == 0).all())
 
+    # Test that results are unchanged when using an index of the service
+    # demand data that is shared across calls
+    def test_service_demand_percentage_indexed(self):
+        index = cm.ServDmdIndex(self.sample_sd_array, self.years)
+        for sel, out in zip(self.selections, [
+                (self.a, self.b), (self.c, self.d), (self.e, self.f),
+                (self.g, self.h)]):
+            (a, b) = cm.sd_mseg_percent(
+                self.sample_sd_array, sel, self.years, index)
+            np.testing.assert_array_equal(a, out[0])
+            self.assertEqual(b, out[1])
+
 
 class CommercialDataSelectionTest(CommonUnitTest):
     """ Test function that selects a subset of data from the combined
@@ -924,6 +936,7 @@ class CommercialDataSelectionTest(CommonUnitTest):
 
     # Test correct selection and conversion
     def test_data_selection_and_reduction(self):
+        index = cm.CatgDataIndex(self.sample_db_array, self.years)
         for idx, the_keys in enumerate(self.sample_keys):
 
             catg_code = self.sample_keys_converted[idx]
@@ -960,6 +973,14 @@ class CommercialDataSelectionTest(CommonUnitTest):
                                       self.years),
                 self.expected_selection[idx])
 
+            # Check the selection using an index of the data
+            np.testing.assert_array_equal(
+                cm.catg_data_selector(self.sample_db_array,
+                                      select_indices,
+                                      correct_label_str,
+                                      self.years, index),
+                self.expected_selection[idx])
+
 
 class DataToFinalDictAtLeafNodeRestructuringTest(CommonUnitTest):
     """ Test function that handles selection of the appropriate data
@@ -0,0 +1,993 @@
+#!/usr/bin/env python3
+
+"""Module for compact, array-backed storage of nested measure data.
+
+Nested dicts of measure and baseline data (e.g., contributing microsegment
+data for measure competition) hold most of their values in dicts of
+numbers keyed by year. This module moves those values into rows of a
+numpy array that is written to a '.npy' file, which may be memory mapped
+when read back in, and pickles the remaining structure of the data
+separately. This avoids parsing or unpickling all numeric data up front
+and allows data for each microsegment to be restored only when needed.
+The module also provides a dense container for nested market data by year
+(e.g., results by climate zone, building type, and end use) that replaces
+recursive walks of the data with array operations, writers for measure
+results (JSON encoded in chunks, and a compact columnar format), and a chunked
+importer for large delimited text data files (e.g., EIA AEO data) with a
+binary cache of the imported arrays, together with a grouped index of the
+rows of the imported arrays.
+"""
+
+import numpy
+import gzip
+import pickle
+import hashlib
+import json
+import copy
+import itertools
+import io
+from collections.abc import MutableMapping
+from os import path, remove, replace, getpid
+
+
+def flatten_year_dicts(data, yr_rows, yr_keys, yr_keys_ind, int_vals):
+    """Move the numeric values of year-keyed dicts into rows of values.
+
+    Args:
+        data: Nested data (or a branch of the data).
+        yr_rows (list): Rows of year values (appended to).
+        yr_keys (list): Unique tuples of year keys (appended to).
+        yr_keys_ind (dict): Index of each tuple of year keys in 'yr_keys'.
+        int_vals (dict): Positions of integer values by row (updated).
+
+    Returns:
+        Data with each year-keyed dict of numbers replaced by a tuple with
+        the index of its row of values and of its tuple of year keys (and
+        any tuple in the data replaced by a tuple of None and its items).
+    """
+    if isinstance(data, dict):
+        # Year-keyed dict of numbers (e.g., stock or energy by year)
+        if len(data) > 0 and all([
+                isinstance(x, str) and x.isdigit() for x in
+                data.keys()]) and all([
+                type(x) in [int, float] for x in data.values()]):
+            keys = tuple(data.keys())
+            if keys not in yr_keys_ind:
+                yr_keys_ind[keys] = len(yr_keys)
+                yr_keys.append(keys)
+            vals = list(data.values())
+            # Record integer values, which are restored as integers
+            ints = [ind for ind, x in enumerate(vals) if type(x) is int]
+            if ints:
+                int_vals[len(yr_rows)] = ints
+            yr_rows.append(vals)
+            return (len(yr_rows) - 1, yr_keys_ind[keys])
+        else:
+            return {k: flatten_year_dicts(
+                v, yr_rows, yr_keys, yr_keys_ind, int_vals)
+                for k, v in data.items()}
+    elif isinstance(data, list):
+        return [flatten_year_dicts(
+            x, yr_rows, yr_keys, yr_keys_ind, int_vals) for x in data]
+    # Distinguish tuples in the data from those that mark year-keyed dicts
+    elif type(data) is tuple:
+        return (None, [flatten_year_dicts(
+            x, yr_rows, yr_keys, yr_keys_ind, int_vals) for x in data])
+    else:
+        return data
+
+
+def rebuild_year_dicts(structure, yr_vals, yr_keys, int_vals):
+    """Restore year-keyed dicts of numbers from rows of values.
+
+    Args:
+        structure: Data structure from 'flatten_year_dicts'.
+        yr_vals (numpy.ndarray): Year values by row (may be memory mapped).
+        yr_keys (list): Unique tuples of year keys.
+        int_vals (dict): Positions of integer values by row.
+
+    Returns:
+        Data with all year-keyed dicts of numbers (and tuples) restored.
+    """
+    # Convert all rows of values to lists at once (much faster than
+    # converting one row at a time)
+    yr_rows = yr_vals.tolist()
+    for row, ints in int_vals.items():
+        for ind in ints:
+            yr_rows[row][ind] = int(yr_rows[row][ind])
+
+    def rebuild(data):
+        # Note: a tuple marks a year-keyed dict of numbers, or a tuple in
+        # the data if its first element is None
+        if type(data) is tuple:
+            if data[0] is None:
+                return tuple(rebuild(x) for x in data[1])
+            return dict(zip(yr_keys[data[1]], yr_rows[data[0]]))
+        elif type(data) is dict:
+            return {k: rebuild(v) for k, v in data.items()}
+        elif type(data) is list:
+            return [rebuild(x) for x in data]
+        else:
+            return data
+
+    return rebuild(structure)
+
+
+def fill_year_array(yr_rows, yr_keys):
+    """Fill an array with rows of year values, padding short rows with NaN.
+
+    Args:
+        yr_rows (list): Rows of year values from 'flatten_year_dicts'.
+        yr_keys (list): Unique tuples of year keys.
+
+    Returns:
+        Array of year values by row.
+    """
+    yr_vals = numpy.full((len(yr_rows), max(
+        [len(x) for x in yr_keys] + [0])), numpy.nan)
+    for ind, row in enumerate(yr_rows):
+        yr_vals[ind, :len(row)] = row
+    return yr_vals
+
+
+class FlatYearData(object):
+    """Nested data with its year-keyed dicts of numbers held in array rows.
+
+    Note:
+        The data are kept in the form given by 'flatten_year_dicts', such
+        that the year values may stay in a memory mapped array (with pages
+        shared across processes) and year-keyed dicts are only restored for
+        the branches of the data that are looked up.
+
+    Attributes:
+        structure: Data structure from 'flatten_year_dicts'.
+        yr_vals (numpy.ndarray): Year values by row.
+        yr_keys (list): Unique tuples of year keys.
+        int_vals (dict): Positions of integer values by row.
+    """
+
+    def __init__(self, structure, yr_vals, yr_keys, int_vals):
+        self.structure = structure
+        self.yr_vals = yr_vals
+        self.yr_keys = yr_keys
+        self.int_vals = int_vals
+
+    @classmethod
+    def from_data(cls, data):
+        """Flatten nested data held in memory.
+
+        Args:
+            data (dict): Nested data.
+
+        Returns:
+            'FlatYearData' object with the data.
+        """
+        yr_rows, yr_keys, int_vals = ([], [], {})
+        structure = flatten_year_dicts(data, yr_rows, yr_keys, {}, int_vals)
+        return cls(structure, fill_year_array(yr_rows, yr_keys), yr_keys,
+                   int_vals)
+
+    def rebuild(self, branch):
+        """Restore year-keyed dicts of numbers in a branch of the structure.
+
+        Args:
+            branch: Branch of the data structure (e.g., 'structure' itself).
+
+        Returns:
+            Branch with all year-keyed dicts of numbers (and tuples) restored.
+        """
+        # Note: a tuple marks a year-keyed dict of numbers, or a tuple in the
+        # data if its first element is None
+        if type(branch) is tuple:
+            if branch[0] is None:
+                return tuple(self.rebuild(x) for x in branch[1])
+            keys = self.yr_keys[branch[1]]
+            vals = self.yr_vals[branch[0], :len(keys)].tolist()
+            for ind in self.int_vals.get(branch[0], []):
+                vals[ind] = int(vals[ind])
+            return dict(zip(keys, vals))
+        elif type(branch) is dict:
+            return {k: self.rebuild(v) for k, v in branch.items()}
+        elif type(branch) is list:
+            return [self.rebuild(x) for x in branch]
+        else:
+            return branch
+
+
+def temp_path(file_path):
+    """Set a temporary path under which to write a file before renaming it.
+
+    Note:
+        The temporary path is unique to the writing process, such that
+        processes writing the same file concurrently never write to (or
+        rename) each other's partially written files.
+
+    Args:
+        file_path (string): Path of the file to write.
+
+    Returns:
+        Temporary path of the file.
+    """
+    return file_path + "." + str(getpid()) + ".tmp"
+
+
+def write_array(file_path, arr):
+    """Write a numpy array to a '.npy' file, replacing any existing file.
+
+    Note:
+        The array is first written under a temporary name and then renamed,
+        such that concurrent processes never read a partially written file.
+
+    Args:
+        file_path (string): Path of the '.npy' file.
+        arr (numpy.ndarray): Array to write.
+    """
+    tmp_path = temp_path(file_path)
+    with open(tmp_path, 'wb') as fa:
+        numpy.save(fa, arr)
+    replace(tmp_path, file_path)
+
+
+def load_array(file_path):
+    """Read a numpy array from a '.npy' file, memory mapped where possible.
+
+    Args:
+        file_path (string): Path of the '.npy' file.
+
+    Returns:
+        Array from the file (read into memory if the array is empty, as
+        empty arrays cannot be memory mapped).
+    """
+    try:
+        return numpy.load(file_path, mmap_mode='r')
+    except ValueError:
+        return numpy.load(file_path)
+
+
+def write_compete_data(file_path, comp_data):
+    """Write a measure's competition data to an array-backed store.
+
+    Note:
+        The data for each contributing microsegment are flattened separately
+        such that their year values occupy a contiguous block of rows in the
+        '.npy' file. The '.pkl' index file records the block of rows and
+        the remaining structure of each contributing microsegment's data,
+        together with all other competition data. Any competition data file
+        in the previous (gzipped pickle) format is removed.
+
+    Args:
+        file_path (string): Path of the measure's competition data files,
+            without a file extension.
+        comp_data (dict): Competition data for the measure by adoption
+            scheme (the measure's 'mseg_adjust' data).
+    """
+    yr_rows, yr_keys, yr_keys_ind, index = ([], [], {}, {})
+    for adopt_scheme, mseg_adj in comp_data.items():
+        index[adopt_scheme] = {}
+        for k, v in mseg_adj.items():
+            # Flatten the data for each contributing microsegment
+            if k == "contributing mseg keys and values":
+                index[adopt_scheme][k] = {}
+                for mseg_key, mseg_data in v.items():
+                    mseg_rows, int_vals = ([], {})
+                    structure = flatten_year_dicts(
+                        mseg_data, mseg_rows, yr_keys, yr_keys_ind, int_vals)
+                    index[adopt_scheme][k][mseg_key] = (
+                        len(yr_rows), len(yr_rows) + len(mseg_rows),
+                        structure, int_vals)
+                    yr_rows.extend(mseg_rows)
+            # Store all other competition data as is
+            else:
+                index[adopt_scheme][k] = v
+    # Fill the array of year values by row (padding short rows)
+    yr_vals = fill_year_array(yr_rows, yr_keys)
+    # Write the array before the index such that the index never points to
+    # rows that are not yet written
+    write_array(file_path + ".npy", yr_vals)
+    write_cache_entry(file_path + ".pkl", {
+        "year keys": yr_keys, "index": index})
+    # Remove competition data in the previous format
+    if path.isfile(file_path + ".pkl.gz"):
+        remove(file_path + ".pkl.gz")
+
+
+def read_compete_data(file_path, lazy=True):
+    """Read a measure's competition data from an array-backed store.
+
+    Note:
+        Competition data in the previous (gzipped pickle) format are read in
+        full if no array-backed store exists for the measure.
+
+    Args:
+        file_path (string): Path of the measure's competition data files,
+            without a file extension.
+        lazy (boolean): Flag for restoring the data of each contributing
+            microsegment only when first accessed.
+
+    Returns:
+        Competition data for the measure by adoption scheme, with the data
+        on contributing microsegments given as a 'ContributingMsegs' object
+        (if lazy) or dict.
+    """
+    # Read competition data in the previous format
+    if not path.isfile(file_path + ".pkl") and \
+            path.isfile(file_path + ".pkl.gz"):
+        with gzip.open(file_path + ".pkl.gz", 'r') as zp:
+            return pickle.load(zp)
+    with open(file_path + ".pkl", 'rb') as fi:
+        stored = pickle.load(fi)
+    yr_vals = load_array(file_path + ".npy")
+    comp_data = {}
+    for adopt_scheme, mseg_adj in stored["index"].items():
+        comp_data[adopt_scheme] = {}
+        for k, v in mseg_adj.items():
+            if k == "contributing mseg keys and values":
+                comp_data[adopt_scheme][k] = ContributingMsegs(
+                    v, yr_vals, stored["year keys"])
+                # Restore the data for all contributing microsegments now
+                if lazy is False:
+                    comp_data[adopt_scheme][k] = dict(
+                        comp_data[adopt_scheme][k].items())
+            else:
+                comp_data[adopt_scheme][k] = v
+
+    return comp_data
+
+
+def hash_compete_data(file_path):
+    """Find a hash of the files of a measure's competition data store.
+
+    Args:
+        file_path (string): Path of the measure's competition data files,
+            without a file extension.
+
+    Returns:
+        Hex digest of the contents of the store files (in either the
+        array-backed or the previous format).
+    """
+    hasher = hashlib.sha256()
+    for ext in [".pkl", ".npy", ".pkl.gz"]:
+        if path.isfile(file_path + ext):
+            hasher.update(ext.encode())
+            with open(file_path + ext, 'rb') as fi:
+                for chunk in iter(lambda: fi.read(2 ** 20), b""):
+                    hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def write_cache_entry(file_path, data):
+    """Write cached results to a file.
+
+    Args:
+        file_path (string): Path of the cache file.
+        data: Results to cache.
+    """
+    # Write to a temporary file first such that an interrupted write never
+    # leaves a partial cache file in place
+    tmp_path = temp_path(file_path)
+    with open(tmp_path, 'wb') as fi:
+        pickle.dump(data, fi, -1)
+    replace(tmp_path, file_path)
+
+
+def read_cache_entry(file_path):
+    """Read cached results from a file.
+
+    Args:
+        file_path (string): Path of the cache file.
+
+    Returns:
+        Cached results, or None if the file is missing or unreadable.
+    """
+    try:
+        with open(file_path, 'rb') as fi:
+            return pickle.load(fi)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+class ContributingMsegs(MutableMapping):
+    """Dict-like view of contributing microsegment data in an array store.
+
+    Note:
+        The data for a contributing microsegment are restored from the
+        (memory mapped) array of year values when first accessed and then
+        kept, such that subsequent changes to the data persist.
+
+    Attributes:
+        data (dict): Restored data for each contributing microsegment, or
+            the block of rows, data structure, and integer value positions
+            for microsegments not yet accessed.
+        yr_vals (numpy.ndarray): Year values by row.
+        yr_keys (list): Unique tuples of year keys.
+    """
+
+    def __init__(self, index, yr_vals, yr_keys):
+        self.data = dict(index)
+        self.yr_vals = yr_vals
+        self.yr_keys = yr_keys
+
+    def __getitem__(self, mseg_key):
+        mseg_data = self.data[mseg_key]
+        # Note: restored data are dicts, so a tuple marks data that are not
+        # yet restored
+        if type(mseg_data) is tuple:
+            start, stop, structure, int_vals = mseg_data
+            mseg_data = rebuild_year_dicts(
+                structure, self.yr_vals[start:stop], self.yr_keys, int_vals)
+            self.data[mseg_key] = mseg_data
+        return mseg_data
+
+    def __setitem__(self, mseg_key, mseg_data):
+        self.data[mseg_key] = mseg_data
+
+    def __delitem__(self, mseg_key):
+        del self.data[mseg_key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, mseg_key):
+        return mseg_key in self.data
+
+    def keys(self):
+        return self.data.keys()
+
+    def copy(self):
+        """Copy the data, sharing the values of microsegments not restored.
+
+        Returns:
+            'ContributingMsegs' object with its own copy of all restored
+            microsegment data, such that changes to either object's data do
+            not affect the other.
+        """
+        return ContributingMsegs({
+            k: (v if type(v) is tuple else copy.deepcopy(v)) for
+            k, v in self.data.items()}, self.yr_vals, self.yr_keys)
+
+
+class MarketArray(object):
+    """Dense, array-backed container for nested market data by year.
+
+    Note:
+        Nested dicts of market data (e.g., a measure's energy, carbon, and
+        cost by climate zone, building type, and end use) are imported with
+        one named axis per level of nesting and a final axis of years, such
+        that arithmetic on all values is a single array operation rather than
+        a recursive walk of the dicts. Branches of the data that hold no
+        values (e.g., empty dicts) are kept for export.
+
+    Attributes:
+        axes (tuple): Names of the axes of the data (the last being years).
+        labels (list): Keys along each axis, in the order first found.
+        values (numpy.ndarray): Values by position along each axis (and by
+            sample, on a trailing axis, for data with sampled values).
+        mask (numpy.ndarray): Flags for the values present in the data, by
+            position along each axis.
+        branches (dict): Structure of the data, with None in place of each
+            year-keyed dict of values.
+    """
+
+    def __init__(self, axes, labels, values, mask, branches):
+        self.axes = tuple(axes)
+        self.labels = labels
+        self.values = values
+        self.mask = mask
+        self.branches = branches
+
+    @classmethod
+    def from_dict(cls, data, axes):
+        """Import nested market data (e.g., as read from a JSON file).
+
+        Args:
+            data (dict): Nested market data, with all values in year-keyed
+                dicts of numbers (or numpy arrays of sampled values).
+            axes (list): Names of each level of the data, ending with the
+                year level.
+
+        Returns:
+            Market data as a 'MarketArray' object.
+
+        Raises:
+            ValueError: If any year-keyed dict of values is not found at
+                the final level of the data.
+        """
+        labels, label_inds, leaves = (
+            [[] for n in axes], [{} for n in axes], [])
+
+        def label_ind(depth, key):
+            """Find the position of a key along an axis (adding new keys)."""
+            try:
+                return label_inds[depth][key]
+            except KeyError:
+                label_inds[depth][key] = len(labels[depth])
+                labels[depth].append(key)
+                return label_inds[depth][key]
+
+        def walk(branch, pos):
+            """Record the values and structure of a branch of the data."""
+            if len(branch) != 0 and not any([
+                    isinstance(x, dict) for x in branch.values()]):
+                if len(pos) != len(axes) - 1:
+                    raise ValueError(
+                        "Market data values found at level " +
+                        str(len(pos) + 1) + " rather than level " +
+                        str(len(axes)) + " ('" + axes[-1] + "')")
+                leaves.append((pos, [
+                    label_ind(len(pos), k) for k in branch.keys()],
+                    list(branch.values())))
+                return None
+            elif len(branch) != 0 and len(pos) == len(axes) - 1:
+                raise ValueError(
+                    "Market data branches found at level " +
+                    str(len(pos) + 1) + " ('" + axes[-1] + "')")
+            return {k: walk(v, pos + (label_ind(len(pos), k),)) for
+                    k, v in branch.items()}
+
+        branches = walk(data, ())
+        # Add a trailing axis of samples for data with sampled values
+        n_samples = [len(x) for leaf in leaves for x in leaf[2] if
+                     isinstance(x, numpy.ndarray)]
+        shape = tuple(len(x) for x in labels)
+        values = numpy.zeros(shape + tuple(n_samples[:1]))
+        mask = numpy.zeros(shape, dtype=bool)
+        for pos, yr_inds, vals in leaves:
+            mask[pos][yr_inds] = True
+            if len(n_samples) == 0:
+                values[pos][yr_inds] = vals
+            # Set values one by one where single and sampled values may mix
+            else:
+                for yr_ind, val in zip(yr_inds, vals):
+                    values[pos][yr_ind] = val
+
+        return cls(axes, labels, values, mask, branches)
+
+    def to_dict(self):
+        """Export market data to nested dicts.
+
+        Note:
+            Values are given as python numbers (or numpy arrays of sampled
+            values), such that data without samples may be written as JSON.
+
+        Returns:
+            Nested dicts of market data in the structure of the imported
+            data, with all values in year-keyed dicts.
+        """
+        yr_labels, label_inds = (self.labels[-1], [
+            {k: ind for ind, k in enumerate(x)} for x in self.labels])
+        sampled = (self.values.ndim > len(self.axes))
+        # Convert all values to python numbers at once for data without
+        # samples
+        values = self.values if sampled else self.values.tolist()
+
+        def walk(branch, pos):
+            """Restore the structure and values of a branch of the data."""
+            if branch is None:
+                vals = values
+                for ind in pos:
+                    vals = vals[ind]
+                return {yr_labels[ind]: (
+                    vals[ind].copy() if sampled else vals[ind]) for
+                    ind in numpy.flatnonzero(self.mask[pos])}
+            return {k: walk(v, pos + (label_inds[len(pos)][k],)) for
+                    k, v in branch.items()}
+
+        return walk(self.branches, ())
+
+    def year_values(self, yr_vals):
+        """Align year-keyed values with the year axis of the market data.
+
+        Args:
+            yr_vals (dict): Values keyed by year (numbers or numpy arrays
+                of sampled values).
+
+        Returns:
+            Array of the values that broadcasts against market data values.
+        """
+        vals = numpy.array([yr_vals[yr] for yr in self.labels[-1]])
+        # Align single values with any trailing axis of samples
+        if vals.ndim == 1 and self.values.ndim > len(self.axes):
+            vals = vals[:, None]
+        return vals
+
+    def divide(self, totals):
+        """Divide market data by totals for each year.
+
+        Args:
+            totals (dict): Totals by year.
+
+        Returns:
+            Market data as fractions of the totals (zero where a total
+            is zero), as a new 'MarketArray' object.
+        """
+        tots = self.year_values(totals)
+        values = numpy.zeros(numpy.broadcast(self.values, tots).shape)
+        numpy.divide(self.values, tots, out=values, where=(tots != 0))
+        return MarketArray(
+            self.axes, self.labels, values, self.mask, self.branches)
+
+    def multiply(self, factors):
+        """Multiply market data by factors for each year.
+
+        Args:
+            factors (dict): Factors by year.
+
+        Returns:
+            Market data multiplied by the factors, as a new 'MarketArray'
+            object.
+        """
+        return MarketArray(
+            self.axes, self.labels, self.values * self.year_values(factors),
+            self.mask, self.branches)
+
+    def add(self, other):
+        """Add other market data to the market data in place.
+
+        Args:
+            other (MarketArray): Market data with the same axes, whose
+                labels along each axis are all found in the market data.
+
+        Raises:
+            ValueError: If the axes of the other market data do not match.
+            KeyError: If a label of the other market data is not found in
+                the market data.
+        """
+        if other.axes != self.axes:
+            raise ValueError(
+                "Market data axes " + str(other.axes) + " do not match " +
+                str(self.axes))
+        label_inds = [{k: ind for ind, k in enumerate(x)} for
+                      x in self.labels]
+        inds = numpy.ix_(*[[inds[x] for x in other_labels] for
+                           inds, other_labels in zip(
+                               label_inds, other.labels)])
+        self.values[inds] += other.values
+        self.mask[inds] |= other.mask
+
+    def sum(self, axis):
+        """Sum market data over an axis.
+
+        Args:
+            axis (string): Name of the axis to sum over.
+
+        Returns:
+            Market data summed over the axis, as a new 'MarketArray'
+            object (with branches of the remaining axes that hold values).
+
+        Raises:
+            ValueError: If the axis is the year axis.
+        """
+        ind = self.axes.index(axis)
+        if ind == len(self.axes) - 1:
+            raise ValueError("Market data cannot be summed over years")
+        axes = self.axes[:ind] + self.axes[ind + 1:]
+        labels = self.labels[:ind] + self.labels[ind + 1:]
+        mask = self.mask.any(axis=ind)
+
+        def walk(pos):
+            """Find the structure of the summed data from present values."""
+            if len(pos) == len(axes) - 1:
+                return None
+            return {labels[len(pos)][k]: walk(pos + (k,)) for k in range(
+                len(labels[len(pos)])) if mask[pos + (k,)].any()}
+
+        return MarketArray(axes, labels, self.values.sum(axis=ind), mask,
+                           walk(()))
+
+
+def write_json_chunks(file_path, data):
+    """Write a dict to a JSON file, encoding one top-level entry at a time.
+
+    Note:
+        The file contents match those written by 'json.dump' with an indent
+        of two spaces. The dict is held in memory in full, but only the
+        encoded text of one top-level entry (e.g., the results of one
+        measure) is held at a time, rather than that of the full dict.
+
+    Args:
+        file_path (string): Path of the JSON file.
+        data (dict): Data to write, with string keys at the top level.
+    """
+    with open(file_path, 'w') as jso:
+        if len(data) == 0:
+            jso.write("{}")
+            return
+        jso.write("{")
+        for ind, (k, v) in enumerate(data.items()):
+            jso.write(("," if ind > 0 else "") + "\n  " + json.dumps(k) +
+                      ": " + json.dumps(v, indent=2).replace("\n", "\n  "))
+        jso.write("\n}")
+
+
+# Columns of measure results in the columnar format (see
+# 'write_result_columns'), with labels for all but the year and value columns
+RESULT_COLUMNS = ["measure", "section", "adoption scheme", "metric",
+                  "region", "building class", "end use", "year", "value"]
+
+
+def write_result_columns(file_path, results, adopt_schemes):
+    """Write measure results by year to a compact columnar file.
+
+    Note:
+        Results are written as one row per measure, results section (e.g.,
+        'Markets and Savings (by Category)', 'Portfolio Level'), adoption
+        scheme, metric, breakout category (region, building class, and end
+        use), and year, with the labels of each column stored once and
+        referenced by integer codes. Columns that do not apply to a row
+        (e.g., breakout categories for overall results) are blank. The file
+        is a compressed '.npz' file, from which individual columns may be
+        read (see 'read_result_columns').
+
+    Args:
+        file_path (string): Path of the '.npz' file.
+        results (dict): Results by measure (e.g., the analysis engine's
+            'output_ecms' attribute), with values by year at each leaf.
+        adopt_schemes (list): Adoption schemes of the results.
+
+    Raises:
+        ValueError: If the results are broken out by more categories than
+            the columns of the format.
+    """
+    labels = {x: [] for x in RESULT_COLUMNS[:-2]}
+    label_inds = {x: {} for x in RESULT_COLUMNS[:-2]}
+    codes = {x: [] for x in RESULT_COLUMNS}
+
+    def add_rows(path, yr_vals):
+        """Add rows for a leaf of the results given its key path."""
+        parts = list(path)
+        section = parts.pop(1)
+        # Financial metrics are further keyed by portfolio/consumer level
+        if section == "Financial Metrics":
+            section = parts.pop(1)
+        scheme = parts.pop(1) if parts[1] in adopt_schemes else ""
+        row = parts[:1] + [section, scheme] + parts[1:]
+        # Ensure the results do not break out values further than the label
+        # columns allow (the labels of further breakouts would be dropped)
+        if len(row) > len(RESULT_COLUMNS) - 2:
+            raise ValueError(
+                "Results for key path " + str(path) + " have " +
+                str(len(row)) + " labels, more than the " +
+                str(len(RESULT_COLUMNS) - 2) + " label columns of the " +
+                "columnar format")
+        row += [""] * (len(RESULT_COLUMNS) - 2 - len(row))
+        for col, label in zip(RESULT_COLUMNS[:-2], row):
+            try:
+                code = label_inds[col][label]
+            except KeyError:
+                code = label_inds[col][label] = len(labels[col])
+                labels[col].append(label)
+            codes[col].extend([code] * len(yr_vals))
+        codes["year"].extend([int(x) for x in yr_vals.keys()])
+        codes["value"].extend([float(x) for x in yr_vals.values()])
+
+    def walk(branch, path):
+        """Find all values by year in a branch of the results."""
+        if len(branch) != 0 and all([
+                isinstance(k, str) and k.isdigit() for k in branch.keys()]):
+            add_rows(path, branch)
+        else:
+            for k, v in branch.items():
+                if isinstance(v, dict):
+                    walk(v, path + (k,))
+
+    for name, out in results.items():
+        walk(out, (name,))
+    columns = {x + " (labels)": numpy.array(labels[x], dtype=str) for
+               x in labels.keys()}
+    columns.update({x: numpy.array(codes[x], dtype=numpy.int32) for
+                    x in RESULT_COLUMNS[:-1]})
+    columns["value"] = numpy.array(codes["value"], dtype=float)
+    # Note: a file object is passed such that numpy does not append a file
+    # extension to the given path
+    with open(file_path, 'wb') as fi:
+        numpy.savez_compressed(fi, **columns)
+
+
+def read_result_columns(file_path, columns=None):
+    """Read measure results from a compact columnar file.
+
+    Args:
+        file_path (string): Path of the '.npz' file.
+        columns (list): Columns to read (all columns if None).
+
+    Returns:
+        Dict of arrays by column, with the labels of each row for all but
+        the year and value columns.
+    """
+    with numpy.load(file_path) as npz:
+        return {x: (npz[x + " (labels)"][npz[x]] if x + " (labels)" in
+                    npz.files else npz[x]) for x in (
+                        columns if columns is not None else RESULT_COLUMNS)}
+
+
+def text_lines(text_file, replacements=[('\0', '')], block_size=2 ** 22):
+    """Read the lines of a text file by block, replacing text in each block.
+
+    Note:
+        The file is read in blocks of many lines, and the replacements
+        (e.g., removing NULL characters) are made on all of the complete
+        lines of a block at once, which is much faster than making them
+        line by line for large files.
+
+    Args:
+        text_file: File object of a text file, opened for reading.
+        replacements (list): Pairs of the text to replace and the text to
+            replace it with, in the order in which to make them.
+        block_size (int): Number of characters to read at a time.
+
+    Yields:
+        Each line of the file (with its line ending), with the replacements
+        made.
+    """
+    rest = ''
+    for block in iter(lambda: text_file.read(block_size), ''):
+        block = rest + block
+        # Hold back the last, possibly incomplete line for the next block
+        end = block.rfind('\n') + 1
+        block, rest = block[:end], block[end:]
+        for old, new in replacements:
+            block = block.replace(old, new)
+        yield from io.StringIO(block, newline='\n')
+    for old, new in replacements:
+        rest = rest.replace(old, new)
+    if rest:
+        yield rest
+
+
+def fill_struct_array(rows, dtype_list, retry=None, chunk_rows=100000):
+    """Convert rows of text data into a numpy structured array by chunk.
+
+    Note:
+        Rows are taken from the iterable of rows (e.g., a 'csv.reader'
+        object over a file) and converted a chunk at a time, such that the
+        rows of the full file are never held in memory at once. If
+        converting a chunk fails and 'retry' is given, the chunk and dtype
+        definition are updated by 'retry' and converted again; any
+        previously converted chunks are cast to the updated dtype
+        definition.
+
+    Args:
+        rows: Iterable of rows (tuples of values), each with one value
+            for each column in 'dtype_list'.
+        dtype_list (list): A numpy dtype definition, given as a list of
+            tuples of a column name and a string defining the data type.
+        retry (function): Function that takes a chunk of rows that could
+            not be converted and the dtype definition and returns updated
+            versions of each to convert instead.
+        chunk_rows (int): Number of rows to convert at a time.
+
+    Returns:
+        A numpy structured array of the rows, with the columns specified
+        by 'dtype_list' (or its updated version).
+
+    Raises:
+        ValueError: If a chunk of rows cannot be converted (after any
+            update by 'retry').
+    """
+    rows = iter(rows)
+    chunks = []
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        if len(chunk) == 0:
+            break
+        try:
+            arr = numpy.array(chunk, dtype=dtype_list)
+        except ValueError:
+            if retry is None:
+                raise
+            chunk, dtype_list = retry(chunk, dtype_list)
+            arr = numpy.array(chunk, dtype=dtype_list)
+            chunks = [x.astype(arr.dtype) for x in chunks]
+        chunks.append(arr)
+    if len(chunks) == 0:
+        return numpy.array([], dtype=dtype_list)
+    return numpy.concatenate(chunks)
+
+
+# Version of the text data importers (the 'data_import' functions of the
+# mseg and com_mseg modules, and 'fill_struct_array'), which is part of the
+# cache key of imported arrays (see 'text_array_key'); increment whenever a
+# change to the importers changes the arrays they produce, such that arrays
+# cached by earlier versions are not reused
+TEXT_IMPORT_VERSION = 1
+
+
+def text_array_key(file_path, params):
+    """Find the cache key of an array imported from a text data file.
+
+    Args:
+        file_path (string): Path of the text data file.
+        params (list): Settings used to import the data (e.g., the dtype
+            definition and delimiting character), given as basic types.
+
+    Returns:
+        Hex digest of the contents of the file, the import settings, and
+        the version of the importers.
+    """
+    hasher = hashlib.sha256(repr([TEXT_IMPORT_VERSION, params]).encode())
+    with open(file_path, 'rb') as fi:
+        for chunk in iter(lambda: fi.read(2 ** 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def read_array_cache(file_path, key):
+    """Read the cached array imported from a text data file, if current.
+
+    Args:
+        file_path (string): Path of the text data file.
+        key (string): Cache key of the imported array (see
+            'text_array_key').
+
+    Returns:
+        The cached array, or None if no cached array matches the key.
+    """
+    # Note: the array is read into memory (rather than memory mapped), as
+    # imported data are often modified in place (e.g., cleaned up strings)
+    if read_cache_entry(file_path + ".cache.key") != key:
+        return None
+    try:
+        return numpy.load(file_path + ".cache.npy")
+    except (OSError, ValueError):
+        return None
+
+
+def write_array_cache(file_path, key, arr):
+    """Write a cached copy of the array imported from a text data file.
+
+    Note:
+        The cache is written next to the text data file as a '.cache.npy'
+        array and a '.cache.key' file with the cache key; the key is
+        written last such that it never refers to a partially written
+        array. Caches that cannot be written are skipped.
+
+    Args:
+        file_path (string): Path of the text data file.
+        key (string): Cache key of the imported array (see
+            'text_array_key').
+        arr (numpy.ndarray): Imported array.
+    """
+    try:
+        write_array(file_path + ".cache.npy", arr)
+        write_cache_entry(file_path + ".cache.key", key)
+    except OSError:
+        pass
+
+
+def group_rows(data, cols, rows=None):
+    """Group the rows of a structured array by the values in some columns.
+
+    Note:
+        The rows are sorted once by the given columns (with a stable sort,
+        such that the rows of each group keep their original order) and
+        split at each change in the values of the columns.
+
+    Args:
+        data (numpy.ndarray): Structured array to group.
+        cols (list): Names of the columns to group by.
+        rows (numpy.ndarray): Indices of the rows to group, in ascending
+            order (all rows if None).
+
+    Returns:
+        Dict of the row indices (in ascending order) for each tuple of
+        values in the given columns.
+    """
+    if rows is None:
+        rows = numpy.arange(len(data))
+    if len(rows) == 0:
+        return {}
+    key_cols = [data[col][rows] for col in cols]
+    # Note: lexsort sorts by its last key first
+    order = numpy.lexsort(key_cols[::-1])
+    new_group = numpy.zeros(len(order), dtype=bool)
+    new_group[0] = True
+    for col in key_cols:
+        col_sorted = col[order]
+        new_group[1:] |= col_sorted[1:] != col_sorted[:-1]
+    offsets = numpy.append(numpy.flatnonzero(new_group), len(order))
+    return {tuple(col[order[start]].item() for col in key_cols):
+            rows[order[start:stop]] for start, stop in zip(
+                offsets[:-1], offsets[1:])}
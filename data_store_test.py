@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+
+"""Tests for the data_store python module
+"""
+
+import data_store
+
+import unittest
+import numpy
+import tempfile
+import pickle
+import gzip
+import os
+import json
+from unittest import mock
+
+
+class CommonMethods(object):
+    """Define common methods for use in all tests below."""
+
+    def dict_check(self, dict1, dict2):
+        """Check the equality of two nested dicts, including value types."""
+        self.assertEqual(type(dict1), type(dict2))
+        if isinstance(dict1, dict):
+            self.assertEqual(list(dict1.keys()), list(dict2.keys()))
+            for k in dict1.keys():
+                self.dict_check(dict1[k], dict2[k])
+        elif isinstance(dict1, (list, tuple)):
+            self.assertEqual(len(dict1), len(dict2))
+            for x, y in zip(dict1, dict2):
+                self.dict_check(x, y)
+        elif isinstance(dict1, numpy.ndarray):
+            numpy.testing.assert_array_equal(dict1, dict2)
+        else:
+            self.assertEqual(dict1, dict2)
+
+
+class CompeteDataStoreTest(unittest.TestCase, CommonMethods):
+    """Test writing and reading measure competition data stores.
+
+    Attributes:
+        comp_data (dict): Sample measure competition data by adoption scheme.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define sample competition data for use across all tests."""
+        cls.comp_data = {
+            "Technical potential": {
+                "contributing mseg keys and values": {
+                    "('primary', 'AIA_CZ1', 'single family home')": {
+                        "stock": {
+                            "total": {
+                                "all": {"2009": 10, "2010": 20},
+                                "measure": {"2009": 0.5, "2010": 1.5}}},
+                        "lifetime": {
+                            "baseline": {"2009": 15, "2010": 15},
+                            "measure": 20},
+                        "sub-market scaling": 1,
+                        "cost units": ("2013$/unit", None),
+                        "flag": {"2009": True, "2010": False}},
+                    "('secondary', 'AIA_CZ1', 'assembly')": {
+                        "energy": {
+                            "total": {
+                                "baseline": {"2009": 1.25, "2010": 2.5},
+                                "efficient": {"2009": 0.75, "2010": 2}}},
+                        "samples": [numpy.array([1.0, 2.0]), {"2009": 3}]}},
+                "competed choice parameters": {
+                    "('primary', 'AIA_CZ1', 'single family home')": {
+                        "b1": {"2009": -0.95, "2010": -0.95}}},
+                "secondary mseg adjustments": {
+                    "market share": {"original energy (total captured)": {}}}
+            },
+            "Max adoption potential": {
+                "contributing mseg keys and values": {},
+                "competed choice parameters": {},
+                "secondary mseg adjustments": {}}}
+
+    def setUp(self):
+        """Set up a temporary directory to hold store files."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "ECM 1")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that data read from a store match the data written."""
+        data_store.write_compete_data(self.file_path, self.comp_data)
+        for lazy in [True, False]:
+            comp_data = data_store.read_compete_data(self.file_path, lazy)
+            for scheme in self.comp_data.keys():
+                mseg_adj = comp_data[scheme]
+                self.assertEqual(
+                    isinstance(mseg_adj["contributing mseg keys and values"],
+                               data_store.ContributingMsegs), lazy)
+                self.dict_check(
+                    dict(mseg_adj["contributing mseg keys and values"]),
+                    self.comp_data[scheme][
+                        "contributing mseg keys and values"])
+                for k in ["competed choice parameters",
+                          "secondary mseg adjustments"]:
+                    self.dict_check(mseg_adj[k], self.comp_data[scheme][k])
+
+    def test_lazy_access(self):
+        """Test that data are restored on access and changes persist."""
+        data_store.write_compete_data(self.file_path, self.comp_data)
+        msegs = data_store.read_compete_data(self.file_path)[
+            "Technical potential"]["contributing mseg keys and values"]
+        key = "('primary', 'AIA_CZ1', 'single family home')"
+        # Check that the keys are available before any data are restored
+        self.assertEqual(list(msegs.keys()), list(self.comp_data[
+            "Technical potential"][
+            "contributing mseg keys and values"].keys()))
+        self.assertTrue(all([
+            type(x) is tuple for x in msegs.data.values()]))
+        msegs[key]["stock"]["total"]["all"]["2009"] = 5
+        self.assertEqual(msegs[key]["stock"]["total"]["all"]["2009"], 5)
+        self.assertTrue(msegs[key] is msegs[key])
+
+    def test_temp_files(self):
+        """Test that temporary files are unique by process and removed."""
+        self.assertTrue(str(os.getpid()) in data_store.temp_path(
+            self.file_path))
+        data_store.write_compete_data(self.file_path, self.comp_data)
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), [
+            "ECM 1.npy", "ECM 1.pkl"])
+
+    def test_previous_format(self):
+        """Test reading competition data in the gzipped pickle format."""
+        with gzip.open(self.file_path + ".pkl.gz", 'w') as zp:
+            pickle.dump(self.comp_data, zp, -1)
+        self.dict_check(data_store.read_compete_data(
+            self.file_path), self.comp_data)
+        # Check that the previous format is replaced when data are written
+        data_store.write_compete_data(self.file_path, self.comp_data)
+        self.assertFalse(os.path.isfile(self.file_path + ".pkl.gz"))
+
+
+class MarketArrayTest(unittest.TestCase, CommonMethods):
+    """Test importing, operating on, and exporting dense market data.
+
+    Attributes:
+        axes (list): Names of the levels of the sample market data.
+        mkt_data (dict): Sample market data by climate zone, building type,
+            and end use, including an end use without data.
+        mkt_data_dist (dict): Sample market data with sampled values.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define sample market data for use across all tests."""
+        cls.axes = ["climate zone", "building type", "end use", "year"]
+        cls.mkt_data = {
+            "AIA CZ1": {
+                "Residential (New)": {
+                    "Heating (Equip.)": {"2009": 10, "2010": 20.5},
+                    "Lighting": {}},
+                "Commercial (New)": {
+                    "Lighting": {"2009": 4.0, "2010": 0}}},
+            "AIA CZ2": {
+                "Residential (New)": {
+                    "Lighting": {"2009": 1.5, "2010": 3.0},
+                    "Heating (Equip.)": {}}}}
+        cls.mkt_data_dist = {
+            "AIA CZ1": {
+                "Residential (New)": {
+                    "Heating (Equip.)": {
+                        "2009": numpy.array([1.0, 2.0]),
+                        "2010": numpy.array([3.0, 4.0])},
+                    "Lighting": {"2009": 2.0, "2010": 1.0}}}}
+
+    def test_round_trip(self):
+        """Test that exported market data match the imported data."""
+        mkt_arr = data_store.MarketArray.from_dict(self.mkt_data, self.axes)
+        self.assertEqual(mkt_arr.values.shape, (2, 2, 2, 2))
+        self.assertEqual(mkt_arr.labels[2], ["Heating (Equip.)", "Lighting"])
+        self.dict_check(mkt_arr.to_dict(), {
+            "AIA CZ1": {
+                "Residential (New)": {
+                    "Heating (Equip.)": {"2009": 10.0, "2010": 20.5},
+                    "Lighting": {}},
+                "Commercial (New)": {
+                    "Lighting": {"2009": 4.0, "2010": 0.0}}},
+            "AIA CZ2": {
+                "Residential (New)": {
+                    "Lighting": {"2009": 1.5, "2010": 3.0},
+                    "Heating (Equip.)": {}}}})
+        # Check export of sampled values
+        mkt_arr = data_store.MarketArray.from_dict(
+            self.mkt_data_dist, self.axes)
+        self.assertEqual(mkt_arr.values.shape, (1, 1, 2, 2, 2))
+        self.dict_check(mkt_arr.to_dict(), {
+            "AIA CZ1": {
+                "Residential (New)": {
+                    "Heating (Equip.)": {
+                        "2009": numpy.array([1.0, 2.0]),
+                        "2010": numpy.array([3.0, 4.0])},
+                    "Lighting": {
+                        "2009": numpy.array([2.0, 2.0]),
+                        "2010": numpy.array([1.0, 1.0])}}}})
+
+    def test_level_check(self):
+        """Test that market data at an unexpected level are rejected."""
+        with self.assertRaises(ValueError):
+            data_store.MarketArray.from_dict(self.mkt_data, self.axes[1:])
+        with self.assertRaises(ValueError):
+            data_store.MarketArray.from_dict(
+                self.mkt_data, self.axes[:2] + ["fuel type"] + self.axes[2:])
+
+    def test_divide_multiply(self):
+        """Test finding and applying fractions of totals by year."""
+        totals = {"2009": 20, "2010": 0}
+        mkt_frac = data_store.MarketArray.from_dict(
+            self.mkt_data, self.axes).divide(totals)
+        self.assertEqual(mkt_frac.to_dict()["AIA CZ1"]["Residential (New)"][
+            "Heating (Equip.)"], {"2009": 0.5, "2010": 0.0})
+        self.assertEqual(mkt_frac.multiply({"2009": 2, "2010": 5}).to_dict()[
+            "AIA CZ2"]["Residential (New)"]["Lighting"],
+            {"2009": 0.15, "2010": 0.0})
+        # Check fractions of sampled values
+        mkt_frac = data_store.MarketArray.from_dict(
+            self.mkt_data_dist, self.axes).divide({"2009": 2, "2010": 4})
+        numpy.testing.assert_array_equal(mkt_frac.values[0, 0, 0], [
+            [0.5, 1.0], [0.75, 1.0]])
+
+    def test_add_sum(self):
+        """Test adding market data in place and summing over an axis."""
+        mkt_arr = data_store.MarketArray.from_dict(self.mkt_data, self.axes)
+        mkt_arr.add(data_store.MarketArray.from_dict({
+            "AIA CZ2": {
+                "Commercial (New)": {
+                    "Lighting": {"2010": 2}}}}, self.axes))
+        mkt_sum = mkt_arr.sum("climate zone")
+        self.assertEqual(mkt_sum.axes, (
+            "building type", "end use", "year"))
+        self.assertEqual(mkt_sum.to_dict(), {
+            "Residential (New)": {
+                "Heating (Equip.)": {"2009": 10.0, "2010": 20.5},
+                "Lighting": {"2009": 1.5, "2010": 3.0}},
+            "Commercial (New)": {
+                "Lighting": {"2009": 4.0, "2010": 2.0}}})
+        with self.assertRaises(KeyError):
+            mkt_arr.add(data_store.MarketArray.from_dict({
+                "AIA CZ3": {
+                    "Commercial (New)": {
+                        "Lighting": {"2010": 2}}}}, self.axes))
+
+
+class ResultWritersTest(unittest.TestCase):
+    """Test writing measure results to JSON and columnar files.
+
+    Attributes:
+        results (dict): Sample measure results.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define sample measure results for use across all tests."""
+        cls.results = {
+            "ECM 1": {
+                "Filter Variables": {"Applicable Regions": ["AIA CZ1"]},
+                "Markets and Savings (Overall)": {
+                    "Technical potential": {
+                        "Energy Savings (MMBtu)": {"2009": 5, "2010": 7.5}}},
+                "Markets and Savings (by Category)": {
+                    "Technical potential": {
+                        "Energy Savings (MMBtu)": {
+                            "AIA CZ1": {
+                                "Residential (New)": {
+                                    "Lighting": {
+                                        "2009": 5.0, "2010": 7.5},
+                                    "Heating (Equip.)": {}}}}}},
+                "Financial Metrics": {
+                    "Portfolio Level": {
+                        "Technical potential": {
+                            "Cost of Conserved Energy ($/MMBtu saved)": {
+                                "2009": 1.5, "2010": 2.5}}},
+                    "Consumer Level": {
+                        "Payback (years)": {"2009": 3.0, "2010": 999}}}},
+            "All ECMs": {
+                "Markets and Savings (Overall)": {
+                    "Technical potential": {
+                        "Energy Savings (MMBtu)": {"2009": 5, "2010": 7.5}}}}}
+
+    def setUp(self):
+        """Set up a temporary directory to hold results files."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp_dir.cleanup()
+
+    def test_json_chunks(self):
+        """Test that JSON encoded in chunks matches JSON encoded at once."""
+        for results in [self.results, self.results["ECM 1"], {}]:
+            file_path = os.path.join(self.tmp_dir.name, "results.json")
+            data_store.write_json_chunks(file_path, results)
+            with open(file_path, 'r') as jsi:
+                self.assertEqual(jsi.read(), json.dumps(results, indent=2))
+
+    def test_columns(self):
+        """Test writing and reading results in the columnar format."""
+        file_path = os.path.join(self.tmp_dir.name, "results.npz")
+        data_store.write_result_columns(
+            file_path, self.results, ["Technical potential"])
+        columns = data_store.read_result_columns(file_path)
+        rows = [tuple(x) for x in zip(*[
+            columns[x].tolist() for x in data_store.RESULT_COLUMNS])]
+        self.assertEqual(rows, [
+            ("ECM 1", "Markets and Savings (Overall)", "Technical potential",
+             "Energy Savings (MMBtu)", "", "", "", yr, val) for
+            yr, val in [(2009, 5.0), (2010, 7.5)]] + [
+            ("ECM 1", "Markets and Savings (by Category)",
+             "Technical potential", "Energy Savings (MMBtu)", "AIA CZ1",
+             "Residential (New)", "Lighting", yr, val) for
+            yr, val in [(2009, 5.0), (2010, 7.5)]] + [
+            ("ECM 1", "Portfolio Level", "Technical potential",
+             "Cost of Conserved Energy ($/MMBtu saved)", "", "", "", yr,
+             val) for yr, val in [(2009, 1.5), (2010, 2.5)]] + [
+            ("ECM 1", "Consumer Level", "", "Payback (years)", "", "", "",
+             yr, val) for yr, val in [(2009, 3.0), (2010, 999.0)]] + [
+            ("All ECMs", "Markets and Savings (Overall)",
+             "Technical potential", "Energy Savings (MMBtu)", "", "", "",
+             yr, val) for yr, val in [(2009, 5.0), (2010, 7.5)]])
+        # Check reading selected columns
+        self.assertEqual(list(data_store.read_result_columns(
+            file_path, ["metric", "value"]).keys()), ["metric", "value"])
+        # Check that results with more breakout levels than the columns
+        # of the format are rejected
+        with self.assertRaises(ValueError):
+            data_store.write_result_columns(file_path, {"ECM 1": {
+                "Markets and Savings (by Category)": {
+                    "Technical potential": {
+                        "Energy Savings (MMBtu)": {
+                            "AIA CZ1": {
+                                "Residential (New)": {
+                                    "Lighting": {
+                                        "LEDs": {"2009": 1.0}}}}}}}}},
+                ["Technical potential"])
+
+
+class TextImportTest(unittest.TestCase):
+    """Test importing delimited text data files to structured arrays."""
+
+    def setUp(self):
+        """Set up a temporary directory to hold data files."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "data.txt")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp_dir.cleanup()
+
+    def test_text_lines(self):
+        """Test reading lines by block with text replaced."""
+        with open(self.file_path, 'w') as fo:
+            fo.write('a,1\0\n\0b,2\nc,3')
+        for block_size in [1, 3, 100]:
+            with open(self.file_path) as fi:
+                self.assertEqual(list(data_store.text_lines(
+                    fi, block_size=block_size)), ['a,1\n', 'b,2\n', 'c,3'])
+
+    def test_fill_struct_array(self):
+        """Test converting rows by chunk, with a retry on failed chunks."""
+        rows = [('a', '1'), ('b', '2'), ('c', '2.5')]
+        dtype_list = [('name', '<U5'), ('value', 'i4')]
+
+        def retry(chunk, dtype_list):
+            return chunk, [dtype_list[0], ('value', 'f8')]
+
+        arr = data_store.fill_struct_array(rows, dtype_list, retry, 2)
+        self.assertEqual(arr.dtype['value'], numpy.dtype('f8'))
+        self.assertEqual(arr.tolist(), [('a', 1.0), ('b', 2.0), ('c', 2.5)])
+        with self.assertRaises(ValueError):
+            data_store.fill_struct_array(rows, dtype_list, chunk_rows=2)
+        self.assertEqual(len(data_store.fill_struct_array(
+            [], dtype_list)), 0)
+
+    def test_group_rows(self):
+        """Test grouping rows by the values in some columns."""
+        arr = numpy.array([('a', 1), ('b', 2), ('a', 2), ('a', 1)],
+                          dtype=[('name', '<U5'), ('value', 'i4')])
+        groups = data_store.group_rows(arr, ['name', 'value'])
+        self.assertEqual({k: v.tolist() for k, v in groups.items()}, {
+            ('a', 1): [0, 3], ('a', 2): [2], ('b', 2): [1]})
+        groups = data_store.group_rows(arr, ['name'], numpy.array([1, 2]))
+        self.assertEqual({k: v.tolist() for k, v in groups.items()}, {
+            ('a',): [2], ('b',): [1]})
+
+    def test_array_cache(self):
+        """Test that cached arrays are used only for unchanged files."""
+        arr = numpy.array([('a', 1)], dtype=[('name', '<U5'), ('value', 'i4')])
+        with open(self.file_path, 'w') as fo:
+            fo.write('name,value\na,1\n')
+        key = data_store.text_array_key(self.file_path, ["settings"])
+        self.assertIsNone(data_store.read_array_cache(self.file_path, key))
+        data_store.write_array_cache(self.file_path, key, arr)
+        cached = data_store.read_array_cache(self.file_path, key)
+        self.assertEqual(cached.tolist(), arr.tolist())
+        # Check that changes to the file or import settings change the key
+        self.assertNotEqual(key, data_store.text_array_key(
+            self.file_path, ["other settings"]))
+        # Check that a change to the version of the importers changes the key
+        with mock.patch.object(data_store, "TEXT_IMPORT_VERSION",
+                               data_store.TEXT_IMPORT_VERSION + 1):
+            self.assertNotEqual(key, data_store.text_array_key(
+                self.file_path, ["settings"]))
+        with open(self.file_path, 'a') as fo:
+            fo.write('b,2\n')
+        self.assertIsNone(data_store.read_array_cache(
+            self.file_path, data_store.text_array_key(
+                self.file_path, ["settings"])))
+
+
+# Offer external code execution (include all lines below this point in all
+# test files)
+def main():
+    """Trigger default behavior of running all test fixtures in the file."""
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -11,10 +11,13 @@ import warnings
 from urllib.parse import urlparse
 import gzip
 import pickle
-from functools import reduce  # forward compatibility for Python 3
-import operator
 from argparse import ArgumentParser
 from ast import literal_eval
+import multiprocessing
+import hashlib
+from data_store import rebuild_year_dicts, write_compete_data, \
+    read_compete_data, write_array, write_cache_entry, load_array, \
+    FlatYearData
 
 
 class MyEncoder(json.JSONEncoder):
@@ -43,6 +46,8 @@ class UsefulInputFiles(object):
         ecm_packages (JSON): Measure package data.
         ecm_prep (JSON): Prepared measure attributes data for use in the
             analysis engine.
+        ecm_prep_manifest (JSON): Hashes of the measure definitions, input
+            files, and options used in preparing measure attributes data.
         ecm_compete_data: Folder with contributing microsegment data needed
             to run measure competition in the analysis engine.
         run_setup (JSON): Names of active measures that should be run in
@@ -55,6 +60,8 @@ class UsefulInputFiles(object):
         tsv_shape_data (CSV): Custom time sensitive hourly savings shape data.
         tsv_metrics_data_tot (CSV): Total system load shape data by EMM region.
         tsv_metrics_data_net (CSV): Net system load shape data by EMM region.
+        tsv_fact_cache (pkl.gz): Time sensitive valuation factors stored
+            across runs (if desired by the user).
         health_data (CSV): EPA public health benefits data by EMM region.
         regions (str): Specifies which baseline data file to choose, based on
             intended regional breakout.
@@ -91,6 +98,8 @@ class UsefulInputFiles(object):
         self.indiv_ecms = "ecm_definitions"
         self.ecm_packages = ("ecm_definitions", "package_ecms.json")
         self.ecm_prep = ("supporting_data", "ecm_prep.json")
+        self.ecm_prep_manifest = (
+            "supporting_data", "ecm_prep_manifest.json")
         self.ecm_compete_data = ("supporting_data", "ecm_competition_data")
         self.run_setup = "run_setup.json"
         self.cpi_data = ("supporting_data", "convert_data", "cpi.csv")
@@ -114,6 +123,8 @@ class UsefulInputFiles(object):
             "supporting_data", "tsv_data", "tsv_hrs_tot.csv")
         self.tsv_metrics_data_net = (
             "supporting_data", "tsv_data", "tsv_hrs_net.csv")
+        self.tsv_fact_cache = (
+            "supporting_data", "tsv_data", "tsv_fact_cache.pkl.gz")
         self.health_data = (
             "supporting_data", "convert_data", "epa_costs.csv")
 
@@ -127,6 +138,8 @@ class UsefulVars(object):
         retro_rate (float): Rate at which existing stock is retrofitted.
         nsamples (int): Number of samples to draw from probability distribution
             on measure inputs.
+        rand_seed (int): Seed for the run's random draws from probability
+            distributions on measure inputs (0 unless set by the user).
         aeo_years (list): Modeling time horizon.
         aeo_years_summary (list): Reduced set of snapshot years in the horizon.
         demand_tech (list): All demand-side heating/cooling technologies.
@@ -195,8 +208,10 @@ class UsefulVars(object):
         tsv_metrics_data (str): Includes information on max/min net system load
             hours, peak/take net system load windows, and peak days by EMM
             region/season, as well as days of year to attribute to each season.
-        tsv_hourly_price (dict): Dict for storing hourly price factors.
-        tsv_hourly_emissions (dict): Dict for storing hourly emissions factors.
+        tsv_hourly_price (dict): Dict for storing hourly price factors
+            (8760 x TSV data year arrays, by EMM region).
+        tsv_hourly_emissions (dict): Dict for storing hourly emissions factors
+            (8760 x TSV data year arrays, by EMM region).
         tsv_hourly_lafs (dict): Dict for storing annual energy, cost, and
             carbon adjustment factors by region, building type, and end use.
         emm_name_num_map (dict): Maps EMM region names to EIA region numbers.
@@ -204,6 +219,7 @@ class UsefulVars(object):
             shape data.
         health_scn_names (list): List of public health data scenario names.
         health_scn_data (numpy.ndarray): Public health cost data.
+        frozen (boolean): Flags variables that may no longer be changed.
     """
 
     def __init__(self, base_dir, handyfiles, regions, tsv_metrics,
@@ -212,6 +228,7 @@ class UsefulVars(object):
         self.discount_rate = 0.07
         self.retro_rate = 0.01
         self.nsamples = 100
+        self.rand_seed = 0
         # Load metadata including AEO year range
         with open(path.join(base_dir, handyfiles.metadata), 'r') as aeo_yrs:
             try:
@@ -899,9 +916,7 @@ class UsefulVars(object):
                             "6A": 10,
                             "6B": 17,
                             "7": 31}
-                    },
-                    "hourly index": list(enumerate(
-                        itertools.product(range(365), range(24))))
+                    }
                 }
             else:
                 self.tsv_metrics_data = None
@@ -1048,6 +1063,89 @@ class UsefulVars(object):
 
         return keyval_list
 
+    def freeze(self):
+        """Prevent further changes to the attributes of the object.
+
+        Note:
+            Once frozen, the object may be shared across Measure objects
+            (see 'UsefulVarsOverlay') without any one measure resetting the
+            global variables seen by the others.
+        """
+        object.__setattr__(self, "frozen", True)
+
+    def __setattr__(self, name, value):
+        """Set an attribute unless the object has been frozen.
+
+        Raises:
+            AttributeError: If the object has been frozen.
+        """
+        if getattr(self, "frozen", False) is True:
+            raise AttributeError(
+                "Cannot set attribute '" + name + "' of frozen global "
+                "variables shared across measures; set it on the measure's "
+                "'handyvars' overlay instead")
+        object.__setattr__(self, name, value)
+
+
+class UsefulVarsOverlay(object):
+    """Class of measure-specific variables layered over global variables.
+
+    Note:
+        Attributes not set on the overlay are read from the shared global
+        variables (UsefulVars object), which are never copied. Attributes
+        set on the overlay (including those a measure updates as it is
+        prepared) apply only to the measure that owns the overlay.
+
+    Attributes:
+        shared (object): Global variables shared across measures.
+        tsv_hourly_lafs (dict): Measure-specific copy of the shared dict for
+            storing annual energy, cost, and carbon adjustment factors.
+        tsv_hourly_price (dict): Measure-specific copy of the shared dict for
+            storing hourly price factors.
+        tsv_hourly_emissions (dict): Measure-specific copy of the shared dict
+            for storing hourly emissions factors.
+    """
+
+    # Global variables that are updated by each measure as it is prepared
+    local_attrs = [
+        "tsv_hourly_lafs", "tsv_hourly_price", "tsv_hourly_emissions"]
+
+    def __init__(self, shared, **kwargs):
+        self.shared = shared
+        # Initialize measure-specific copies of the global variables that
+        # are updated by each measure
+        for attr in self.local_attrs:
+            if hasattr(shared, attr):
+                setattr(self, attr, copy.deepcopy(getattr(shared, attr)))
+        # Set any other measure-specific values for global variables
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __getattr__(self, name):
+        """Read attributes not set on the overlay from the global variables.
+
+        Raises:
+            AttributeError: If the attribute is not a global variable.
+        """
+        # Note: special attributes and the 'shared' attribute itself are not
+        # looked up in the global variables (e.g., when unpickling)
+        if name.startswith("__") or name == "shared" or \
+                self.__dict__.get("shared") is None:
+            raise AttributeError(name)
+        return getattr(self.shared, name)
+
+    def __deepcopy__(self, memo):
+        """Copy the measure-specific variables, sharing global variables."""
+        new = object.__new__(type(self))
+        memo[id(self)] = new
+        for key, value in self.__dict__.items():
+            if key == "shared":
+                new.__dict__[key] = value
+            else:
+                new.__dict__[key] = copy.deepcopy(value, memo)
+
+        return new
+
 
 class EPlusMapDicts(object):
     """Class of dicts used to map Scout measure definitions to EnergyPlus.
@@ -1311,6 +1409,461 @@ class EPlusGlobals(object):
         return eplus_vintage_weights
 
 
+class BaselineMsegStore(object):
+    """Class of flattened baseline microsegment data for fast lookups.
+
+    Note:
+        Baseline stock/energy and cost/performance/lifetime data are read
+        from nested data once, such that each microsegment key chain may
+        subsequently be mapped to its data with a single lookup rather than
+        by walking each level of the nested data.
+
+        Stock/energy data are held in flattened form (see 'FlatYearData'),
+        and the store reads complete numeric stock and energy data directly
+        from the array of year values (which may be memory mapped, such
+        that processes preparing measures share its pages); year-keyed
+        dicts are only restored for the levels of the stock/energy data
+        that are looked up. The store holds references to (not copies of)
+        the levels of the nested cost/performance/lifetime dicts.
+
+    Attributes:
+        aeo_years (list): Modeling time horizon.
+        msegs (object): Flattened baseline stock and energy use data.
+        index (dict): Row number for each baseline key chain (region,
+            building type, fuel type, end use, technology type, technology),
+            including all partial key chains at higher levels of the data.
+        cpl (list): Baseline cost, performance, and lifetime data by row.
+        mseg (list): Flattened baseline stock and energy use data by row.
+        yr_cols (list): Columns of the year values for each year in the
+            modeling time horizon, by tuple of year keys in the flattened
+            data (None for tuples that miss any of these years).
+        yr_rows (dict): Row of year values in the flattened data for the
+            stock and energy data of each row (-1 if none).
+        yr_keys (dict): Tuple of year keys in the flattened data for the
+            stock and energy data of each row (-1 if none).
+        stock_ok (numpy.ndarray): Flags rows with complete stock data.
+        energy_ok (numpy.ndarray): Flags rows with complete energy data.
+        bldg_constr (dict): New construction data by region and building
+            type, filled as needed by the 'new_constr' method.
+    """
+
+    # Microsegment key chain elements that do not break out baseline data
+    skip_keys = ["primary", "secondary", "new", "existing", None]
+
+    def __init__(self, msegs, msegs_cpl, aeo_years):
+        self.aeo_years = aeo_years
+        # Flatten stock/energy data that are given as nested dicts
+        if not isinstance(msegs, FlatYearData):
+            msegs = FlatYearData.from_data(msegs)
+        self.msegs = msegs
+        self.index, self.cpl, self.mseg = ({}, [], [])
+        self.bldg_constr = {}
+        # Register all baseline key chains, starting from the top level
+        self.add_rows((), msegs_cpl, msegs.structure)
+        # Find the columns of each tuple of year keys in the flattened data
+        # that hold the years of the modeling time horizon (None if any year
+        # is missing)
+        self.yr_cols = [numpy.array([x.index(yr) for yr in aeo_years]) if all(
+            [yr in x for yr in aeo_years]) else None for x in msegs.yr_keys]
+        self.yr_rows, self.yr_keys = ({}, {})
+        ok = {}
+        for var in ["stock", "energy"]:
+            # Find the row of year values and tuple of year keys for rows
+            # with numeric data for all years in the modeling time horizon
+            self.yr_rows[var], self.yr_keys[var] = (numpy.full(
+                len(self.mseg), -1) for n in range(2))
+            for row, mseg in enumerate(self.mseg):
+                if isinstance(mseg, dict) and all([
+                        x in mseg.keys() for x in ["stock", "energy"]]) and \
+                        type(mseg[var]) is tuple and \
+                        mseg[var][0] is not None and \
+                        self.yr_cols[mseg[var][1]] is not None:
+                    self.yr_rows[var][row], self.yr_keys[var][row] = \
+                        mseg[var]
+            # Flag rows with complete (finite) numeric data, reading the data
+            # for all rows with the same year keys at once
+            ok[var] = numpy.zeros(len(self.mseg), dtype=bool)
+            for keys_ind in numpy.unique(self.yr_keys[var]):
+                if keys_ind == -1:
+                    continue
+                rows = numpy.flatnonzero(self.yr_keys[var] == keys_ind)
+                ok[var][rows] = numpy.isfinite(msegs.yr_vals[
+                    self.yr_rows[var][rows][:, None],
+                    self.yr_cols[keys_ind]]).all(axis=1)
+        self.stock_ok, self.energy_ok = [ok["stock"], ok["energy"]]
+
+    def add_rows(self, keys, cpl, mseg):
+        """Register a baseline key chain and all key chains below it.
+
+        Args:
+            keys (tuple): Baseline key chain to register.
+            cpl (dict): Baseline cost/performance/lifetime data for key chain.
+            mseg (dict): Flattened baseline stock/energy data for key chain
+                (None if the key chain is missing from the stock/energy data).
+        """
+        self.index[keys] = len(self.mseg)
+        self.cpl.append(cpl)
+        self.mseg.append(mseg)
+        # Proceed down to the next level of the data until the terminal
+        # stock/energy data are reached (key chains are defined by the
+        # cost/performance/lifetime data, consistent with 'fill_mkts')
+        if isinstance(cpl, dict) and isinstance(mseg, dict) and all([
+                x not in mseg.keys() for x in ["stock", "energy"]]):
+            for k, v in cpl.items():
+                self.add_rows(keys + (k,), v, mseg.get(k))
+
+    def values(self, row, var):
+        """Read complete numeric stock or energy data for a row.
+
+        Args:
+            row (int): Row number.
+            var (string): Data type ('stock' or 'energy').
+
+        Returns:
+            Array of the data by year in the modeling time horizon.
+        """
+        return self.msegs.yr_vals[self.yr_rows[var][row], self.yr_cols[
+            self.yr_keys[var][row]]]
+
+    def find(self, mskeys):
+        """Find baseline data for a microsegment key chain.
+
+        Args:
+            mskeys (tuple): Microsegment key chain.
+
+        Returns:
+            Number of key chain levels with baseline data (equal to the
+            key chain length when baseline data are found for the full key
+            chain), and the row number for the deepest of these levels.
+
+        Raises:
+            KeyError: If key chain is found in the baseline cost/performance/
+                lifetime data but not in the baseline stock/energy data.
+        """
+        # Key chain levels that break out baseline data
+        keys = tuple(x for x in mskeys if x not in self.skip_keys)
+        # Handle the typical case where the full key chain is found
+        try:
+            row, depth = [self.index[keys], len(mskeys)]
+        # Otherwise, find the first key chain level without baseline data
+        except KeyError:
+            row, depth, keys = [0, len(mskeys), ()]
+            for i, k in enumerate(mskeys):
+                if k in self.skip_keys:
+                    continue
+                elif (keys + (k,)) in self.index.keys():
+                    keys = keys + (k,)
+                    row = self.index[keys]
+                else:
+                    depth = i
+                    break
+        if self.mseg[row] is None:
+            raise KeyError(
+                "Baseline stock/energy data missing for key chain " +
+                str(keys))
+
+        return depth, row
+
+    def mseg_data(self, row):
+        """Return baseline stock/energy data for a row.
+
+        Note:
+            Year-keyed dicts are restored for rows with terminal stock/energy
+            data only; for rows at higher levels of the data, the flattened
+            data (with the same keys) are returned.
+
+        Args:
+            row (int): Row number.
+
+        Returns:
+            Baseline stock/energy data for the row.
+        """
+        mseg = self.mseg[row]
+        if isinstance(mseg, dict) and any([
+                x in mseg.keys() for x in ["stock", "energy"]]):
+            return self.msegs.rebuild(mseg)
+        else:
+            return mseg
+
+    def node(self, keys):
+        """Return baseline stock/energy data for a baseline key chain.
+
+        Args:
+            keys (tuple): Baseline key chain (e.g., region, building type,
+                and 'total square footage').
+
+        Returns:
+            Baseline stock/energy data for the key chain (with year-keyed
+            dicts restored).
+
+        Raises:
+            KeyError: If the key chain is missing from the baseline stock/
+                energy data.
+        """
+        keys = tuple(keys)
+        # Find the deepest level of the key chain that is registered in the
+        # store (key chains are registered from the cost/performance/
+        # lifetime data) and walk the stock/energy data for any remaining
+        # levels (e.g., building stock data that have no cost/performance/
+        # lifetime counterpart)
+        depth = len(keys)
+        while keys[:depth] not in self.index.keys():
+            depth -= 1
+        node = self.mseg[self.index[keys[:depth]]]
+        try:
+            for k in keys[depth:]:
+                node = node[k]
+        except (KeyError, TypeError):
+            node = None
+        if node is None:
+            raise KeyError(
+                "Baseline stock/energy data missing for key chain " +
+                str(keys))
+
+        return self.msegs.rebuild(node)
+
+    def new_constr(self, czone, bldg, bldg_sect):
+        """Find new construction information for a region/building type.
+
+        Args:
+            czone (string): Region.
+            bldg (string): Building type.
+            bldg_sect (string): Building sector ('residential' or
+                'commercial').
+
+        Returns:
+            Dict with annual new, total new, total, and new fraction of
+            buildings (residential) or floor area (commercial) by year, and
+            an array of the new fraction of buildings/floor area by year.
+        """
+        try:
+            return self.bldg_constr[(czone, bldg)]
+        except KeyError:
+            pass
+        # Set building stock data keys by sector
+        if bldg_sect == "residential":
+            new_key, tot_key = ["new homes", "total homes"]
+        else:
+            new_key, tot_key = ["new square footage", "total square footage"]
+        new_stock, tot_stock = [
+            self.node((czone, bldg, x)) for x in [new_key, tot_key]]
+        new_constr = {"annual new": {}, "total new": {},
+                      "total": {}, "new fraction": {}}
+        for yr in self.aeo_years:
+            # Find new and total buildings/floor area for current year
+            new_constr["annual new"][yr] = new_stock[yr]
+            new_constr["total"][yr] = tot_stock[yr]
+            # Find cumulative total of new building/floor space stock
+            if yr == self.aeo_years[0]:
+                new_constr["total new"][yr] = new_constr["annual new"][yr]
+            else:
+                new_constr["total new"][yr] = \
+                    new_constr["annual new"][yr] + \
+                    new_constr["total new"][str(int(yr) - 1)]
+            # Calculate new vs. existing fraction of stock
+            if new_constr["total new"][yr] <= new_constr["total"][yr]:
+                new_constr["new fraction"][yr] = \
+                    new_constr["total new"][yr] / new_constr["total"][yr]
+            else:
+                new_constr["new fraction"][yr] = 1
+        self.bldg_constr[(czone, bldg)] = (new_constr, numpy.array([
+            new_constr["new fraction"][yr] for yr in self.aeo_years]))
+
+        return self.bldg_constr[(czone, bldg)]
+
+
+class TSVFactorCache(object):
+    """Class of time sensitive valuation factors shared across measures.
+
+    Note:
+        Energy, cost, and carbon re-weighting factors (and hourly load
+        shapes) for time sensitive valuation depend only on the region,
+        building type, and end use of a microsegment, the time-varying
+        efficiency features that apply to it, and the time sensitive
+        valuation settings. Factors are stored for each unique combination
+        of these inputs such that measures that share a combination need
+        not recalculate the factors. The least recently used factors are
+        dropped once the maximum number of stored combinations is reached.
+
+    Attributes:
+        maxsize (int): Maximum number of factor sets to store.
+        data_key (str): Fingerprint of the input data the factors are
+            calculated from (used to screen factors read from file).
+        entries (OrderedDict): Factor sets by key, least recently used first.
+        added (list): Keys of factor sets added since the last export.
+        hits (int): Number of factor lookups that found stored factors.
+        misses (int): Number of factor lookups that found no stored factors.
+        digests (OrderedDict): Recently calculated digests of time-varying
+            efficiency features, by object ID (object kept with digest).
+    """
+
+    def __init__(self, maxsize=500, data_key=None):
+        self.maxsize = maxsize
+        self.data_key = data_key
+        self.entries = OrderedDict()
+        self.added = []
+        self.hits, self.misses = (0 for n in range(2))
+        self.digests = OrderedDict()
+
+    def digest(self, obj):
+        """Find a digest of the canonical JSON representation of an object.
+
+        Args:
+            obj (dict, list, or str): Object to digest.
+
+        Returns:
+            Hexadecimal digest string.
+        """
+        # Time-varying efficiency features may include large custom 8760
+        # savings shapes; reuse digests of recently digested objects (the
+        # object is stored with its digest such that its ID is not reused)
+        try:
+            digest = self.digests[id(obj)][1]
+            self.digests.move_to_end(id(obj))
+        except KeyError:
+            digest = json_digest(obj)
+            self.digests[id(obj)] = (obj, digest)
+            if len(self.digests) > 100:
+                self.digests.popitem(last=False)
+
+        return digest
+
+    def key(self, mskeys, bldg_sect, eu, tsv_adjustments, tsv_metrics,
+            sect_shapes, cost_yr_map, carb_yr_map):
+        """Set the key for the factors of a microsegment.
+
+        Args:
+            mskeys (tuple): Microsegment information.
+            bldg_sect (str): Building sector flag (residential/commercial).
+            eu (str): End use for keying time sensitive load data.
+            tsv_adjustments (dict): Time-varying efficiency features that
+                apply to the microsegment.
+            tsv_metrics (boolean or list): TSV metrics settings.
+            sect_shapes (boolean): Flag for sector-level load shape outputs.
+            cost_yr_map (dict): Mapping 8760 TSV price data years -> AEO years.
+            carb_yr_map (dict): Mapping 8760 TSV carbon data yrs. -> AEO years.
+
+        Returns:
+            Tuple that keys the factors of the microsegment.
+        """
+        return (mskeys[1], bldg_sect, mskeys[2], eu,
+                self.digest(tsv_adjustments), self.digest(tsv_metrics),
+                sect_shapes, self.digest(cost_yr_map),
+                self.digest(carb_yr_map))
+
+    def get(self, key):
+        """Find stored factors for a key, updating lookup statistics.
+
+        Args:
+            key (tuple): Key for the factors.
+
+        Returns:
+            Stored factors for the key, or None if there are none.
+        """
+        try:
+            facts = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+
+        return facts
+
+    def put(self, key, facts):
+        """Store factors for a key, dropping the least recently used factors.
+
+        Args:
+            key (tuple): Key for the factors.
+            facts (tuple): Re-weighting factors and hourly load shapes.
+        """
+        self.entries[key] = facts
+        self.entries.move_to_end(key)
+        self.added.append(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def export(self, with_entries):
+        """Export lookup statistics and new factors, then reset them.
+
+        Note:
+            Used to return the work of a worker process to the parent
+            process (see 'merge').
+
+        Args:
+            with_entries (boolean): Flag to export factors added since the
+                last export (otherwise, only statistics are exported).
+
+        Returns:
+            Tuple of hits, misses, and dict of new factors by key.
+        """
+        if with_entries is True:
+            new = {k: self.entries[k] for k in self.added
+                   if k in self.entries}
+        else:
+            new = {}
+        stats = (self.hits, self.misses, new)
+        self.added, self.hits, self.misses = ([], 0, 0)
+
+        return stats
+
+    def merge(self, stats):
+        """Merge lookup statistics and factors exported by 'export'.
+
+        Args:
+            stats (tuple): Hits, misses, and dict of new factors by key.
+        """
+        hits, misses, new = stats
+        self.hits += hits
+        self.misses += misses
+        for k in new.keys():
+            self.put(k, new[k])
+
+    def summary(self):
+        """Summarize lookup statistics.
+
+        Returns:
+            String with counts of factor lookups, hits, and misses.
+        """
+        lookups = self.hits + self.misses
+        return ("Time sensitive valuation factor cache: " + str(lookups) +
+                " lookups, " + str(self.hits) + " hits (" + "{:.1f}".format(
+                    (100 * self.hits / lookups) if lookups > 0 else 0) +
+                "%), " + str(self.misses) + " misses, " +
+                str(len(self.entries)) + " factor sets stored")
+
+    def load(self, file_path):
+        """Read stored factors from file.
+
+        Note:
+            Factors are only read if they were written for the same input
+            data fingerprint as that of the current cache.
+
+        Args:
+            file_path (str): Path to gzipped pickle file of factors.
+        """
+        try:
+            with gzip.open(file_path, 'r') as zp:
+                stored = pickle.load(zp)
+        except FileNotFoundError:
+            return
+        if stored["data key"] == self.data_key:
+            for k in stored["entries"].keys():
+                self.put(k, stored["entries"][k])
+            # Factors read from file are not new to the current run
+            self.added = []
+
+    def save(self, file_path):
+        """Write stored factors to file.
+
+        Args:
+            file_path (str): Path to gzipped pickle file of factors.
+        """
+        with gzip.open(file_path, 'w') as zp:
+            pickle.dump({"data key": self.data_key,
+                         "entries": self.entries}, zp, -1)
+
+
 class Measure(object):
     """Set up a class representing efficiency measures as objects.
 
@@ -1386,9 +1939,10 @@ class Measure(object):
             elif "PHC-EE (high)" in self.name:
                 self.energy_outputs["health_costs"] = "Uniform EE-high"
         self.sector_shapes = {a_s: {} for a_s in handyvars.adopt_schemes}
-        # Deep copy handy vars to avoid any dependence of changes to these vars
-        # across other measures that use them
-        self.handyvars = copy.deepcopy(handyvars)
+        # Layer measure-specific handy vars over the handy vars shared across
+        # all measures to avoid any dependence of changes to these vars
+        # across other measures that use them (without copying shared vars)
+        self.handyvars = UsefulVarsOverlay(handyvars)
         # Set the rate of baseline retrofitting for ECM stock-and-flow calcs
         try:
             # Check first to see whether pulling up retrofit rate errors
@@ -1396,9 +1950,11 @@ class Measure(object):
             # Accommodate retrofit rate input as a probability distribution
             if type(self.retro_rate) is list and isinstance(
                     self.retro_rate[0], str):
-                # Sample measure retrofit rate values
+                # Sample measure retrofit rate values from the measure's
+                # retrofit rate stream of random draws
                 self.retro_rate = self.rand_list_gen(
-                    self.retro_rate, self.handyvars.nsamples)
+                    self.retro_rate, self.handyvars.nsamples,
+                    numpy.random.RandomState(self.rand_seed("retro_rate")))
             # Raise error in case where distribution is incorrectly specified
             elif type(self.retro_rate) is list:
                 raise ValueError(
@@ -1786,16 +2342,22 @@ class Measure(object):
                 "Scout building type(s) " + str(self.bldg_type) +
                 "in ECM '" + self.name + "'")
 
-    def fill_mkts(self, msegs, msegs_cpl, convert_data, tsv_data, opts):
+    def fill_mkts(self, msegs, msegs_cpl, convert_data, tsv_data, opts,
+                  base_store=None, tsv_cache=None):
         """Fill in a measure's market microsegments using EIA baseline data.
 
         Args:
-            msegs (dict): Baseline microsegment stock and energy use.
+            msegs (dict or object): Baseline microsegment stock and energy
+                use (as a dict or a 'FlatYearData' object).
             msegs_cpl (dict): Baseline technology cost, performance, and
                 lifetime.
             convert_data (dict): Measure -> baseline cost unit conversions.
             tsv_data (dict): Data for time sensitive valuation of efficiency.
             opts (object): Stores user-specified execution options.
+            base_store (object): Flattened baseline microsegment data; built
+                from 'msegs' and 'msegs_cpl' if not provided.
+            tsv_cache (object): Time sensitive valuation factors shared
+                across measures (if None, factors are not shared).
 
         Returns:
             Updated measure stock, energy/carbon, and cost market microsegment
@@ -1813,6 +2375,12 @@ class Measure(object):
         # are valid before attempting to retrieve data on this baseline market
         self.check_mkt_inputs()
 
+        # Flatten baseline microsegment data for key chain lookups, if this
+        # has not already been done across all measures
+        if base_store is None:
+            base_store = BaselineMsegStore(
+                msegs, msegs_cpl, self.handyvars.aeo_years)
+
         # Notify user that ECM is being updated; suppress new line
         # if not in verbose mode ('Success' is appended to this message on
         # the same line of the console upon completion of ECM update)
@@ -1826,7 +2394,7 @@ class Measure(object):
         # performance, and or lifetime with for consistency across all
         # microsegments that contribute to the measure's master microsegment
         if self.handyvars.nsamples is not None:
-            rnd_sd = numpy.random.randint(10000)
+            rnd_sd = self.rand_seed("markets")
 
         # Initialize a counter of key chains that yield "stock" and "energy"
         # keys in the baseline data dict; that have valid stock/energy data;
@@ -2091,51 +2659,27 @@ class Measure(object):
                         intensity_carb_meas = self.handyvars.carb_int[
                             bldg_sect][self.fuel_switch_to]
 
-            # Initialize cost/performance/lifetime, stock/energy, square
-            # footage, and new building fraction variables for the baseline
-            # microsegment associated with the current key chain
-            base_cpl = msegs_cpl
-            mseg = msegs
-            mseg_sqft_stock = msegs
-            new_constr = {"annual new": {}, "total new": {},
-                          "total": {}, "new fraction": {}}
+            # Find the cost/performance/lifetime and stock/energy data for
+            # the baseline microsegment associated with the current key chain,
+            # as well as the number of key chain levels with baseline data
+            mseg_depth, mseg_row = base_store.find(mskeys)
+            base_cpl, mseg = [
+                base_store.cpl[mseg_row], base_store.mseg_data(mseg_row)]
 
             # Initialize a variable for measure relative performance (broken
             # out by year in modeling time horizon)
             rel_perf = {}
 
-            # In cases where measure and baseline cost/performance/lifetime
-            # data and/or baseline stock/energy market size data are formatted
-            # as nested dicts, loop recursively through dict levels until
-            # appropriate terminal value is reached
+            # In cases where measure cost/performance/lifetime data are
+            # formatted as nested dicts, loop recursively through dict levels
+            # until appropriate terminal value is reached
             for i in range(0, len(mskeys)):
-                # Check whether baseline microsegment cost/performance/lifetime
-                # data are in dict format and current key is in dict keys; if
-                # so, proceed further with the recursive loop. * Note: dict key
-                # hierarchies and syntax are assumed to be consistent across
-                # all measure and baseline cost/performance/lifetime and
-                # stock/energy market data
-                if isinstance(base_cpl, dict) and mskeys[i] in \
-                    base_cpl.keys() or mskeys[i] in [
-                        "primary", "secondary", "new", "existing", None]:
-                    # Skip over "primary", "secondary", "new", and "existing"
-                    # keys in updating baseline stock/energy, cost and lifetime
-                    # information (this information is not broken out by these
-                    # categories)
-                    if mskeys[i] not in [
-                            "primary", "secondary", "new", "existing", None]:
-
-                        # Restrict base cost/performance/lifetime dict to key
-                        # chain info.
-                        base_cpl = base_cpl[mskeys[i]]
-
-                        # Restrict stock/energy dict to key chain info.
-                        mseg = mseg[mskeys[i]]
-
-                        # Restrict ft^2 floor area dict to key chain info.
-                        if i < 3:  # Note: ft^2 floor area broken out 2 levels
-                            mseg_sqft_stock = mseg_sqft_stock[mskeys[i]]
-
+                # Check whether baseline microsegment data are available for
+                # the current key chain level; if so, proceed further with the
+                # recursive loop. * Note: dict key hierarchies and syntax are
+                # assumed to be consistent across all measure and baseline
+                # cost/performance/lifetime and stock/energy market data
+                if i < mseg_depth:
                     # Handle a superfluous 'undefined' key in the ECM
                     # cost, performance, and lifetime fields that is generated
                     # by the 'Add ECM' web form in certain cases *** NOTE: WILL
@@ -2436,8 +2980,10 @@ class Measure(object):
                 # are identical relative to two contributing baseline
                 # microsegments, the numpy arrays yielded by the random number
                 # generator for these measure parameters and microsegments
-                # will also be identical)
-                numpy.random.seed(rnd_sd)
+                # will also be identical); draws are made from a stream that
+                # is specific to the measure, leaving the global random state
+                # untouched
+                rng = numpy.random.RandomState(rnd_sd)
 
                 # If the measure performance/cost/lifetime variable is list
                 # with distribution information, sample values accordingly
@@ -2445,7 +2991,7 @@ class Measure(object):
                                                               str):
                     # Sample measure performance values
                     perf_meas = self.rand_list_gen(
-                        perf_meas, self.handyvars.nsamples)
+                        perf_meas, self.handyvars.nsamples, rng)
                     # Set any measure performance values less than zero to
                     # zero, for cases where performance isn't relative
                     if perf_units != 'relative savings (constant)' and \
@@ -2465,7 +3011,7 @@ class Measure(object):
                                                               str):
                     # Sample measure cost values
                     cost_meas = self.rand_list_gen(
-                        cost_meas, self.handyvars.nsamples)
+                        cost_meas, self.handyvars.nsamples, rng)
                     # Set any measure cost values less than zero to zero
                     if any(cost_meas < 0) is True:
                         cost_meas[numpy.where(cost_meas < 0)] = 0
@@ -2473,7 +3019,7 @@ class Measure(object):
                                                               str):
                     # Sample measure lifetime values
                     life_meas = self.rand_list_gen(
-                        life_meas, self.handyvars.nsamples)
+                        life_meas, self.handyvars.nsamples, rng)
                     # Set any measure lifetime values in list less than zero
                     # to 1
                     if any(life_meas < 0) is True:
@@ -2893,19 +3439,17 @@ class Measure(object):
                                     # initially be specified as less than zero
                                     # in lighting efficiency cases, which
                                     # secondarily increase heating energy use
-                                    if type(perf_meas) == numpy.array:
-                                        if any(perf_meas > 1):
-                                            perf_meas[
-                                                numpy.where(perf_meas > 1)] = 1
-                                        elif any(perf_meas < 0) and \
-                                                all(perf_meas_orig) > 0:
-                                            perf_meas[
-                                                numpy.where(perf_meas < 0)] = 0
-                                    elif type(perf_meas) != numpy.array and \
-                                            perf_meas > 1:
+                                    # (applied to each sample for sampled
+                                    # measure performance)
+                                    if isinstance(perf_meas, numpy.ndarray):
+                                        perf_meas = numpy.where(
+                                            perf_meas > 1, 1, numpy.where(
+                                                (perf_meas < 0) &
+                                                (perf_meas_orig > 0), 0,
+                                                perf_meas))
+                                    elif perf_meas > 1:
                                         perf_meas = 1
-                                    elif type(perf_meas) != numpy.array and \
-                                            perf_meas < 0 and \
+                                    elif perf_meas < 0 and \
                                             perf_meas_orig > 0:
                                         perf_meas = 0
                                 # Calculate relative performance
@@ -3044,14 +3588,6 @@ class Measure(object):
                             cost_energy_meas = self.handyvars.ecosts[
                                 "residential"][self.fuel_switch_to]
 
-                    # Update new building construction information
-                    for yr in self.handyvars.aeo_years:
-                        # Find new and total buildings for current year
-                        new_constr["annual new"][yr] = \
-                            mseg_sqft_stock["new homes"][yr]
-                        new_constr["total"][yr] = \
-                            mseg_sqft_stock["total homes"][yr]
-
                     # Update technology choice parameters needed to choose
                     # between multiple efficient technology options that
                     # access this baseline microsegment. For the residential
@@ -3179,14 +3715,6 @@ class Measure(object):
                             cost_energy_meas = self.handyvars.ecosts[
                                 "commercial"][self.fuel_switch_to]
 
-                    # Update new building construction information
-                    for yr in self.handyvars.aeo_years:
-                        # Find new and total square footage for current year
-                        new_constr["annual new"][yr] = \
-                            mseg_sqft_stock["new square footage"][yr]
-                        new_constr["total"][yr] = \
-                            mseg_sqft_stock["total square footage"][yr]
-
                     # Update technology choice parameters needed to choose
                     # between multiple efficient technology options that
                     # access this baseline microsegment. For the commercial
@@ -3239,23 +3767,10 @@ class Measure(object):
                 # Find fraction of total new buildings in each year.
                 # Note: in each year, this fraction is calculated by summing
                 # the annual new building/floor space figures for all
-                # preceding years
-                for yr in self.handyvars.aeo_years:
-                    # Find cumulative total of new building/floor space stock
-                    if yr == self.handyvars.aeo_years[0]:
-                        new_constr["total new"][yr] = \
-                            new_constr["annual new"][yr]
-                    else:
-                        new_constr["total new"][yr] = \
-                            new_constr["annual new"][yr] + \
-                            new_constr["total new"][str(int(yr) - 1)]
-                    # Calculate new vs. existing fraction of stock
-                    if new_constr["total new"][yr] <= new_constr["total"][yr]:
-                        new_constr["new fraction"][yr] = \
-                            new_constr["total new"][yr] / \
-                            new_constr["total"][yr]
-                    else:
-                        new_constr["new fraction"][yr] = 1
+                # preceding years (the fraction is only calculated once for
+                # each region and building type)
+                new_constr, new_frac = base_store.new_constr(
+                    mskeys[1], mskeys[2], bldg_sect)
 
                 # Determine the fraction to use in scaling down the stock,
                 # energy, and carbon microsegments to the applicable structure
@@ -3267,6 +3782,7 @@ class Measure(object):
                 else:
                     new_existing_frac = {key: (1 - val) for key, val in
                                          new_constr["new fraction"].items()}
+                    new_frac = 1 - new_frac
 
                 # Update bass diffusion parameters needed to determine the
                 # fraction of the baseline microsegment that will be captured
@@ -3298,27 +3814,39 @@ class Measure(object):
                 elif sqft_subst == 1:  # Use ft^2 floor area in lieu of # units
                     add_stock = {
                         key: val * new_existing_frac[key] * 1000000 for
-                        key, val in mseg_sqft_stock[
-                            "total square footage"].items()
+                        key, val in base_store.node(mskeys[1:3] + (
+                            "total square footage",)).items()
                         if key in self.handyvars.aeo_years}
+                # Slice stock data from the flattened baseline data when
+                # complete numeric data are available for all years
+                elif base_store.stock_ok[mseg_row]:
+                    add_stock = dict(zip(self.handyvars.aeo_years, (
+                        base_store.values(mseg_row, "stock") *
+                        new_frac).tolist()))
                 else:
                     add_stock = {
                         key: val * new_existing_frac[key] for key, val in
                         mseg["stock"].items() if key in
                         self.handyvars.aeo_years}
                 # Total energy use
-                add_energy = {
-                    key: val * site_source_conv_base[key] *
-                    new_existing_frac[key] for key, val in mseg[
-                        "energy"].items() if key in
-                    self.handyvars.aeo_years}
+                if base_store.energy_ok[mseg_row]:
+                    add_energy = dict(zip(self.handyvars.aeo_years, (
+                        base_store.values(mseg_row, "energy") * numpy.array([
+                            site_source_conv_base[yr] for yr in
+                            self.handyvars.aeo_years]) * new_frac).tolist()))
+                else:
+                    add_energy = {
+                        key: val * site_source_conv_base[key] *
+                        new_existing_frac[key] for key, val in mseg[
+                            "energy"].items() if key in
+                        self.handyvars.aeo_years}
                 # Total lighting energy use for climate zone, building type,
                 # and structure type of current primary lighting
                 # microsegment (used to adjust secondary effects)
                 if energy_total_scnd is True:
                     energy_total_scnd = self.find_scnd_overlp(
-                        new_existing_frac, site_source_conv_base, reduce(
-                            operator.getitem, mskeys[1:5], msegs),
+                        new_existing_frac, site_source_conv_base,
+                        base_store.node(mskeys[1:5]),
                         energy_tot=dict.fromkeys(
                             self.handyvars.aeo_years, 0))
                 # Total carbon emissions
@@ -3343,7 +3871,8 @@ class Measure(object):
                     mskeys[0] == "secondary" or (mskeys[0] == "primary" and
                                                  mskeys[3] == "electricity")):
                     tsv_scale_fracs, tsv_shapes = self.gen_tsv_facts(
-                        tsv_data, mskeys, bldg_sect, convert_data, opts)
+                        tsv_data, mskeys, bldg_sect, convert_data, opts,
+                        tsv_cache)
                 else:
                     tsv_scale_fracs = {
                         "energy": {"baseline": 1, "efficient": 1},
@@ -3752,7 +4281,8 @@ class Measure(object):
         else:
             print(" Success" + bstk_msg + bcpl_msg + bcc_msg + cc_msg)
 
-    def gen_tsv_facts(self, tsv_data, mskeys, bldg_sect, cost_conv, opts):
+    def gen_tsv_facts(self, tsv_data, mskeys, bldg_sect, cost_conv, opts,
+                      tsv_cache=None):
         """Set annual re-weighting factors and hourly load fractions for TSV.
 
         Args:
@@ -3761,6 +4291,8 @@ class Measure(object):
             bldg_sect (string): Building sector of the current microsegment.
             cost_conv (dict): Conversion factors, EPlus->Scout building types.
             opts (object): Stores user-specified execution options.
+            tsv_cache (object): Factors already calculated across measures
+                (if None, factors are calculated for each measure).
 
         Returns:
             Dict of microsegment-specific energy, cost, and emissions annual
@@ -3897,46 +4429,69 @@ class Measure(object):
 
             # Generate appropriate 8760 price and emissions scaling shapes
 
+            # Set TSV data -> AEO year mapping to use in preparing cost scaling
+            # factors
+            cost_yr_map = tsv_data["price_yr_map"]
             # Set time-varying electricity price scaling factors for the EMM
-            # region (dict with keys distinguished by year, *CURRENTLY* every
-            # four years beginning in 2018)
+            # region (8760 x year array, with columns ordered by the TSV data
+            # years in the mapping above, *CURRENTLY* every four years
+            # beginning in 2018)
             if self.handyvars.tsv_hourly_price[mskeys[1]] is None:
-                cost_fact_hourly,  self.handyvars.tsv_hourly_price[
-                    mskeys[1]] = ({yr: tsv_data["price"][
-                        "electricity price shapes"][yr][
-                        mskeys[1]] for yr in tsv_data["price"][
-                        "electricity price shapes"].keys()} for n in range(2))
+                cost_fact_hourly = numpy.column_stack([
+                    tsv_data["price"]["electricity price shapes"][yr][
+                        mskeys[1]] for yr in cost_yr_map.keys()]).astype(float)
+                self.handyvars.tsv_hourly_price[mskeys[1]] = cost_fact_hourly
             else:
                 cost_fact_hourly = self.handyvars.tsv_hourly_price[mskeys[1]]
-            # Set TSV data -> AEO year mapping to use in preparing cost scaling
-            # factors
-            cost_yr_map = tsv_data["price_yr_map"]
+            # Set TSV data -> AEO year mapping to use in preparing emissions
+            # scaling factors
+            carb_yr_map = tsv_data["emissions_yr_map"]
             # Set time-varying emissions scaling factors for the EMM
-            # region (dict with keys distinguished by year, *CURRENTLY* every
-            # four years beginning in 2018)
+            # region (8760 x year array, with columns ordered by the TSV data
+            # years in the mapping above, *CURRENTLY* every four years
+            # beginning in 2018)
             if self.handyvars.tsv_hourly_emissions[mskeys[1]] is None:
-                carbon_fact_hourly,  self.handyvars.tsv_hourly_emissions[
-                    mskeys[1]] = ({yr: tsv_data["emissions"][
-                        "average carbon emissions rates"][yr][
-                        mskeys[1]] for yr in tsv_data["emissions"][
-                        "average carbon emissions rates"].keys()} for
-                        n in range(2))
+                carbon_fact_hourly = numpy.column_stack([
+                    tsv_data["emissions"]["average carbon emissions rates"][
+                        yr][mskeys[1]] for yr in carb_yr_map.keys()]).astype(
+                    float)
+                self.handyvars.tsv_hourly_emissions[mskeys[1]] = \
+                    carbon_fact_hourly
             else:
                 carbon_fact_hourly = self.handyvars.tsv_hourly_emissions[
                     mskeys[1]]
-            # Set TSV data -> AEO year mapping to use in preparing emissions
-            # scaling factors
-            carb_yr_map = tsv_data["emissions_yr_map"]
 
-            # Use 8760 load shape information, combined with 8760 price and
-            # emissions shape information above, to calculate factors that
-            # modify annually-determined baseline and efficient energy, cost,
-            # and carbon totals such that they reflect sub-annual assessment
-            # of these totals
-            updated_tsv_fracs, updated_tsv_shapes = self.apply_tsv(
-                load_fact, ash_czone_wts, eplus_bldg_wts, cost_fact_hourly,
-                carbon_fact_hourly, mskeys, bldg_sect, eu, opts, cost_yr_map,
-                carb_yr_map)
+            # Set the user-specified time-sensitive valuation features
+            # for the current ECM and microsegment
+            tsv_adjustments = self.find_tsv_adjustments(mskeys)
+
+            # Check for factors already calculated for the same combination
+            # of region, building type, end use, time-sensitive valuation
+            # features, and time-sensitive valuation settings (e.g., by
+            # another measure)
+            if tsv_cache is not None:
+                cache_key = tsv_cache.key(
+                    mskeys, bldg_sect, eu, tsv_adjustments,
+                    self.energy_outputs["tsv_metrics"], opts.sect_shapes,
+                    cost_yr_map, carb_yr_map)
+                cached = tsv_cache.get(cache_key)
+            else:
+                cached = None
+            if cached is not None:
+                updated_tsv_fracs, updated_tsv_shapes = cached
+            else:
+                # Use 8760 load shape information, combined with 8760 price
+                # and emissions shape information above, to calculate factors
+                # that modify annually-determined baseline and efficient
+                # energy, cost, and carbon totals such that they reflect
+                # sub-annual assessment of these totals
+                updated_tsv_fracs, updated_tsv_shapes = self.apply_tsv(
+                    load_fact, ash_czone_wts, eplus_bldg_wts,
+                    cost_fact_hourly, carbon_fact_hourly, mskeys, bldg_sect,
+                    eu, opts, cost_yr_map, carb_yr_map, tsv_adjustments)
+                if tsv_cache is not None:
+                    tsv_cache.put(
+                        cache_key, (updated_tsv_fracs, updated_tsv_shapes))
             # Set adjustment factors for current combination of
             # region, building type, and end use such that they
             # need not be calculated again for this combination in
@@ -3960,56 +4515,20 @@ class Measure(object):
 
         return updated_tsv_fracs, updated_tsv_shapes
 
-    def apply_tsv(self, load_fact, ash_cz_wts, eplus_bldg_wts,
-                  cost_fact_hourly, carbon_fact_hourly, mskeys, bldg_sect,
-                  eu, opts, cost_yr_map, carb_yr_map):
-        """Apply time varying efficiency levels to base load profile.
+    def find_tsv_adjustments(self, mskeys):
+        """Find the time-varying efficiency features for a microsegment.
 
         Args:
-            load_fact (dict): Hourly energy load fractions of annual load.
-            ash_cz_wts (list): Factors to map ASH climates -> EMM regions.
-            eplus_bldg_wts (dict): Factors to map EPlus -> Scout bldg. types.
-            cost_fact_hourly (list): 8760 electricity price scaling factors.
-            carbon_fact_hourly (list): 8760 emissions scaling factors.
             mskeys (tuple): Microsegment information.
-            bldg_sect (str): Building sector flag (residential/commercial).
-            eu (str): End use for keying time sensitive load data.
-            opts (object): Stores user-specified execution options.
-            cost_yr_map (dict): Mapping 8760 TSV price data years -> AEO years.
-            carb_yr_map (dict): Mapping 8760 TSV carbon data yrs. -> AEO years.
 
         Returns:
-            Dict of microsegment-specific energy, cost, and emissions re-
-            weighting factors that reflect time-sensitive evaluation of energy
-            efficiency and associated energy costs/carbon emissions; list
-            with hourly fractions of annual baseline and efficient energy use
-            (if desired by the user)
-        """
-
-        # Initialize overall factors to use in scaling annually-determined
-        # baseline and efficient energy, cost and emissions data
-
-        # Initial format of cost/carbon scaling factor data (broken out by
-        # years available in the 8760 TSV cost/carbon input data)
-        cost_scale_base, cost_scale_eff = (
-            {yr: 0 for yr in cost_yr_map.keys()} for n in range(2))
-        carb_scale_base, carb_scale_eff = (
-            {yr: 0 for yr in carb_yr_map.keys()} for n in range(2))
-        # Final format of cost/carbon scaling factor data (broken out by AEO
-        # years)
-        cost_scale_base_aeo, cost_scale_eff_aeo, carb_scale_base_aeo, \
-            carb_scale_eff_aeo = (
-                {yr: 0 for yr in self.handyvars.aeo_years} for n in range(4))
-        # Note: energy scaling data is not broken out by projection year
-        energy_scale_base, energy_scale_eff = (0 for n in range(2))
+            Dict of time-varying efficiency features that apply to the
+            current microsegment (empty if there are no such features).
 
-        # Initialize hourly fractions of annual baseline and efficient energy
-        # if sector-level load shape information is desired by the user
-        if opts.sect_shapes is True:
-            energy_base_shape, energy_eff_shape = ([
-                0 for x in range(8760)] for n in range(2))
-        # Create shorthand for measure's time sensitive metrics settings
-        tsv_metrics = self.energy_outputs["tsv_metrics"]
+        Raises:
+            KeyError: If the breakout of the measure's 'tsv_features'
+                attribute does not cover the current microsegment.
+        """
 
         # Set the user-specified time-sensitive valuation features
         # for the current ECM; handle cases where this parameter is
@@ -4075,47 +4594,104 @@ class Measure(object):
         else:
             tsv_adjustments = {}
 
-        # Loop through all EPlus building types (which commercial load profiles
-        # are broken out by) that map to the current Scout building type
-        for bldg in eplus_bldg_wts.keys():
-            # Find the appropriate key in the load shape information for the
-            # current EnergyPlus building type; in the residential sector,
-            # there is currently no building type breakout, set key to None
-            if bldg_sect == "commercial":
-                load_fact_bldg_key = [
-                    x for x in load_fact.keys() if (bldg in load_fact[x][
-                        "represented building types"] or load_fact[x][
-                        "represented building types"] == "all")][0]
-            else:
-                load_fact_bldg_key = "SFD Home"
+        return tsv_adjustments
 
-            # Ensure that all applicable ASHRAE climate zones are represented
-            # in the keys for time sensitive metrics data; if a zone is not
-            # represented, remove it from the weighting and renormalize weights
-            ash_cz_wts = [
-                [x[0], x[1]] for x in ash_cz_wts if x[0] in
-                self.handyvars.tsv_climate_regions]
-            # Ensure that ASHRAE climate zone weightings sum to 1
-            ash_cz_renorm = sum([x[1] for x in ash_cz_wts])
-            if round(ash_cz_renorm, 2) != 1:
-                ash_cz_wts = [[x[0], (x[1] / ash_cz_renorm)] for
-                              x in ash_cz_wts]
-            # Loop through all ASHRAE/IECC climate zones (which load profiles
-            # are broken out by) that map to the current EMM region
-            for cz in ash_cz_wts:
-                # Set the climate zone key to use in keying in savings
-                # shape information
-                load_fact_climate_key = cz[0]
-                # Flag for cases where multiple sets of system load shape
-                # information are germane to the current climate zone
-                if type(self.handyvars.cz_emm_map[cz[0]]) == int:
-                    mult_sysshp = False
-                    mult_sysshp_key_metrics, mult_sysshp_key_save = (
-                        "set 1" for n in range(2))
-                elif type(self.handyvars.cz_emm_map[cz[0]]) == dict:
-                    mult_sysshp = True
-                    # Given multiple possible system load shape data
-                    # sets, find the key for the set that is representative
+    def apply_tsv(self, load_fact, ash_cz_wts, eplus_bldg_wts,
+                  cost_fact_hourly, carbon_fact_hourly, mskeys, bldg_sect,
+                  eu, opts, cost_yr_map, carb_yr_map, tsv_adjustments):
+        """Apply time varying efficiency levels to base load profile.
+
+        Args:
+            load_fact (dict): Hourly energy load fractions of annual load.
+            ash_cz_wts (list): Factors to map ASH climates -> EMM regions.
+            eplus_bldg_wts (dict): Factors to map EPlus -> Scout bldg. types.
+            cost_fact_hourly (numpy.ndarray): 8760 x year electricity price
+                scaling factors (columns ordered as in cost_yr_map).
+            carbon_fact_hourly (numpy.ndarray): 8760 x year emissions scaling
+                factors (columns ordered as in carb_yr_map).
+            mskeys (tuple): Microsegment information.
+            bldg_sect (str): Building sector flag (residential/commercial).
+            eu (str): End use for keying time sensitive load data.
+            opts (object): Stores user-specified execution options.
+            cost_yr_map (dict): Mapping 8760 TSV price data years -> AEO years.
+            carb_yr_map (dict): Mapping 8760 TSV carbon data yrs. -> AEO years.
+            tsv_adjustments (dict): Time-varying efficiency features that
+                apply to the microsegment.
+
+        Returns:
+            Dict of microsegment-specific energy, cost, and emissions re-
+            weighting factors that reflect time-sensitive evaluation of energy
+            efficiency and associated energy costs/carbon emissions; list
+            with hourly fractions of annual baseline and efficient energy use
+            (if desired by the user)
+        """
+
+        # Initialize overall factors to use in scaling annually-determined
+        # baseline and efficient energy, cost and emissions data
+
+        # Final format of cost/carbon scaling factor data (broken out by AEO
+        # years)
+        cost_scale_base_aeo, cost_scale_eff_aeo, carb_scale_base_aeo, \
+            carb_scale_eff_aeo = (
+                {yr: 0 for yr in self.handyvars.aeo_years} for n in range(4))
+        # Note: energy scaling data is not broken out by projection year
+        energy_scale_base, energy_scale_eff = (0 for n in range(2))
+
+        # Initialize hourly fractions of annual baseline and efficient energy
+        # if sector-level load shape information is desired by the user
+        if opts.sect_shapes is True:
+            energy_base_shape, energy_eff_shape = (
+                numpy.zeros(8760) for n in range(2))
+        # Set the day of year and hour of day (both zero-indexed) that
+        # correspond to each of the 8760 hours of the year; these are used
+        # below to build boolean masks of the hours affected by time-varying
+        # efficiency features and time sensitive valuation metrics
+        hr_ind = numpy.arange(8760)
+        day_of_yr, hr_of_day = numpy.divmod(hr_ind, 24)
+        # Create shorthand for measure's time sensitive metrics settings
+        tsv_metrics = self.energy_outputs["tsv_metrics"]
+
+        # Loop through all EPlus building types (which commercial load profiles
+        # are broken out by) that map to the current Scout building type
+        for bldg in eplus_bldg_wts.keys():
+            # Find the appropriate key in the load shape information for the
+            # current EnergyPlus building type; in the residential sector,
+            # there is currently no building type breakout, set key to None
+            if bldg_sect == "commercial":
+                load_fact_bldg_key = [
+                    x for x in load_fact.keys() if (bldg in load_fact[x][
+                        "represented building types"] or load_fact[x][
+                        "represented building types"] == "all")][0]
+            else:
+                load_fact_bldg_key = "SFD Home"
+
+            # Ensure that all applicable ASHRAE climate zones are represented
+            # in the keys for time sensitive metrics data; if a zone is not
+            # represented, remove it from the weighting and renormalize weights
+            ash_cz_wts = [
+                [x[0], x[1]] for x in ash_cz_wts if x[0] in
+                self.handyvars.tsv_climate_regions]
+            # Ensure that ASHRAE climate zone weightings sum to 1
+            ash_cz_renorm = sum([x[1] for x in ash_cz_wts])
+            if round(ash_cz_renorm, 2) != 1:
+                ash_cz_wts = [[x[0], (x[1] / ash_cz_renorm)] for
+                              x in ash_cz_wts]
+            # Loop through all ASHRAE/IECC climate zones (which load profiles
+            # are broken out by) that map to the current EMM region
+            for cz in ash_cz_wts:
+                # Set the climate zone key to use in keying in savings
+                # shape information
+                load_fact_climate_key = cz[0]
+                # Flag for cases where multiple sets of system load shape
+                # information are germane to the current climate zone
+                if type(self.handyvars.cz_emm_map[cz[0]]) == int:
+                    mult_sysshp = False
+                    mult_sysshp_key_metrics, mult_sysshp_key_save = (
+                        "set 1" for n in range(2))
+                elif type(self.handyvars.cz_emm_map[cz[0]]) == dict:
+                    mult_sysshp = True
+                    # Given multiple possible system load shape data
+                    # sets, find the key for the set that is representative
                     # of the current EMM region; initialize separate keys to
                     # use in retrieving TSV metrics data vs. savings shape
                     # data (the approaches to keying in these different types
@@ -4159,8 +4735,13 @@ class Measure(object):
                     except (KeyError, TypeError):
                         base_load_hourly = load_fact
 
-                # Initialize efficient load shape as equal to base load
-                eff_load_hourly = copy.deepcopy(base_load_hourly)
+                # Convert the baseline load shape to an array and initialize
+                # the efficient load shape as equal to base load (no copy is
+                # needed, as the operations below never modify either array
+                # in place)
+                base_load_hourly = numpy.asarray(
+                    base_load_hourly, dtype=float)
+                eff_load_hourly = base_load_hourly
 
                 # Loop through all time-varying efficiency features in sorted
                 # order, applying each successively to the base load shape
@@ -4225,10 +4806,10 @@ class Measure(object):
                     except (TypeError, KeyError):
                         applicable_hrs = list(range(0, 24))
 
-                    # Set enumerate object for applicable day/hour ranges
-                    enumerate_list = list(
-                        enumerate(itertools.product(
-                            range(365), range(24))))
+                    # Set boolean masks flagging which of the 8760 hours of the
+                    # year fall within the applicable day and hour ranges
+                    day_mask = numpy.isin(day_of_yr, applicable_days)
+                    hr_mask = numpy.isin(hr_of_day, applicable_hrs)
 
                     # Apply time-varying impacts based on type of time-varying
                     # efficiency feature(s) specified for the measure
@@ -4246,17 +4827,26 @@ class Measure(object):
                             rel_save_tsv = 0
                         # Reflect the shed impacts on efficient load shape
                         # across all relevant hours of the year
-                        eff_load_hourly = [base_load_hourly[i] * (
-                            1 - rel_save_tsv) if (
-                            x in applicable_days and y in applicable_hrs) else
-                            eff_load_hourly[i] for
-                            i, (x, y) in enumerate_list]
+                        eff_load_hourly = numpy.where(
+                            day_mask & hr_mask,
+                            base_load_hourly * (1 - rel_save_tsv),
+                            eff_load_hourly)
                     # "Shift" time-varying efficiency features move a certain
                     # percentage of baseline load from one time period into
                     # another time period
                     elif "shift" in a:
                         # Set the number of hours earlier to shift the load
                         offset_hrs = tsv_adjustments[a]["offset_hrs_earlier"]
+                        # Set the hour that load is shifted from for each hour
+                        # of the year; for hours where the offset runs past
+                        # the end of the year (or that fall outside the
+                        # applicable days), the load is drawn from the offset
+                        # hour of day (negative indices wrap to the end of the
+                        # year, as in list indexing)
+                        shift_ok = ((hr_ind + offset_hrs) <= 8759) & day_mask
+                        shift_from = numpy.where(
+                            shift_ok, hr_ind + offset_hrs,
+                            (hr_of_day + offset_hrs) - 24)
                         # If the user has not specified a time range for the
                         # load shifting, assume the measure shifts the entire
                         # load shape earlier by the number of hours set above
@@ -4265,12 +4855,7 @@ class Measure(object):
                             # across all 8760 hours of the year; the initial
                             # efficient load in hour X is now the load in hour
                             # X minus user-specified hour offset
-                            eff_load_hourly = [
-                                base_load_hourly[i + offset_hrs] if ((
-                                    i + offset_hrs) <= 8759 and
-                                    x in applicable_days) else
-                                base_load_hourly[(y + offset_hrs) - 24] for
-                                i, (x, y) in enumerate_list]
+                            eff_load_hourly = base_load_hourly[shift_from]
                         # If the user has specified a time range for the load
                         # shifting, shift the load in accordance with range
                         else:
@@ -4305,41 +4890,21 @@ class Measure(object):
                             # user-specified % of load in the user-specified
                             # hour range and move it X hours earlier, where X
                             # is determined by the "offset_hours" parameter
-                            eff_load_hourly = [
-                                    (base_load_hourly[i] + (
-                                        base_load_hourly[
-                                            i + offset_hrs] *
-                                        rel_save_tsv)) if (
-                                        ((i + offset_hrs) <= 8759 and
-                                         x in applicable_days)
-                                        and y in hrs_to_shift_to and
-                                        y not in applicable_hrs) else
-                                    (base_load_hourly[i] * (
-                                      1 - rel_save_tsv) + (base_load_hourly[
-                                        i + offset_hrs] *
-                                        rel_save_tsv)) if (
-                                        ((i + offset_hrs) <= 8759 and
-                                         x in applicable_days)
-                                        and y in hrs_to_shift_to and
-                                        y in applicable_hrs) else
-                                    (base_load_hourly[i] +
-                                     base_load_hourly[
-                                        (y + offset_hrs) - 24] * rel_save_tsv)
-                                    if (y in hrs_to_shift_to and
-                                        y not in applicable_hrs and
-                                        x in applicable_days) else
-                                    (base_load_hourly[i] * (
-                                        1 - rel_save_tsv) + base_load_hourly[
-                                        (y + offset_hrs) - 24] * rel_save_tsv)
-                                    if (y in hrs_to_shift_to and
-                                        y in applicable_hrs and
-                                        x in applicable_days) else
-                                    eff_load_hourly[i] * (
-                                        1 - rel_save_tsv) if (
-                                        y in applicable_hrs and
-                                        x in applicable_days) else
-                                    eff_load_hourly[i] for i, (x, y) in
-                                    enumerate_list]
+                            shift_to_mask = numpy.isin(
+                                hr_of_day, hrs_to_shift_to) & day_mask
+                            shift_load = \
+                                base_load_hourly[shift_from] * rel_save_tsv
+                            eff_load_hourly = numpy.where(
+                                shift_to_mask & ~hr_mask,
+                                base_load_hourly + shift_load,
+                                numpy.where(
+                                    shift_to_mask & hr_mask,
+                                    base_load_hourly * (1 - rel_save_tsv) +
+                                    shift_load,
+                                    numpy.where(
+                                        hr_mask & day_mask,
+                                        eff_load_hourly * (1 - rel_save_tsv),
+                                        eff_load_hourly)))
 
                     # "Shape" time-sensitive efficiency features reshape
                     # the baseline load shape in accordance with custom load
@@ -4357,12 +4922,12 @@ class Measure(object):
                                 tsv_adjustments[a]["custom_daily_savings"]
                             # Reflect custom load savings in efficient load
                             # shape
-                            eff_load_hourly = [
-                                base_load_hourly[i] * (
-                                    1 - custom_save_shape[y]) if (
-                                    x in applicable_days) else
-                                eff_load_hourly[i] for
-                                i, (x, y) in enumerate_list]
+                            eff_load_hourly = numpy.where(
+                                day_mask, base_load_hourly * (
+                                    1 - numpy.asarray(
+                                        custom_save_shape,
+                                        dtype=float)[hr_of_day]),
+                                eff_load_hourly)
 
                         # Custom annual load savings shape information contains
                         # savings fractions for all 8760 hours of the year
@@ -4419,19 +4984,20 @@ class Measure(object):
                                     "all baseline market segments the "
                                     "measure applies to in ./ecm_definitions/"
                                     "energy_plus_data/savings_shapes.")
-                                custom_hr_save_shape = [0 for x in range(8760)]
+                                custom_hr_save_shape = numpy.zeros(8760)
+                            else:
+                                custom_hr_save_shape = numpy.asarray(
+                                    custom_hr_save_shape, dtype=float)
                             # Reflect custom load savings in efficient load
                             # shape; screen for NaNs in the CSV
-                            eff_load_hourly = [(
-                                base_load_hourly[x] +
-                                custom_hr_save_shape[x]) if not
-                                numpy.isnan(custom_hr_save_shape[x]) else
-                                eff_load_hourly[x] for x in range(8760)]
+                            eff_load_hourly = numpy.where(
+                                numpy.isnan(custom_hr_save_shape),
+                                eff_load_hourly,
+                                base_load_hourly + custom_hr_save_shape)
                             # Ensure all efficient load fractions are greater
                             # than zero
-                            eff_load_hourly = [
-                                eff_load_hourly[x] if eff_load_hourly[x] >= 0
-                                else 0 for x in range(8760)]
+                            eff_load_hourly = numpy.where(
+                                eff_load_hourly >= 0, eff_load_hourly, 0)
                         else:
                             # Throw an error if the load reshaping operation
                             # name is invalid
@@ -4451,24 +5017,16 @@ class Measure(object):
                 # energy to reflect baseline hourly load shape plus effects of
                 # time-sensitive measure features on the baseline load (if any)
                 if opts.sect_shapes is True:
-                    # Base load weighted by contribution of climate for load
-                    # to EMM region
-                    base_ls_wt = [
-                        x * emm_adj_wt for x in base_load_hourly]
-                    # Efficient load weighted by contribution of climate for
-                    # load to current EMM region
-                    eff_ls_wt = [
-                        x * emm_adj_wt for x in eff_load_hourly]
-                    # Add to existing base load fractions (across all climates
-                    # that overlap with the current EMM region)
-                    energy_base_shape = [
-                        energy_base_shape[x] + base_ls_wt[x] for
-                        x in range(len(energy_base_shape))]
-                    # Add to existing efficient load fractions (across all
-                    # climates that overlap with the current EMM region)
-                    energy_eff_shape = [
-                        energy_eff_shape[x] + eff_ls_wt[x] for
-                        x in range(len(energy_eff_shape))]
+                    # Add base load weighted by contribution of climate for
+                    # load to EMM region to existing base load fractions
+                    # (across all climates that overlap with the current EMM
+                    # region)
+                    energy_base_shape += base_load_hourly * emm_adj_wt
+                    # Add efficient load weighted by contribution of climate
+                    # for load to current EMM region to existing efficient
+                    # load fractions (across all climates that overlap with
+                    # the current EMM region)
+                    energy_eff_shape += eff_load_hourly * emm_adj_wt
 
                 # Further adjust baseline and efficient load shapes
                 # to account for time sensitive valuation (TSV) output metrics
@@ -4611,22 +5169,20 @@ class Measure(object):
                     # only the hourly values that fall within the applicable
                     # hour and day ranges from above; set all inapplicable
                     # values to zero (to maintain full 8760 list length)
-                    base_load_hourly, eff_load_hourly = [[
-                        (x[i] / avg_len) if (
-                            (d + 1) in tsv_metrics_days and
-                            (h + 1) in tsv_metrics_hrs)
-                        else 0 for
-                        i, (d, h) in
-                        self.handyvars.tsv_metrics_data["hourly index"]] for
-                        x in [base_load_hourly, eff_load_hourly]]
+                    metrics_mask = numpy.isin(
+                        day_of_yr + 1, tsv_metrics_days) & numpy.isin(
+                        hr_of_day + 1, tsv_metrics_hrs)
+                    base_load_hourly, eff_load_hourly = [numpy.where(
+                        metrics_mask, x / avg_len, 0) for x in [
+                        base_load_hourly, eff_load_hourly]]
 
                     # Sum across all 8760 hourly baseline and efficient load
                     # values to arrive at final factor used to rescale
                     # annually-determined energy totals
-                    energy_scale_base += numpy.sum([
-                        x * emm_adj_wt for x in base_load_hourly])
-                    energy_scale_eff += numpy.sum([
-                        x * emm_adj_wt for x in eff_load_hourly])
+                    energy_scale_base += numpy.sum(
+                        base_load_hourly * emm_adj_wt)
+                    energy_scale_eff += numpy.sum(
+                        eff_load_hourly * emm_adj_wt)
                 else:
                     # If no tsv metrics are specified, annually-determined
                     # baseline energy total requires no rescaling (8760
@@ -4635,31 +5191,25 @@ class Measure(object):
                     # Sum across all 8760 hourly efficient load values
                     # to arrive at final factor used to rescale annually-
                     # determined energy totals
-                    energy_scale_eff += numpy.sum([
-                        x * emm_adj_wt for x in eff_load_hourly])
+                    energy_scale_eff += numpy.sum(
+                        eff_load_hourly * emm_adj_wt)
 
         # Calculate baseline/efficient cost rescaling factors as the sums of
         # the hourly baseline/efficient load shape multiplied by the hourly
         # price scaling factors; calculate across available projection years
-        # for the price scaling factors
-        for yr in cost_scale_base.keys():
-            cost_scale_base[yr] += numpy.sum([
-                x * y for x, y in zip(
-                    base_load_hourly, cost_fact_hourly[yr])])
-            cost_scale_eff[yr] += numpy.sum([
-                x * y for x, y in zip(
-                    eff_load_hourly, cost_fact_hourly[yr])])
+        # for the price scaling factors with a single matrix product of the
+        # (2 x 8760) baseline/efficient loads and the (8760 x year) factors
+        loads_hourly = numpy.vstack([base_load_hourly, eff_load_hourly])
+        cost_scale_base, cost_scale_eff = (
+            dict(zip(cost_yr_map.keys(), x)) for x in numpy.dot(
+                loads_hourly, cost_fact_hourly).tolist())
         # Calculate baseline/efficient emissions rescaling factors as the sums
         # of the hourly baseline/efficient load shape multiplied by the hourly
         # emissions scaling factors; calculate across available projection
         # years for the emissions scaling factors
-        for yr in carb_scale_base.keys():
-            carb_scale_base[yr] += numpy.sum([
-                x * y for x, y in zip(
-                    base_load_hourly, carbon_fact_hourly[yr])])
-            carb_scale_eff[yr] += numpy.sum([
-                x * y for x, y in zip(
-                    eff_load_hourly, carbon_fact_hourly[yr])])
+        carb_scale_base, carb_scale_eff = (
+            dict(zip(carb_yr_map.keys(), x)) for x in numpy.dot(
+                loads_hourly, carbon_fact_hourly).tolist())
 
         # Extend price/emissions factors across all years in the AEO time
         # horizon
@@ -4706,8 +5256,8 @@ class Measure(object):
         # if sector-level load shape information is desired by the user
         if opts.sect_shapes is True:
             updated_tsv_shapes = {
-                "baseline": energy_base_shape,
-                "efficient": energy_eff_shape}
+                "baseline": energy_base_shape.tolist(),
+                "efficient": energy_eff_shape.tolist()}
         else:
             updated_tsv_shapes = None
         # Return the final energy, cost, and emissions rescaling factors
@@ -5038,33 +5588,6 @@ class Measure(object):
             Total, total-efficient, competed, and competed-efficient
             stock, energy, carbon, and cost market microsegments.
         """
-        # Initialize stock, energy, and carbon mseg partition dicts, where the
-        # dict keys will be years in the modeling time horizon
-        stock_total, energy_total, carb_total, energy_total_sbmkt, \
-            carb_total_sbmkt, stock_total_meas, \
-            energy_total_eff, carb_total_eff, stock_compete, \
-            energy_compete, carb_compete, energy_compete_sbmkt, \
-            carb_compete_sbmkt, stock_compete_meas, \
-            energy_compete_eff, carb_compete_eff, stock_total_cost, \
-            energy_total_cost, carb_total_cost, stock_total_cost_eff, \
-            energy_total_eff_cost, carb_total_eff_cost, \
-            stock_compete_cost, energy_compete_cost, carb_compete_cost, \
-            stock_compete_cost_eff, energy_compete_cost_eff, \
-            carb_compete_cost_eff = ({} for n in range(28))
-
-        # Initialize the portion of microsegment already captured by the
-        # efficient measure as 0, and the portion baseline stock as 1.
-        captured_eff_frac = 0
-        captured_base_frac = 1
-
-        # Set the relative energy performance of the current year's
-        # competed and uncompeted stock that goes uncaptured
-        rel_perf_uncapt = 1
-        # Set time sensitive energy scaling factors for all baseline stock
-        tsv_energy_base = tsv_adj["energy"]["baseline"]
-        # Set time-sensitive energy scaling factors for all efficient stock
-        tsv_energy_eff = tsv_adj["energy"]["efficient"]
-
         # In cases where secondary microsegments are present, initialize a
         # dict of year-by-year secondary microsegment adjustment information
         # that will be used to scale down the secondary microsegment(s) in
@@ -5143,615 +5666,521 @@ class Measure(object):
         else:
             secnd_mseg_adjkey = None
 
-        # Loop through and update stock, energy, and carbon mseg partitions for
-        # each year in the modeling time horizon
-        for yr in self.handyvars.aeo_years:
-            # Set time sensitive cost/emissions scaling factors for all
-            # baseline stock; handle cases where these factors are/are not
-            # broken out by AEO projection year
-            try:
-                tsv_ecost_base, tsv_carb_base = [
-                    tsv_adj[x]["baseline"][yr] for x in ["cost", "carbon"]]
-            except TypeError:
-                tsv_ecost_base, tsv_carb_base = [
-                    tsv_adj[x]["baseline"] for x in ["cost", "carbon"]]
-            # Set time sensitive cost/emissions scaling factors for all
-            # efficient stock; handle cases where these factors are/are not
-            # broken out by AEO projection year
-            try:
-                tsv_ecost_eff, tsv_carb_eff = [
-                    tsv_adj[x]["efficient"][yr] for x in ["cost", "carbon"]]
-            except TypeError:
-                tsv_ecost_eff, tsv_carb_eff = [
-                    tsv_adj[x]["efficient"] for x in ["cost", "carbon"]]
-
-            # For secondary microsegments only, update: a) sub-market scaling
-            # fraction, based on any sub-market scaling in the associated
-            # primary microsegment, and b) the portion of associated primary
-            # microsegment stock that has been captured by the measure in
-            # previous years
-            if mskeys[0] == "secondary":
-                # Adjust sub-market scaling fraction
-                if secnd_adj_sbmkt["original energy (total)"][
-                        secnd_mseg_adjkey][yr] != 0:
-                    mkt_scale_frac = secnd_adj_sbmkt[
-                        "adjusted energy (sub-market)"][
-                        secnd_mseg_adjkey][yr] / \
-                        secnd_adj_sbmkt["original energy (total)"][
-                        secnd_mseg_adjkey][yr]
-                # Adjust previously captured efficient fraction
-                if secnd_adj_stk["original energy (total)"][
-                        secnd_mseg_adjkey][yr] != 0:
-                    captured_eff_frac = secnd_adj_stk[
-                        "adjusted energy (previously captured)"][
-                        secnd_mseg_adjkey][yr] / secnd_adj_stk[
-                        "original energy (total)"][secnd_mseg_adjkey][yr]
-                else:
-                    captured_eff_frac = 0
-                # Update portion of existing primary stock remaining with the
-                # baseline technology
-                captured_base_frac = 1 - captured_eff_frac
-
-            # Stock, energy, and carbon adjustments
-            stock_total[yr] = stock_total_init[yr] * mkt_scale_frac
-            energy_total_sbmkt[yr] = energy_total_init[yr] * mkt_scale_frac
-            energy_total[yr] = energy_total_sbmkt[yr] * tsv_energy_base
-            carb_total_sbmkt[yr] = carb_total_init[yr] * mkt_scale_frac
-            carb_total[yr] = carb_total_sbmkt[yr] * tsv_carb_base
-
-            # Re-apportion total baseline microsegment energy across all 8760
-            # hours of the year, if necessary (supports sector-level savings
-            # shapes)
-
-            # Only update sector-level shapes for certain years of focus;
-            # ensure that load shape information is available for the
-            # update and if not, yield an error message
-            if opts.sect_shapes is True and yr in \
-                    self.handyvars.aeo_years_summary and \
-                    tsv_shapes is not None:
-                self.sector_shapes[adopt_scheme][mskeys[1]][yr]["baseline"] = [
-                    self.sector_shapes[adopt_scheme][mskeys[1]][yr][
-                        "baseline"][x] + tsv_shapes["baseline"][x] *
-                    energy_total_sbmkt[yr] for x in range(8760)]
-            elif opts.sect_shapes is True and tsv_shapes is None and (
-                mskeys[0] == "secondary" or (
-                    mskeys[0] == "primary" and
-                    mskeys[3] == "electricity")):
-                raise ValueError(
-                    "Missing hourly fraction of annual load data for "
-                    "baseline energy use segment: " + mskeys + ". ")
-
-            # For a primary microsegment and adjusted adoption potential case,
-            # determine the portion of competed stock that remains with the
-            # baseline technology or changes to the efficient alternative
-            # technology; for all other scenarios, set both fractions to 1
-            if adopt_scheme == "Adjusted adoption potential" and \
-               mskeys[0] == "primary":
-                # PLACEHOLDER
-                diffuse_eff_frac = 999
-            else:
-                diffuse_eff_frac = 1
+        # Partition the microsegment using array operations across all years
+        # in the modeling time horizon (and across all samples drawn from any
+        # probability distributions on measure inputs)
+        return self.partition_microsegment_arr(
+            adopt_scheme, mskeys, mkt_scale_frac, stock_total_init,
+            energy_total_init, carb_total_init, cost_base, cost_meas,
+            cost_energy_base, cost_energy_meas, rel_perf, life_base,
+            site_source_conv_base, site_source_conv_meas,
+            intensity_carb_base, intensity_carb_meas, secnd_mseg_adjkey,
+            tsv_adj, tsv_shapes, opts)
+
+    def partition_microsegment_arr(
+            self, adopt_scheme, mskeys, mkt_scale_frac, stock_total_init,
+            energy_total_init, carb_total_init, cost_base, cost_meas,
+            cost_energy_base, cost_energy_meas, rel_perf, life_base,
+            site_source_conv_base, site_source_conv_meas, intensity_carb_base,
+            intensity_carb_meas, secnd_mseg_adjkey, tsv_adj, tsv_shapes, opts):
+        """Partition a mkt. microsegment using arrays across all years.
 
-            # Calculate replacement fractions for the baseline and efficient
-            # stock. * Note: these fractions are both 0 for secondary
-            # microsegments
-            if mskeys[0] == "primary":
-                # Calculate the portions of existing baseline and efficient
-                # stock that are up for replacement
+        Note:
+            All quantities are arrays with a row for each year in the
+            modeling time horizon and either a single column (point values)
+            or a column for each sample drawn from probability distributions
+            on measure inputs (e.g., measure performance, cost, lifetime, or
+            retrofit rate). Stock turnover calculations that depend on results
+            from the previous year are completed in a single pass through the
+            years of the modeling time horizon (across all samples at once),
+            and all other calculations are completed for all years and
+            samples at once.
 
-                # Update base replacement fraction
+        Args:
+            adopt_scheme (string): Assumed consumer adoption scenario.
+            mskeys (tuple): Dictionary key information for the currently
+                partitioned market microsegment (mseg type->czone->bldg->
+                fuel->end use->technology type->structure type)
+            mkt_scale_frac (float): Microsegment scaling fraction (used to
+                break market microsegments into more granular sub-markets).
+            stock_total_init (dict): Baseline technology stock, by year.
+            energy_total_init (dict): Baseline microsegment primary energy use,
+                by year.
+            carb_total_init (dict): Baseline microsegment carbon emissions,
+                by year.
+            cost_base (dict): Baseline technology installed cost, by year.
+            cost_meas (float or numpy.ndarray): Measure installed cost.
+            cost_energy_base (dict): Baseline fuel cost, by year.
+            cost_energy_meas (dict): Measure fuel cost, by year.
+            rel_perf (dict): Measure performance relative to baseline, by year
+                (point values or numpy arrays of samples).
+            life_base (dict): Baseline technology lifetime.
+            site_source_conv_base (dict): Baseline fuel site-source conversion,
+                by year.
+            site_source_conv_meas (dict): Measure fuel site-source conversion,
+                by year.
+            intensity_carb_base (dict): Baseline fuel carbon intensity,
+                by year.
+            intensity_carb_meas (dict): Measure fuel carbon intensity, by year.
+            secnd_mseg_adjkey (string): Climate zone, building type, and
+                structure type shared by primary and secondary microsegments
+                (None if no secondary microsegment adjustments are needed).
+            tsv_adj (dict): Adjustment for time sensitive efficiency valuation.
+            tsv_shapes (dict): 8760 hourly adjustments (sum to tsv_adj values)
+            opts (object): Stores user-specified execution options.
 
+        Returns:
+            Total, total-efficient, competed, and competed-efficient
+            stock, energy, carbon, and cost market microsegments (where these
+            vary across samples, as numpy arrays of samples for each year).
+        """
+        # Set short names for years in the modeling time horizon and the
+        # number of these years
+        yrs = self.handyvars.aeo_years
+        nyrs = len(yrs)
+        # Set integer versions of the years in the modeling time horizon
+        yrs_int = numpy.array([int(yr) for yr in yrs])
+        # Flag years in which the measure is on the market (as a column, to
+        # apply across all samples)
+        on_mkt = (yrs_int >= self.market_entry_year) & (
+            yrs_int < self.market_exit_year)
+        on_mkt_col = on_mkt[:, None]
+
+        # Convert all inputs that are broken out by year to arrays with one
+        # row per year (and one column per sample for sampled inputs)
+        stk_init, nrg_init, carb_init, cost_b, cost_e_b, cost_e_m, rp, \
+            life_b, ss_b, ss_m, int_b, int_m, ccosts = [yr_array([
+                x[yr] for yr in yrs]) for x in [
+                stock_total_init, energy_total_init, carb_total_init,
+                cost_base, cost_energy_base, cost_energy_meas, rel_perf,
+                life_base, site_source_conv_base, site_source_conv_meas,
+                intensity_carb_base, intensity_carb_meas,
+                self.handyvars.ccosts]]
+
+        # Set time sensitive energy scaling factors for all baseline and
+        # efficient stock
+        tsv_energy_base, tsv_energy_eff = [
+            tsv_adj["energy"][x] for x in ["baseline", "efficient"]]
+        # Set time sensitive cost/emissions scaling factors for all baseline
+        # and efficient stock; handle cases where these factors are/are not
+        # broken out by AEO projection year
+        tsv_ecost_base, tsv_carb_base, tsv_ecost_eff, tsv_carb_eff = [
+            yr_array([tsv_adj[x][y][yr] for yr in yrs]) if
+            isinstance(tsv_adj[x][y], dict) else tsv_adj[x][y] for y, x in
+            itertools.product(["baseline", "efficient"], ["cost", "carbon"])]
+
+        # For a primary microsegment and adjusted adoption potential case,
+        # determine the portion of competed stock that remains with the
+        # baseline technology or changes to the efficient alternative
+        # technology; for all other scenarios, set both fractions to 1
+        if adopt_scheme == "Adjusted adoption potential" and \
+           mskeys[0] == "primary":
+            # PLACEHOLDER
+            diffuse_eff_frac = 999
+        else:
+            diffuse_eff_frac = 1
+
+        # Initialize the competed fraction of stock, energy, and carbon and
+        # the previously captured efficient fraction (the latter is only
+        # updated directly for secondary microsegments)
+        competed_frac, captured_eff_scnd = (
+            numpy.zeros((nyrs, 1)) for n in range(2))
+
+        # For secondary microsegments only, update: a) sub-market scaling
+        # fraction, b) the portion of associated primary microsegment stock
+        # that has been captured by the measure in previous years, and c)
+        # competed and competed and captured fractions, all based on the
+        # associated primary microsegment
+        if mskeys[0] == "secondary":
+            # Set short names for secondary adjustment information dicts
+            secnd_adj_sbmkt = self.markets[adopt_scheme]["mseg_adjust"][
+                "secondary mseg adjustments"]["sub-market"]
+            secnd_adj_stk = self.markets[adopt_scheme]["mseg_adjust"][
+                "secondary mseg adjustments"]["stock-and-flow"]
+            # Convert secondary adjustment information to arrays
+            orig_sbmkt, adj_sbmkt, orig_stk, adj_capt, adj_comp, \
+                adj_comp_capt = [yr_array([
+                    x[secnd_mseg_adjkey][yr] for yr in yrs]) for
+                    x in [secnd_adj_sbmkt["original energy (total)"],
+                          secnd_adj_sbmkt["adjusted energy (sub-market)"],
+                          secnd_adj_stk["original energy (total)"],
+                          secnd_adj_stk[
+                            "adjusted energy (previously captured)"],
+                          secnd_adj_stk["adjusted energy (competed)"],
+                          secnd_adj_stk[
+                            "adjusted energy (competed and captured)"]]]
+            # Adjust sub-market scaling fraction; in years where no primary
+            # microsegment energy is present, carry the fraction forward from
+            # the previous year
+            mkt_frac = numpy.zeros((nyrs, max(
+                adj_sbmkt.shape[1], numpy.size(mkt_scale_frac))))
+            for ind in range(nyrs):
+                if orig_sbmkt[ind, 0] != 0:
+                    mkt_scale_frac = adj_sbmkt[ind] / orig_sbmkt[ind]
+                mkt_frac[ind] = mkt_scale_frac
+            # Flag years with primary microsegment energy
+            orig_nonzero = (orig_stk != 0)
+            # Adjust previously captured efficient fraction
+            captured_eff_scnd = numpy.divide(
+                adj_capt, orig_stk, out=numpy.zeros(adj_capt.shape),
+                where=orig_nonzero)
+            # Adjust competed fraction (years when measure is on market only)
+            competed_frac = numpy.divide(
+                adj_comp, orig_stk, out=numpy.zeros(adj_comp.shape),
+                where=(orig_nonzero & on_mkt_col))
+            # Adjust competed and captured fraction
+            competed_captured_eff_frac = numpy.divide(
+                adj_comp_capt, orig_stk, out=numpy.broadcast_to(
+                    competed_frac * diffuse_eff_frac, numpy.broadcast(
+                        competed_frac, adj_comp_capt).shape).copy(),
+                where=orig_nonzero)
+        else:
+            mkt_frac = mkt_scale_frac
+
+        # Stock, energy, and carbon adjustments
+        stock_total = stk_init * mkt_frac
+        energy_total_sbmkt = nrg_init * mkt_frac
+        energy_total = energy_total_sbmkt * tsv_energy_base
+        carb_total_sbmkt = carb_init * mkt_frac
+        carb_total = carb_total_sbmkt * tsv_carb_base
+
+        # Re-apportion total baseline microsegment energy across all 8760
+        # hours of the year, if necessary (supports sector-level savings
+        # shapes); ensure that load shape information is available for the
+        # update and if not, yield an error message
+        if opts.sect_shapes is True and tsv_shapes is not None:
+            nrg_sbmkt_yr = yr_values(energy_total_sbmkt)
+            # Only update sector-level shapes for certain years of focus
+            for ind in [i for i, yr in enumerate(yrs) if
+                        yr in self.handyvars.aeo_years_summary]:
+                self.sector_shapes[adopt_scheme][mskeys[1]][yrs[ind]][
+                    "baseline"] = [
+                    self.sector_shapes[adopt_scheme][mskeys[1]][yrs[ind]][
+                        "baseline"][x] + tsv_shapes["baseline"][x] *
+                    nrg_sbmkt_yr[ind] for x in range(8760)]
+        elif opts.sect_shapes is True and tsv_shapes is None and (
+            mskeys[0] == "secondary" or (
+                mskeys[0] == "primary" and mskeys[3] == "electricity")):
+            raise ValueError(
+                "Missing hourly fraction of annual load data for "
+                "baseline energy use segment: " + mskeys + ". ")
+
+        # For primary microsegments, calculate the portions of existing
+        # baseline stock that are up for replacement and the fraction of
+        # total stock, energy, and carbon in a given year that the measure
+        # will compete for given the structure type and adoption scenario
+        if mskeys[0] == "primary":
+            # Suppress warnings for fractions with zero denominators, which
+            # are screened out of the final results below
+            with numpy.errstate(divide="ignore", invalid="ignore"):
                 # For a case where the current microsegment applies to new
-                # structures, determine whether enough years have passed
-                # since the baseline technology was first adopted in new
-                # homes in year 1 of the modeling time horizon to begin
-                # replacing that baseline stock; if so, the baseline
-                # replacement fraction is the fraction of new construction
-                # stock from previous years that has already been
-                # captured by the baseline technology * (1 / baseline
-                # lifetime + retrofit rate); if not, the baseline replacement
-                # fraction is 0
+                # structures, the baseline replacement fraction is the
+                # fraction of new construction stock from previous years
+                # that has already been captured by the baseline technology
+                # * (1 / baseline lifetime + retrofit rate), once enough years
+                # have passed for that baseline stock to begin to turn over
                 if mskeys[-1] == "new":
-                    # Determine the fraction of total new stock in the given
-                    # year that was previously captured by the baseline
-                    # technology; screen for cases where the total new stock
-                    # in the given year is zero
-                    if stock_total_init[yr] != 0:
-                        # Use try and except to handle cases where the market
-                        # entry year occurs in the first year of the modeling
-                        # time horizon (in this case, there were no previous
-                        # years in which new stock could be captured by the
-                        # baseline technology)
-                        try:
-                            new_stock_base_frac = stock_total_init[str(
-                                self.market_entry_year - 1)] / \
-                                stock_total_init[yr]
-                        except KeyError:
-                            new_stock_base_frac = 0
+                    # Determine the fraction of total new stock in each year
+                    # that was previously captured by the baseline technology
+                    # (zero when the market entry year is the first year of
+                    # the modeling time horizon or total new stock is zero)
+                    if str(self.market_entry_year - 1) in \
+                            stock_total_init.keys():
+                        new_stock_base_frac = numpy.where(
+                            stk_init != 0, stock_total_init[str(
+                                self.market_entry_year - 1)] / stk_init, 0)
                     else:
-                        new_stock_base_frac = 0
-
-                    # If some of the total new stock was previously captured
-                    # by the baseline technology, determine the annual baseline
-                    # replacement fraction
-                    if new_stock_base_frac != 0:
-                        # Set maximum annual baseline replacement rate
-                        base_repl_rt_max = (
-                            (1 / life_base[yr]) + self.retro_rate) * \
-                            new_stock_base_frac
-                        # Set an indicator for when the previously captured
-                        # base stock begins to turnover, using the baseline
-                        # lifetime (zero or negative value indicates turnover)
-                        turnover_base = life_base[yr] - (
-                            int(yr) - int(sorted(self.handyvars.aeo_years)[0]))
-                        # Handle case without life or retro. rate distributions
-                        if type(base_repl_rt_max) != numpy.ndarray:
-                            # If the previously captured baseline stock has
-                            # begun to turnover, the turnover rate equals the
-                            # max annual baseline replacement rate above
-                            if turnover_base <= 0:
-                                captured_base_replace_frac = base_repl_rt_max
-                            # Otherwise, the turnover rate is zero
-                            else:
-                                captured_base_replace_frac = 0
-                        # Handle case with life or retro. rate distributions
-                        else:
-                            # Ensure that all variables involved in the
-                            # calculation are set to lists with the same length
-                            # (and that list elements are of the float type)
-                            turnover_base, base_repl_rt_max, \
-                                captured_base_frac, captured_eff_frac = [
-                                    numpy.repeat(float(x),
-                                                 self.handyvars.nsamples) if
-                                    type(x) in (int, float) else x for x in [
-                                        turnover_base, base_repl_rt_max,
-                                        captured_base_frac, captured_eff_frac]]
-                            # Initialize the final base replacement fraction
-                            # output as a list of zeros with the appropriate
-                            # length
-                            captured_base_replace_frac = numpy.zeros(
-                                self.handyvars.nsamples)
-                            # Using a for loop, complete the set of operations
-                            # used above (under 'try') for each list element
-                            for ind in range(self.handyvars.nsamples):
-                                # If the previously captured baseline stock has
-                                # begun to turnover, the turnover rate equals
-                                # the max annual base replacement rate above
-                                if turnover_base[ind] <= 0:
-                                    captured_base_replace_frac[ind] = \
-                                        base_repl_rt_max[ind]
-                                # Otherwise, the turnover rate is zero
-                                else:
-                                    captured_base_replace_frac[ind] = 0
-                    else:
-                        captured_base_replace_frac = 0
-
+                        new_stock_base_frac = numpy.zeros((nyrs, 1))
+                    # Set maximum annual baseline replacement rate
+                    base_repl_rt_max = ((1 / life_b) + self.retro_rate) * \
+                        new_stock_base_frac
+                    # Set an indicator for when the previously captured base
+                    # stock begins to turnover, using the baseline lifetime
+                    # (zero or negative value indicates turnover)
+                    turnover_base = life_b - (
+                        yrs_int - int(sorted(yrs)[0]))[:, None]
+                    captured_base_replace_frac = numpy.where(
+                        (new_stock_base_frac != 0) & (turnover_base <= 0),
+                        base_repl_rt_max, 0)
                 # For a case where the current microsegment applies to
                 # existing structures, the baseline replacement fraction
-                # is the lesser of (1 / baseline lifetime) + retrofit rate
-                # and the fraction of existing stock from previous years that
-                # has already been captured by the baseline technology
+                # is (1 / baseline lifetime) + retrofit rate
                 else:
-                    # Set maximum annual baseline replacement rate
-                    base_repl_rt_max = (1 / life_base[yr]) + self.retro_rate
-                    # Handle case without lifetime or retro. rate distributions
-                    if type(base_repl_rt_max) != numpy.ndarray:
-                        captured_base_replace_frac = base_repl_rt_max
-                    # Handle case with lifetime or retro. rate distributions
-                    else:
-                        # Ensure that all variables involved in the
-                        # calculation are set to lists with the same length
-                        # (and that list elements are of the float type)
-                        base_repl_rt_max, captured_base_frac, \
-                            captured_eff_frac = [numpy.repeat(
-                                float(x), self.handyvars.nsamples) if type(x)
-                                in (int, float) else x for x in [
-                                base_repl_rt_max, captured_base_frac,
-                                captured_eff_frac]]
-                        # Initialize the final base replacement fraction output
-                        # as a list of zeros with the appropriate length
-                        captured_base_replace_frac = numpy.zeros(
-                            self.handyvars.nsamples)
-                        # Using a for loop, complete the set of operations
-                        # used above (under 'try') for each list element
-                        for ind in range(self.handyvars.nsamples):
-                            captured_base_replace_frac[ind] = \
-                                base_repl_rt_max[ind]
-
-            else:
-                captured_base_replace_frac = (0 for n in range(2))
-
-            # Determine the fraction of total stock, energy, and carbon
-            # in a given year that the measure will compete for given the
-            # microsegment type and technology adoption scenario
-
-            # Secondary microsegment (competed fraction tied to the associated
-            # primary microsegment)
-            if int(yr) >= self.market_entry_year and \
-                    int(yr) < self.market_exit_year:
-                if mskeys[0] == "secondary" and secnd_mseg_adjkey is not None \
-                    and secnd_adj_stk["original energy (total)"][
-                        secnd_mseg_adjkey][yr] != 0:
-                    competed_frac = secnd_adj_stk[
-                        "adjusted energy (competed)"][
-                        secnd_mseg_adjkey][yr] / secnd_adj_stk[
-                        "original energy (total)"][secnd_mseg_adjkey][yr]
-                # Primary microsegment in the first year of a technical
-                # potential scenario (all stock competed)
-                elif mskeys[0] == "primary" and \
-                        adopt_scheme == "Technical potential":
-                    competed_frac = 1
-                # Primary microsegment not in the first year where current
-                # microsegment applies to new structure type
-                elif mskeys[0] == "primary" and mskeys[-1] == "new":
-                    # Calculate the newly added portion of the total new
-                    # stock (where 'new' is all stock added since year one of
-                    # the modeling time horizon)
-
-                    # After the first year in the modeling time horizon,
+                    captured_base_replace_frac = (1 / life_b) + self.retro_rate
+
+                # Technical potential scenario (all stock competed)
+                if adopt_scheme == "Technical potential":
+                    competed_frac = numpy.where(on_mkt_col, 1.0, 0.0)
+                # New structure type: the competed fraction is the sum of the
+                # newly added stock fraction and the portion of the total
+                # stock that was previously captured by the baseline
+                # technology and is up for replacement or retrofit
+                elif mskeys[-1] == "new":
+                    # For the first year in the modeling time horizon, the
+                    # newly added stock fraction is 1; after the first year,
                     # the newly added stock fraction is the difference in
                     # stock between the current and previous year divided
-                    # by the current year's stock (assuming it is not zero)
-                    if yr != self.handyvars.aeo_years[0] and \
-                            stock_total[yr] != 0:
-                        new_stock_add_frac = (stock_total[yr] - stock_total[
-                            str(int(yr) - 1)]) / stock_total[yr]
-                    # For the first year in the modeling time horizon, the
-                    # newly added stock fraction is 1
-                    elif yr == self.handyvars.aeo_years[0]:
-                        new_stock_add_frac = 1
-                    # If the total new stock in the current year is zero,
-                    # the newly added stock fraction is also zero
-                    else:
-                        new_stock_add_frac = 0
-
-                    # The total competed stock fraction is the sum of the
-                    # newly added stock fraction and the portion of the
-                    # total stock that was previously captured by the baseline
-                    # technology and is up for replacement or retrofit
-                    competed_frac = new_stock_add_frac + \
-                        captured_base_replace_frac
-
-                # Primary microsegment not in the first year where current
-                # microsegment applies to existing structure type
-                elif mskeys[0] == "primary" and mskeys[-1] == "existing":
-
-                    # Ensure that replacement fraction does not exceed 1
-
-                    # Handle case without lifetime or retro. rate distributions
-                    try:
-                        if captured_base_replace_frac <= 1:
-                            competed_frac = captured_base_replace_frac
-                        else:
-                            competed_frac = 1
-                    # Handle case with lifetime or retro. rate distributions
-                    except ValueError:
-                        if all(captured_base_replace_frac <= 1):
-                            competed_frac = captured_base_replace_frac
-                        else:
-                            captured_base_replace_frac[
-                                numpy.where(
-                                    captured_base_replace_frac > 1)] = 1
-                            competed_frac = captured_base_replace_frac
-
-                else:
-                    competed_frac = 0
-            # For all other cases, set competed fraction to 0
-            else:
-                competed_frac = 0
-
-            # Determine the fraction of total stock, energy, and carbon
-            # in a given year that is competed and captured by the measure
-
-            # Secondary microsegment (competed and captured fraction tied
-            # to the associated primary microsegment)
-            if mskeys[0] == "secondary" and secnd_adj_stk[
-                    "original energy (total)"][secnd_mseg_adjkey][yr] != 0:
-                competed_captured_eff_frac = secnd_adj_stk[
-                    "adjusted energy (competed and captured)"][
-                    secnd_mseg_adjkey][yr] / secnd_adj_stk[
-                    "original energy (total)"][secnd_mseg_adjkey][yr]
-            # Primary microsegment and year when measure is on the market
-            else:
-                competed_captured_eff_frac = competed_frac * diffuse_eff_frac
-
-            # In the case of a primary microsegment with secondary effects,
-            # update the information needed to scale down the secondary
-            # microsegment(s) by a sub-market fraction and previously captured,
-            # competed, and competed and captured stock fractions for the
-            # primary microsegment
-            if mskeys[0] == "primary" and mskeys[4] == "lighting" and \
-                    secnd_mseg_adjkey is not None:
-                # Sub-market stock
-                secnd_adj_sbmkt["adjusted energy (sub-market)"][
-                    secnd_mseg_adjkey][yr] += energy_total_sbmkt[yr]
-                # Total stock
-                secnd_adj_stk[
-                    "original energy (total)"][secnd_mseg_adjkey][yr] += \
-                    energy_total_sbmkt[yr]
-                # Previously captured stock
-                secnd_adj_stk["adjusted energy (previously captured)"][
-                    secnd_mseg_adjkey][yr] += \
-                    captured_eff_frac * energy_total_sbmkt[yr]
-                # Competed stock
-                secnd_adj_stk["adjusted energy (competed)"][
-                    secnd_mseg_adjkey][yr] += competed_frac * \
-                    energy_total_sbmkt[yr]
-                # Competed and captured stock
-                secnd_adj_stk["adjusted energy (competed and captured)"][
-                    secnd_mseg_adjkey][yr] += \
-                    competed_captured_eff_frac * energy_total_sbmkt[yr]
-
-            # Update competed stock, energy, and carbon
-            stock_compete[yr] = stock_total[yr] * competed_frac
-            energy_compete_sbmkt[yr] = energy_total_sbmkt[yr] * competed_frac
-            energy_compete[yr] = energy_total[yr] * competed_frac
-            carb_compete_sbmkt[yr] = carb_total_sbmkt[yr] * competed_frac
-            carb_compete[yr] = carb_total[yr] * competed_frac
-
-            # Determine the competed stock that is captured by the measure
-            stock_compete_meas[yr] = stock_total[yr] * \
-                competed_captured_eff_frac
-
-            # Determine the amount of existing stock that has already
-            # been captured by the measure up until the current year;
-            # subsequently, update the number of total and competed stock units
-            # captured by the measure to reflect additions from the current
-            # year
-
-            # First year in the modeling time horizon
-            if yr == self.handyvars.aeo_years[0]:
-                stock_total_meas[yr] = stock_compete_meas[yr]
-            # Subsequent year in modeling time horizon
-            else:
-                # Technical potential case where the measure is on the
-                # market: the stock captured by the measure should equal the
-                # total stock (measure captures all stock)
-                if adopt_scheme == "Technical potential" and (
-                    int(yr) >= self.market_entry_year) and (
-                        int(yr) < self.market_exit_year):
-                    stock_total_meas[yr] = stock_total[yr]
+                    # by the current year's stock (or zero if the current
+                    # year's stock is zero)
+                    new_stock_add_frac = numpy.ones(stock_total.shape)
+                    new_stock_add_frac[1:] = numpy.where(
+                        stock_total[1:] != 0,
+                        (stock_total[1:] - stock_total[:-1]) /
+                        stock_total[1:], 0)
+                    competed_frac = numpy.where(
+                        on_mkt_col,
+                        new_stock_add_frac + captured_base_replace_frac, 0)
+                # Existing structure type: the competed fraction is the
+                # baseline replacement fraction (never exceeding 1)
+                elif mskeys[-1] == "existing":
+                    competed_frac = numpy.where(on_mkt_col, numpy.where(
+                        captured_base_replace_frac <= 1,
+                        captured_base_replace_frac, 1), 0)
+            # Determine the fraction of total stock, energy, and carbon that
+            # is competed and captured by the measure
+            competed_captured_eff_frac = competed_frac * diffuse_eff_frac
+
+        # Update competed stock, energy, and carbon
+        stock_compete = stock_total * competed_frac
+        energy_compete_sbmkt = energy_total_sbmkt * competed_frac
+        energy_compete = energy_total * competed_frac
+        carb_compete_sbmkt = carb_total_sbmkt * competed_frac
+        carb_compete = carb_total * competed_frac
+        # Determine the competed stock that is captured by the measure
+        stock_compete_meas = stock_total * competed_captured_eff_frac
+
+        # Set a turnover weight to use in balancing the current year's
+        # relative performance with that of all previous years since market
+        # entry (ensuring the weight never exceeds 1)
+        base_turnover_wt = (1 / life_b) + self.retro_rate
+        base_turnover_wt = numpy.where(
+            base_turnover_wt > 1, 1, base_turnover_wt)
+
+        # Calculate the stock captured by the measure, the relative
+        # performance of captured stock, and the portion of stock captured
+        # by the measure in previous years, each of which depends on the
+        # results from the previous year; these quantities are updated for
+        # all samples at once in each year (point values are handled as a
+        # single sample column)
+        stock_total_meas, captured_eff_frac = (numpy.zeros((nyrs, max([
+            x.shape[1] for x in [stock_total, stock_compete_meas,
+                                 captured_eff_scnd]]))) for n in range(2))
+        rel_perf_capt = numpy.zeros((nyrs, max(
+            rp.shape[1], base_turnover_wt.shape[1])))
+        # Initialize the portion of microsegment already captured by the
+        # efficient measure as 0
+        captured_eff = numpy.zeros(stock_total_meas.shape[1])
+        # Suppress warnings for fractions with zero denominators, which
+        # are screened out below
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            for ind in range(nyrs):
+                # Secondary microsegment previously captured fraction is tied
+                # to the associated primary microsegment
+                if mskeys[0] == "secondary":
+                    captured_eff = captured_eff_scnd[ind]
+                captured_eff_frac[ind] = captured_eff
+
+                # Update the number of total stock units captured by the
+                # measure to reflect additions from the current year
+
+                # First year in the modeling time horizon
+                if ind == 0:
+                    stock_total_meas[ind] = stock_compete_meas[ind]
+                # Technical potential case where the measure is on the market
+                # (measure captures all stock)
+                elif adopt_scheme == "Technical potential" and on_mkt[ind]:
+                    stock_total_meas[ind] = stock_total[ind]
                 # All other cases
                 else:
-                    # For microsegments applying to existing stock, calculate
-                    # a fraction for mapping the portion of captured stock as
-                    # of the previous year to the stock total for the current
-                    # year, such that the captured portion remains consistent
-                    if "existing" in mskeys and \
-                        yr != self.handyvars.aeo_years[0] and \
-                            (stock_total[str(int(yr) - 1)]) != 0:
-                        stock_adj_frac = stock_total[yr] / \
-                            stock_total[str(int(yr) - 1)]
+                    # For microsegments applying to existing stock, map the
+                    # portion of captured stock as of the previous year to
+                    # the stock total for the current year
+                    if "existing" in mskeys:
+                        stock_adj_frac = numpy.where(
+                            stock_total[ind - 1] != 0,
+                            stock_total[ind] / stock_total[ind - 1], 1)
                     else:
                         stock_adj_frac = 1
-                    # Update total number of stock units captured by the
-                    # measure (reflects all previously captured stock +
-                    # captured competed stock from the current year). Note
-                    # that previously captured stock that is now competed
-                    # must be subtracted from the previously captured stock
-                    stock_total_meas[yr] = (stock_total_meas[
-                        str(int(yr) - 1)]) * stock_adj_frac + \
-                        stock_compete_meas[yr]
-
-                    # Ensure captured stock never exceeds total stock
-
-                    # Handle case where stock captured by measure is an array
-                    if type(stock_total_meas[yr]) == numpy.ndarray and \
-                       any(stock_total_meas[yr] > stock_total[yr]) \
-                            is True:
-                        stock_total_meas[yr][
-                            numpy.where(
-                                stock_total_meas[yr] > stock_total[yr])] = \
-                            stock_total[yr]
-                    # Handle case where stock captured by measure is point val
-                    elif type(stock_total_meas[yr]) != numpy.ndarray and \
-                            stock_total_meas[yr] > stock_total[yr]:
-                        stock_total_meas[yr] = stock_total[yr]
-
-            # Update the relative performance and time-sensitive efficiency
-            # scaling factors of the current year's captured stock. Set to the
-            # relative performance/scaling factors of the current year only
-            # for all years through market entry; after market entry, these
-            # values are weighted combinations of the relative performance/
-            # scaling factor values for captured stock in both the current year
-            # and all previous years since market entry
-            if int(yr) <= self.market_entry_year:
-                # Update relative performance
-                rel_perf_capt = rel_perf[yr]
-            else:
-                # Set a turnover weight to use in balancing the current year's
-                # relative performance with that of all previous years since
-                # market entry
-                base_turnover_wt = (1 / life_base[yr]) + self.retro_rate
+                    # Add captured competed stock from the current year to
+                    # the previously captured stock, ensuring captured stock
+                    # never exceeds total stock
+                    stock_total_meas[ind] = stock_total_meas[ind - 1] * \
+                        stock_adj_frac + stock_compete_meas[ind]
+                    stock_total_meas[ind] = numpy.where(
+                        stock_total_meas[ind] > stock_total[ind],
+                        stock_total[ind], stock_total_meas[ind])
+
+                # Update the relative performance of the current year's
+                # captured stock (after market entry, a weighted combination
+                # of the relative performance for captured stock in both the
+                # current year and all previous years since market entry)
+                if yrs_int[ind] <= self.market_entry_year:
+                    rel_perf_capt[ind] = rp[ind]
+                else:
+                    rel_perf_capt[ind] = (
+                        rp[ind] * base_turnover_wt[ind] +
+                        rel_perf_capt[ind - 1] * (1 - base_turnover_wt[ind]))
 
-                # Ensure the turnover weight never exceeds 1
+                # For primary microsegments only, update portion of stock
+                # captured by efficient measure in previous years to reflect
+                # gains from the current modeling year
+                if mskeys[0] == "primary":
+                    captured_eff = numpy.where(
+                        (stock_total[ind] != 0) & (captured_eff != 1),
+                        stock_total_meas[ind] / stock_total[ind],
+                        captured_eff)
+
+        # In the case of a primary microsegment with secondary effects,
+        # update the information needed to scale down the secondary
+        # microsegment(s) by a sub-market fraction and previously captured,
+        # competed, and competed and captured stock fractions for the
+        # primary microsegment
+        if mskeys[0] == "primary" and mskeys[4] == "lighting" and \
+                secnd_mseg_adjkey is not None:
+            secnd_adj_sbmkt = self.markets[adopt_scheme]["mseg_adjust"][
+                "secondary mseg adjustments"]["sub-market"]
+            secnd_adj_stk = self.markets[adopt_scheme]["mseg_adjust"][
+                "secondary mseg adjustments"]["stock-and-flow"]
+            for adj, vals in [
+                    (secnd_adj_sbmkt["adjusted energy (sub-market)"],
+                     energy_total_sbmkt),
+                    (secnd_adj_stk["original energy (total)"],
+                     energy_total_sbmkt),
+                    (secnd_adj_stk["adjusted energy (previously captured)"],
+                     captured_eff_frac * energy_total_sbmkt),
+                    (secnd_adj_stk["adjusted energy (competed)"],
+                     competed_frac * energy_total_sbmkt),
+                    (secnd_adj_stk["adjusted energy (competed and captured)"],
+                     competed_captured_eff_frac * energy_total_sbmkt)]:
+                for yr, val in zip(yrs, yr_values(vals)):
+                    adj[secnd_mseg_adjkey][yr] += val
 
-                # Handle case without lifetime or retro. rate distributions
-                try:
-                    if base_turnover_wt > 1:
-                        base_turnover_wt = 1
-                # Handle case with lifetime or retro. rate distributions
-                except ValueError:
-                    base_turnover_wt[numpy.where(base_turnover_wt > 1)] = 1
-
-                # Update relative performance
-                rel_perf_capt = (
-                    rel_perf[yr] * base_turnover_wt +
-                    rel_perf_capt * (1 - base_turnover_wt))
-
-            # Update total-efficient and competed-efficient energy and
-            # carbon, where "efficient" signifies the total and competed
-            # energy/carbon remaining after measure implementation plus
-            # non-competed energy/carbon. * Note: Efficient energy and
-            # carbon is dependent upon whether the measure is on the market
-            # for the given year (if not, use baseline energy and carbon)
-
-            # Set common variables for the efficient energy calculations
-            energy_tot_comp_meas = energy_total_sbmkt[yr] * \
-                competed_captured_eff_frac * rel_perf_capt * (
-                    site_source_conv_meas[yr] / site_source_conv_base[yr])
-            energy_tot_comp_base = energy_total_sbmkt[yr] * (
-                    competed_frac - competed_captured_eff_frac) * \
-                rel_perf_uncapt
-            energy_tot_uncomp_meas = (
-                energy_total_sbmkt[yr] - energy_compete_sbmkt[yr]) * \
-                captured_eff_frac * rel_perf_capt * (
-                    site_source_conv_meas[yr] / site_source_conv_base[yr])
-            energy_tot_uncomp_base = (
-                energy_total_sbmkt[yr] - energy_compete_sbmkt[yr]) * \
-                (1 - captured_eff_frac) * rel_perf_uncapt
-
-            # Competed-efficient energy
-            energy_compete_eff[yr] = energy_tot_comp_meas * tsv_energy_eff + \
-                energy_tot_comp_base * tsv_energy_base
-            # Total-efficient energy
-            energy_total_eff[yr] = energy_compete_eff[yr] + \
-                energy_tot_uncomp_meas * tsv_energy_eff + \
-                energy_tot_uncomp_base * tsv_energy_base
-            # Re-apportion total efficient microsegment energy across all 8760
-            # hours of the year, if necessary (supports sector-level savings
-            # shapes)
-            if opts.sect_shapes is True and yr in \
-                    self.handyvars.aeo_years_summary:
-                self.sector_shapes[adopt_scheme][mskeys[1]][yr][
+        # Set the relative energy performance of the current year's
+        # competed and uncompeted stock that goes uncaptured
+        rel_perf_uncapt = 1
+        # Set the ratios of measure to baseline site-source conversions and
+        # carbon intensities
+        ss_ratio = ss_m / ss_b
+        int_ratio = int_m / int_b
+
+        # Update total-efficient and competed-efficient energy and carbon,
+        # where "efficient" signifies the total and competed energy/carbon
+        # remaining after measure implementation plus non-competed
+        # energy/carbon
+
+        # Set common variables for the efficient energy calculations
+        energy_tot_comp_meas = energy_total_sbmkt * \
+            competed_captured_eff_frac * rel_perf_capt * ss_ratio
+        energy_tot_comp_base = energy_total_sbmkt * (
+            competed_frac - competed_captured_eff_frac) * rel_perf_uncapt
+        energy_tot_uncomp_meas = (
+            energy_total_sbmkt - energy_compete_sbmkt) * \
+            captured_eff_frac * rel_perf_capt * ss_ratio
+        energy_tot_uncomp_base = (
+            energy_total_sbmkt - energy_compete_sbmkt) * \
+            (1 - captured_eff_frac) * rel_perf_uncapt
+        # Competed-efficient energy
+        energy_compete_eff = energy_tot_comp_meas * tsv_energy_eff + \
+            energy_tot_comp_base * tsv_energy_base
+        # Total-efficient energy
+        energy_total_eff = energy_compete_eff + \
+            energy_tot_uncomp_meas * tsv_energy_eff + \
+            energy_tot_uncomp_base * tsv_energy_base
+        # Re-apportion total efficient microsegment energy across all 8760
+        # hours of the year, if necessary (supports sector-level savings
+        # shapes)
+        if opts.sect_shapes is True:
+            nrg_comp_meas_yr, nrg_comp_base_yr, nrg_uncomp_meas_yr, \
+                nrg_uncomp_base_yr = [yr_values(x) for x in [
+                    energy_tot_comp_meas, energy_tot_comp_base,
+                    energy_tot_uncomp_meas, energy_tot_uncomp_base]]
+            for ind in [i for i, yr in enumerate(yrs) if
+                        yr in self.handyvars.aeo_years_summary]:
+                self.sector_shapes[adopt_scheme][mskeys[1]][yrs[ind]][
                     "efficient"] = [
                     self.sector_shapes[adopt_scheme][
-                        mskeys[1]][yr]["efficient"][x] + (
-                        energy_tot_comp_meas * tsv_shapes["efficient"][x] +
-                        energy_tot_comp_base * tsv_shapes["baseline"][x] +
-                        energy_tot_uncomp_meas * tsv_shapes["efficient"][x] +
-                        energy_tot_uncomp_base * tsv_shapes["baseline"][x])
+                        mskeys[1]][yrs[ind]]["efficient"][x] + (
+                        nrg_comp_meas_yr[ind] *
+                        tsv_shapes["efficient"][x] +
+                        nrg_comp_base_yr[ind] *
+                        tsv_shapes["baseline"][x] +
+                        nrg_uncomp_meas_yr[ind] *
+                        tsv_shapes["efficient"][x] +
+                        nrg_uncomp_base_yr[ind] *
+                        tsv_shapes["baseline"][x])
                     for x in range(8760)]
-
-            # Competed-efficient carbon
-            carb_compete_eff[yr] = carb_total_sbmkt[yr] * \
-                competed_captured_eff_frac * rel_perf_capt * \
-                tsv_carb_eff * \
-                (site_source_conv_meas[yr] / site_source_conv_base[yr]) * \
-                (intensity_carb_meas[yr] / intensity_carb_base[yr]) + \
-                carb_total_sbmkt[yr] * (
-                    competed_frac - competed_captured_eff_frac) * \
-                rel_perf_uncapt * tsv_carb_base
-            # Total-efficient carbon
-            carb_total_eff[yr] = carb_compete_eff[yr] + \
-                (carb_total_sbmkt[yr] - carb_compete_sbmkt[yr]) * \
-                captured_eff_frac * rel_perf_capt * tsv_carb_eff * \
-                (site_source_conv_meas[yr] / site_source_conv_base[yr]) * \
-                (intensity_carb_meas[yr] / intensity_carb_base[yr]) + \
-                (carb_total_sbmkt[yr] - carb_compete_sbmkt[yr]) * (
-                    1 - captured_eff_frac) * rel_perf_uncapt * tsv_carb_base
-
-            # Update total and competed stock, energy, and carbon
-            # costs. * Note: total-efficient and competed-efficient stock
-            # cost for the measure are dependent upon whether that measure is
-            # on the market for the given year (if not, use baseline technology
-            # cost)
-
-            # Baseline cost of the competed stock
-            stock_compete_cost[yr] = stock_compete[yr] * cost_base[yr]
-            # Baseline cost of the total stock
-            stock_total_cost[yr] = stock_total[yr] * cost_base[yr]
-            # Total and competed-efficient stock cost for add-on and
-            # full service measures. * Note: the baseline technology installed
-            # cost must be added to the measure installed cost in the case of
-            # an add-on measure type
-            if self.measure_type == "add-on":
-                # Competed-efficient stock cost (add-on measure)
-                stock_compete_cost_eff[yr] = \
-                    stock_compete_meas[yr] * (cost_meas + cost_base[yr]) + (
-                        stock_compete[yr] - stock_compete_meas[yr]) * \
-                    cost_base[yr]
-                # Total-efficient stock cost (add-on measure)
-                stock_total_cost_eff[yr] = stock_total_meas[yr] * (
-                    cost_meas + cost_base[yr]) + (
-                    stock_total[yr] - stock_total_meas[yr]) * cost_base[yr]
-            else:
-                # Competed-efficient stock cost (full service measure)
-                stock_compete_cost_eff[yr] = \
-                    stock_compete_meas[yr] * cost_meas + (
-                        stock_compete[yr] - stock_compete_meas[yr]) * \
-                    cost_base[yr]
-                # Total-efficient stock cost (full service measure)
-                stock_total_cost_eff[yr] = stock_total_meas[yr] * cost_meas \
-                    + (stock_total[yr] - stock_total_meas[yr]) * cost_base[yr]
-
-            # Competed baseline energy cost
-            energy_compete_cost[yr] = energy_compete_sbmkt[yr] * \
-                cost_energy_base[yr] * tsv_ecost_base
-            # Competed energy-efficient cost
-            energy_compete_cost_eff[yr] = energy_total_sbmkt[yr] * \
-                competed_captured_eff_frac * rel_perf_capt * \
-                (site_source_conv_meas[yr] / site_source_conv_base[yr]) * \
-                cost_energy_meas[yr] * tsv_ecost_eff + \
-                energy_total_sbmkt[yr] * (
-                    competed_frac - competed_captured_eff_frac) * \
-                cost_energy_base[yr] * rel_perf_uncapt * tsv_ecost_base
-            # Total baseline energy cost
-            energy_total_cost[yr] = energy_total_sbmkt[yr] * \
-                cost_energy_base[yr] * tsv_ecost_base
-            # Total energy-efficient cost
-            energy_total_eff_cost[yr] = energy_compete_cost_eff[yr] + \
-                (energy_total_sbmkt[yr] - energy_compete_sbmkt[yr]) * \
-                captured_eff_frac * rel_perf_capt * (
-                    site_source_conv_meas[yr] / site_source_conv_base[yr]) * \
-                cost_energy_meas[yr] * tsv_ecost_eff + (
-                    energy_total_sbmkt[yr] - energy_compete_sbmkt[yr]) * \
-                (1 - captured_eff_frac) * \
-                rel_perf_uncapt * cost_energy_base[yr] * tsv_ecost_base
-
-            # Competed baseline carbon cost
-            carb_compete_cost[yr] = carb_compete[yr] * \
-                self.handyvars.ccosts[yr]
-            # Competed carbon-efficient cost
-            carb_compete_cost_eff[yr] = \
-                carb_compete_eff[yr] * self.handyvars.ccosts[yr]
-            # Total baseline carbon cost
-            carb_total_cost[yr] = carb_total[yr] * self.handyvars.ccosts[yr]
-            # Total carbon-efficient cost
-            carb_total_eff_cost[yr] = \
-                carb_total_eff[yr] * self.handyvars.ccosts[yr]
-
-            # For primary microsegments only, update portion of stock captured
-            # by efficient measure in previous years to reflect gains from the
-            # current modeling year. If this portion is already 1 or the total
-            # stock for the year is 0, do not update the captured portion from
-            # the previous year
-            if mskeys[0] == "primary":
-                # Handle case where captured efficient stock total/fraction
-                # is a point value
-                try:
-                    if stock_total[yr] != 0 and captured_eff_frac != 1:
-                        captured_eff_frac = \
-                            stock_total_meas[yr] / stock_total[yr]
-                # Handle case where captured efficient stock total/fraction
-                # is a numpy array
-                except ValueError:
-                    try:
-                        for i in range(0, self.handyvars.nsamples):
-                            if stock_total[yr] != 0 and \
-                                    captured_eff_frac[i] != 1:
-                                captured_eff_frac[i] = \
-                                    (stock_total_meas[yr][i] / stock_total[yr])
-                    except TypeError:
-                        # Handle case where captured efficient stock is forced
-                        # to total stock point value (Technical potential)
-                        if stock_total_meas[yr] == stock_total[yr]:
-                            captured_eff_frac = 1
-
-                # Update portion of existing stock remaining with the baseline
-                # technology
-                captured_base_frac = 1 - captured_eff_frac
-
-        # Return partitioned stock, energy, and cost mseg information
-        return [stock_total, energy_total, carb_total,
-                stock_total_meas, energy_total_eff, carb_total_eff,
-                stock_compete, energy_compete,
-                carb_compete, stock_compete_meas, energy_compete_eff,
-                carb_compete_eff, stock_total_cost, energy_total_cost,
-                carb_total_cost, stock_total_cost_eff, energy_total_eff_cost,
-                carb_total_eff_cost, stock_compete_cost, energy_compete_cost,
-                carb_compete_cost, stock_compete_cost_eff,
-                energy_compete_cost_eff, carb_compete_cost_eff]
+        # Competed-efficient carbon
+        carb_compete_eff = carb_total_sbmkt * competed_captured_eff_frac * \
+            rel_perf_capt * tsv_carb_eff * ss_ratio * int_ratio + \
+            carb_total_sbmkt * (competed_frac - competed_captured_eff_frac) * \
+            rel_perf_uncapt * tsv_carb_base
+        # Total-efficient carbon
+        carb_total_eff = carb_compete_eff + \
+            (carb_total_sbmkt - carb_compete_sbmkt) * captured_eff_frac * \
+            rel_perf_capt * tsv_carb_eff * ss_ratio * int_ratio + \
+            (carb_total_sbmkt - carb_compete_sbmkt) * (
+                1 - captured_eff_frac) * rel_perf_uncapt * tsv_carb_base
+
+        # Update total and competed stock, energy, and carbon costs
+
+        # Baseline cost of the competed stock
+        stock_compete_cost = stock_compete * cost_b
+        # Baseline cost of the total stock
+        stock_total_cost = stock_total * cost_b
+        # Total and competed-efficient stock cost for add-on and full service
+        # measures. * Note: the baseline technology installed cost must be
+        # added to the measure installed cost in the case of an add-on
+        # measure type
+        if self.measure_type == "add-on":
+            cost_meas_capt = cost_meas + cost_b
+        else:
+            cost_meas_capt = cost_meas
+        # Competed-efficient stock cost
+        stock_compete_cost_eff = stock_compete_meas * cost_meas_capt + (
+            stock_compete - stock_compete_meas) * cost_b
+        # Total-efficient stock cost
+        stock_total_cost_eff = stock_total_meas * cost_meas_capt + (
+            stock_total - stock_total_meas) * cost_b
+
+        # Competed baseline energy cost
+        energy_compete_cost = energy_compete_sbmkt * cost_e_b * tsv_ecost_base
+        # Competed energy-efficient cost
+        energy_compete_cost_eff = energy_total_sbmkt * \
+            competed_captured_eff_frac * rel_perf_capt * ss_ratio * \
+            cost_e_m * tsv_ecost_eff + energy_total_sbmkt * (
+                competed_frac - competed_captured_eff_frac) * cost_e_b * \
+            rel_perf_uncapt * tsv_ecost_base
+        # Total baseline energy cost
+        energy_total_cost = energy_total_sbmkt * cost_e_b * tsv_ecost_base
+        # Total energy-efficient cost
+        energy_total_eff_cost = energy_compete_cost_eff + (
+            energy_total_sbmkt - energy_compete_sbmkt) * captured_eff_frac * \
+            rel_perf_capt * ss_ratio * cost_e_m * tsv_ecost_eff + (
+            energy_total_sbmkt - energy_compete_sbmkt) * (
+                1 - captured_eff_frac) * rel_perf_uncapt * cost_e_b * \
+            tsv_ecost_base
+
+        # Competed baseline carbon cost
+        carb_compete_cost = carb_compete * ccosts
+        # Competed carbon-efficient cost
+        carb_compete_cost_eff = carb_compete_eff * ccosts
+        # Total baseline carbon cost
+        carb_total_cost = carb_total * ccosts
+        # Total carbon-efficient cost
+        carb_total_eff_cost = carb_total_eff * ccosts
+
+        # Return partitioned stock, energy, and cost mseg information,
+        # broken out by year
+        return [dict(zip(yrs, yr_values(x))) for x in [
+            stock_total, energy_total, carb_total,
+            stock_total_meas, energy_total_eff, carb_total_eff,
+            stock_compete, energy_compete,
+            carb_compete, stock_compete_meas, energy_compete_eff,
+            carb_compete_eff, stock_total_cost, energy_total_cost,
+            carb_total_cost, stock_total_cost_eff, energy_total_eff_cost,
+            carb_total_eff_cost, stock_compete_cost, energy_compete_cost,
+            carb_compete_cost, stock_compete_cost_eff,
+            energy_compete_cost_eff, carb_compete_cost_eff]]
 
     def check_mkt_inputs(self):
         """Check for valid applicable baseline market inputs for a measure.
@@ -5864,13 +6293,17 @@ class Measure(object):
                         self.fuel_type, self.end_use, self.technology,
                         self.technology_type]]
 
-        # Fill out an 'all' climate zone input
+        # Fill out an 'all' climate zone input (copy the list of all climate
+        # zones, which is shared across measures)
         if self.climate_zone == 'all' or 'all' in self.climate_zone:
-            self.climate_zone = self.handyvars.in_all_map["climate_zone"]
+            self.climate_zone = list(
+                self.handyvars.in_all_map["climate_zone"])
 
-        # Fill out an 'all' structure type input
+        # Fill out an 'all' structure type input (copy the list of all
+        # structure types, which is shared across measures)
         if self.structure_type == 'all' or 'all' in self.structure_type:
-            self.structure_type = self.handyvars.in_all_map["structure_type"]
+            self.structure_type = list(
+                self.handyvars.in_all_map["structure_type"])
 
         # Fill out an 'all' building type, fuel type, end use, and/or
         # technology input. Note that these attributes are affected by whether
@@ -6377,12 +6810,38 @@ class Measure(object):
                     dict1[k] = dict1[k] / reduce_num
         return dict1
 
-    def rand_list_gen(self, distrib_info, nsamples):
+    def rand_seed(self, stream):
+        """Find the seed for one of the measure's streams of random draws.
+
+        Note:
+            The seed for each stream is derived from the seed for the run
+            (0 unless set by the user), the measure name, and the stream
+            name, such that draws are reproducible and do not depend on the
+            order in which measures are prepared (or on the number of worker
+            processes used).
+
+        Args:
+            stream (string): Name of the stream of random draws (e.g.,
+                'markets' or 'retro_rate').
+
+        Returns:
+            Integer seed for the stream of random draws.
+        """
+        # Use the default seed for the run if no seed has been set
+        run_seed = getattr(self.handyvars, "rand_seed", None)
+        if run_seed is None:
+            run_seed = 0
+        return int(hashlib.sha1((str(run_seed) + "|" + self.name + "|" +
+                                 stream).encode("utf-8")).hexdigest()[:8], 16)
+
+    def rand_list_gen(self, distrib_info, nsamples, rng=None):
         """Generate N samples from a given probability distribution.
 
         Args:
             distrib_info (list): Distribution type and parameters.
             nsamples (int): Number of samples to draw from distribution.
+            rng (numpy.random.RandomState): Stream of random draws to sample
+                from (defaults to the global random state).
 
         Returns:
             Numpy array of samples from the input distribution.
@@ -6390,29 +6849,32 @@ class Measure(object):
         Raises:
             ValueError: When unsupported probability distribution is present.
         """
+        # Default to the global random state
+        if rng is None:
+            rng = numpy.random
         # Generate a list of randomly generated numbers using the
         # distribution name and parameters provided in "distrib_info".
         # Check that the correct number of parameters is specified for
         # each distribution.
         if len(distrib_info) == 3 and distrib_info[0] == "normal":
-            rand_list = numpy.random.normal(distrib_info[1],
-                                            distrib_info[2], nsamples)
+            rand_list = rng.normal(distrib_info[1],
+                                   distrib_info[2], nsamples)
         elif len(distrib_info) == 3 and distrib_info[0] == "lognormal":
-            rand_list = numpy.random.lognormal(distrib_info[1],
-                                               distrib_info[2], nsamples)
+            rand_list = rng.lognormal(distrib_info[1],
+                                      distrib_info[2], nsamples)
         elif len(distrib_info) == 3 and distrib_info[0] == "uniform":
-            rand_list = numpy.random.uniform(distrib_info[1],
-                                             distrib_info[2], nsamples)
+            rand_list = rng.uniform(distrib_info[1],
+                                    distrib_info[2], nsamples)
         elif len(distrib_info) == 3 and distrib_info[0] == "gamma":
-            rand_list = numpy.random.gamma(distrib_info[1],
-                                           distrib_info[2], nsamples)
+            rand_list = rng.gamma(distrib_info[1],
+                                  distrib_info[2], nsamples)
         elif len(distrib_info) == 3 and distrib_info[0] == "weibull":
-            rand_list = numpy.random.weibull(distrib_info[1], nsamples)
+            rand_list = rng.weibull(distrib_info[1], nsamples)
             rand_list = distrib_info[2] * rand_list
         elif len(distrib_info) == 4 and distrib_info[0] == "triangular":
-            rand_list = numpy.random.triangular(distrib_info[1],
-                                                distrib_info[2],
-                                                distrib_info[3], nsamples)
+            rand_list = rng.triangular(distrib_info[1],
+                                       distrib_info[2],
+                                       distrib_info[3], nsamples)
         else:
             raise ValueError(
                 "Unsupported input distribution specification for ECM '" +
@@ -7492,7 +7954,7 @@ class MeasurePackage(Measure):
 
 def prepare_measures(measures, convert_data, msegs, msegs_cpl, handyvars,
                      handyfiles, cbecs_sf_byvint, tsv_data, base_dir, opts,
-                     regions, tsv_metrics):
+                     regions, tsv_metrics, tsv_cache=None):
     """Finalize measure markets for subsequent use in the analysis engine.
 
     Note:
@@ -7505,7 +7967,8 @@ def prepare_measures(measures, convert_data, msegs, msegs_cpl, handyvars,
     Args:
         measures (list): List of dicts with efficiency measure attributes.
         convert_data (dict): Measure cost unit conversion data.
-        msegs (dict): Baseline microsegment stock and energy use.
+        msegs (dict or object): Baseline microsegment stock and energy use
+            (as a dict or a 'FlatYearData' object).
         msegs_cpl (dict): Baseline technology cost, performance, and lifetime.
         handyvars (object): Global variables of use across Measure methods.
         handyfiles (object): Input files of use across Measure methods.
@@ -7515,6 +7978,8 @@ def prepare_measures(measures, convert_data, msegs, msegs_cpl, handyvars,
         opts (object): Stores user-specified execution options.
         regions (string): Regional breakouts to use.
         tsv_metrics (boolean or list): TSV metrics settings.
+        tsv_cache (object): Time sensitive valuation factors shared across
+            measures (if None, factors are not shared).
 
     Returns:
         A list of dicts, each including a set of measure attributes that has
@@ -7558,13 +8023,97 @@ def prepare_measures(measures, convert_data, msegs, msegs_cpl, handyvars,
             'One or more ECMs require EnergyPlus data for ECM performance; '
             'EnergyPlus-based ECM performance data are currently unsupported.')
 
-    # Finalize 'markets' attribute for all Measure objects
-    [m.fill_mkts(msegs, msegs_cpl, convert_data, tsv_data, opts) for
-     m in meas_update_objs]
+    # Flatten baseline microsegment data once for use across all measures
+    base_store = BaselineMsegStore(msegs, msegs_cpl, handyvars.aeo_years)
+
+    # Determine the number of worker processes to use in finalizing the
+    # 'markets' attribute for all Measure objects (parallel execution relies
+    # on forked processes inheriting the large baseline data inputs, and
+    # therefore falls back to serial execution where fork is unavailable)
+    workers = getattr(opts, "workers", None) if opts is not None else None
+    if workers is not None and workers > 1 and len(meas_update_objs) > 1 and \
+            "fork" in multiprocessing.get_all_start_methods():
+        # Register baseline data inputs (and the useful variables shared
+        # across measures) as module-level variables that are shared with the
+        # forked worker processes without being pickled
+        global _fill_mkts_shared
+        _fill_mkts_shared = (
+            msegs, msegs_cpl, convert_data, tsv_data, opts, base_store,
+            tsv_cache, handyvars)
+        # Detach the shared useful variables from each measure such that
+        # they are not pickled with the measure (they are reattached in the
+        # worker process and again once the updated measure is returned)
+        for m in meas_update_objs:
+            m.handyvars.shared = None
+        try:
+            with multiprocessing.get_context("fork").Pool(
+                    min(workers, len(meas_update_objs))) as pool:
+                # Finalize 'markets' attribute for all Measure objects; note
+                # that 'map' returns the updated Measure objects in the same
+                # order as the input list; random draws are seeded from each
+                # measure's name (see 'Measure.rand_seed'), such that results
+                # match those of a serial update
+                meas_update_objs, tsv_cache_stats = zip(*pool.map(
+                    fill_mkts_worker, meas_update_objs, chunksize=1))
+                meas_update_objs = list(meas_update_objs)
+        finally:
+            _fill_mkts_shared = None
+        for m in meas_update_objs:
+            m.handyvars.shared = handyvars
+        # Collect time sensitive valuation factor lookup statistics (and
+        # any new factors to write to file) from the worker processes
+        if tsv_cache is not None:
+            [tsv_cache.merge(x) for x in tsv_cache_stats]
+    else:
+        # Finalize 'markets' attribute for all Measure objects
+        [m.fill_mkts(msegs, msegs_cpl, convert_data, tsv_data, opts,
+                     base_store, tsv_cache) for m in meas_update_objs]
 
     return meas_update_objs
 
 
+# Baseline data inputs shared with worker processes that finalize Measure
+# object markets in parallel (set by 'prepare_measures' before forking)
+_fill_mkts_shared = None
+
+
+def fill_mkts_worker(m):
+    """Finalize the markets of a single Measure object in a worker process.
+
+    Note:
+        Baseline microsegment, cost/performance/lifetime, cost conversion,
+        and time sensitive valuation data (and the flattened baseline data,
+        shared time sensitive valuation factors, and useful variables shared
+        across measures) are read from the module-level '_fill_mkts_shared'
+        variable inherited from the parent process.
+
+    Args:
+        m (object): Measure object to update.
+
+    Returns:
+        Measure object with a finalized 'markets' attribute and time
+        sensitive valuation factor lookup statistics for the update (with
+        any new factors, if factors are to be written to file).
+    """
+    msegs, msegs_cpl, convert_data, tsv_data, opts, base_store, \
+        tsv_cache, handyvars = _fill_mkts_shared
+    # Reattach the useful variables shared across measures, and detach them
+    # again once the update is complete
+    m.handyvars.shared = handyvars
+    m.fill_mkts(msegs, msegs_cpl, convert_data, tsv_data, opts, base_store,
+                tsv_cache)
+    m.handyvars.shared = None
+    # Factors calculated in a worker process are only returned to the parent
+    # process when they are to be written to file
+    if tsv_cache is not None:
+        tsv_cache_stats = tsv_cache.export(
+            opts is not None and getattr(opts, "tsv_cache", False) is True)
+    else:
+        tsv_cache_stats = (0, 0, {})
+
+    return m, tsv_cache_stats
+
+
 def prepare_packages(packages, meas_update_objs, meas_summary,
                      handyvars, handyfiles, base_dir, opts,
                      regions, tsv_metrics):
@@ -7620,19 +8169,19 @@ def prepare_packages(packages, meas_update_objs, meas_summary,
                     "technology_type"]
                 # Assemble folder path for measure competition data
                 meas_folder_name = path.join(*handyfiles.ecm_compete_data)
-                # Assemble file name for measure competition data
-                meas_file_name = meas_obj.name + ".pkl.gz"
-                # Load and set competition data for the missing measure object
-                with gzip.open(path.join(base_dir, meas_folder_name,
-                                         meas_file_name), 'r') as zp:
-                    try:
-                        meas_comp_data = pickle.load(zp)
-                    except Exception as e:
-                        raise Exception(
-                            "Error reading in competition data of " +
-                            "contributing ECM '" + meas_obj.name +
-                            "' for package '" + p["name"] + "': " +
-                            str(e)) from None
+                # Load and set competition data for the missing measure
+                # object (restoring all contributing microsegment data, which
+                # are needed to prepare the package)
+                try:
+                    meas_comp_data = read_compete_data(path.join(
+                        base_dir, meas_folder_name, meas_obj.name),
+                        lazy=False)
+                except Exception as e:
+                    raise Exception(
+                        "Error reading in competition data of " +
+                        "contributing ECM '" + meas_obj.name +
+                        "' for package '" + p["name"] + "': " +
+                        str(e)) from None
                 for adopt_scheme in handyvars.adopt_schemes:
                     meas_obj.markets[adopt_scheme]["master_mseg"] = \
                         meas_summary_data[0]["markets"][adopt_scheme][
@@ -7800,38 +8349,540 @@ def tsv_cost_carb_yrmap(tsv_data, aeo_years):
     return tsv_yr_map
 
 
-def main(base_dir):
-    """Import and prepare measure attributes for analysis engine.
+def yr_array(vals):
+    """Convert a list of values by year into an array of years by samples.
 
-    Note:
-        Determine which measure definitions in an 'ecm_definitions'
-        sub-folder are new or edited; prepare the cost, performance, and
-        markets attributes for these measures for use in the analysis
-        engine; and write prepared data to analysis engine input files.
+    Args:
+        vals (list): Values for each year, each given as a point value or as
+            a numpy array of samples.
+
+    Returns:
+        Numpy array with a row for each year and a single column (if all
+        values are point values) or a column for each sample (point values
+        are repeated across all samples).
+    """
+    # Case where all values are point values
+    if not any([isinstance(x, numpy.ndarray) for x in vals]):
+        return numpy.array(vals, dtype=float)[:, None]
+    # Case where any values are sampled
+    else:
+        nsamples = max([numpy.size(x) for x in vals])
+        return numpy.array([numpy.broadcast_to(
+            x, (nsamples,)) for x in vals], dtype=float)
+
+
+def yr_values(arr):
+    """Convert an array of years by samples into a list of values by year.
 
     Args:
-        base_dir (string): Root Scout directory.
+        arr (numpy.ndarray): Array with a row for each year and a column for
+            each sample (or a single column for point values).
+
+    Returns:
+        List with the point value (single column) or the numpy array of
+        samples for each year.
     """
-    # If a user has specified the use of an alternate regional breakout
-    # than the AIA climate zones, prompt the user to directly select that
-    # alternate regional breakout. Currently the only alternate is NEMS EMM.
-    if opts.alt_regions is True:
-        input_var = 0
-        # Determine the regional breakdown to use (NEMS EMM (1) vs. AIA (2))
-        while input_var not in ['1', '2']:
-            input_var = input(
-                "Enter 1 to use an EIA NEMS Electricity Market Module (EMM) "
-                "geographical breakdown or 2 to use an AIA climate zone"
-                " geographical breakdown: ")
-            if input_var not in ['1', '2']:
-                print('Please try again. Enter either 1 or 2. '
-                      'Use ctrl-c to exit.')
-        if input_var == '1':
-            regions = "EMM"
-        else:
-            regions = "AIA"
+    if arr.shape[1] == 1:
+        return arr[:, 0].tolist()
     else:
-        regions = "AIA"
+        return list(arr)
+
+
+def json_digest(obj):
+    """Find a digest of the canonical JSON representation of an object.
+
+    Args:
+        obj: Object to digest (numpy arrays are digested as lists).
+
+    Returns:
+        Hexadecimal SHA-1 digest string.
+    """
+    return hashlib.sha1(json.dumps(
+        obj, sort_keys=True, cls=MyEncoder).encode("utf-8")).hexdigest()
+
+
+def file_digests(base_dir, file_paths, known):
+    """Find digests of the contents of a set of files.
+
+    Note:
+        Files with the same size and modification time as recorded with a
+        known digest are not read again; the known digest is used instead.
+
+    Args:
+        base_dir (string): Root Scout directory.
+        file_paths (list): File paths relative to the root directory, each
+            given as a string or a tuple of path elements.
+        known (dict): Previously found size, modification time, and digest
+            for each file path.
+
+    Returns:
+        Dict with the size, modification time, and content digest of each
+        file by file path (None for files that do not exist).
+    """
+    digests = {}
+    for fp in file_paths:
+        # Convert tuples of path elements to path strings
+        if not isinstance(fp, str):
+            fp = path.join(*fp)
+        try:
+            fp_stat = stat(path.join(base_dir, fp))
+        except FileNotFoundError:
+            digests[fp] = None
+            continue
+        # Reuse the known digest for the file if it is unchanged
+        if known.get(fp) is not None and \
+                known[fp]["size"] == fp_stat.st_size and \
+                known[fp]["mtime"] == fp_stat.st_mtime:
+            digests[fp] = known[fp]
+        # Otherwise, digest the file contents in 1 MB blocks
+        else:
+            fp_hash = hashlib.sha1()
+            with open(path.join(base_dir, fp), 'rb') as fp_data:
+                for block in iter(lambda: fp_data.read(2 ** 20), b""):
+                    fp_hash.update(block)
+            digests[fp] = {
+                "size": fp_stat.st_size, "mtime": fp_stat.st_mtime,
+                "sha1": fp_hash.hexdigest()}
+
+    return digests
+
+
+def custom_shape_files(meas_dict, handyfiles):
+    """Find the custom savings shape data file used by a measure, if any.
+
+    Args:
+        meas_dict (dict): Measure definition.
+        handyfiles (object): Input files of use across Measure methods.
+
+    Returns:
+        List with the path of the custom savings shape data file referenced
+        by the measure's 'tsv_features' attribute (empty if there is none).
+    """
+    try:
+        csv_shape_file_name = meas_dict["tsv_features"]["shape"][
+            "custom_annual_savings"]
+    except (KeyError, TypeError):
+        csv_shape_file_name = None
+    if isinstance(csv_shape_file_name, str):
+        return [handyfiles.tsv_shape_data + (csv_shape_file_name,)]
+    else:
+        return []
+
+
+def load_baseline_json(file_path, gzipped=False, flat=False):
+    """Read a baseline data JSON, using a binary cache of the data if current.
+
+    Note:
+        The first time a baseline data file is read, a binary cache of its
+        contents is written next to the file: a '.cache.npy' array with all
+        numeric values that are broken out by year (one row per set of year
+        values) and a '.cache.pkl' file with the remaining structure of the
+        data and a fingerprint of the source file. Flat data are read from
+        the cache with the array memory mapped, such that the year values
+        are neither parsed nor copied into each process that reads them
+        (concurrent processes share the pages of the array); otherwise,
+        the nested dict of baseline data is rebuilt from the cache. The
+        cache is rebuilt when the size or modification time of the source
+        file changes, unless the source file contents still match the
+        cached content hash. If the cache cannot be written, the data are
+        read from the source file alone.
+
+    Args:
+        file_path (string): Path to the baseline data JSON.
+        gzipped (boolean): Flag for a gzip-compressed baseline data JSON.
+        flat (boolean): Flag for returning the data in flattened form.
+
+    Returns:
+        Baseline data, as read from the source file, given as a dict or (if
+        flat) a 'FlatYearData' object.
+
+    Raises:
+        ValueError: If the baseline data JSON cannot be read.
+    """
+    cache_arr, cache_struct = [file_path + x for x in [
+        ".cache.npy", ".cache.pkl"]]
+    src_stat = stat(file_path)
+    # Read the fingerprint and structure of the cached data, if available
+    try:
+        with open(cache_struct, 'rb') as cs:
+            cached = pickle.load(cs)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        cached = None
+    # Screen for a cache built for a different version of the source file;
+    # if the source file size and modification time do not match those of
+    # the cache, check whether the source file contents have changed
+    if cached is not None and (
+            cached["size"], cached["mtime"]) != (
+            src_stat.st_size, src_stat.st_mtime):
+        if cached["size"] != src_stat.st_size or \
+                file_digests("", [file_path], {})[file_path]["sha1"] != \
+                cached["sha1"]:
+            cached = None
+        else:
+            # Contents are unchanged; record the new modification time
+            cached["mtime"] = src_stat.st_mtime
+            try:
+                write_baseline_cache(cache_struct, None, cached)
+            except OSError:
+                pass
+    # Read the baseline data from the cache
+    if cached is not None:
+        try:
+            if flat is True:
+                return FlatYearData(
+                    cached["structure"], load_array(cache_arr),
+                    cached["year keys"], cached["int values"])
+            else:
+                return rebuild_year_dicts(
+                    cached["structure"], numpy.load(cache_arr),
+                    cached["year keys"], cached["int values"])
+        except (OSError, ValueError):
+            pass
+
+    # Read the baseline data from the source file
+    try:
+        if gzipped is True:
+            with gzip.GzipFile(file_path, 'r') as zip_ref:
+                data = json.loads(zip_ref.read().decode('utf-8'))
+        else:
+            with open(file_path, 'r') as js:
+                data = json.load(js)
+    except ValueError as e:
+        raise ValueError(
+            "Error reading in '" + file_path + "': " + str(e)) from None
+    # Write the cache of the baseline data for subsequent use
+    flat_data = FlatYearData.from_data(data)
+    try:
+        write_baseline_cache(cache_struct, (cache_arr, flat_data.yr_vals), {
+            "size": src_stat.st_size, "mtime": src_stat.st_mtime,
+            "sha1": file_digests("", [file_path], {})[file_path]["sha1"],
+            "structure": flat_data.structure,
+            "year keys": flat_data.yr_keys,
+            "int values": flat_data.int_vals})
+    except OSError:
+        pass
+
+    if flat is True:
+        return flat_data
+    else:
+        return data
+
+
+def write_baseline_cache(cache_struct, cache_arr, cached):
+    """Write a binary cache of baseline data.
+
+    Note:
+        Files are first written under temporary names and then renamed,
+        such that concurrent processes never read a partially written cache.
+
+    Args:
+        cache_struct (string): Path of the cached data structure file.
+        cache_arr (tuple): Path of the cached year values array file and the
+            array to write (None to write only the data structure file).
+        cached (dict): Fingerprint of the source file and data structure.
+    """
+    if cache_arr is not None:
+        write_array(cache_arr[0], cache_arr[1])
+    write_cache_entry(cache_struct, cached)
+
+
+def find_measures_to_prep(base_dir, handyfiles, handyvars, opts, regions,
+                          tsv_metrics, meas_summary, manifest):
+    """Find the measure definitions that require preparation.
+
+    Note:
+        A measure or package definition is prepared if it is new, if its
+        definition, the input files, or the options used to prepare it have
+        changed since it was last prepared (as recorded in the manifest of
+        hashes from previous preparations), or if it has no prepared
+        competition data. Packages are also prepared when any of their
+        contributing measures are prepared.
+
+    Args:
+        base_dir (string): Root Scout directory.
+        handyfiles (object): Input files of use across Measure methods.
+        handyvars (object): Global variables of use across Measure methods.
+        opts (object): Stores user-specified execution options.
+        regions (string): Regional breakout used in preparing measures.
+        tsv_metrics (list): Time sensitive valuation metrics settings.
+        meas_summary (list): High-level data for previously prepared
+            measures and packages.
+        manifest (dict): Hashes of the input files and of the measure and
+            package definitions used in previous preparations.
+
+    Returns:
+        Lists of the individual measure and package definitions to prepare,
+        and dict of the current hashes of the input files and of the
+        measure and package definitions (to record in the manifest once
+        the definitions are prepared).
+    """
+    # Find hashes of the contents of the input files used in preparing
+    # measures (reusing previous hashes for files with unchanged size and
+    # modification time)
+    prep_files = [
+        handyfiles.msegs_in, handyfiles.cost_convert_in,
+        handyfiles.cbecs_sf_byvint, handyfiles.ss_data, handyfiles.metadata,
+        handyfiles.cpi_data, handyfiles.tsv_load_data,
+        handyfiles.tsv_cost_data, handyfiles.tsv_carbon_data,
+        handyfiles.tsv_metrics_data_tot, handyfiles.tsv_metrics_data_net,
+        handyfiles.health_data]
+    # Baseline cost, performance, and lifetime data for EMM regions are read
+    # from a compressed file
+    if regions == "EMM":
+        prep_files.extend([
+            (path.splitext(path.join(*handyfiles.msegs_cpl_in))[0] + ".gz",),
+            handyfiles.ash_emm_map])
+    else:
+        prep_files.append(handyfiles.msegs_cpl_in)
+    input_files = file_digests(base_dir, prep_files, manifest["input files"])
+    # Find a hash that summarizes the input files and user-specified
+    # options used in preparing measures
+    inputs_hash = json_digest([
+        {x[0]: (x[1]["sha1"] if x[1] is not None else None) for
+         x in input_files.items()}, {
+            "site_energy": opts.site_energy,
+            "captured_energy": opts.captured_energy,
+            "regions": regions, "tsv_metrics": tsv_metrics,
+            "sect_shapes": opts.sect_shapes,
+            "rp_persist": opts.rp_persist,
+            "health_costs": opts.health_costs,
+            "seed": handyvars.rand_seed}])
+    # Initialize dicts of hashes for current measure/package definitions
+    meas_hashes, pkg_hashes = ({} for n in range(2))
+    # List measure competition data files that have already been prepared
+    compete_files = listdir(path.join(
+        base_dir, *handyfiles.ecm_compete_data))
+
+    # Determine full list of individual measure JSON names
+    meas_toprep_indiv_names = [
+        x for x in listdir(path.join(base_dir, handyfiles.indiv_ecms)) if
+        x.endswith(".json") and 'package' not in x]
+    # Initialize list of individual measures to prepare
+    meas_toprep_indiv = []
+    # Import all individual measure JSONs
+    for mi in meas_toprep_indiv_names:
+        with open(path.join(base_dir, handyfiles.indiv_ecms, mi), 'r') as jsf:
+            try:
+                # Load each JSON into a dict
+                meas_dict = json.load(jsf)
+                # Determine whether dict should be added to list of measure
+                # definitions to update. Add a measure dict to the list
+                # requiring further prepartion if: a) measure name is not
+                # already included in database of prepared measure attributes
+                # ('ecm_prep.json'); b) measure does not already have
+                # competition data prepared for it (in
+                # '/supporting_data/ecm_competition_data' folder), or
+                # c) measure JSON time stamp indicates it has been modified
+                # since the last run of 'ecm_prep.py' or d) the user added/
+                # removed the "site_energy," "captured_energy" or "tsv_metrics"
+                # cmd line arguments and the measure definition was not already
+                # prepared using these settings
+                # Find hashes of the measure definition (including any custom
+                # savings shape data file it references) and of the input
+                # files and options used to prepare it; note that hashes are
+                # keyed by measure definition file name, as more than one
+                # definition file may share the same measure name
+                meas_hashes[mi] = {
+                    "definition": json_digest([meas_dict, list(file_digests(
+                        base_dir, custom_shape_files(meas_dict, handyfiles),
+                        manifest["input files"]).values())]),
+                    "inputs": inputs_hash}
+                meas_manifest = manifest["measures"].get(mi)
+                # If the manifest has hashes for the measure, prepare the
+                # measure if: a) measure definition, input file, or option
+                # hashes have changed since the measure was last prepared;
+                # b) measure name is not already included in database of
+                # prepared measure attributes ('ecm_prep.json'); or
+                # c) measure does not already have competition data prepared
+                # for it
+                if meas_manifest is not None:
+                    prep_flag = (
+                        meas_manifest != meas_hashes[mi] or
+                        all([meas_dict["name"] != y["name"] for
+                             y in meas_summary]) or
+                        all([meas_dict["name"] not in y for
+                             y in compete_files]))
+                # Otherwise, determine whether the measure should be prepared
+                # from the criteria below
+                else:
+                    prep_flag = \
+                       all([meas_dict["name"] != y["name"] for
+                           y in meas_summary]) or \
+                       all([meas_dict["name"] not in y for
+                            y in compete_files]) or \
+                       (stat(path.join(
+                           base_dir, handyfiles.indiv_ecms, mi)).st_mtime >
+                        stat(path.join(
+                            base_dir, *handyfiles.ecm_prep)).st_mtime) or \
+                       (opts is not None and opts.site_energy is True and
+                        all([y["energy_outputs"]["site_energy"] is False for
+                             y in meas_summary if y["name"] ==
+                             meas_dict["name"]])) or \
+                       (opts is not None and opts.captured_energy is True and
+                        all([y["energy_outputs"]["captured_energy_ss"] is False
+                             for y in meas_summary if y["name"] ==
+                             meas_dict["name"]])) or \
+                       (opts is not None and opts.alt_regions is True and
+                        all([(y["energy_outputs"]["alt_regions"] is False or
+                              y["energy_outputs"]["alt_regions"] != regions)
+                             for y in meas_summary if y["name"] ==
+                             meas_dict["name"]])) or \
+                       (opts is not None and opts.tsv_metrics is True and
+                        all([y["energy_outputs"]["tsv_metrics"] is False or
+                             y["energy_outputs"]["tsv_metrics"] != tsv_metrics
+                             for y in meas_summary if y["name"] ==
+                             meas_dict["name"]])) or \
+                       (opts is None or opts.site_energy is False and
+                        all([y["energy_outputs"]["site_energy"] is True for
+                             y in meas_summary if y["name"] ==
+                             meas_dict["name"]])) or \
+                       (opts is None or opts.captured_energy is False and
+                        all([y["energy_outputs"]["captured_energy_ss"] is True
+                             for y in meas_summary if y["name"] ==
+                             meas_dict["name"]])) or \
+                       (opts is None or opts.alt_regions is False and
+                        all([y["energy_outputs"]["alt_regions"] is not False
+                             for y in meas_summary if y["name"] ==
+                             meas_dict["name"]])) or \
+                       (opts is None or opts.tsv_metrics is False and
+                        all([y["energy_outputs"]["tsv_metrics"] is not False
+                             for y in meas_summary if y["name"] ==
+                             meas_dict["name"]]))
+                if prep_flag:
+                    # Append measure dict to list of measure definitions
+                    # to update if it meets the above criteria
+                    meas_toprep_indiv.append(meas_dict)
+                    # Add copies of the measure that examine multiple scenarios
+                    # of public health cost data additions, assuming the
+                    # measure is not already a previously prepared copy
+                    # that reflects these additions (judging by name)
+                    if opts is not None and opts.health_costs is True and \
+                            "PHC" not in meas_dict["name"]:
+                        # Check to ensure that the measure applies to the
+                        # electric fuel type (or switches to it); if not, do
+                        # not prepare additional versions of the measure with
+                        # health costs
+                        if ((((type(meas_dict["fuel_type"]) is not list) and
+                              meas_dict["fuel_type"] not in [
+                            "electricity", "all"]) or ((type(
+                                meas_dict["fuel_type"]) is list) and all([
+                                x not in ["electricity", "all"] for x in
+                                meas_dict["fuel_type"]]))) and
+                                meas_dict["fuel_switch_to"] != "electricity"):
+                            # Warn the user that ECMs that do not apply to the
+                            # electric fuel type will not be prepared with
+                            # public cost health adders
+                            warnings.warn(
+                                "WARNING: " + meas_dict["name"] + " does not "
+                                "apply to the electric fuel type; versions of "
+                                "this ECM with low/high public health cost "
+                                "adders will not be prepared.")
+                        else:
+                            for scn in handyvars.health_scn_names:
+                                # Determine unique measure copy name
+                                new_name = meas_dict["name"] + "-" + scn[0]
+                                # Copy the measure
+                                new_meas = copy.deepcopy(meas_dict)
+                                # Set the copied measure name to the name above
+                                new_meas["name"] = new_name
+                                # Append the copied measure to list of measure
+                                # definitions to update
+                                meas_toprep_indiv.append(new_meas)
+            except ValueError as e:
+                raise ValueError(
+                    "Error reading in ECM '" + mi + "': " +
+                    str(e)) from None
+
+    # Find package measure definitions that are new or were edited since
+    # the last time 'ecm_prep.py' routine was run, or are comprised of
+    # individual measures that are new or were edited since the last time
+    # 'ecm_prep.py' routine was run
+
+    # Import packages JSON
+    with open(path.join(base_dir, *handyfiles.ecm_packages), 'r') as mpk:
+        try:
+            meas_toprep_package_init = json.load(mpk)
+        except ValueError as e:
+            raise ValueError(
+                "Error reading in ECM package '" + handyfiles.ecm_packages +
+                "': " + str(e)) from None
+    # Initialize list of measure package dicts to prepare
+    meas_toprep_package = []
+    # Identify all previously prepared measure packages
+    meas_prepped_pkgs = [
+        mpkg for mpkg in meas_summary if "contributing_ECMs" in mpkg.keys()]
+    # Loop through each package dict in the current list and determine which
+    # of these package measures require further preparation
+    for m in meas_toprep_package_init:
+        # Determine the subset of previously prepared package measures
+        # with the same name as the current package measure
+        m_exist = [
+            me for me in meas_prepped_pkgs if me["name"] == m["name"]]
+        # Find hashes of the package definition and of the input files and
+        # options used to prepare it
+        pkg_hashes[m["name"]] = {
+            "definition": json_digest(m), "inputs": inputs_hash}
+        pkg_manifest = manifest["packages"].get(m["name"])
+        # Add a package dict to the list requiring further prepartion if:
+        # a) any of the package's contributing measures have been updated,
+        # b) the package is new, c) package does not already have competition
+        # data prepared for it; or d) package definition, input file, or
+        # option hashes have changed since the package was last prepared (or,
+        # if the manifest has no hashes for the package, package
+        # "contributing_ECMs" and/or "benefits" parameters have been edited
+        # from a previous version)
+        if any([x["name"] in m["contributing_ECMs"] for
+                x in meas_toprep_indiv]) or len(m_exist) == 0 or \
+            all([m["name"] not in y for y in compete_files]) or (
+                pkg_manifest is not None and
+                pkg_manifest != pkg_hashes[m["name"]]) or (
+                pkg_manifest is None and len(m_exist) == 1 and any([
+                    m[x] != m_exist[0][x] for x in [
+                        "contributing_ECMs", "benefits"]])):
+            meas_toprep_package.append(m)
+        # Raise an error if the current package matches the name of
+        # multiple previously prepared packages
+        elif len(m_exist) > 1:
+            raise ValueError(
+                "Multiple existing ECM names match '" + m["name"] + "'")
+
+    return meas_toprep_indiv, meas_toprep_package, {
+        "input files": input_files, "measures": meas_hashes,
+        "packages": pkg_hashes}
+
+
+def main(base_dir):
+    """Import and prepare measure attributes for analysis engine.
+
+    Note:
+        Determine which measure definitions in an 'ecm_definitions'
+        sub-folder are new or edited; prepare the cost, performance, and
+        markets attributes for these measures for use in the analysis
+        engine; and write prepared data to analysis engine input files.
+
+    Args:
+        base_dir (string): Root Scout directory.
+    """
+    # If a user has specified the use of an alternate regional breakout
+    # than the AIA climate zones, prompt the user to directly select that
+    # alternate regional breakout. Currently the only alternate is NEMS EMM.
+    if opts.alt_regions is True:
+        input_var = 0
+        # Determine the regional breakdown to use (NEMS EMM (1) vs. AIA (2))
+        while input_var not in ['1', '2']:
+            input_var = input(
+                "Enter 1 to use an EIA NEMS Electricity Market Module (EMM) "
+                "geographical breakdown or 2 to use an AIA climate zone"
+                " geographical breakdown: ")
+            if input_var not in ['1', '2']:
+                print('Please try again. Enter either 1 or 2. '
+                      'Use ctrl-c to exit.')
+        if input_var == '1':
+            regions = "EMM"
+        else:
+            regions = "AIA"
+    else:
+        regions = "AIA"
 
     # Screen for cases where user desires time-sensitive valuation metrics
     # or hourly sector-level load shapes but EMM regions are not used (such
@@ -7959,6 +9010,13 @@ def main(base_dir):
     # Instantiate useful variables object
     handyvars = UsefulVars(
         base_dir, handyfiles, regions, tsv_metrics, opts.health_costs)
+    # Set any user-specified seed for random draws from probability
+    # distributions on measure inputs
+    if opts.seed is not None:
+        handyvars.rand_seed = opts.seed
+    # Share the useful variables object across all measures without copying
+    # (measure-specific changes are set on each measure's overlay)
+    handyvars.freeze()
 
     # Import file to write prepared measure attributes data to for
     # subsequent use in the analysis engine (if file does not exist,
@@ -7976,192 +9034,47 @@ def main(base_dir):
     except FileNotFoundError:
         meas_summary = []
 
-    # Determine which individual and package measure definitions
-    # require further preparation for use in the analysis engine
-
-    # Find individual measure definitions that are new (e.g., they have
-    # not already been fully prepared for use in the analysis engine) or
-    # have been edited since last the 'ecm_prep.py' routine was run
-
-    # Determine full list of individual measure JSON names
-    meas_toprep_indiv_names = [
-        x for x in listdir(handyfiles.indiv_ecms) if x.endswith(".json") and
-        'package' not in x]
-    # Initialize list of individual measures to prepare
-    meas_toprep_indiv = []
-    # Import all individual measure JSONs
-    for mi in meas_toprep_indiv_names:
-        with open(path.join(base_dir, handyfiles.indiv_ecms, mi), 'r') as jsf:
-            try:
-                # Load each JSON into a dict
-                meas_dict = json.load(jsf)
-                # Determine whether dict should be added to list of measure
-                # definitions to update. Add a measure dict to the list
-                # requiring further prepartion if: a) measure name is not
-                # already included in database of prepared measure attributes
-                # ('ecm_prep.json'); b) measure does not already have
-                # competition data prepared for it (in
-                # '/supporting_data/ecm_competition_data' folder), or
-                # c) measure JSON time stamp indicates it has been modified
-                # since the last run of 'ecm_prep.py' or d) the user added/
-                # removed the "site_energy," "captured_energy" or "tsv_metrics"
-                # cmd line arguments and the measure definition was not already
-                # prepared using these settings
-                if all([meas_dict["name"] != y["name"] for
-                       y in meas_summary]) or \
-                   all([meas_dict["name"] not in y for y in listdir(
-                        path.join(*handyfiles.ecm_compete_data))]) or \
-                   (stat(path.join(handyfiles.indiv_ecms, mi)).st_mtime >
-                    stat(path.join(
-                        "supporting_data", "ecm_prep.json")).st_mtime) or \
-                   (opts is not None and opts.site_energy is True and
-                    all([y["energy_outputs"]["site_energy"] is False for
-                         y in meas_summary if y["name"] ==
-                         meas_dict["name"]])) or \
-                   (opts is not None and opts.captured_energy is True and
-                    all([y["energy_outputs"]["captured_energy_ss"] is False
-                         for y in meas_summary if y["name"] ==
-                         meas_dict["name"]])) or \
-                   (opts is not None and opts.alt_regions is True and
-                    all([(y["energy_outputs"]["alt_regions"] is False or
-                          y["energy_outputs"]["alt_regions"] != regions)
-                         for y in meas_summary if y["name"] ==
-                         meas_dict["name"]])) or \
-                   (opts is not None and opts.tsv_metrics is True and
-                    all([y["energy_outputs"]["tsv_metrics"] is False or
-                         y["energy_outputs"]["tsv_metrics"] != tsv_metrics
-                         for y in meas_summary if y["name"] ==
-                         meas_dict["name"]])) or \
-                   (opts is None or opts.site_energy is False and
-                    all([y["energy_outputs"]["site_energy"] is True for
-                         y in meas_summary if y["name"] ==
-                         meas_dict["name"]])) or \
-                   (opts is None or opts.captured_energy is False and
-                    all([y["energy_outputs"]["captured_energy_ss"] is True
-                         for y in meas_summary if y["name"] ==
-                         meas_dict["name"]])) or \
-                   (opts is None or opts.alt_regions is False and
-                    all([y["energy_outputs"]["alt_regions"] is not False
-                         for y in meas_summary if y["name"] ==
-                         meas_dict["name"]])) or \
-                   (opts is None or opts.tsv_metrics is False and
-                    all([y["energy_outputs"]["tsv_metrics"] is not False
-                         for y in meas_summary if y["name"] ==
-                         meas_dict["name"]])):
-                    # Append measure dict to list of measure definitions
-                    # to update if it meets the above criteria
-                    meas_toprep_indiv.append(meas_dict)
-                    # Add copies of the measure that examine multiple scenarios
-                    # of public health cost data additions, assuming the
-                    # measure is not already a previously prepared copy
-                    # that reflects these additions (judging by name)
-                    if opts is not None and opts.health_costs is True and \
-                            "PHC" not in meas_dict["name"]:
-                        # Check to ensure that the measure applies to the
-                        # electric fuel type (or switches to it); if not, do
-                        # not prepare additional versions of the measure with
-                        # health costs
-                        if ((((type(meas_dict["fuel_type"]) is not list) and
-                              meas_dict["fuel_type"] not in [
-                            "electricity", "all"]) or ((type(
-                                meas_dict["fuel_type"]) is list) and all([
-                                x not in ["electricity", "all"] for x in
-                                meas_dict["fuel_type"]]))) and
-                                meas_dict["fuel_switch_to"] != "electricity"):
-                            # Warn the user that ECMs that do not apply to the
-                            # electric fuel type will not be prepared with
-                            # public cost health adders
-                            warnings.warn(
-                                "WARNING: " + meas_dict["name"] + " does not "
-                                "apply to the electric fuel type; versions of "
-                                "this ECM with low/high public health cost "
-                                "adders will not be prepared.")
-                        else:
-                            for scn in handyvars.health_scn_names:
-                                # Determine unique measure copy name
-                                new_name = meas_dict["name"] + "-" + scn[0]
-                                # Copy the measure
-                                new_meas = copy.deepcopy(meas_dict)
-                                # Set the copied measure name to the name above
-                                new_meas["name"] = new_name
-                                # Append the copied measure to list of measure
-                                # definitions to update
-                                meas_toprep_indiv.append(new_meas)
-            except ValueError as e:
-                raise ValueError(
-                    "Error reading in ECM '" + mi + "': " +
-                    str(e)) from None
-
-    # Find package measure definitions that are new or were edited since
-    # the last time 'ecm_prep.py' routine was run, or are comprised of
-    # individual measures that are new or were edited since the last time
-    # 'ecm_prep.py' routine was run
-
-    # Import packages JSON
-    with open(path.join(base_dir, *handyfiles.ecm_packages), 'r') as mpk:
-        try:
-            meas_toprep_package_init = json.load(mpk)
-        except ValueError as e:
-            raise ValueError(
-                "Error reading in ECM package '" + handyfiles.ecm_packages +
-                "': " + str(e)) from None
-    # Initialize list of measure package dicts to prepare
-    meas_toprep_package = []
-    # Identify all previously prepared measure packages
-    meas_prepped_pkgs = [
-        mpkg for mpkg in meas_summary if "contributing_ECMs" in mpkg.keys()]
-    # Loop through each package dict in the current list and determine which
-    # of these package measures require further preparation
-    for m in meas_toprep_package_init:
-        # Determine the subset of previously prepared package measures
-        # with the same name as the current package measure
-        m_exist = [
-            me for me in meas_prepped_pkgs if me["name"] == m["name"]]
-        # Add a package dict to the list requiring further prepartion if:
-        # a) any of the package's contributing measures have been updated,
-        # b) the package is new, c) package does not already have competition
-        # data prepared for it; or d) package "contributing_ECMs" and/or
-        # "benefits" parameters have been edited from a previous version
-        if any([x["name"] in m["contributing_ECMs"] for
-                x in meas_toprep_indiv]) or len(m_exist) == 0 or \
-            all([m["name"] not in y for y in listdir(path.join(
-                *handyfiles.ecm_compete_data))]) or (
-                len(m_exist) == 1 and any([m[x] != m_exist[0][x] for x in [
-                    "contributing_ECMs", "benefits"]])):
-            meas_toprep_package.append(m)
-        # Raise an error if the current package matches the name of
-        # multiple previously prepared packages
-        elif len(m_exist) > 1:
-            raise ValueError(
-                "Multiple existing ECM names match '" + m["name"] + "'")
+    # Import manifest of hashes for the measure definitions, input files,
+    # and options used in previous measure preparations (if the file does not
+    # exist, provide an empty manifest as substitute, since the file will be
+    # created later when writing ECM data)
+    try:
+        with open(path.join(base_dir, *handyfiles.ecm_prep_manifest),
+                  'r') as mf:
+            manifest = json.load(mf)
+    except FileNotFoundError:
+        manifest = {"input files": {}, "measures": {}, "packages": {}}
+    except ValueError as e:
+        warnings.warn(
+            "WARNING: Error reading in '" +
+            path.join(*handyfiles.ecm_prep_manifest) + "' (" + str(e) +
+            "); ECMs will be checked for updates without the manifest")
+        manifest = {"input files": {}, "measures": {}, "packages": {}}
+    # Determine which individual and package measure definitions require
+    # further preparation for use in the analysis engine (e.g., they are new
+    # or have been edited since the 'ecm_prep.py' routine was last run), and
+    # find the hashes to record in the manifest
+    meas_toprep_indiv, meas_toprep_package, manifest_update = \
+        find_measures_to_prep(
+            base_dir, handyfiles, handyvars, opts, regions, tsv_metrics,
+            meas_summary, manifest)
 
     # If one or more measure definition is new or has been edited, proceed
     # further with 'ecm_prep.py' routine; otherwise end the routine
     if len(meas_toprep_indiv) > 0 or len(meas_toprep_package) > 0:
 
-        # Import baseline microsegments
-        with open(path.join(base_dir, *handyfiles.msegs_in), 'r') as msi:
-            try:
-                msegs = json.load(msi)
-            except ValueError as e:
-                raise ValueError(
-                    "Error reading in '" +
-                    handyfiles.msegs_in + "': " + str(e)) from None
+        # Import baseline microsegments in flattened form (from a memory
+        # mapped binary cache of the data when it is current)
+        msegs = load_baseline_json(
+            path.join(base_dir, *handyfiles.msegs_in), flat=True)
         # Import baseline cost, performance, and lifetime data
         if regions == 'EMM':  # Extract compressed CPL EMM file
             bjs = path.join(base_dir, *handyfiles.msegs_cpl_in)
             bjszip = path.splitext(bjs)[0] + '.gz'
-            with gzip.GzipFile(bjszip, 'r') as zip_ref:
-                msegs_cpl = json.loads(zip_ref.read().decode('utf-8'))
+            msegs_cpl = load_baseline_json(bjszip, gzipped=True)
         else:
-            with open(
-                    path.join(base_dir, *handyfiles.msegs_cpl_in), 'r') as bjs:
-                try:
-                    msegs_cpl = json.load(bjs)
-                except ValueError as e:
-                    raise ValueError(
-                        "Error reading in '" +
-                        handyfiles.msegs_cpl_in + "': " + str(e)) from None
+            msegs_cpl = load_baseline_json(
+                path.join(base_dir, *handyfiles.msegs_cpl_in))
         # Import measure cost unit conversion data
         with open(path.join(base_dir, *handyfiles.cost_convert_in), 'r') as cc:
             try:
@@ -8238,11 +9151,41 @@ def main(base_dir):
         except FileNotFoundError:
             run_setup = {"active": [], "inactive": []}
 
+        # Initialize time sensitive valuation factors to share across
+        # measures, keyed to a fingerprint of the input data the factors are
+        # calculated from; if desired by the user, read in factors that were
+        # written to file by a previous run with the same input data
+        tsv_cache_files = [
+            handyfiles.tsv_load_data, handyfiles.tsv_cost_data,
+            handyfiles.tsv_carbon_data, handyfiles.tsv_metrics_data_tot,
+            handyfiles.tsv_metrics_data_net, handyfiles.cost_convert_in]
+        if regions == "EMM":
+            tsv_cache_files.append(handyfiles.ash_emm_map)
+        tsv_cache_persist = getattr(opts, "tsv_cache", False) is True
+        # Fingerprint input data files by their contents (only needed to
+        # screen factors that are read from or written to file)
+        if tsv_cache_persist:
+            tsv_cache_files = file_digests(base_dir, tsv_cache_files, {})
+            tsv_cache = TSVFactorCache(data_key=json_digest([
+                regions, handyvars.aeo_years, {
+                    x: (y["sha1"] if y is not None else None) for
+                    x, y in tsv_cache_files.items()}]))
+            tsv_cache.load(path.join(base_dir, *handyfiles.tsv_fact_cache))
+        else:
+            tsv_cache = TSVFactorCache()
+
         # Prepare new or edited measures for use in analysis engine
         meas_prepped_objs = prepare_measures(
             meas_toprep_indiv, convert_data, msegs, msegs_cpl, handyvars,
             handyfiles, cbecs_sf_byvint, tsv_data, base_dir, opts, regions,
-            tsv_metrics)
+            tsv_metrics, tsv_cache)
+
+        # Report on the sharing of time sensitive valuation factors across
+        # measures and, if desired by the user, write the factors to file
+        if (tsv_cache.hits + tsv_cache.misses) > 0:
+            print(tsv_cache.summary())
+        if tsv_cache_persist:
+            tsv_cache.save(path.join(base_dir, *handyfiles.tsv_fact_cache))
 
         # Prepare measure packages for use in analysis engine (if needed)
         if meas_toprep_package:
@@ -8290,15 +9233,14 @@ def main(base_dir):
         # Notify user that all measure preparations are completed
         print('All ECM updates complete; writing output data...')
 
-        # Write prepared measure competition data to zipped JSONs
+        # Write prepared measure competition data to array-backed stores
+        # (see 'data_store' module)
         for ind, m in enumerate(meas_prepped_objs):
             # Assemble folder path for measure competition data
             meas_folder_name = path.join(*handyfiles.ecm_compete_data)
-            # Assemble file name for measure competition data
-            meas_file_name = m.name + ".pkl.gz"
-            with gzip.open(path.join(
-                    base_dir, meas_folder_name, meas_file_name), 'w') as zp:
-                pickle.dump(meas_prepped_compete[ind], zp, -1)
+            write_compete_data(path.join(
+                base_dir, meas_folder_name, m.name),
+                meas_prepped_compete[ind])
         # Write prepared high-level measure attributes data to JSON
         with open(path.join(base_dir, *handyfiles.ecm_prep), "w") as jso:
             json.dump(meas_summary, jso, indent=2, cls=MyEncoder)
@@ -8307,6 +9249,17 @@ def main(base_dir):
         # measures to be run in the analysis engine
         with open(path.join(base_dir, handyfiles.run_setup), "w") as jso:
             json.dump(run_setup, jso, indent=2)
+
+        # Update the manifest with the hashes for all current measure and
+        # package definitions (each of which is now prepared with the current
+        # definition, input files, and options) and for the input files, and
+        # write it to JSON
+        manifest["input files"] = manifest_update["input files"]
+        manifest["measures"].update(manifest_update["measures"])
+        manifest["packages"].update(manifest_update["packages"])
+        with open(path.join(
+                base_dir, *handyfiles.ecm_prep_manifest), "w") as jso:
+            json.dump(manifest, jso, indent=2)
     else:
         print('No new ECM updates available')
 
@@ -8342,6 +9295,18 @@ if __name__ == "__main__":
     # Optional flag to introduce public health cost assessment
     parser.add_argument("--health_costs", action="store_true",
                         help="Flag addition of public health cost data")
+    # Optional number of worker processes to use in preparing ECM markets
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of processes to use in ECM preparation")
+    # Optional flag to read/write time sensitive valuation factors from/to
+    # file across runs
+    parser.add_argument("--tsv_cache", action="store_true",
+                        help="Flag reuse of time sensitive valuation factors "
+                        "across runs")
+    # Optional seed for reproducible sampling of measure input distributions
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed random draws from ECM input distributions "
+                        "(default: 0)")
     # Object to store all user-specified execution arguments
     opts = parser.parse_args()
 
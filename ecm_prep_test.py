@@ -0,0 +1,1817 @@
+#!/usr/bin/env python3
+
+""" Tests for preparing measures for the analysis engine """
+
+# Import code to be tested
+import ecm_prep
+
+# Import needed packages
+import unittest
+import numpy
+import copy
+import itertools
+import multiprocessing
+import os
+import json
+import tempfile
+import gzip
+import pickle
+
+
+class UserOptions(object):
+    """Generate sample user-specified execution options.
+
+    Attributes:
+        site_energy (boolean): Flag site energy output.
+        captured_energy (boolean): Flag captured energy output.
+        alt_regions (boolean): Flag alternate regional breakout.
+        tsv_metrics (list): Time sensitive valuation metrics settings.
+        health_costs (boolean): Flag public health cost adders.
+        sect_shapes (boolean): Flag sector-level load shape output.
+        rp_persist (boolean): Flag persistent relative performance.
+        verbose (boolean): Flag verbose output.
+        workers (int): Number of processes to use in preparing measures.
+        seed (int): Seed for random draws from measure input distributions.
+    """
+
+    def __init__(self, workers=None, seed=None):
+        self.site_energy = False
+        self.captured_energy = False
+        self.alt_regions = False
+        self.tsv_metrics = False
+        self.health_costs = None
+        self.sect_shapes = False
+        self.rp_persist = False
+        self.verbose = False
+        self.workers = workers
+        self.seed = seed
+
+
+class CommonTestData(object):
+    """Class of common sample baseline data and measures for tests.
+
+    Attributes:
+        years (list): Modeling time horizon.
+        msegs (dict): Sample baseline stock and energy use data.
+        msegs_cpl (dict): Sample baseline cost, performance, and lifetime.
+        sample_measure (dict): Sample residential measure with sampled
+            performance, cost, lifetime, and retrofit rate inputs.
+    """
+
+    def __init__(self, years):
+        self.years = years
+        self.msegs = {"AIA_CZ1": {"single family home": {
+            "total square footage": self.yr_vals(3000, 10),
+            "new square footage": self.yr_vals(100, 1),
+            "total homes": self.yr_vals(1000, 5),
+            "new homes": self.yr_vals(20, 0.5),
+            "electricity": {
+                "refrigeration": {
+                    "stock": self.yr_vals(1000, 5),
+                    "energy": self.yr_vals(500, -2)}}}}}
+        self.msegs_cpl = {"AIA_CZ1": {"single family home": {
+            "electricity": {
+                "refrigeration": {
+                    "installed cost": {
+                        "typical": self.yr_vals(800, 2),
+                        "units": "2013$/unit",
+                        "source": "EIA AEO"},
+                    "performance": {
+                        "typical": self.yr_vals(550, -3),
+                        "units": "kWh/yr",
+                        "source": "EIA AEO"},
+                    "lifetime": {
+                        "average": self.yr_vals(17),
+                        "range": self.yr_vals(2),
+                        "units": "years",
+                        "source": "EIA AEO"},
+                    "consumer choice": {
+                        "competed market share": {
+                            "model type": "logistic regression",
+                            "parameters": {
+                                "b1": self.yr_vals(-0.01),
+                                "b2": self.yr_vals(-0.12)},
+                            "source": "EIA AEO"}}}}}}}
+        self.sample_measure = {
+            "name": "sample measure 1",
+            "active": 1,
+            "market_entry_year": None,
+            "market_exit_year": None,
+            "market_scaling_fractions": None,
+            "market_scaling_fractions_source": None,
+            "measure_type": "full service",
+            "structure_type": ["new", "existing"],
+            "climate_zone": "AIA_CZ1",
+            "bldg_type": "single family home",
+            "fuel_type": "electricity",
+            "fuel_switch_to": None,
+            "end_use": "refrigeration",
+            "technology": None,
+            "energy_efficiency": ["normal", 400, 20],
+            "energy_efficiency_units": "kWh/yr",
+            "installed_cost": ["normal", 1000, 50],
+            "cost_units": "2013$/unit",
+            "product_lifetime": ["normal", 20, 1],
+            "product_lifetime_units": "years",
+            "retro_rate": ["uniform", 0.005, 0.015]}
+
+    def yr_vals(self, start, step=0):
+        """Generate sample values for each year in the modeling time horizon.
+
+        Args:
+            start (float): Value for the first year.
+            step (float): Change in the value from one year to the next.
+
+        Returns:
+            Dict of values by year.
+        """
+        return {yr: start + step * ind for ind, yr in enumerate(self.years)}
+
+
+class CommonMethods(object):
+    """Define common methods for use in all tests below."""
+
+    def dict_check(self, dict1, dict2, places=None):
+        """Check the equality of two dicts.
+
+        Args:
+            dict1 (dict): First dictionary to be compared.
+            dict2 (dict): Second dictionary to be compared.
+            places (int): Decimal places to compare values to (values
+                must be identical if None).
+
+        Raises:
+            AssertionError: If dictionaries are not equal.
+        """
+        # zip_longest() substitutes the fill value below for missing
+        # content in the smaller of the two dicts
+        fill_val = ('substituted entry', 5.2)
+
+        for (k, i), (k2, i2) in itertools.zip_longest(sorted(dict1.items()),
+                                                      sorted(dict2.items()),
+                                                      fillvalue=fill_val):
+            # Confirm that at the current location in the dict structure,
+            # the keys are equal
+            self.assertEqual(k, k2)
+            # If the recursion has not yet reached the terminal/leaf node
+            if isinstance(i, dict):
+                self.assertCountEqual(i, i2)
+                self.dict_check(i, i2, places)
+            else:
+                self.value_check(i, i2, places)
+
+    def value_check(self, val1, val2, places=None):
+        """Check the equality of two terminal values.
+
+        Args:
+            val1: First value (point value, numpy array, or list).
+            val2: Second value (point value, numpy array, or list).
+            places (int): Decimal places to compare values to (values
+                must be identical if None).
+
+        Raises:
+            AssertionError: If values are not equal.
+        """
+        # Terminal values formatted as lists or tuples (e.g., choice
+        # parameters) are compared element by element
+        if isinstance(val1, (list, tuple)) and not isinstance(
+                val2, numpy.ndarray):
+            self.assertEqual(len(val1), len(val2))
+            for x, y in zip(val1, val2):
+                self.value_check(x, y, places)
+        # Terminal values formatted as numpy arrays (for input uncertainty
+        # test cases)
+        elif isinstance(val1, numpy.ndarray) or isinstance(
+                val2, numpy.ndarray):
+            if places is None:
+                numpy.testing.assert_array_equal(val1, val2)
+            else:
+                numpy.testing.assert_array_almost_equal(
+                    val1, val2, decimal=places)
+        elif places is None:
+            self.assertEqual(val1, val2)
+        else:
+            self.assertAlmostEqual(val1, val2, places=places)
+
+
+class BaselineMsegStoreTest(unittest.TestCase, CommonMethods):
+    """Test lookups of flattened baseline microsegment data.
+
+    Verify that the store maps microsegment key chains to the baseline data
+    without copying the nested cost/performance/lifetime dicts, that stock
+    and energy data read from the flattened data match the nested dicts,
+    and that lookups of levels of the nested stock/energy data behave like
+    direct lookups.
+
+    Attributes:
+        sample_data (object): Sample baseline data.
+        store (object): Flattened sample baseline data.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        cls.sample_data = CommonTestData([str(x) for x in range(2016, 2021)])
+        # Add cost/performance/lifetime data that have no stock/energy data
+        cls.sample_data.msegs_cpl["AIA_CZ1"]["single family home"][
+            "electricity"]["other"] = copy.deepcopy(
+                cls.sample_data.msegs_cpl["AIA_CZ1"]["single family home"][
+                    "electricity"]["refrigeration"])
+        cls.store = ecm_prep.BaselineMsegStore(
+            cls.sample_data.msegs, cls.sample_data.msegs_cpl,
+            cls.sample_data.years)
+
+    def test_find(self):
+        """Test finding baseline data for microsegment key chains."""
+        mseg = self.sample_data.msegs["AIA_CZ1"]["single family home"][
+            "electricity"]["refrigeration"]
+        depth, row = self.store.find((
+            "primary", "AIA_CZ1", "single family home", "electricity",
+            "refrigeration", None, "new"))
+        self.assertEqual(depth, 7)
+        # Cost/performance/lifetime data are referenced from, not copied out
+        # of, the nested dicts
+        self.assertIs(self.store.cpl[row], self.sample_data.msegs_cpl[
+            "AIA_CZ1"]["single family home"]["electricity"]["refrigeration"])
+        # Stock/energy data are restored from the flattened data
+        self.assertEqual(self.store.mseg_data(row), mseg)
+        # Complete numeric stock and energy data are read from the flattened
+        # data
+        self.assertTrue(self.store.stock_ok[row] and self.store.energy_ok[row])
+        numpy.testing.assert_array_equal(self.store.values(row, "stock"), [
+            mseg["stock"][yr] for yr in self.sample_data.years])
+        numpy.testing.assert_array_equal(self.store.values(row, "energy"), [
+            mseg["energy"][yr] for yr in self.sample_data.years])
+        # Key chains that are partially missing from the baseline data yield
+        # the depth of the first missing level
+        depth, row = self.store.find((
+            "primary", "AIA_CZ1", "single family home", "natural gas",
+            "refrigeration", None, "new"))
+        self.assertEqual(depth, 3)
+        # Key chains missing from the stock/energy data yield an error
+        with self.assertRaises(KeyError):
+            self.store.find((
+                "primary", "AIA_CZ1", "single family home", "electricity",
+                "other", None, "new"))
+
+    def test_node(self):
+        """Test lookups of levels of the nested baseline data."""
+        msegs = self.sample_data.msegs
+        for keys in [
+                ("AIA_CZ1", "single family home"),
+                ("AIA_CZ1", "single family home", "electricity",
+                 "refrigeration"),
+                # Levels without cost/performance/lifetime data
+                ("AIA_CZ1", "single family home", "total square footage"),
+                ("AIA_CZ1", "single family home", "electricity",
+                 "refrigeration", "energy")]:
+            node = msegs
+            for k in keys:
+                node = node[k]
+            self.assertEqual(self.store.node(keys), node)
+        # Key chains missing from the stock/energy data yield an error
+        for keys in [
+                ("AIA_CZ2", "single family home"),
+                ("AIA_CZ1", "single family home", "natural gas"),
+                ("AIA_CZ1", "single family home", "electricity", "other"),
+                ("AIA_CZ1", "single family home", "electricity", "other",
+                 "energy")]:
+            with self.assertRaisesRegex(KeyError, "missing for key chain"):
+                self.store.node(keys)
+
+
+class BaselineCacheTest(unittest.TestCase):
+    """Test the binary cache of baseline data files.
+
+    Verify that the cache is written the first time a baseline data file is
+    read; that flattened data are read back from the cache with memory
+    mapped year values and rebuild to the data of the source file; that the
+    cache is reused while the source file is unchanged; and that the cache
+    is rebuilt when the source file contents change.
+
+    Attributes:
+        sample_data (object): Sample baseline data.
+        sample_msegs (dict): Sample baseline data with integer, missing, and
+            non-numeric values.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        cls.sample_data = CommonTestData([str(x) for x in range(2016, 2021)])
+        cls.sample_msegs = copy.deepcopy(cls.sample_data.msegs)
+        cls.sample_msegs["AIA_CZ1"]["single family home"]["electricity"][
+            "other"] = {
+                "stock": "NA",
+                "energy": {yr: int(x) for yr, x in zip(
+                    cls.sample_data.years, range(5))},
+                "shares": [0.5, 0.5]}
+
+    def setUp(self):
+        """Write the sample baseline data to a temporary directory."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.file_path = os.path.join(tmp_dir.name, "mseg.json")
+        self.write(self.sample_msegs)
+
+    def write(self, data):
+        """Write baseline data to the sample baseline data file.
+
+        Args:
+            data (dict): Baseline data to write.
+        """
+        with open(self.file_path, 'w') as js:
+            json.dump(data, js)
+
+    def load(self, flat=False):
+        """Read the sample baseline data file.
+
+        Args:
+            flat (boolean): Flag for reading the data in flattened form.
+
+        Returns:
+            Baseline data, as a dict, or (if flat) with year values rebuilt
+            from the flattened data into a dict.
+        """
+        data = ecm_prep.load_baseline_json(self.file_path, flat=flat)
+        if flat is True:
+            return data.rebuild(data.structure)
+        else:
+            return data
+
+    def test_create(self):
+        """Test writing the cache and reading the data back from it."""
+        with open(self.file_path, 'r') as js:
+            data = json.load(js)
+        # Data read from the source file
+        self.assertEqual(self.load(), data)
+        for ext in [".cache.npy", ".cache.pkl"]:
+            self.assertTrue(os.path.exists(self.file_path + ext))
+        # Data read from the cache, with year values memory mapped
+        flat_data = ecm_prep.load_baseline_json(self.file_path, flat=True)
+        self.assertIsInstance(flat_data.yr_vals, numpy.memmap)
+        self.assertEqual(flat_data.rebuild(flat_data.structure), data)
+        self.assertEqual(self.load(), data)
+        # Integer values are restored as integers
+        self.assertEqual(self.load()["AIA_CZ1"]["single family home"][
+            "electricity"]["other"]["energy"]["2017"], 1)
+        self.assertIsInstance(self.load()["AIA_CZ1"]["single family home"][
+            "electricity"]["other"]["energy"]["2017"], int)
+        # Stores of the flattened and nested data yield the same values
+        mskeys = ("primary", "AIA_CZ1", "single family home", "electricity",
+                  "refrigeration", None, "new")
+        stores = [ecm_prep.BaselineMsegStore(
+            msegs, self.sample_data.msegs_cpl, self.sample_data.years)
+            for msegs in [data, flat_data]]
+        rows = [store.find(mskeys)[1] for store in stores]
+        for var in ["stock", "energy"]:
+            numpy.testing.assert_array_equal(*[
+                store.values(row, var) for store, row in zip(stores, rows)])
+        self.assertEqual(*[
+            store.mseg_data(row) for store, row in zip(stores, rows)])
+
+    def test_gzipped(self):
+        """Test reading a gzip-compressed baseline data file."""
+        self.file_path += ".gz"
+        with gzip.GzipFile(self.file_path, 'w') as zip_ref:
+            zip_ref.write(json.dumps(self.sample_msegs).encode('utf-8'))
+        for _ in range(2):
+            self.assertEqual(ecm_prep.load_baseline_json(
+                self.file_path, gzipped=True), self.sample_msegs)
+
+    def test_reuse(self):
+        """Test reusing the cache while the source file is unchanged."""
+        self.load()
+        src_stat = os.stat(self.file_path)
+        # Overwrite the source file with different contents of the same
+        # size and modification time; the cache is used as is
+        changed = copy.deepcopy(self.sample_msegs)
+        changed["AIA_CZ1"]["single family home"]["electricity"]["other"][
+            "stock"] = "NB"
+        self.write(changed)
+        os.utime(self.file_path, ns=(src_stat.st_atime_ns,
+                                     src_stat.st_mtime_ns))
+        self.assertEqual(self.load(flat=True), self.sample_msegs)
+        self.assertEqual(self.load(), self.sample_msegs)
+
+    def test_invalidate(self):
+        """Test rebuilding the cache when the source file changes."""
+        self.load()
+        # Source file with a new modification time but the same contents;
+        # the cache is used and records the new modification time
+        new_mtime = os.stat(self.file_path).st_mtime_ns + 10 ** 9
+        os.utime(self.file_path, ns=(new_mtime, new_mtime))
+        with open(self.file_path + ".cache.pkl", 'rb') as cs:
+            self.assertNotEqual(pickle.load(cs)["mtime"], new_mtime / 1e9)
+        self.assertEqual(self.load(), self.sample_msegs)
+        with open(self.file_path + ".cache.pkl", 'rb') as cs:
+            self.assertEqual(pickle.load(cs)["mtime"],
+                             os.stat(self.file_path).st_mtime)
+        # Source file with changed contents of the same size; the cache is
+        # rebuilt from the source file contents
+        changed = copy.deepcopy(self.sample_msegs)
+        changed["AIA_CZ1"]["single family home"]["electricity"]["other"][
+            "stock"] = "NB"
+        self.write(changed)
+        os.utime(self.file_path, ns=(new_mtime + 10 ** 9,) * 2)
+        self.assertEqual(self.load(flat=True), changed)
+        self.assertEqual(self.load(), changed)
+        # Source file with changed contents of a different size
+        changed["AIA_CZ1"]["single family home"]["electricity"]["other"][
+            "energy"]["2016"] = 1.5
+        self.write(changed)
+        self.assertEqual(self.load(), changed)
+        self.assertEqual(self.load(flat=True), changed)
+
+
+class UsefulVarsOverlayTest(unittest.TestCase):
+    """Test the isolation of measure-specific variables across measures.
+
+    Verify that the time sensitive valuation factors and hourly price and
+    emissions factors a measure stores as it is prepared are written to its
+    own overlay of the global variables; that the frozen global variables
+    shared across measures are left unchanged; and that measures do not see
+    each other's stored factors.
+
+    Attributes:
+        handyfiles (object): Useful input files across the class.
+        handyvars (object): Frozen global variables shared across measures.
+        sample_measure (dict): Sample measure definition.
+        mskeys (tuple): Sample microsegment information.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        base_dir = os.getcwd()
+        cls.handyfiles = ecm_prep.UsefulInputFiles(
+            capt_energy=False, regions="EMM")
+        cls.handyvars = ecm_prep.UsefulVars(
+            base_dir, cls.handyfiles, "EMM", None, None)
+        cls.handyvars.freeze()
+        cls.sample_measure = {
+            "active": 1, "market_entry_year": None,
+            "market_exit_year": None, "market_scaling_fractions": None,
+            "market_scaling_fractions_source": None,
+            "measure_type": "full service",
+            "structure_type": ["new", "existing"], "climate_zone": "SRDA",
+            "bldg_type": "single family home", "fuel_type": "electricity",
+            "fuel_switch_to": None, "end_use": "cooling",
+            "technology": "central AC"}
+        cls.mskeys = ("primary", "SRDA", "single family home",
+                      "electricity", "cooling", "central AC", "existing")
+
+    def measure(self, name):
+        """Initialize a sample measure over the shared global variables.
+
+        Args:
+            name (string): Measure name.
+
+        Returns:
+            Measure object.
+        """
+        return ecm_prep.Measure(
+            os.getcwd(), self.handyvars, self.handyfiles, False, False,
+            "EMM", None, None, **dict(
+                copy.deepcopy(self.sample_measure), name=name))
+
+    def store(self, measure, value):
+        """Store sample TSV factors the way a measure does when prepared.
+
+        Args:
+            measure (object): Measure that stores the factors.
+            value (float): Value of the stored factors.
+        """
+        reg, bldg, eu = [self.mskeys[x] for x in [1, 2, 4]]
+        measure.handyvars.tsv_hourly_price[reg] = numpy.full((8760, 2), value)
+        measure.handyvars.tsv_hourly_emissions[reg] = numpy.full(
+            (8760, 2), value)
+        measure.handyvars.tsv_hourly_lafs[reg]["residential"][bldg][eu] = {
+            "annual adjustment fractions": {x: {
+                "baseline": 1, "efficient": value} for x in [
+                "energy", "cost", "carbon"]},
+            "hourly shapes": None}
+
+    def stored(self, handyvars):
+        """Find the sample TSV factors stored in a set of variables.
+
+        Args:
+            handyvars (object): Global variables or a measure's overlay.
+
+        Returns:
+            List of the stored price, emissions, and adjustment factors.
+        """
+        reg, bldg, eu = [self.mskeys[x] for x in [1, 2, 4]]
+        return [handyvars.tsv_hourly_price[reg],
+                handyvars.tsv_hourly_emissions[reg],
+                handyvars.tsv_hourly_lafs[reg]["residential"][bldg][eu]]
+
+    def test_isolation(self):
+        """Test that stored factors apply only to the storing measure."""
+        measures = [self.measure("sample measure " + str(n + 1))
+                    for n in range(2)]
+        for m in measures:
+            self.assertIs(m.handyvars.shared, self.handyvars)
+        self.store(measures[0], 0.9)
+        # The first measure sees the factors it stored
+        price, emissions, lafs = self.stored(measures[0].handyvars)
+        numpy.testing.assert_equal(price, numpy.full((8760, 2), 0.9))
+        numpy.testing.assert_equal(emissions, numpy.full((8760, 2), 0.9))
+        self.assertEqual(lafs["annual adjustment fractions"]["energy"][
+            "efficient"], 0.9)
+        # Neither the shared variables nor the second measure see them
+        for hv in [self.handyvars, measures[1].handyvars]:
+            self.assertEqual(self.stored(hv), [None, None, None])
+        # Factors stored by the second measure do not reach the first
+        self.store(measures[1], 0.8)
+        self.assertEqual(self.stored(measures[0].handyvars)[2][
+            "annual adjustment fractions"]["energy"]["efficient"], 0.9)
+        self.assertEqual(self.stored(self.handyvars), [None, None, None])
+
+    def test_frozen(self):
+        """Test that the shared variables cannot be reset by a measure."""
+        measure = self.measure("sample measure")
+        aeo_years = list(self.handyvars.aeo_years)
+        with self.assertRaises(AttributeError):
+            self.handyvars.aeo_years = aeo_years[:2]
+        # Variables set on a measure's overlay apply only to the measure
+        measure.handyvars.aeo_years = aeo_years[:2]
+        self.assertEqual(measure.handyvars.aeo_years, aeo_years[:2])
+        self.assertEqual(self.handyvars.aeo_years, aeo_years)
+        # Copies of a measure share the global variables without copying
+        measure_copy = copy.deepcopy(measure)
+        self.assertIs(measure_copy.handyvars.shared, self.handyvars)
+        self.assertIsNot(measure_copy.handyvars.tsv_hourly_lafs,
+                         measure.handyvars.tsv_hourly_lafs)
+
+
+class TSVFactorCacheTest(unittest.TestCase):
+    """Test the storage of time sensitive valuation factors across measures.
+
+    Verify that factors are keyed to a canonical representation of the
+    time-varying efficiency features and settings of a microsegment; that
+    the least recently used factors are dropped once the cache is full;
+    that lookup statistics and factors exported by worker processes are
+    merged; and that factors written to file are read back only for the
+    same input data fingerprint.
+
+    Attributes:
+        mskeys (tuple): Sample microsegment information.
+        yr_map (dict): Sample TSV data year -> AEO year mapping.
+        facts (tuple): Sample re-weighting factors and hourly load shapes.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        cls.mskeys = ("primary", "SRDA", "single family home",
+                      "electricity", "cooling", "central AC", "existing")
+        cls.yr_map = {"2018": ["2018", "2019"], "2020": ["2020", "2021"]}
+        cls.facts = ({x: {"baseline": 1, "efficient": 0.9} for x in [
+            "energy", "cost", "carbon"]}, None)
+
+    def key(self, cache, tsv_adjustments, mskeys=None):
+        """Set the cache key for the sample microsegment.
+
+        Args:
+            cache (object): Time sensitive valuation factor cache.
+            tsv_adjustments (dict): Time-varying efficiency features.
+            mskeys (tuple): Microsegment information (defaults to the
+                sample microsegment).
+
+        Returns:
+            Tuple that keys the factors of the microsegment.
+        """
+        return cache.key(
+            mskeys or self.mskeys, "residential", "cooling", tsv_adjustments,
+            False, False, self.yr_map, self.yr_map)
+
+    def test_key(self):
+        """Test that equivalent features yield the same key."""
+        cache = ecm_prep.TSVFactorCache()
+        shed = {"shed": {"relative energy change fraction": 0.2,
+                         "start_hour": 14, "stop_hour": 18}}
+        # Same features, given in a different key order
+        shed_reordered = {"shed": {"stop_hour": 18, "start_hour": 14,
+                                   "relative energy change fraction": 0.2}}
+        self.assertEqual(self.key(cache, shed),
+                         self.key(cache, shed_reordered))
+        # Numpy arrays are keyed as lists
+        shape = {"shape": {"custom_daily_savings": [0.1] * 24}}
+        self.assertEqual(self.key(cache, shape), self.key(cache, {
+            "shape": {"custom_daily_savings": numpy.full(24, 0.1)}}))
+        # Features, microsegments, and settings that differ yield
+        # different keys
+        self.assertNotEqual(self.key(cache, shed), self.key(cache, shape))
+        self.assertNotEqual(self.key(cache, shed), self.key(
+            cache, shed, self.mskeys[:2] + ("assembly",) + self.mskeys[3:]))
+        self.assertNotEqual(self.key(cache, shed), cache.key(
+            self.mskeys, "residential", "cooling", shed,
+            ["1", "2", "1", "1", "2", "1"], False, self.yr_map, self.yr_map))
+        # Features with a changed value yield a different key
+        shed_edit = copy.deepcopy(shed)
+        shed_edit["shed"]["stop_hour"] = 19
+        self.assertNotEqual(self.key(cache, shed),
+                            self.key(cache, shed_edit))
+
+    def test_lru(self):
+        """Test that the least recently used factors are dropped."""
+        cache = ecm_prep.TSVFactorCache(maxsize=2)
+        keys = [self.key(cache, {"shed": {
+            "relative energy change fraction": x}}) for x in [0.1, 0.2, 0.3]]
+        cache.put(keys[0], self.facts)
+        cache.put(keys[1], self.facts)
+        # Looking up the first factors makes the second the least recently
+        # used
+        self.assertEqual(cache.get(keys[0]), self.facts)
+        cache.put(keys[2], self.facts)
+        self.assertEqual(list(cache.entries.keys()), [keys[0], keys[2]])
+        self.assertIsNone(cache.get(keys[1]))
+
+    def test_stats(self):
+        """Test lookup statistics and merging of worker process exports."""
+        cache, worker = [ecm_prep.TSVFactorCache() for n in range(2)]
+        keys = [self.key(cache, {"shed": {
+            "relative energy change fraction": x}}) for x in [0.1, 0.2]]
+        cache.put(keys[0], self.facts)
+        self.assertEqual(cache.get(keys[0]), self.facts)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # Worker process misses and stores new factors
+        self.assertIsNone(worker.get(keys[1]))
+        worker.put(keys[1], self.facts)
+        self.assertEqual(worker.get(keys[1]), self.facts)
+        cache.merge(worker.export(True))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertEqual(cache.get(keys[1]), self.facts)
+        # Worker statistics are reset on export
+        self.assertEqual(worker.export(False), (0, 0, {}))
+
+    def test_save_load(self):
+        """Test that stored factors are read back for the same input data."""
+        cache = ecm_prep.TSVFactorCache(data_key="inputs 1")
+        key = self.key(cache, {"shed": {
+            "relative energy change fraction": 0.1}})
+        cache.put(key, self.facts)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_file = os.path.join(tmp_dir, "tsv_fact_cache.pkl.gz")
+            cache.save(cache_file)
+            same, changed = [ecm_prep.TSVFactorCache(data_key=x) for x in [
+                "inputs 1", "inputs 2"]]
+            for c in [same, changed]:
+                c.load(cache_file)
+        self.assertEqual(same.get(key), self.facts)
+        # Factors read from file are not new to the run
+        self.assertEqual(same.export(True)[-1], {})
+        self.assertEqual(len(changed.entries), 0)
+        # A missing file yields no factors
+        missing = ecm_prep.TSVFactorCache(data_key="inputs 1")
+        missing.load(os.path.join(os.getcwd(), "no_such_file.pkl.gz"))
+        self.assertEqual(len(missing.entries), 0)
+
+
+class PartitionMicrosegmentTest(unittest.TestCase, CommonMethods):
+    """Test the partitioning of a microsegment into its market components.
+
+    Verify that the total, total-efficient, competed, and competed-efficient
+    stock, energy, carbon, and cost outputs for each year match those
+    recorded from the year-by-year implementation of the calculations, for
+    point value and sampled inputs; new and existing structures; technical
+    and max adoption potential scenarios; and a secondary microsegment
+    that is tied to a primary lighting microsegment.
+
+    Attributes:
+        handyfiles (object): Useful input files across the class.
+        handyvars (object): Useful variables across the class.
+        sample_data (object): Sample baseline data.
+        opts (object): User-specified execution options.
+        tsv_adj (dict): Time sensitive valuation adjustments (no change).
+        samples (numpy.ndarray): Multipliers used to generate sampled inputs.
+        ok_out (dict): Recorded outputs for each case, given as lists of
+            output values by year (by sample for sampled outputs) for the
+            primary microsegment (and the secondary microsegment, if any).
+    """
+
+    ok_out = {
+        "point new technical potential": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 528.0, 549.01, 567.4512, 583.6603],
+             [60.0, 63.0, 26.4, 27.4505, 28.37256, 29.183015],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [0.0, 0.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [0.0, 0.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [0.0, 0.0, 528.0, 549.01, 567.4512, 583.6603],
+             [0.0, 0.0, 26.4, 27.4505, 28.37256, 29.183015],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [1000.0, 1155.0, 1800.0, 1950.0, 2100.0, 2250.0],
+             [30.0, 31.5, 16.896, 18.11733, 19.293341, 20.42811],
+             [2280000000.0, 2457000000.0, 1056000000.0, 1125470500.0,
+              1191647520.0, 1225686630.0],
+             [0.0, 0.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [0.0, 0.0, 33.0, 34.5, 36.0, 37.5],
+             [0.0, 0.0, 2640000000.0, 2829000000.0, 3024000000.0,
+              3150000000.0],
+             [0.0, 0.0, 1800.0, 1950.0, 2100.0, 2250.0],
+             [0.0, 0.0, 16.896, 18.11733, 19.293341, 20.42811],
+             [0.0, 0.0, 1056000000.0, 1125470500.0, 1191647520.0,
+              1225686630.0]]],
+        "point existing technical potential": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 528.0, 549.01, 567.4512, 583.6603],
+             [60.0, 63.0, 26.4, 27.4505, 28.37256, 29.183015],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [0.0, 0.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [0.0, 0.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [0.0, 0.0, 528.0, 549.01, 567.4512, 583.6603],
+             [0.0, 0.0, 26.4, 27.4505, 28.37256, 29.183015],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [1000.0, 1155.0, 1800.0, 1950.0, 2100.0, 2250.0],
+             [30.0, 31.5, 16.896, 18.11733, 19.293341, 20.42811],
+             [2280000000.0, 2457000000.0, 1056000000.0, 1125470500.0,
+              1191647520.0, 1225686630.0],
+             [0.0, 0.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [0.0, 0.0, 33.0, 34.5, 36.0, 37.5],
+             [0.0, 0.0, 2640000000.0, 2829000000.0, 3024000000.0,
+              3150000000.0],
+             [0.0, 0.0, 1800.0, 1950.0, 2100.0, 2250.0],
+             [0.0, 0.0, 16.896, 18.11733, 19.293341, 20.42811],
+             [0.0, 0.0, 1056000000.0, 1125470500.0, 1191647520.0,
+              1225686630.0]]],
+        "point new max adoption potential": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 10.0, 20.0, 58.6, 97.2],
+             [1000.0, 1050.0, 1052.333333, 1057.54, 955.11325, 871.390859],
+             [60.0, 63.0, 62.7, 62.607769, 55.109948, 48.967138],
+             [0.0, 0.0, 10.0, 10.0, 38.6, 38.6],
+             [0.0, 0.0, 91.666667, 88.461538, 330.857143, 321.666667],
+             [0.0, 0.0, 5.5, 5.307692, 19.851429, 19.3],
+             [0.0, 0.0, 10.0, 10.0, 38.6, 38.6],
+             [0.0, 0.0, 44.0, 42.231538, 156.454402, 150.195251],
+             [0.0, 0.0, 2.2, 2.111577, 7.82272, 7.509763],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [1000.0, 1155.0, 1360.0, 1565.0, 1855.8, 2118.0],
+             [30.0, 31.5, 31.658, 31.979589, 29.532136, 27.799882],
+             [2280000000.0, 2457000000.0, 2508000000.0, 2566918538.461539,
+              2314617825.6, 2056619804.6012],
+             [0.0, 0.0, 110.0, 115.0, 463.2, 482.5],
+             [0.0, 0.0, 2.75, 2.653846, 9.925714, 9.65],
+             [0.0, 0.0, 220000000.0, 217615384.615385, 833760000.0,
+              810600000.0],
+             [0.0, 0.0, 150.0, 150.0, 579.0, 579.0],
+             [0.0, 0.0, 1.408, 1.393641, 5.31945, 5.256834],
+             [0.0, 0.0, 88000000.0, 86574653.846154, 328554244.8,
+              315410026.12]]],
+        "point existing max adoption potential": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 31.2, 67.6, 109.2, 150.0],
+             [1000.0, 1050.0, 951.28, 878.112124, 792.132534, 692.140403],
+             [60.0, 63.0, 55.704, 50.203006, 43.869027, 36.64202],
+             [0.0, 0.0, 31.2, 33.8, 36.4, 39.0],
+             [0.0, 0.0, 286.0, 299.0, 312.0, 325.0],
+             [0.0, 0.0, 17.16, 17.94, 18.72, 19.5],
+             [0.0, 0.0, 31.2, 33.8, 36.4, 39.0],
+             [0.0, 0.0, 137.28, 142.7426, 147.537312, 151.751678],
+             [0.0, 0.0, 6.864, 7.13713, 7.376866, 7.587584],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [1000.0, 1155.0, 1444.8, 1731.6, 2007.6, 2250.0],
+             [30.0, 31.5, 28.81296, 27.08848, 25.227546, 23.207414],
+             [2280000000.0, 2457000000.0, 2228160000.0, 2058323254.2,
+              1842499120.896, 1538964846.636],
+             [0.0, 0.0, 343.2, 388.7, 436.8, 487.5],
+             [0.0, 0.0, 8.58, 8.97, 9.36, 9.75],
+             [0.0, 0.0, 686400000.0, 735540000.0, 786240000.0, 819000000.0],
+             [0.0, 0.0, 468.0, 507.0, 546.0, 585.0],
+             [0.0, 0.0, 4.39296, 4.710506, 5.016269, 5.311309],
+             [0.0, 0.0, 274560000.0, 292622330.0, 309828355.2, 318678523.8]]],
+        "point secondary": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [26.0, 57.2, 93.6, 130.0, 140.0, 150.0],
+             [870.0, 811.254948, 740.307089, 656.024771, 575.912277,
+              590.18238],
+             [50.9, 46.312547, 40.922554, 34.673439, 28.795614, 29.509119],
+             [26.0, 28.6, 31.2, 33.8, 0.0, 0.0],
+             [260.0, 273.0, 286.0, 299.0, 0.0, 0.0],
+             [15.6, 16.38, 17.16, 17.94, 0.0, 0.0],
+             [26.0, 28.6, 31.2, 33.8, 0.0, 0.0],
+             [130.0, 135.7902, 140.962536, 145.591544, 0.0, 0.0],
+             [6.5, 6.78951, 7.048127, 7.279577, 0.0, 0.0],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [1130.0, 1412.4, 1694.4, 1950.0, 2100.0, 2250.0],
+             [26.1, 24.573923, 22.908387, 21.087157, 19.581017, 20.656383],
+             [1934200000.0, 1806189348.6, 1636902178.56, 1421610980.35976,
+              1209415781.952, 1239382998.588],
+             [260.0, 300.3, 343.2, 388.7, 0.0, 0.0],
+             [7.8, 8.19, 8.58, 8.97, 0.0, 0.0],
+             [592800000.0, 638820000.0, 686400000.0, 735540000.0, 0.0, 0.0],
+             [390.0, 429.0, 468.0, 507.0, 0.0, 0.0],
+             [3.9, 4.209496, 4.510801, 4.804521, 0.0, 0.0],
+             [247000000.0, 264790890.0, 281925072.0, 298462664.708, 0.0, 0.0]],
+            [[0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [250.0, 265.09901, 280.392157, 295.873786, 311.538462,
+              327.380952],
+             [15.0, 16.113861, 17.254902, 18.42233, 19.615385, 20.833333],
+             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [263.0, 289.085168, 316.551529, 345.414893, 373.846154,
+              392.857143],
+             [15.0, 16.113861, 17.254902, 18.42233, 19.615385, 20.833333],
+             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [65.0, 68.925743, 72.901961, 76.927184, 0.0, 0.0],
+             [3.9, 4.189604, 4.486275, 4.789806, 0.0, 0.0],
+             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [78.0, 82.710891, 87.482353, 92.312621, 0.0, 0.0],
+             [3.9, 4.189604, 4.486275, 4.789806, 0.0, 0.0],
+             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [7.5, 7.95297, 8.411765, 8.876214, 9.346154, 9.821429],
+             [570000000.0, 628440594.059406, 690196078.431373,
+              755315533.980582, 823846153.846154, 875000000.0],
+             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [7.89, 8.816472, 9.930458, 11.254187, 12.710769, 13.75],
+             [570000000.0, 628440594.059406, 690196078.431373,
+              755315533.980583, 823846153.846154, 875000000.0],
+             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [1.95, 2.067772, 2.187059, 2.307816, 0.0, 0.0],
+             [148200000.0, 163394554.455446, 179450980.392157,
+              196382038.834951, 0.0, 0.0],
+             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [2.34, 2.564038, 2.799435, 3.046317, 0.0, 0.0],
+             [148200000.0, 163394554.455446, 179450980.392157,
+              196382038.834952, 0.0, 0.0]]],
+        "sampled new technical potential": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [[1000.0, 1000.0, 1000.0], [1050.0, 1050.0, 1050.0], [473.0,
+              528.0, 583.0], [491.5675, 549.01, 606.395], [507.6003, 567.4512,
+              627.1548], [521.418983, 583.6603, 645.648963]],
+             [[60.0, 60.0, 60.0], [63.0, 63.0, 63.0], [23.65, 26.4, 29.15],
+              [24.578375, 27.4505, 30.31975], [25.380015, 28.37256, 31.35774],
+              [26.070949, 29.183015, 32.282448]],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [0.0, 0.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [0.0, 0.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [473.0, 528.0, 583.0],
+              [491.5675, 549.01, 606.395], [507.6003, 567.4512, 627.1548],
+              [521.418983, 583.6603, 645.648963]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [23.65, 26.4, 29.15],
+              [24.578375, 27.4505, 30.31975], [25.380015, 28.37256, 31.35774],
+              [26.070949, 29.183015, 32.282448]],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [[1000.0, 1000.0, 1000.0], [1155.0, 1155.0, 1155.0], [1620.0,
+              1800.0, 1980.0], [1755.0, 1950.0, 2145.0], [1890.0, 2100.0,
+              2310.0], [2025.0, 2250.0, 2475.0]],
+             [[30.0, 30.0, 30.0], [31.5, 31.5, 31.5], [15.136, 16.896, 18.656],
+              [16.221728, 18.11733, 20.011035], [17.25841, 19.293341,
+              21.323263], [18.249664, 20.42811, 22.597714]],
+             [[2280000000.0, 2280000000.0, 2280000000.0], [2457000000.0,
+              2457000000.0, 2457000000.0], [946000000.0, 1056000000.0,
+              1166000000.0], [1007713375.0, 1125470500.0, 1243109750.0],
+              [1065960630.0, 1191647520.0, 1317025080.0], [1094979863.90625,
+              1225686630.0, 1355862821.25]],
+             [0.0, 0.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [0.0, 0.0, 33.0, 34.5, 36.0, 37.5],
+             [0.0, 0.0, 2640000000.0, 2829000000.0, 3024000000.0,
+              3150000000.0],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1620.0, 1800.0, 1980.0],
+              [1755.0, 1950.0, 2145.0], [1890.0, 2100.0, 2310.0], [2025.0,
+              2250.0, 2475.0]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [15.136, 16.896, 18.656],
+              [16.221728, 18.11733, 20.011035], [17.25841, 19.293341,
+              21.323263], [18.249664, 20.42811, 22.597714]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [946000000.0, 1056000000.0,
+              1166000000.0], [1007713375.0, 1125470500.0, 1243109750.0],
+              [1065960630.0, 1191647520.0, 1317025080.0], [1094979863.90625,
+              1225686630.0, 1355862821.25]]]],
+        "sampled existing technical potential": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [[1000.0, 1000.0, 1000.0], [1050.0, 1050.0, 1050.0], [473.0,
+              528.0, 583.0], [491.5675, 549.01, 606.395], [507.6003, 567.4512,
+              627.1548], [521.418983, 583.6603, 645.648963]],
+             [[60.0, 60.0, 60.0], [63.0, 63.0, 63.0], [23.65, 26.4, 29.15],
+              [24.578375, 27.4505, 30.31975], [25.380015, 28.37256, 31.35774],
+              [26.070949, 29.183015, 32.282448]],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [0.0, 0.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [0.0, 0.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, 120.0, 130.0, 140.0, 150.0],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [473.0, 528.0, 583.0],
+              [491.5675, 549.01, 606.395], [507.6003, 567.4512, 627.1548],
+              [521.418983, 583.6603, 645.648963]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [23.65, 26.4, 29.15],
+              [24.578375, 27.4505, 30.31975], [25.380015, 28.37256, 31.35774],
+              [26.070949, 29.183015, 32.282448]],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [[1000.0, 1000.0, 1000.0], [1155.0, 1155.0, 1155.0], [1620.0,
+              1800.0, 1980.0], [1755.0, 1950.0, 2145.0], [1890.0, 2100.0,
+              2310.0], [2025.0, 2250.0, 2475.0]],
+             [[30.0, 30.0, 30.0], [31.5, 31.5, 31.5], [15.136, 16.896, 18.656],
+              [16.221728, 18.11733, 20.011035], [17.25841, 19.293341,
+              21.323263], [18.249664, 20.42811, 22.597714]],
+             [[2280000000.0, 2280000000.0, 2280000000.0], [2457000000.0,
+              2457000000.0, 2457000000.0], [946000000.0, 1056000000.0,
+              1166000000.0], [1007713375.0, 1125470500.0, 1243109750.0],
+              [1065960630.0, 1191647520.0, 1317025080.0], [1094979863.90625,
+              1225686630.0, 1355862821.25]],
+             [0.0, 0.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [0.0, 0.0, 33.0, 34.5, 36.0, 37.5],
+             [0.0, 0.0, 2640000000.0, 2829000000.0, 3024000000.0,
+              3150000000.0],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1620.0, 1800.0, 1980.0],
+              [1755.0, 1950.0, 2145.0], [1890.0, 2100.0, 2310.0], [2025.0,
+              2250.0, 2475.0]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [15.136, 16.896, 18.656],
+              [16.221728, 18.11733, 20.011035], [17.25841, 19.293341,
+              21.323263], [18.249664, 20.42811, 22.597714]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [946000000.0, 1056000000.0,
+              1166000000.0], [1007713375.0, 1125470500.0, 1243109750.0],
+              [1065960630.0, 1191647520.0, 1317025080.0], [1094979863.90625,
+              1225686630.0, 1355862821.25]]]],
+        "sampled new max adoption potential": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, [10.0, 10.0, 10.0], [20.0, 20.0, 20.0], [58.05, 58.6,
+              59.7], [96.1, 97.2, 99.4]],
+             [[1000.0, 1000.0, 1000.0], [1050.0, 1050.0, 1050.0], [1047.75,
+              1052.333333, 1056.916667], [1048.702692, 1057.54, 1066.368462],
+              [934.24406, 955.11325, 974.418596], [839.715299, 871.390859,
+              900.543797]],
+             [[60.0, 60.0, 60.0], [63.0, 63.0, 63.0], [62.470833, 62.7,
+              62.929167], [62.165904, 62.607769, 63.049192], [54.106379,
+              55.109948, 55.995435], [47.446659, 48.967138, 50.299267]],
+             [0.0, 0.0, [10.0, 10.0, 10.0], [10.0, 10.0, 10.0], [38.05, 38.6,
+              39.7], [38.05, 38.6, 39.7]],
+             [0.0, 0.0, [91.666667, 91.666667, 91.666667], [88.461538,
+              88.461538, 88.461538], [326.142857, 330.857143, 340.285714],
+              [317.083333, 321.666667, 330.833333]],
+             [0.0, 0.0, [5.5, 5.5, 5.5], [5.307692, 5.307692, 5.307692],
+              [19.568571, 19.851429, 20.417143], [19.025, 19.3, 19.85]],
+             [0.0, 0.0, [10.0, 10.0, 10.0], [10.0, 10.0, 10.0], [38.05, 38.6,
+              39.7], [38.05, 38.6, 39.7]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [39.416667, 44.0, 48.583333],
+              [37.812885, 42.231538, 46.645769], [137.95851, 156.454402,
+              177.843183], [132.266615, 150.195251, 170.881759]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.970833, 2.2, 2.429167],
+              [1.890644, 2.111577, 2.332288], [6.897926, 7.82272, 8.892159],
+              [6.613331, 7.509763, 8.544088]],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [[1000.0, 1000.0, 1000.0], [1155.0, 1155.0, 1155.0], [1345.0,
+              1360.0, 1375.0], [1535.0, 1565.0, 1595.0], [1767.075, 1855.8,
+              1948.65], [1971.1, 2118.0, 2272.6]],
+             [[30.0, 30.0, 30.0], [31.5, 31.5, 31.5], [31.511333, 31.658,
+              31.804667], [31.687958, 31.979589, 32.270928], [28.806628,
+              29.532136, 30.22043], [26.659588, 27.799882, 28.882994]],
+             [[2280000000.0, 2280000000.0, 2280000000.0], [2457000000.0,
+              2457000000.0, 2457000000.0], [2498833333.333333, 2508000000.0,
+              2517166666.666667], [2548802057.692307, 2566918538.461539,
+              2585016884.615385], [2272467911.036539, 2314617825.6,
+              2351808282.876924], [1992759691.149833, 2056619804.6012,
+              2112569224.323088]],
+             [0.0, 0.0, [110.0, 110.0, 110.0], [115.0, 115.0, 115.0], [456.6,
+              463.2, 476.4], [475.625, 482.5, 496.25]],
+             [0.0, 0.0, [2.75, 2.75, 2.75], [2.653846, 2.653846, 2.653846],
+              [9.784286, 9.925714, 10.208571], [9.5125, 9.65, 9.925]],
+             [0.0, 0.0, [220000000.0, 220000000.0, 220000000.0],
+              [217615384.615385, 217615384.615385, 217615384.615385],
+              [821880000.0, 833760000.0, 857520000.0], [799050000.0,
+              810600000.0, 833700000.0]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [135.0, 150.0, 165.0], [135.0,
+              150.0, 165.0], [513.675, 579.0, 655.05], [513.675, 579.0,
+              655.05]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [1.261333, 1.408, 1.554667],
+              [1.247825, 1.393641, 1.53931], [4.690589, 5.31945, 6.046668],
+              [4.629332, 5.256834, 5.980862]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [78833333.333333, 88000000.0,
+              97166666.666667], [77516413.461538, 86574653.846154,
+              95623826.923077], [289712871.225, 328554244.8, 373470683.4],
+              [277759892.144219, 315410026.12, 358851693.3575]]]],
+        "sampled existing max adoption potential": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [0.0, 0.0, [30.6, 31.2, 32.4], [66.3, 67.6, 70.2], [107.1, 109.2,
+              113.4], [150.0, 150.0, 150.0]],
+             [[1000.0, 1000.0, 1000.0], [1050.0, 1050.0, 1050.0], [940.115,
+              951.28, 960.41], [857.013998, 878.112124, 896.082105],
+              [760.36081, 792.132534, 819.516218], [648.975304, 692.140403,
+              729.472451]],
+             [[60.0, 60.0, 60.0], [63.0, 63.0, 63.0], [55.20075, 55.704,
+              56.0505], [49.233487, 50.203006, 50.932455], [42.398641,
+              43.869027, 45.005411], [34.637203, 36.64202, 38.207373]],
+             [0.0, 0.0, [30.6, 31.2, 32.4], [33.15, 33.8, 35.1], [35.7, 36.4,
+              37.8], [38.25, 39.0, 40.5]],
+             [0.0, 0.0, [280.5, 286.0, 297.0], [293.25, 299.0, 310.5], [306.0,
+              312.0, 324.0], [318.75, 325.0, 337.5]],
+             [0.0, 0.0, [16.83, 17.16, 17.82], [17.595, 17.94, 18.63], [18.36,
+              18.72, 19.44], [19.125, 19.5, 20.25]],
+             [0.0, 0.0, [30.6, 31.2, 32.4], [33.15, 33.8, 35.1], [35.7, 36.4,
+              37.8], [38.25, 39.0, 40.5]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [120.615, 137.28, 157.41],
+              [125.349712, 142.7426, 163.72665], [129.438076, 147.537312,
+              169.331796], [132.961841, 151.751678, 174.32522]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [6.03075, 6.864, 7.8705],
+              [6.267486, 7.13713, 8.186333], [6.471904, 7.376866, 8.46659],
+              [6.648092, 7.587584, 8.716261]],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [[1000.0, 1000.0, 1000.0], [1155.0, 1155.0, 1155.0], [1396.5,
+              1444.8, 1498.2], [1627.6, 1731.6, 1846.0], [1840.65, 2007.6,
+              2190.3], [2025.0, 2250.0, 2475.0]],
+             [[30.0, 30.0, 30.0], [31.5, 31.5, 31.5], [28.44468, 28.81296,
+              29.12712], [26.366626, 27.08848, 27.732204], [24.100028,
+              25.227546, 26.251711], [21.619917, 23.207414, 24.664661]],
+             [[2280000000.0, 2280000000.0, 2280000000.0], [2457000000.0,
+              2457000000.0, 2457000000.0], [2208030000.0, 2228160000.0,
+              2242020000.0], [2018572984.040625, 2058323254.2, 2088230664.225],
+              [1780742902.0185, 1842499120.896, 1890227258.136],
+              [1454762514.232863, 1538964846.636, 1604709647.942625]],
+             [0.0, 0.0, [336.6, 343.2, 356.4], [381.225, 388.7, 403.65],
+              [428.4, 436.8, 453.6], [478.125, 487.5, 506.25]],
+             [0.0, 0.0, [8.415, 8.58, 8.91], [8.7975, 8.97, 9.315], [9.18,
+              9.36, 9.72], [9.5625, 9.75, 10.125]],
+             [0.0, 0.0, [673200000.0, 686400000.0, 712800000.0], [721395000.0,
+              735540000.0, 763830000.0], [771120000.0, 786240000.0,
+              816480000.0], [803250000.0, 819000000.0, 850500000.0]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [413.1, 468.0, 534.6],
+              [447.525, 507.0, 579.15], [481.95, 546.0, 623.7], [516.375,
+              585.0, 668.25]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [3.85968, 4.39296, 5.03712],
+              [4.136541, 4.710506, 5.402979], [4.400895, 5.016269, 5.757281],
+              [4.653664, 5.311309, 6.101383]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [241230000.0, 274560000.0,
+              314820000.0], [256966910.625, 292622330.0, 335639632.5],
+              [271819960.65, 309828355.2, 355596771.6], [279219865.296094,
+              318678523.8, 366082961.7375]]]],
+        "sampled secondary": [
+            [[100.0, 110.0, 120.0, 130.0, 140.0, 150.0],
+             [1000.0, 1050.0, 1100.0, 1150.0, 1200.0, 1250.0],
+             [60.0, 63.0, 66.0, 69.0, 72.0, 75.0],
+             [[25.5, 26.0, 27.0], [56.1, 57.2, 59.4], [91.8, 93.6, 97.2],
+              [130.0, 130.0, 130.0], [140.0, 140.0, 140.0], [150.0, 150.0,
+              150.0]],
+             [[859.75, 870.0, 878.5], [791.835517, 811.254948, 827.971022],
+              [710.96631, 740.307089, 765.8356], [616.030555, 656.024771,
+              690.924555], [516.258857, 575.912277, 635.230793], [528.138383,
+              590.18238, 651.790082]],
+             [[50.4375, 50.9, 51.225], [45.419538, 46.312547, 46.994001],
+              [39.563865, 40.922554, 41.98558], [32.81489, 34.673439,
+              36.141278], [25.812943, 28.795614, 31.76154], [26.406919,
+              29.509119, 32.589504]],
+             [[25.5, 26.0, 27.0], [28.05, 28.6, 29.7], [30.6, 31.2, 32.4],
+              [33.15, 33.8, 35.1], 0.0, 0.0],
+             [[255.0, 260.0, 270.0], [267.75, 273.0, 283.5], [280.5, 286.0,
+              297.0], [293.25, 299.0, 310.5], 0.0, 0.0],
+             [[15.3, 15.6, 16.2], [16.065, 16.38, 17.01], [16.83, 17.16,
+              17.82], [17.595, 17.94, 18.63], 0.0, 0.0],
+             [[25.5, 26.0, 27.0], [28.05, 28.6, 29.7], [30.6, 31.2, 32.4],
+              [33.15, 33.8, 35.1], 0.0, 0.0],
+             [[114.75, 130.0, 148.5], [119.804738, 135.7902, 155.15955],
+              [124.26157, 140.962536, 161.160813], [128.189893, 145.591544,
+              166.589202], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]],
+             [[5.7375, 6.5, 7.425], [5.990237, 6.78951, 7.757978], [6.213079,
+              7.048127, 8.058041], [6.409495, 7.279577, 8.32946], [0.0, 0.0,
+              0.0], [0.0, 0.0, 0.0]],
+             [1000.0, 1155.0, 1320.0, 1495.0, 1680.0, 1875.0],
+             [30.0, 31.5, 33.0, 34.5, 36.0, 37.5],
+             [2280000000.0, 2457000000.0, 2640000000.0, 2829000000.0,
+              3024000000.0, 3150000000.0],
+             [[1089.25, 1130.0, 1175.5], [1323.3, 1412.4, 1511.4], [1549.5,
+              1694.4, 1854.6], [1755.0, 1950.0, 2145.0], [1890.0, 2100.0,
+              2310.0], [2025.0, 2250.0, 2475.0]],
+             [[25.7925, 26.1, 26.355], [23.964125, 24.573923, 25.107557],
+              [21.947812, 22.908387, 23.767979], [19.725, 21.087157,
+              22.321995], [17.552801, 19.581017, 21.597847], [18.484843,
+              20.656383, 22.812653]],
+             [[1916625000.0, 1934200000.0, 1946550000.0], [1771361995.528125,
+              1806189348.6, 1832766041.925], [1582554619.2225, 1636902178.56,
+              1679423199.96], [1345410500.34199, 1421610980.35976,
+              1481792388.342757], [1084143598.66575, 1209415781.952,
+              1333984665.132], [1109090605.214566, 1239382998.588,
+              1368759172.444125]],
+             [[255.0, 260.0, 270.0], [294.525, 300.3, 311.85], [336.6, 343.2,
+              356.4], [381.225, 388.7, 403.65], 0.0, 0.0],
+             [[7.65, 7.8, 8.1], [8.0325, 8.19, 8.505], [8.415, 8.58, 8.91],
+              [8.7975, 8.97, 9.315], 0.0, 0.0],
+             [[581400000.0, 592800000.0, 615600000.0], [626535000.0,
+              638820000.0, 663390000.0], [673200000.0, 686400000.0,
+              712800000.0], [721395000.0, 735540000.0, 763830000.0], 0.0, 0.0],
+             [[344.25, 390.0, 445.5], [378.675, 429.0, 490.05], [413.1, 468.0,
+              534.6], [447.525, 507.0, 579.15], [0.0, 0.0, 0.0], [0.0, 0.0,
+              0.0]],
+             [[3.4425, 3.9, 4.455], [3.713947, 4.209496, 4.809946], [3.97637,
+              4.510801, 5.157146], [4.230266, 4.804521, 5.497444], [0.0, 0.0,
+              0.0], [0.0, 0.0, 0.0]],
+             [[218025000.0, 247000000.0, 282150000.0], [233619238.125,
+              264790890.0, 302561122.5], [248523140.25, 281925072.0,
+              322321626.0], [262789281.404016, 298462664.708, 341507864.68425],
+              [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]]],
+            [[0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [250.0, 265.09901, 280.392157, 295.873786, 311.538462,
+              327.380952],
+             [15.0, 16.113861, 17.254902, 18.42233, 19.615385, 20.833333],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0,
+              0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]],
+             [[262.75, 263.0, 263.5], [288.691496, 289.085168, 289.864559],
+              [315.999157, 316.551529, 317.639451], [344.688523, 345.414893,
+              346.841005], [373.846154, 373.846154, 373.846154], [392.857143,
+              392.857143, 392.857143]],
+             [[15.0, 15.0, 15.0], [16.113861, 16.113861, 16.113861],
+              [17.254902, 17.254902, 17.254902], [18.42233, 18.42233,
+              18.42233], [19.615385, 19.615385, 19.615385], [20.833333,
+              20.833333, 20.833333]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0,
+              0.0], 0.0, 0.0],
+             [[63.75, 65.0, 67.5], [67.600248, 68.925743, 71.576733], [71.5,
+              72.901961, 75.705882], [75.447816, 76.927184, 79.885922], 0.0,
+              0.0],
+             [[3.825, 3.9, 4.05], [4.109035, 4.189604, 4.350743], [4.4,
+              4.486275, 4.658824], [4.697694, 4.789806, 4.974029], 0.0, 0.0],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0,
+              0.0], 0.0, 0.0],
+             [[76.5, 78.0, 81.0], [81.120297, 82.710891, 85.892079], [85.8,
+              87.482353, 90.847059], [90.537379, 92.312621, 95.863107], [0.0,
+              0.0, 0.0], [0.0, 0.0, 0.0]],
+             [[3.825, 3.9, 4.05], [4.109035, 4.189604, 4.350743], [4.4,
+              4.486275, 4.658824], [4.697694, 4.789806, 4.974029], [0.0, 0.0,
+              0.0], [0.0, 0.0, 0.0]],
+             [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+             [7.5, 7.95297, 8.411765, 8.876214, 9.346154, 9.821429],
+             [570000000.0, 628440594.059406, 690196078.431373,
+              755315533.980582, 823846153.846154, 875000000.0],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0,
+              0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]],
+             [[7.8825, 7.89, 7.905], [8.8023, 8.816472, 8.84453], [9.907259,
+              9.930458, 9.976151], [11.219321, 11.254187, 11.32264],
+              [12.710769, 12.710769, 12.710769], [13.75, 13.75, 13.75]],
+             [[570000000.0, 570000000.0, 570000000.0], [628440594.059406,
+              628440594.059406, 628440594.059406], [690196078.431373,
+              690196078.431373, 690196078.431373], [755315533.980583,
+              755315533.980583, 755315533.980583], [823846153.846154,
+              823846153.846154, 823846153.846154], [875000000.0, 875000000.0,
+              875000000.0]],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0,
+              0.0], 0.0, 0.0],
+             [[1.9125, 1.95, 2.025], [2.028007, 2.067772, 2.147302], [2.145,
+              2.187059, 2.271176], [2.263434, 2.307816, 2.396578], 0.0, 0.0],
+             [[145350000.0, 148200000.0, 153900000.0], [160252351.485149,
+              163394554.455446, 169678960.39604], [176000000.0,
+              179450980.392157, 186352941.176471], [192605461.165049,
+              196382038.834951, 203935194.174757], 0.0, 0.0],
+             [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0,
+              0.0], 0.0, 0.0],
+             [[2.295, 2.34, 2.43], [2.514729, 2.564038, 2.662654], [2.7456,
+              2.799435, 2.907106], [2.987733, 3.046317, 3.163483], [0.0, 0.0,
+              0.0], [0.0, 0.0, 0.0]],
+             [[145350000.0, 148200000.0, 153900000.0], [160252351.485149,
+              163394554.455446, 169678960.39604], [176000000.0,
+              179450980.392157, 186352941.176471], [192605461.165049,
+              196382038.834952, 203935194.174757], [0.0, 0.0, 0.0], [0.0, 0.0,
+              0.0]]]]}
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        base_dir = os.getcwd()
+        cls.handyfiles = ecm_prep.UsefulInputFiles(
+            capt_energy=False, regions="AIA")
+        cls.handyvars = ecm_prep.UsefulVars(
+            base_dir, cls.handyfiles, "AIA", None, None)
+        cls.handyvars.aeo_years = [str(x) for x in range(2016, 2022)]
+        cls.handyvars.nsamples = 3
+        cls.handyvars.freeze()
+        cls.sample_data = CommonTestData(cls.handyvars.aeo_years)
+        cls.opts = UserOptions()
+        cls.tsv_adj = {x: {"baseline": 1, "efficient": 1} for x in [
+            "energy", "cost", "carbon"]}
+        cls.samples = numpy.array([0.9, 1.0, 1.1])
+
+    def partition(self, sampled, adopt_scheme, structure, entry_year=2018,
+                  exit_year=None, secondary=False):
+        """Partition a sample lighting microsegment.
+
+        Args:
+            sampled (boolean): Flag sampled measure inputs.
+            adopt_scheme (string): Assumed consumer adoption scenario.
+            structure (string): Structure type ('new' or 'existing').
+            entry_year (int): Measure market entry year.
+            exit_year (int): Measure market exit year.
+            secondary (boolean): Flag partitioning of a secondary heating
+                microsegment after the primary lighting microsegment.
+
+        Returns:
+            List of partitioned outputs for the primary microsegment (and
+            for the secondary microsegment, if any).
+        """
+        yr_vals = self.sample_data.yr_vals
+        measure = ecm_prep.Measure(
+            os.getcwd(), self.handyvars, self.handyfiles, False, False,
+            "AIA", None, None, **{
+                "name": "sample measure", "active": 1,
+                "market_entry_year": entry_year,
+                "market_exit_year": exit_year,
+                "market_scaling_fractions": None,
+                "market_scaling_fractions_source": None,
+                "measure_type": "full service",
+                "structure_type": ["new", "existing"],
+                "climate_zone": "AIA_CZ1", "bldg_type": "assembly",
+                "fuel_type": "electricity", "fuel_switch_to": None,
+                "end_use": "lighting", "technology": None,
+                "retro_rate": numpy.array([0.005, 0.01, 0.02]) if sampled
+                else 0.01})
+        if sampled:
+            cost_meas = 15 * self.samples
+            rel_perf = {yr: 0.5 * self.samples - 0.01 * ind for ind, yr in
+                        enumerate(self.handyvars.aeo_years)}
+        else:
+            cost_meas = 15
+            rel_perf = yr_vals(0.5, -0.01)
+        outputs = [measure.partition_microsegment(
+            adopt_scheme, None, (
+                "primary", "AIA_CZ1", "assembly", "electricity", "lighting",
+                "T5 F28", structure), 1, None, yr_vals(100, 10),
+            yr_vals(1000, 50), yr_vals(60, 3), yr_vals(10, 0.5), cost_meas,
+            yr_vals(0.03), yr_vals(0.03, 0.001), rel_perf, yr_vals(4), 10,
+            yr_vals(3.1, -0.01), yr_vals(3.1, -0.01), yr_vals(0.06),
+            yr_vals(0.05), yr_vals(2000, 20) if secondary else False,
+            self.tsv_adj, None, self.opts)]
+        if secondary:
+            outputs.append(measure.partition_microsegment(
+                adopt_scheme, None, (
+                    "secondary", "AIA_CZ1", "assembly", "electricity",
+                    "heating", "demand", "lighting gain", structure), None,
+                None, yr_vals(0), yr_vals(500, 10), yr_vals(30, 1),
+                yr_vals(0), 0, yr_vals(0.03), yr_vals(0.03, 0.001),
+                yr_vals(1.2), yr_vals(10), 0, yr_vals(3.1, -0.01),
+                yr_vals(3.1, -0.01), yr_vals(0.06), yr_vals(0.05), False,
+                self.tsv_adj, None, self.opts))
+
+        return outputs
+
+    def output_check(self, case, outputs):
+        """Check partitioned outputs against the recorded outputs for a case.
+
+        Args:
+            case (string): Name of the case in the recorded outputs.
+            outputs (list): Partitioned outputs for the case.
+        """
+        self.assertEqual(len(outputs), len(self.ok_out[case]))
+        for mseg_out, mseg_ok in zip(outputs, self.ok_out[case]):
+            self.assertEqual(len(mseg_out), len(mseg_ok))
+            for out, ok in zip(mseg_out, mseg_ok):
+                self.dict_check(out, dict(zip(
+                    self.handyvars.aeo_years, ok)), places=5)
+
+    def test_point_values(self):
+        """Test outputs for point value measure inputs."""
+        for adopt_scheme, structure in itertools.product([
+                "Technical potential", "Max adoption potential"], [
+                "new", "existing"]):
+            with self.subTest(adopt_scheme=adopt_scheme, structure=structure):
+                self.output_check(" ".join([
+                    "point", structure, adopt_scheme.lower()]),
+                    self.partition(False, adopt_scheme, structure))
+
+    def test_sampled_values(self):
+        """Test outputs for measure inputs sampled from distributions."""
+        for adopt_scheme, structure in itertools.product([
+                "Technical potential", "Max adoption potential"], [
+                "new", "existing"]):
+            with self.subTest(adopt_scheme=adopt_scheme, structure=structure):
+                self.output_check(" ".join([
+                    "sampled", structure, adopt_scheme.lower()]),
+                    self.partition(True, adopt_scheme, structure))
+
+    def test_secondary(self):
+        """Test outputs for a secondary microsegment."""
+        for sampled in [False, True]:
+            with self.subTest(sampled=sampled):
+                self.output_check(
+                    ("sampled" if sampled else "point") + " secondary",
+                    self.partition(sampled, "Max adoption potential",
+                                   "existing", None, 2020, True))
+
+
+class ApplyTSVTest(unittest.TestCase, CommonMethods):
+    """Test the time-sensitive valuation of a measure's load shape.
+
+    Verify that the energy, cost, and carbon scaling factors and sector-level
+    load shapes yielded by load shedding, load shifting (with and without a
+    shifting window), and custom daily load reshaping features match those
+    recorded from the hour-by-hour implementation of the calculations, both
+    without time sensitive valuation metrics and with energy and power
+    metrics.
+
+    Attributes:
+        handyfiles (object): Useful input files across the class.
+        handyvars (object): Useful variables across the class.
+        opts (object): User-specified execution options.
+        hr_of_day (numpy.ndarray): Zero-indexed hour of day for each of the
+            8760 hours of the year.
+        load_fact (dict): Sample baseline load shapes by climate zone.
+        ash_cz_wts (list): Sample climate zone -> EMM region weights.
+        cost_yr_map (dict): Sample price data year -> AEO year mapping.
+        carb_yr_map (dict): Sample emissions data year -> AEO year mapping.
+        cost_fact_hourly (numpy.ndarray): Sample 8760 x year price factors.
+        carbon_fact_hourly (numpy.ndarray): Sample 8760 x year emissions
+            factors.
+        tsv_adjustments (dict): Sample time-varying efficiency features.
+        tsv_metrics (dict): Sample time sensitive valuation metrics settings.
+        ok_out (dict): Recorded outputs for each case, given as the baseline
+            and efficient energy scaling factors; baseline and efficient
+            cost and carbon scaling factors in 2019 and 2023; and the
+            hour-of-day weighted sums of the baseline and efficient load
+            shapes.
+    """
+
+    ok_out = {
+        "shed": [
+            1.0, 0.995027958729453, [1.019411428382689, 1.096592582628907],
+            [1.0159278916877128, 1.093235263518637], [0.9438919757237955, 0.8],
+            [0.9394648209086756, 0.7965100498769215], 10.950854156329738,
+            10.8722136419345],
+        "shed, energy peak": [
+            0.030158957744494452, 0.029078390068026545,
+            [0.0378009230883728, 0.05943564765388684],
+            [0.0378009230883728, 0.05943564765388684],
+            [0.051108655268088284, 0.039812732450389764],
+            [0.051108655268088284, 0.039812732450389764], 10.950854156329738,
+            10.8722136419345],
+        "shed, power max": [
+            5.200858026997761e-05, 5.200858026997761e-05,
+            [6.503375110901614e-05, 0.00010104800326948596],
+            [6.503375110901614e-05, 0.00010104800326948596],
+            [9.156816885912403e-05, 7.258700681314505e-05],
+            [9.156816885912403e-05, 7.258700681314505e-05], 10.950854156329738,
+            10.8722136419345],
+        "shift all hours": [
+            1.0, 0.9999999999999998, [1.019411428382689, 1.096592582628907],
+            [0.980588571617311, 1.0965925826289067], [0.9438919757237955, 0.8],
+            [0.9520833333333333, 0.7999928277682685], 10.950854156329738,
+            11.33632969605898],
+        "shift all hours, energy peak": [
+            0.030158957744494452, 0.035247574266894316,
+            [0.0378009230883728, 0.05943564765388684],
+            [0.04711565543537582, 0.07389808058373402],
+            [0.051108655268088284, 0.039812732450389764],
+            [0.06386539328572344, 0.04976586778239522], 10.950854156329738,
+            11.33632969605898],
+        "shift all hours, power max": [
+            5.200858026997761e-05, 6.592309039274548e-05,
+            [6.503375110901614e-05, 0.00010104800326948596],
+            [8.530265099809376e-05, 0.0001325413713642636],
+            [9.156816885912403e-05, 7.258700681314505e-05],
+            [0.00012010698164451218, 9.521001024219776e-05],
+            10.950854156329738, 11.33632969605898],
+        "shift hour range": [
+            1.0, 1.0, [1.019411428382689, 1.096592582628907],
+            [1.0287725652236173, 1.0774501897142141],
+            [0.9438919757237955, 0.8], [0.9438919757237956, 0.8],
+            10.950854156329738, 10.758762720558064],
+        "shift hour range, energy peak": [
+            0.030158957744494452, 0.021257286936806605,
+            [0.0378009230883728, 0.05943564765388684],
+            [0.030036152829889338, 0.04781371929700308],
+            [0.051108655268088284, 0.039812732450389764],
+            [0.04010306461038435, 0.031241776313126145], 10.950854156329738,
+            10.758762720558064],
+        "shift hour range, power max": [
+            5.200858026997761e-05, 2.6004290134988805e-05,
+            [6.503375110901614e-05, 0.00010104800326948596],
+            [3.251687555450807e-05, 5.052400163474298e-05],
+            [9.156816885912403e-05, 7.258700681314505e-05],
+            [4.5784084429562016e-05, 3.6293503406572524e-05],
+            10.950854156329738, 10.758762720558064],
+        "shape": [
+            1.0, 0.9864556306428192, [1.019411428382689, 1.096592582628907],
+            [1.0102249711012041, 1.0902374309422689],
+            [0.9438919757237955, 0.8], [0.9348943071352211, 0.792350201907766],
+            10.950854156329738, 10.77552687555114],
+        "shape, energy peak": [
+            0.030158957744494452, 0.029870455131287013,
+            [0.0378009230883728, 0.05943564765388684],
+            [0.0378009230883728, 0.05943564765388684],
+            [0.051108655268088284, 0.039812732450389764],
+            [0.051108655268088284, 0.039812732450389764], 10.950854156329738,
+            10.77552687555114],
+        "shape, power max": [
+            5.200858026997761e-05, 5.200858026997761e-05,
+            [6.503375110901614e-05, 0.00010104800326948596],
+            [6.503375110901614e-05, 0.00010104800326948596],
+            [9.156816885912403e-05, 7.258700681314505e-05],
+            [9.156816885912403e-05, 7.258700681314505e-05], 10.950854156329738,
+            10.77552687555114]
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        base_dir = os.getcwd()
+        cls.handyfiles = ecm_prep.UsefulInputFiles(
+            capt_energy=False, regions="EMM")
+        cls.handyvars = ecm_prep.UsefulVars(
+            base_dir, cls.handyfiles, "EMM", ["1", "2", "1", "1", "2", "1"],
+            None)
+        cls.handyvars.aeo_years = [str(x) for x in range(2018, 2024)]
+        cls.opts = UserOptions()
+        cls.opts.sect_shapes = True
+        day_of_yr, cls.hr_of_day = numpy.divmod(numpy.arange(8760), 24)
+        # Daily baseline load shapes peaking at different hours in each
+        # climate zone, with a seasonal variation
+        cls.load_fact = {}
+        for cz, phase in [("2A", 0), ("3A", 5)]:
+            shape = 1 + 0.5 * numpy.sin(
+                2 * numpy.pi * (cls.hr_of_day + phase) / 24) + \
+                0.2 * numpy.cos(2 * numpy.pi * day_of_yr / 365)
+            cls.load_fact[cz] = list(shape / shape.sum())
+        cls.ash_cz_wts = [["2A", 0.7], ["3A", 0.3]]
+        cls.cost_yr_map = {
+            "2018": ["2018", "2019", "2020"],
+            "2022": ["2021", "2022", "2023"]}
+        cls.carb_yr_map = {
+            "2018": ["2018", "2019"],
+            "2020": ["2020", "2021", "2022", "2023"]}
+        cls.cost_fact_hourly = numpy.column_stack([
+            1 + 0.3 * numpy.sin(2 * numpy.pi * cls.hr_of_day / 24),
+            1 + 0.4 * numpy.cos(2 * numpy.pi * cls.hr_of_day / 24)])
+        cls.carbon_fact_hourly = numpy.column_stack([
+            0.9 + 0.1 * (cls.hr_of_day >= 12),
+            0.8 + 0.05 * numpy.sin(2 * numpy.pi * day_of_yr / 365)])
+        cls.tsv_adjustments = {
+            "shed": {"shed": {
+                "relative energy change fraction": 0.2,
+                "start_hour": 14, "stop_hour": 18,
+                "start_day": 152, "stop_day": 243}},
+            "shift all hours": {"shift": {"offset_hrs_earlier": 2}},
+            "shift hour range": {"shift": {
+                "offset_hrs_earlier": 3,
+                "relative energy change fraction": 0.5,
+                "start_hour": 16, "stop_hour": 20}},
+            "shape": {"shape": {
+                "custom_daily_savings": [
+                    0.1 if 9 <= x < 17 else 0 for x in range(24)],
+                "start_day": [1, 152], "stop_day": [90, 243]}}}
+        cls.tsv_metrics = {
+            None: None,
+            "energy peak": ["1", "2", "1", "1", "2", "1"],
+            "power max": ["2", "1", "1", "1", "2", "0"]}
+
+    def apply(self, tsv_adjustments, tsv_metrics):
+        """Apply time-varying efficiency features to the sample load shapes.
+
+        Args:
+            tsv_adjustments (dict): Time-varying efficiency features.
+            tsv_metrics (list): Time sensitive valuation metrics settings.
+
+        Returns:
+            List of the energy scaling factors, cost and carbon scaling
+            factors in 2019 and 2023, and hour-of-day weighted load shape
+            sums, ordered as in the recorded outputs.
+        """
+        measure = ecm_prep.Measure(
+            os.getcwd(), self.handyvars, self.handyfiles, False, False,
+            "EMM", tsv_metrics, None, **{
+                "name": "sample measure", "active": 1,
+                "market_entry_year": None, "market_exit_year": None,
+                "market_scaling_fractions": None,
+                "market_scaling_fractions_source": None,
+                "measure_type": "full service",
+                "structure_type": ["new", "existing"],
+                "climate_zone": "SRDA", "bldg_type": "single family home",
+                "fuel_type": "electricity", "fuel_switch_to": None,
+                "end_use": "cooling", "technology": "central AC"})
+        tsv_fracs, tsv_shapes = measure.apply_tsv(
+            copy.deepcopy(self.load_fact), copy.deepcopy(self.ash_cz_wts),
+            {"single family home": 1}, self.cost_fact_hourly,
+            self.carbon_fact_hourly, (
+                "primary", "SRDA", "single family home", "electricity",
+                "cooling", "central AC", "existing"), "residential",
+            "cooling", self.opts, self.cost_yr_map, self.carb_yr_map,
+            tsv_adjustments)
+
+        return [tsv_fracs["energy"]["baseline"],
+                tsv_fracs["energy"]["efficient"]] + [
+            [tsv_fracs[x][y][yr] for yr in ["2019", "2023"]] for x, y in
+            itertools.product(["cost", "carbon"], ["baseline", "efficient"])
+        ] + [numpy.sum(numpy.array(tsv_shapes[x]) * (self.hr_of_day + 1))
+             for x in ["baseline", "efficient"]]
+
+    def test_tsv_adjustments(self):
+        """Test outputs for each time-varying efficiency feature."""
+        for (adj_name, adj), (metrics_name, metrics) in itertools.product(
+                self.tsv_adjustments.items(), self.tsv_metrics.items()):
+            case = adj_name + (
+                (", " + metrics_name) if metrics_name is not None else "")
+            with self.subTest(case=case):
+                outputs = self.apply(adj, metrics)
+                self.assertEqual(len(outputs), len(self.ok_out[case]))
+                for out, ok in zip(outputs, self.ok_out[case]):
+                    numpy.testing.assert_allclose(out, ok, rtol=1e-12)
+
+
+class FindMeasuresToPrepTest(unittest.TestCase):
+    """Test the selection of measure definitions that require preparation.
+
+    Verify that the hashes used to record previous measure preparations
+    reflect the contents of measure definitions and input files rather
+    than their formatting or modification times, and that measures and
+    packages are prepared again when their definitions, the input files,
+    or the options used to prepare them change (and only then).
+
+    Attributes:
+        handyfiles (object): Useful input files across the class.
+        handyvars (object): Useful variables across the class.
+        sample_measures (dict): Sample measure definitions by file name.
+        sample_package (dict): Sample package definition.
+        base_dir (string): Temporary root directory for each test.
+        manifest (dict): Manifest of hashes recorded once all sample
+            measures and packages have been prepared.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        cls.handyfiles = ecm_prep.UsefulInputFiles(
+            capt_energy=False, regions="AIA")
+        cls.handyvars = ecm_prep.UsefulVars(
+            os.getcwd(), cls.handyfiles, "AIA", None, None)
+        cls.handyvars.freeze()
+        cls.sample_measures = {
+            "measure " + x + ".json": {
+                "name": "measure " + x, "fuel_type": "electricity",
+                "fuel_switch_to": None, "energy_efficiency": y} for x, y in
+            [("A", 0.5), ("B", 0.7)]}
+        cls.sample_package = {
+            "name": "package P", "contributing_ECMs": ["measure A"],
+            "benefits": {"energy savings increase": 0.1,
+                         "cost reduction": 0}}
+
+    def setUp(self):
+        """Write sample measures and input files that are all prepared."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.base_dir = tmp_dir.name
+        for folder in [(self.handyfiles.indiv_ecms,),
+                       self.handyfiles.ecm_compete_data,
+                       self.handyfiles.cost_convert_in[:-1]]:
+            os.makedirs(os.path.join(self.base_dir, *folder))
+        for file_name, meas in self.sample_measures.items():
+            self.write((self.handyfiles.indiv_ecms, file_name), meas)
+        self.write(self.handyfiles.ecm_packages, [self.sample_package])
+        self.write(self.handyfiles.cost_convert_in, {"cost": 1})
+        # Record competition data for all measures and packages
+        for name in ["measure A", "measure B", "package P"]:
+            self.write(self.handyfiles.ecm_compete_data + (name,), {})
+        # Initially, all measures and packages are new
+        to_prep, self.manifest = self.find()
+        self.assertEqual(to_prep, [
+            ["measure A", "measure B"], ["package P"]])
+
+    def write(self, file_path, data):
+        """Write JSON data to a file in the temporary root directory.
+
+        Args:
+            file_path (tuple): Path elements relative to the root directory.
+            data (dict or list): Data to write.
+        """
+        with open(os.path.join(self.base_dir, *file_path), 'w') as jso:
+            json.dump(data, jso)
+
+    def find(self, opts=None, handyvars=None, manifest=None):
+        """Find the sample measures and packages that require preparation.
+
+        Args:
+            opts (object): User-specified execution options.
+            handyvars (object): Useful variables (defaults to those of the
+                class).
+            manifest (dict): Manifest of hashes from previous preparations
+                (defaults to an empty manifest).
+
+        Returns:
+            List of the names of the measures and of the packages to
+            prepare, and dict of the current hashes.
+        """
+        meas_summary = [
+            {"name": "measure A"}, {"name": "measure B"},
+            dict(copy.deepcopy(self.sample_package))] if \
+            manifest is not None else []
+        meas_toprep_indiv, meas_toprep_package, manifest_update = \
+            ecm_prep.find_measures_to_prep(
+                self.base_dir, self.handyfiles, handyvars or self.handyvars,
+                opts or UserOptions(), "AIA", None, meas_summary,
+                copy.deepcopy(manifest) if manifest is not None else {
+                    "input files": {}, "measures": {}, "packages": {}})
+
+        return [sorted([x["name"] for x in meas_toprep_indiv]),
+                [x["name"] for x in meas_toprep_package]], manifest_update
+
+    def test_json_digest(self):
+        """Test that digests reflect contents rather than formatting."""
+        digest = ecm_prep.json_digest({"a": [1, 2], "b": {"c": 0.5}})
+        self.assertEqual(digest, ecm_prep.json_digest(
+            {"b": {"c": 0.5}, "a": numpy.array([1, 2])}))
+        self.assertNotEqual(digest, ecm_prep.json_digest(
+            {"a": [1, 2], "b": {"c": 0.6}}))
+
+    def test_file_digests(self):
+        """Test that file digests are reused only for unchanged files."""
+        fp = self.handyfiles.cost_convert_in
+        digests = ecm_prep.file_digests(self.base_dir, [
+            fp, ("no_such_file.json",)], {})
+        self.assertIsNone(digests["no_such_file.json"])
+        known = {os.path.join(*fp): dict(
+            digests[os.path.join(*fp)], sha1="known")}
+        # File with the same size and modification time as recorded
+        self.assertEqual(ecm_prep.file_digests(
+            self.base_dir, [fp], known)[os.path.join(*fp)]["sha1"], "known")
+        # File with a changed modification time is digested again
+        os.utime(os.path.join(self.base_dir, *fp), (0, 0))
+        self.assertEqual(ecm_prep.file_digests(
+            self.base_dir, [fp], known)[os.path.join(*fp)]["sha1"],
+            digests[os.path.join(*fp)]["sha1"])
+
+    def test_unchanged(self):
+        """Test that nothing is prepared when nothing has changed."""
+        # Including when an input file is touched without being changed
+        os.utime(os.path.join(
+            self.base_dir, *self.handyfiles.cost_convert_in), (0, 0))
+        self.assertEqual(self.find(manifest=self.manifest)[0], [[], []])
+
+    def test_definition_change(self):
+        """Test that an edited measure and its packages are prepared."""
+        self.write((self.handyfiles.indiv_ecms, "measure A.json"), dict(
+            self.sample_measures["measure A.json"], energy_efficiency=0.4))
+        self.assertEqual(self.find(manifest=self.manifest)[0], [
+            ["measure A"], ["package P"]])
+        # A measure that does not contribute to the package
+        self.write((self.handyfiles.indiv_ecms, "measure A.json"),
+                   self.sample_measures["measure A.json"])
+        self.write((self.handyfiles.indiv_ecms, "measure B.json"), dict(
+            self.sample_measures["measure B.json"], energy_efficiency=0.6))
+        self.assertEqual(self.find(manifest=self.manifest)[0], [
+            ["measure B"], []])
+
+    def test_package_change(self):
+        """Test that an edited package alone is prepared."""
+        self.write(self.handyfiles.ecm_packages, [dict(
+            self.sample_package, contributing_ECMs=[
+                "measure A", "measure B"])])
+        self.assertEqual(self.find(manifest=self.manifest)[0], [
+            [], ["package P"]])
+
+    def test_input_file_change(self):
+        """Test that all measures are prepared when an input file changes."""
+        self.write(self.handyfiles.cost_convert_in, {"cost": 2})
+        self.assertEqual(self.find(manifest=self.manifest)[0], [
+            ["measure A", "measure B"], ["package P"]])
+
+    def test_options_change(self):
+        """Test that all measures are prepared when an option changes."""
+        opts = UserOptions()
+        opts.site_energy = True
+        self.assertEqual(self.find(opts=opts, manifest=self.manifest)[0], [
+            ["measure A", "measure B"], ["package P"]])
+
+    def test_seed(self):
+        """Test that measures are prepared again only for a new seed."""
+        # The default seed for the run is 0
+        self.assertEqual(self.find(
+            opts=UserOptions(seed=0), handyvars=ecm_prep.UsefulVarsOverlay(
+                self.handyvars, rand_seed=0), manifest=self.manifest)[0],
+            [[], []])
+        self.assertEqual(self.find(
+            opts=UserOptions(seed=1), handyvars=ecm_prep.UsefulVarsOverlay(
+                self.handyvars, rand_seed=1), manifest=self.manifest)[0],
+            [["measure A", "measure B"], ["package P"]])
+
+
+class PrepareMeasuresTest(unittest.TestCase, CommonMethods):
+    """Test the preparation of measure markets in serial and in parallel.
+
+    Verify that measures with inputs sampled from probability distributions
+    are prepared identically whether they are updated serially or across
+    worker processes, and that each measure's draws do not depend on the
+    other measures being prepared.
+
+    Attributes:
+        handyvars (object): Useful variables across the class.
+        handyfiles (object): Useful input files across the class.
+        sample_data (object): Sample baseline data and measures.
+        convert_data (dict): Measure cost unit conversion data.
+        sample_measures (list): Sample measures with sampled inputs.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        base_dir = os.getcwd()
+        cls.handyfiles = ecm_prep.UsefulInputFiles(
+            capt_energy=False, regions="AIA")
+        cls.handyvars = ecm_prep.UsefulVars(
+            base_dir, cls.handyfiles, "AIA", None, None)
+        cls.handyvars.freeze()
+        cls.sample_data = CommonTestData(cls.handyvars.aeo_years)
+        with open(os.path.join(
+                base_dir, *cls.handyfiles.cost_convert_in), 'r') as cc:
+            cls.convert_data = json.load(cc)
+        cls.sample_measures = [
+            dict(copy.deepcopy(cls.sample_data.sample_measure),
+                 name="sample measure " + str(n + 1)) for n in range(3)]
+
+    def prepare(self, measures, opts):
+        """Prepare a list of sample measures.
+
+        Args:
+            measures (list): Sample measure definitions.
+            opts (object): User-specified execution options.
+
+        Returns:
+            List of prepared Measure objects.
+        """
+        return ecm_prep.prepare_measures(
+            copy.deepcopy(measures), self.convert_data,
+            self.sample_data.msegs, self.sample_data.msegs_cpl,
+            self.handyvars, self.handyfiles, None, None, os.getcwd(), opts,
+            "AIA", None)
+
+    def test_serial_parallel_match(self):
+        """Test that serial and parallel preparation yield the same markets.
+        """
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.skipTest("Parallel measure preparation is unavailable")
+        serial, parallel = [self.prepare(self.sample_measures, UserOptions(
+            workers=x)) for x in [None, 2]]
+        for m_s, m_p in zip(serial, parallel):
+            self.assertEqual(m_s.name, m_p.name)
+            # Confirm that the measure inputs were sampled
+            self.assertIsInstance(m_s.retro_rate, numpy.ndarray)
+            self.dict_check(m_s.markets, m_p.markets)
+
+    def test_measure_order_independence(self):
+        """Test that a measure's draws do not depend on other measures."""
+        prepared_all, prepared_one = [self.prepare(x, UserOptions()) for x in [
+            self.sample_measures, self.sample_measures[-1:]]]
+        self.dict_check(prepared_all[-1].markets, prepared_one[0].markets)
+
+    def test_run_seed(self):
+        """Test that a seed set for the run changes each measure's draws."""
+        handyvars = ecm_prep.UsefulVars(
+            os.getcwd(), self.handyfiles, "AIA", None, None)
+        seeds = []
+        for run_seed in [None, 0, 1]:
+            if run_seed is not None:
+                handyvars.rand_seed = run_seed
+            measure = ecm_prep.Measure(
+                os.getcwd(), handyvars, self.handyfiles, False, False,
+                "AIA", None, None, **copy.deepcopy(self.sample_measures[0]))
+            seeds.append(measure.rand_seed("markets"))
+        # The default seed for the run is 0
+        self.assertEqual(seeds[0], seeds[1])
+        self.assertNotEqual(seeds[1], seeds[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
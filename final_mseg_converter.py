@@ -24,7 +24,6 @@ script checks for the correct input file and produces an instructive
 error message if the file is missing.
 """
 
-import copy
 import numpy as np
 import json
 import mseg
@@ -149,176 +148,160 @@ class UsefulVars(object):
             self.json_out = 'cpl_res_com_emm.json'
 
 
-def merge_sum(base_dict, add_dict, cd, cz, cd_dict, cd_list,
-              res_convert_array, com_convert_array, cd_to_cz_factor=0,
-              fuel_flag=None):
-    """Calculate values to restructure census division data to custom regions.
-
-    Two dicts with identical structure, 'base_dict' and 'add_dict' are
-    passed to this function and manipulated to effect conversion of the
-    data from a census division (specified by 'cd') to a custom region
-    (specified by 'cz') basis.
-
-    This function operates recursively, traversing the structure of
-    the input dicts until a list of years is reached. At that point,
-    if the census division specified corresponds to the first census
-    division in the original data (the order is obtained from
-    'cd_list'), the entries in 'base_dict' are overwritten by the same
-    data multiplied by the appropriate conversion factor. If the census
-    division is not the first to appear in the original data,
-    'base_dict' has already been modified, and data from subsequent
-    census divisions should be added to 'base_dict', thus 'add_dict' is
-    modified to the current custom region using the appropriate
-    conversion factor and added to 'base_dict'.
-
-    This approach to converting the data to a custom region basis works
-    because this function is called from within nested for loops that
-    cover all of the census divisions for each custom region.
-    Consequently, the data from each of the census divisions converted
-    to their respective contributions to a single custom region can be
-    added together to obtain the data in the desired final form.
+def leaf_layout(base_dict, fuel_split, slot_factors=None,
+                bldg_class=None, fuel_flag=None):
+    """Identify the conversion factors that apply to each value in a dict.
+
+    This function traverses the dict structure below the census
+    division level in sorted key order and records, for each numeric
+    value (or each element of a list of numeric values), the building
+    class and fuel type that determine the census division to custom
+    region conversion factor to apply to that value.
 
     Args:
         base_dict (dict): A portion of the input JSON database
-            corresponding to the current census division, modified in
-            place to convert the data to a custom region basis.
-        add_dict (dict): A portion of the input JSON database
-            corresponding to the current census division, copied from
-            the original input data each time this function is called
-            by the clim_converter function. This portion of the data
-            should be structurally identical to 'base_dict', and
-            (generally) corresponds to the data that should be updated
-            and then added to 'base_dict'.
-        cd (int): The census division (1-9) currently being processed.
-            Used as an array row index, so the actual values begin
-            with 0, not 1.
-        cz (int): The custom region to which the census division data
-            are being added. Used as an array column index where the
-            first (0th) column is not relevant, thus it begins at 1.
-        cd_dict (dict): A dict for translating between census division
-            descriptive strings and their corresponding numeric codes.
-        cd_list (list): A list of the census divisions that are in the
-            input data (the top level keys from the JSON structure),
-            in the order in which they appear.
-        res_convert_array (numpy.ndarray): Coefficients for converting
-            from census divisions to custom regions for residential buildings.
-        com_convert_array (numpy.ndarray): Coefficients for converting
-            from census divisions to custom regions for commercial buildings.
-        cd_to_cz_factor (float): The numeric conversion factor to
-            calculate the contribution from the current census division
-            'cd' to the current custom region 'cz'.
-        fuel_flag (NoneType): Flag for the fuel type currently being looped
-            through (relevant only to EMM custom region cost_convert).
+            corresponding to a single census division.
+        fuel_split (bool): True if the conversion arrays are broken out
+            by electric and non-electric fuels (EMM regions).
+        slot_factors (list): Building class and fuel type tuples
+            recorded so far, appended to in place.
+        bldg_class (str): The building class ('residential' or
+            'commercial') of the current portion of the dict.
+        fuel_flag (str): The fuel type currently being looped through
+            (relevant only to EMM region conversions).
 
     Returns:
-        A dict with the same form as base_dict and add_dict, with the
-        values for the particular census division specified in 'cd'
-        converted to the custom region 'cz'.
+        A list of (building class, fuel type) tuples with one entry
+        per numeric value in base_dict, in traversal order.
     """
 
+    if slot_factors is None:
+        slot_factors = []
+
     # Extract lists of strings corresponding to the residential and
-    # commercial building types used to process these inputs
-    res_bldg_types = list(mseg.bldgtypedict.keys())
-    com_bldg_types = list(cm.CommercialTranslationDicts().bldgtypedict.keys())
-    # Extract lists of strings corresponding to the residential and
-    # commercial fuel types used to process these inputs
-    res_fuel_types = list(mseg.fueldict.keys())
-    com_fuel_types = list(cm.CommercialTranslationDicts().fueldict.keys())
-
-    for (k, i), (k2, i2) in zip(sorted(base_dict.items()),
-                                sorted(add_dict.items())):
-        # Compare the top level/parent keys of the section of the dict
-        # currently being parsed to ensure that both the base_dict
-        # (census division basis) and add_dict (custom region basis)
-        # are proceeding with the same structure
-        if k == k2:
-            # Identify appropriate census division to custom region
-            # conversion weighting factor array as a function of building
-            # type; k and k2 correspond to the current top level/parent key,
-            # thus k and k2 are equal to a building type immediately
-            # prior to traversing the entire child tree for that
-            # building type, for which the conversion number array
-            # cd_to_cz_factor will be the same. Ensure that the walk is
-            # currently at the building type level by checking keys from the
-            # next level down (the fuel type level) against expected fuel types
-            if ((k in res_bldg_types and
-                any([x in res_fuel_types for x in base_dict[k].keys()])) or
-                (k in com_bldg_types and
-                 any([x in com_fuel_types for x in base_dict[k].keys()]))):
-                if k in res_bldg_types:
-                    cd_to_cz_factor = res_convert_array
-                elif k in com_bldg_types:
-                    cd_to_cz_factor = com_convert_array
-            # Flag the current fuel type being updated, which is relevant
-            # to ultimate selection of conversion factor from the conversion
-            # array when translating to EMM region, in which case conversion
-            # factors are different for electric and non-electric fuels. Use
-            # the expectation that conversion arrays will be in dict format
-            # in the EMM region case (with keys for electric and non-electric
-            # conversion factors) to trigger the fuel flag update
-            elif (k in res_fuel_types or k in com_fuel_types) and \
-                    type(res_convert_array) is dict:
-                fuel_flag = k
-
-            # Recursively loop through both dicts
-            if isinstance(i, dict):
-                merge_sum(i, i2, cd, cz, cd_dict, cd_list, res_convert_array,
-                          com_convert_array, cd_to_cz_factor, fuel_flag)
-            elif type(base_dict[k]) is not str:
-                # Check whether the conversion array needs to be further keyed
-                # by fuel type, as is the case when converting to EMM region;
-                # in such cases, the fuel flag indicates the key value to use
-                if fuel_flag is not None:
-                    # Find conversion factor for the electric fuel and given
-                    # combination of census division and EMM region
-                    if fuel_flag == "electricity":
-                        convert_fact = cd_to_cz_factor["electric"][cd][cz]
-                    # Find conversion data for the non-electric fuels and given
-                    # combination of census division and EMM region
-                    else:
-                        convert_fact = cd_to_cz_factor["non-electric"][cd][cz]
-                else:
-                    # Find the conversion factor for the given combination of
-                    # census division and AIA climate zone
-                    convert_fact = cd_to_cz_factor[cd][cz]
-
-                # Special handling of first dict (no addition of the
-                # second dict, only conversion of the first dict with
-                # the appropriate factor)
-                if (cd == (cd_dict[cd_list[0]] - 1)):
-                    # In the special case of consumer choice/time
-                    # preference premium data, the data are reported
-                    # as a list and must be reprocessed using a list
-                    # comprehension (or comparable looping approach)
-                    if isinstance(base_dict[k], list):
-                        base_dict[k] = [z * convert_fact for z
-                                        in base_dict[k]]
-                    else:
-                        base_dict[k] = base_dict[k] * convert_fact
-                else:
-                    if isinstance(base_dict[k], list):
-                        base_dict[k] = [sum(y) for y
-                                        in zip(base_dict[k],
-                                        [z * convert_fact for z
-                                         in add_dict[k2]])]
+    # commercial building and fuel types used to process these inputs
+    res_bldg_types = mseg.bldgtypedict.keys()
+    com_bldg_types = cm.CommercialTranslationDicts().bldgtypedict.keys()
+    res_fuel_types = mseg.fueldict.keys()
+    com_fuel_types = cm.CommercialTranslationDicts().fueldict.keys()
+
+    for k, i in sorted(base_dict.items()):
+        # Update the building class at the building type level and the
+        # fuel type at the fuel type level
+        if ((k in res_bldg_types and
+            any([x in res_fuel_types for x in i.keys()])) or
+            (k in com_bldg_types and
+             any([x in com_fuel_types for x in i.keys()]))):
+            if k in res_bldg_types:
+                bldg_class = "residential"
+            elif k in com_bldg_types:
+                bldg_class = "commercial"
+        elif (k in res_fuel_types or k in com_fuel_types) and fuel_split:
+            fuel_flag = k
+
+        # Recursively loop through the dict, recording the conversion
+        # factor keys for each numeric value or list element
+        if isinstance(i, dict):
+            leaf_layout(i, fuel_split, slot_factors, bldg_class, fuel_flag)
+        elif isinstance(i, list):
+            slot_factors.extend([(bldg_class, fuel_flag)] * len(i))
+        elif type(i) is not str:
+            slot_factors.append((bldg_class, fuel_flag))
+
+    return slot_factors
+
+
+def leaf_values(base_dict, add_dict, values=None):
+    """Flatten the numeric values in a dict in sorted key order.
 
-                    else:
-                        base_dict[k] = (base_dict[k] +
-                                        add_dict[k2] * convert_fact)
+    Args:
+        base_dict (dict): A portion of the input JSON database for the
+            first census division, used as the structure template.
+        add_dict (dict): The same portion of the input JSON database
+            for the census division whose values are extracted.
+        values (list): Values extracted so far, appended to in place.
+
+    Returns:
+        A list of the numeric values in add_dict, in the same order as
+        the entries recorded by the leaf_layout function.
+
+    Raises:
+        KeyError: If the keys in add_dict do not match base_dict.
+    """
+
+    if values is None:
+        values = []
+
+    # Confirm that base_dict (the structure template) and add_dict
+    # have the same keys at the current level of the dict
+    if sorted(base_dict) != sorted(add_dict):
+        raise KeyError('Merge keys do not match!')
+
+    for k, i in sorted(base_dict.items()):
+        if isinstance(i, dict):
+            leaf_values(i, add_dict[k], values)
+        elif isinstance(i, list):
+            # Lists (i.e., consumer choice/time preference premium
+            # data) must have the same length in every census division
+            if len(add_dict[k]) != len(i):
+                raise KeyError('Merge keys do not match!')
+            values.extend(add_dict[k])
+        elif type(i) is not str:
+            values.append(add_dict[k])
+
+    return values
+
+
+def leaf_rebuild(base_dict, converted, n_regions, slot=0):
+    """Rebuild the dict structure for each custom region from values.
+
+    Args:
+        base_dict (dict): A portion of the input JSON database for the
+            first census division, used as the structure template.
+        converted (numpy.ndarray): A (values x custom regions) array of
+            converted values, in the order given by leaf_layout.
+        n_regions (int): The number of custom regions.
+        slot (int): The row of 'converted' corresponding to the first
+            numeric value in base_dict.
+
+    Returns:
+        A list of dicts (one per custom region) with the same structure
+        and key order as base_dict, and the row of 'converted' that
+        follows the last numeric value in base_dict.
+    """
+
+    # Set up the dicts for each custom region with the same key order
+    # as base_dict; strings are carried over from base_dict
+    region_dicts = [dict.fromkeys(base_dict) for n in range(n_regions)]
+
+    for k, i in sorted(base_dict.items()):
+        if isinstance(i, dict):
+            region_values, slot = leaf_rebuild(
+                i, converted, n_regions, slot)
+        elif isinstance(i, list):
+            region_values = converted[slot:(slot + len(i))].T.tolist()
+            slot += len(i)
+        elif type(i) is not str:
+            region_values = converted[slot].tolist()
+            slot += 1
         else:
-            raise(KeyError('Merge keys do not match!'))
+            region_values = [i] * n_regions
+        for region_dict, region_value in zip(region_dicts, region_values):
+            region_dict[k] = region_value
 
-    # Return a single dict representing sum of values of original two dicts
-    return base_dict
+    return region_dicts, slot
 
 
 def clim_converter(input_dict, res_convert_array, com_convert_array):
     """Convert input data dict from a census division to a custom region basis.
 
-    This function principally serves to prepare the inputs for, and
-    then call, a function that performs the calculations to convert
-    data in the input_dict database specified for each microsegment
-    from a census division to a custom region basis.
+    This function converts the data in the input_dict database
+    specified for each microsegment from a census division to a custom
+    region basis. The numeric values for all census divisions are
+    flattened once into a (census divisions x values) array, converted
+    to all of the custom regions by multiplying with the census
+    division to custom region conversion factors, and then restructured
+    into a dict for each custom region.
 
     Args:
         input_dict (dict): Data from JSON database, as imported,
@@ -354,55 +337,79 @@ def clim_converter(input_dict, res_convert_array, com_convert_array):
     # Obtain list of all census divisions in the input data
     cd_list = list(input_dict.keys())
 
-    # Set up empty dict to be updated with the results for each custom
-    # region as the data are converted
-    converted_dict = {}
-
-    # Add the values from each custom region to the converted_dict
-    for cz_number, cz_name in enumerate(cz_list):
-        # Create a copy of the input dict at the level below a census
-        # division or custom region (the structure below that level
-        # should be identical); uses the first census division in
-        # cd_list each time
-        base_dict = copy.deepcopy(input_dict[cd_list[0]])
-
-        # Loop through all census divisions to add their contributions
-        # to each custom region
-        for cd_name in cd_list:
-            # Proceed only if the census division name is found in
-            # the dict specified in this function, otherwise raise
-            # a KeyError
-            if cd_name in cd.cdivdict.keys():
-                # Obtain the census division number from the dict
-                # and subtract 1 to make the number usable as a list
-                # index (1st list element is indexed by 0 in Python)
-                cd_number = cd.cdivdict[cd_name] - 1
-
-                # Make a copy of the portion of the input dict
-                # corresponding to the current census division
-                add_dict = copy.deepcopy(input_dict[cd_name])
-
-                # Call the merge_sum function to replace base_dict with
-                # updated contents; add 1 to the custom region number
-                # because it will be used as a column index for an
-                # array where the first column of data are in the
-                # second column (indexed as 1 in Python); this approach
-                # overwrites base_dict, which is intentional because it
-                # is the master dict that stores the data on a custom
-                # region basis as the contribution from each census
-                # division is added to the custom region by merge_sum
-                base_dict = merge_sum(base_dict, add_dict, cd_number,
-                                      (cz_number + 1), cd.cdivdict, cd_list,
-                                      res_convert_array, com_convert_array)
-            else:
-                raise(KeyError("Census division name not found in dict keys!"))
-
-        # Once fully updated with the data from all census divisions,
-        # write the resulting data to a new variable and update the
-        # master dict with the data using the appropriate census
-        # division string name as the key
-        newadd = base_dict
-        converted_dict.update({cz_name: newadd})
+    # Obtain the census division numbers for each census division in
+    # the input data, subtracting 1 to make the numbers usable as
+    # conversion array row indices; raise a KeyError if a census
+    # division name is not found in the dict specified in this function
+    cd_numbers = []
+    for cd_name in cd_list:
+        if cd_name in cd.cdivdict.keys():
+            cd_numbers.append(cd.cdivdict[cd_name] - 1)
+        else:
+            raise(KeyError("Census division name not found in dict keys!"))
+
+    # Use the first census division in cd_list as the template for the
+    # structure below the census division or custom region level (the
+    # structure below that level should be identical)
+    base_dict = input_dict[cd_list[0]]
+
+    # Determine the conversion factors (residential or commercial, and
+    # electric or non-electric for EMM regions) that apply to each
+    # numeric value in the data
+    slot_factors = leaf_layout(base_dict, type(res_convert_array) is dict)
+
+    # Flatten the numeric values for all census divisions into a single
+    # (census divisions x values) array; each census division is
+    # traversed only once, regardless of the number of custom regions
+    cd_values = np.array([leaf_values(base_dict, input_dict[cd_name])
+                          for cd_name in cd_list], dtype="float64")
+
+    # Group the value positions by the conversion factors that apply
+    # to them
+    factor_slots = {}
+    for slot, factor_key in enumerate(slot_factors):
+        factor_slots.setdefault(factor_key, []).append(slot)
+
+    # Convert the values for each group of positions from a census
+    # division to a custom region basis
+    converted = np.zeros((len(slot_factors), len(cz_list)))
+    for (bldg_class, fuel_flag), slots in factor_slots.items():
+        # Select the conversion array for the building class (and the
+        # fuel type when converting to EMM regions) of the values
+        if bldg_class == "residential":
+            cd_to_cz_factor = res_convert_array
+        elif bldg_class == "commercial":
+            cd_to_cz_factor = com_convert_array
+        else:
+            cd_to_cz_factor = 0
+        if fuel_flag == "electricity":
+            cd_to_cz_factor = cd_to_cz_factor["electric"]
+        elif fuel_flag is not None:
+            cd_to_cz_factor = cd_to_cz_factor["non-electric"]
+
+        # Build a (census divisions x custom regions) matrix of
+        # conversion factors; add 1 to the custom region number because
+        # the first column of data is in the second column of the array
+        factor_matrix = np.array(
+            [[cd_to_cz_factor[cd_number][cz_number + 1]
+              for cz_number in range(len(cz_list))]
+             for cd_number in cd_numbers], dtype="float64")
+
+        # Multiply the values by the conversion matrix; the contribution
+        # from each census division is added in cd_list order
+        slots = np.array(slots)
+        group_values = cd_values[:, slots]
+        group_converted = group_values[0][:, None] * factor_matrix[0]
+        for cd_index in range(1, len(cd_list)):
+            group_converted = (group_converted + group_values[cd_index][
+                :, None] * factor_matrix[cd_index])
+        converted[slots] = group_converted
+
+    # Rebuild the dict structure once for all of the custom regions
+    # using the converted values and update the master dict with the
+    # data using the appropriate custom region string name as the key
+    region_dicts = leaf_rebuild(base_dict, converted, len(cz_list))[0]
+    converted_dict = dict(zip(cz_list, region_dicts))
 
     return converted_dict
 
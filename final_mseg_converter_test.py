@@ -6,13 +6,9 @@
 # Import code to be tested
 import final_mseg_converter as fmc
 
-# Import code with translation dicts
-import com_mseg as cm
-
 # Import needed packages
 import unittest
 import numpy as np
-import copy
 import itertools
 
 
@@ -167,140 +163,6 @@ class CommonUnitTest(unittest.TestCase):
         "non-electric": com_cd_cz_wtavg_array}
 
 
-class DataRestructuringFunctionTest(CommonUnitTest):
-    """ Test the operation of the function that calculates the
-    contribution of each census division to each climate zone """
-
-    # Create a sample dict that takes the form of the data provided
-    # within each census division (each climate zone will have the
-    # same keys and structure, but different numbers)
-    orig_input = {
-        'single family home': {
-            'new homes': {'2009': 111, '2010': 111, '2011': 111},
-            'total homes': {'2009': 222, '2010': 222, '2011': 222},
-            'square footage': {'2009': 333, '2010': 333, '2011': 333},
-            'electricity': {
-                'lighting': {
-                    'linear fluorescent': {
-                        'stock': {'2009': 13, '2010': 14, '2011': 15},
-                        'energy': {'2009': 16, '2010': 17, '2011': 18}}}}},
-        'mercantile/service': {
-            'total square footage': {'2009': 19, '2010': 21, '2011': 20},
-            'new square footage': {'2009': 6, '2010': 5, '2011': 4},
-            'electricity': {
-                'lighting': {
-                    'F96T8 HO_HB': {'2009': 0.3, '2010': 0.6, '2011': 0.7}}},
-            'natural gas': {
-                'water heating': {'2009': 20, '2010': 22, '2011': 23}}}}
-
-    # Specify the census divisions to be tested; more than one census
-    # divisions is tested here because the mathematical treatment of
-    # the first census division (in the order in which it appears in
-    # the census division list 'cd_list') to be added to a climate
-    # zone is different than subsequent climate zones
-    census_divisions = [1, 2]
-
-    # Specify the climate zones to be tested with the census divisions
-    # specified by 'census_divisions'
-    climate_zones = [1, 1]
-
-    # Create an instance of the CommericalTranslationDicts object from
-    # com_mseg, which includes dictionaries for converting between
-    # descriptive string keys for e.g., census divisions and the
-    # corresponding integer numeric values for those strings
-    cd = cm.CommercialTranslationDicts()
-
-    # List of census divisions typically derived from the top-level
-    # keys in the input JSON database
-    cd_list = ['new england', 'mid atlantic', 'east north central']
-
-    # List the dicts that should be produced from the inputs to the
-    # merge_sum function in the order in which they should be tested
-    # (i.e., matching the order of 'census_divisions' and 'climate_zones')
-    loutput = [
-        {'single family home': {
-            'new homes': {
-                '2009': 117.6489, '2010': 117.6489, '2011': 117.6489},
-            'total homes': {
-                '2009': 235.2978, '2010': 235.2978, '2011': 235.2978},
-            'square footage': {
-                '2009': 352.9467, '2010': 352.9467, '2011': 352.9467},
-            'electricity': {
-                'lighting': {
-                    'linear fluorescent': {
-                        'energy': {
-                            '2009': 16.9584,
-                            '2010': 18.0183,
-                            '2011': 19.0782},
-                        'stock': {
-                            '2009': 13.7787,
-                            '2010': 14.8386,
-                            '2011': 15.8985}}}}},
-         'mercantile/service': {
-            'total square footage': {
-                '2009': 21.9374, '2010': 24.2466, '2011': 23.092},
-            'new square footage': {
-                '2009': 6.9276, '2010': 5.773, '2011': 4.6184},
-            'electricity': {
-                'lighting': {
-                    'F96T8 HO_HB': {
-                        '2009': 0.3464, '2010': 0.6928, '2011': 0.8082}}},
-            'natural gas': {
-                'water heating': {
-                    '2009': 23.092, '2010': 25.401, '2011': 26.556}}}},
-        {'single family home': {
-            'new homes': {
-                '2009': 128.2494, '2010': 128.2494, '2011': 128.2494},
-            'total homes': {
-                '2009': 256.4988, '2010': 256.4988, '2011': 256.4988},
-            'square footage': {
-                '2009': 384.7482, '2010': 384.7482, '2011': 384.7482},
-            'electricity': {
-                'lighting': {
-                    'linear fluorescent': {
-                        'energy': {
-                            '2009': 18.4864,
-                            '2010': 19.6418,
-                            '2011': 20.7972},
-                        'stock': {
-                            '2009': 15.0202,
-                            '2010': 16.1756,
-                            '2011': 17.331}}}}},
-         'mercantile/service': {
-            'natural gas': {
-                'water heating': {
-                    '2009': 25.336, '2010': 27.8696, '2011': 29.1363}},
-            'total square footage': {
-                '2009': 24.0692, '2010': 26.6028, '2011': 25.336},
-            'new square footage': {
-                '2009': 7.6008, '2010': 6.334, '2011': 5.0672},
-            'electricity': {
-                'lighting': {
-                    'F96T8 HO_HB': {
-                        '2009': 0.38, '2010': 0.7601, '2011': 0.8866}}}}}]
-
-    def test_conversion_calculation_for_individual_cz_cd_combinations(self):
-        for idx, _ in enumerate(self.census_divisions):
-            # Since the merge_sum function recursively operates on
-            # 'base_input', make the two required copies to serve as
-            # the inputs for testing purposes to ensure that all tests
-            # start with the same input data
-            base_input = copy.deepcopy(self.orig_input)
-            add_input = copy.deepcopy(self.orig_input)
-
-            # Call the function to be tested
-            result = fmc.merge_sum(base_input,
-                                   add_input,
-                                   self.census_divisions[idx],
-                                   self.climate_zones[idx],
-                                   self.cd.cdivdict,
-                                   self.cd_list,
-                                   self.res_cd_cz_array,
-                                   self.com_cd_cz_array)
-
-            self.dict_check(result, self.loutput[idx])
-
-
 class ToClimateZoneConversionTest(CommonUnitTest):
     """ Test the operation of the full climate conversion function
     operating over multiple census divisions to convert the data to a
@@ -882,6 +744,32 @@ class ToClimateZoneConversionTest(CommonUnitTest):
                                 '2010': 3,
                                 '2011': 3}}}}}}}
 
+    # Create a sample input dict that will trigger KeyError exceptions
+    # because the census divisions do not share the same structure
+    test_mismatch_input = {
+        'new england': {
+            'single family home': {
+                'electricity': {
+                    'lighting': {
+                        'linear fluorescent': {
+                            'stock': {
+                                '2009': 1,
+                                '2010': 1,
+                                '2011': 1},
+                            'energy': {
+                                '2009': 1,
+                                '2010': 1,
+                                '2011': 1}}}}}},
+        'mid atlantic': {
+            'single family home': {
+                'electricity': {
+                    'lighting': {
+                        'linear fluorescent': {
+                            'stock': {
+                                '2009': 2,
+                                '2010': 2,
+                                '2011': 2}}}}}}}
+
     # Create an expected output dict of energy, square footage, and
     # stock data structured by climate zone
     test_energy_stock_output = {
@@ -1807,6 +1695,14 @@ class ToClimateZoneConversionTest(CommonUnitTest):
                                self.res_cd_cz_array,
                                self.com_cd_cz_array)
 
+    # Check census divisions with mismatched structures to verify that
+    # the appropriate error is raised
+    def test_census_division_structure_mismatch_error_handling(self):
+        with self.assertRaises(KeyError):
+            fmc.clim_converter(self.test_mismatch_input,
+                               self.res_cd_cz_array,
+                               self.com_cd_cz_array)
+
 
 class EnvelopeDataUnitTest(CommonUnitTest):
     """ Set up a CommonUnitTest subclass with additional data to be
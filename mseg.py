@@ -6,6 +6,8 @@ import json
 import argparse
 import csv
 import mseg_techdata as rmt
+from data_store import text_lines, fill_struct_array, text_array_key, \
+    read_array_cache, write_array_cache, group_rows
 
 
 class EIAData(object):
@@ -338,7 +340,135 @@ def thermal_load_select(tl_data, sel):
     return tloads_component
 
 
-def nrg_stock_select(data, sel):
+class NrgStockIndex(object):
+    """Grouped index of the rows in the EIA AEO energy and stock data.
+
+    The rows of the AEO data array are grouped once by end use, census
+    division, building type, and fuel type (and within those groups,
+    by equipment class and lighting bulb type) so that the rows for
+    any microsegment can be found with dict lookups instead of a
+    full scan of the array. The year sums for each selection are
+    computed once and reused for subsequent requests.
+
+    Attributes:
+        data (numpy.ndarray): An array of AEO energy, equipment stock,
+            and household count data given by microsegment.
+        groups (dict): Row indices (in ascending order) for each
+            (end use, census division, building type, fuel type) key,
+            further keyed by None for all of the rows in the group,
+            by equipment class, and by (equipment class, bulb type).
+        sums (dict): Energy and stock dicts already computed for each
+            selection key.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.groups = {}
+        self.sums = {}
+
+        # Group the rows by end use, census division, building type, and
+        # fuel type, and break out the rows in each group by equipment
+        # class and, where reported, by equipment class and bulb type
+        # (bulb types are only reported in data that include lighting)
+        for key, rows in group_rows(
+                data, ['ENDUSE', 'CDIV', 'BLDG', 'FUEL']).items():
+            group = {None: rows}
+            group.update({eqp[0]: eqp_rows for eqp, eqp_rows in group_rows(
+                data, ['EQPCLASS'], rows).items()})
+            if 'BULBTYPE' in data.dtype.names:
+                group.update(group_rows(data, ['EQPCLASS', 'BULBTYPE'], rows))
+            self.groups[key] = group
+
+    def rows(self, sel):
+        """Find the data array rows that correspond to a microsegment
+
+        The rows are returned in the same order in which they would be
+        found by successively masking the full array by census division
+        and building type, then by each end use, then by each fuel type.
+
+        Args:
+            sel (list): A nested list of indices for selecting the
+                relevant data, created by json_translator.
+
+        Returns:
+            A numpy array of row indices into the AEO data array.
+        """
+
+        # Multiple end uses and fuel types can be provided
+        enduses = sel[0][0]
+        if not isinstance(enduses, (list, tuple)):
+            enduses = [enduses]
+        fuels = sel[0][3]
+        if not isinstance(fuels, (list, tuple)):
+            fuels = [fuels]
+
+        # If an equipment class (and for lighting, a bulb type) is
+        # specified, select only the rows for that class
+        try:
+            eqp = sel[0][4]
+        except IndexError:
+            eqp = False
+        if not eqp:
+            eqp = None
+
+        row_sets = []
+        for fuel in fuels:
+            for enduse in enduses:
+                group = self.groups.get((enduse, sel[0][1], sel[0][2], fuel))
+                if group is not None and eqp in group:
+                    row_sets.append(group[eqp])
+
+        if not row_sets:
+            return numpy.array([], dtype=int)
+        return numpy.concatenate(row_sets)
+
+    def select(self, sel):
+        """Obtain the energy and stock data by year for a microsegment
+
+        Args:
+            sel (list): A nested list of indices for selecting the
+                relevant data, created by json_translator.
+
+        Returns:
+            A dict for energy and a dict for stock data, with keys for
+            each year of available data for the specified microsegment.
+        """
+
+        # Convert the selection to a hashable key
+        sel_key = tuple(tuple(x) if isinstance(x, list) else x
+                        for x in sel[0])
+
+        if sel_key not in self.sums:
+            rows = self.rows(sel)
+
+            # Identify the unique years in the order in which they
+            # first appear in the selected rows
+            years, first, inverse = numpy.unique(
+                self.data['YEAR'][rows], return_index=True,
+                return_inverse=True)
+            year_order = numpy.argsort(first)
+
+            # Sum the values for each year starting from the first row
+            # for that year and adding the remaining rows in order
+            # (matching the order of a row by row summation)
+            later = numpy.ones(len(rows), dtype=bool)
+            later[first] = False
+            sums = []
+            for col in ['CONSUMPTION', 'EQSTOCK']:
+                values = self.data[col][rows]
+                col_sum = values[first]
+                numpy.add.at(col_sum, inverse[later], values[later])
+                # Convert the numeric years to strings to be compatible
+                # with valid JSON
+                sums.append([(str(years[i]), col_sum[i])
+                             for i in year_order])
+            self.sums[sel_key] = sums
+
+        group_energy, group_stock = self.sums[sel_key]
+        return dict(group_energy), dict(group_stock)
+
+
+def nrg_stock_select(data, sel, index=None):
     """Extract and restructure energy and stock data for a microsegment
 
     For the specific microsegment identified by 'sel,' this function
@@ -355,81 +485,20 @@ def nrg_stock_select(data, sel):
             and household count data given by microsegment.
         sel (list): A nested list of indices for selecting the relevant
             data, created by json_translator.
+        index (NrgStockIndex, optional): A grouped index of 'data'; if
+            not provided, the index is built for this call only.
 
     Returns:
         A dict for energy and a dict for stock data, with keys for
         each year of available data for the specified microsegment.
     """
 
-    # Define initial stock and energy dicts
-    group_stock = {}
-    group_energy = {}
-
-    # Select data for the specified census division and building type
-    data_sel = data[numpy.all([data['CDIV'] == sel[0][1],
-                               data['BLDG'] == sel[0][2]], axis=0)]
-
-    # Multiple end uses can be provided, but try first to see if only
-    # one end use is provided; if not, select data for all of the
-    # end uses given
-    try:
-        data_sel = data_sel[numpy.all(
-            [data_sel['ENDUSE'] == sel[0][0]], axis=0)]
-    except ValueError:
-        data_sel = data_sel[numpy.hstack([numpy.where(
-            data_sel['ENDUSE'] == i) for i in sel[0][0]]).flatten()]
-
-    # Multiple fuel types can be provided, but try first to see if only
-    # one fuel type is provided and if not, use a different approach to
-    # select data for all of the fuel types indicated
-    try:
-        data_sel = data_sel[numpy.all(
-            [data_sel['FUEL'] == sel[0][3]], axis=0)]
-    except ValueError:
-        data_sel = data_sel[numpy.hstack([numpy.where(
-            data_sel['FUEL'] == i) for i in sel[0][3]]).flatten()]
-
-    # If an equipment class is specified, select the subset of
-    # applicable data as appropriate
-    try:
-        eqp = sel[0][4]
-    except IndexError:
-        eqp = False
-
-    if eqp:
-        if isinstance(eqp, tuple):  # Lighting
-            data_sel = data_sel[
-                numpy.all([data_sel['EQPCLASS'] == eqp[0],
-                           data_sel['BULBTYPE'] == eqp[1]], axis=0)]
-        else:  # Other end uses
-            data_sel = data_sel[
-                numpy.all([data_sel['EQPCLASS'] == eqp], axis=0)]
-
-    # Loop through the reduced numpy stock and energy array and
-    # combine the reported values together
-    for idx, row in enumerate(data_sel):
-        # If data for the year is already present for the current
-        # microsegment (as with microsegments that combine several
-        # EIA categories together), add the new stock and consumption
-        # values to the existing values (assume that if the year is
-        # present in the group_stock dict it is also in group_energy)
-        if row['YEAR'] in group_stock:
-            # Record energy consumption and stock information
-            # (change the year to a string to yield a valid
-            # JSON dict, where all keys must be strings)
-            group_stock[row['YEAR']] += row['EQSTOCK']
-            group_energy[row['YEAR']] += row['CONSUMPTION']
-
-        else:
-            group_stock[row['YEAR']] = row['EQSTOCK']
-            group_energy[row['YEAR']] = row['CONSUMPTION']
-
-    # Convert the numeric year keys in the energy and stock dicts
-    # to strings to be compatible with valid JSON
-    group_stock = {str(key): value for key, value in group_stock.items()}
-    group_energy = {str(key): value for key, value in group_energy.items()}
+    # Build the grouped index of the data if it is not shared across
+    # calls (as it is when walking the full microsegments structure)
+    if index is None:
+        index = NrgStockIndex(data)
 
-    return group_energy, group_stock
+    return index.select(sel)
 
 
 def sqft_homes_select(data, sel):
@@ -495,7 +564,8 @@ def sqft_homes_select(data, sel):
     return group_out
 
 
-def list_generator(nrg_stock, tloads, filterdata, aeo_years, lt_factors):
+def list_generator(nrg_stock, tloads, filterdata, aeo_years, lt_factors,
+                   nrg_stock_index=None):
     """Extract the desired energy, equipment stock, or household count data
 
     Given the data to be obtained, indicated by the keys from the
@@ -520,6 +590,8 @@ def list_generator(nrg_stock, tloads, filterdata, aeo_years, lt_factors):
         lt_factors (numpy.ndarray): A numpy structured array with
             lighting efficiency and stock weighted factors to be used
             to break out the lighting energy use data by bulb type.
+        nrg_stock_index (NrgStockIndex, optional): A grouped index of
+            'nrg_stock' shared across calls to this function.
 
     Returns:
         In general, this function returns stock and energy dicts,
@@ -570,7 +642,7 @@ def list_generator(nrg_stock, tloads, filterdata, aeo_years, lt_factors):
         # Find baseline heating or cooling energy microsegment (before
         # application of load component); establish reduced numpy array
         group_energy_base, group_stock = nrg_stock_select(
-            nrg_stock, txt_filter)
+            nrg_stock, txt_filter, nrg_stock_index)
 
         # Given the discovered lists of energy/stock values, ensure
         # length is equal to the number of years currently projected
@@ -624,14 +696,14 @@ def list_generator(nrg_stock, tloads, filterdata, aeo_years, lt_factors):
             if addl_txt_filter:
                 # Get the lighting energy data
                 group_energy, _ = nrg_stock_select(
-                    nrg_stock, addl_txt_filter)
+                    nrg_stock, addl_txt_filter, nrg_stock_index)
 
                 # Get the lighting stock data
                 _, group_stock = nrg_stock_select(
-                    nrg_stock, txt_filter)
+                    nrg_stock, txt_filter, nrg_stock_index)
             else:
                 group_energy, group_stock = nrg_stock_select(
-                    nrg_stock, txt_filter)
+                    nrg_stock, txt_filter, nrg_stock_index)
 
             # Obtain the applicable lighting energy correction factors
             lt_correction = lt_factors[numpy.all(
@@ -654,7 +726,7 @@ def list_generator(nrg_stock, tloads, filterdata, aeo_years, lt_factors):
             # energy/stock projection lists and reduced numpy array
             # (with matched rows removed)
             group_energy, group_stock = nrg_stock_select(
-                nrg_stock, txt_filter)
+                nrg_stock, txt_filter, nrg_stock_index)
 
         # Given the discovered lists of energy/stock values, ensure
         # length is equal to the number of years currently projected
@@ -667,7 +739,8 @@ def list_generator(nrg_stock, tloads, filterdata, aeo_years, lt_factors):
         return {'stock': group_stock, 'energy': group_energy}
 
 
-def walk(nrg_stock, loads, json_dict, yrs_range, lt_factors, key_list=[]):
+def walk(nrg_stock, loads, json_dict, yrs_range, lt_factors, key_list=[],
+         nrg_stock_index=None):
     """Recursively traverse the input dict and obtain the corresponding data
 
     This function recursively explores the microsegments JSON key
@@ -691,6 +764,8 @@ def walk(nrg_stock, loads, json_dict, yrs_range, lt_factors, key_list=[]):
         key_list (list): A list of keys corresponding to the current
             location in the dict, ultimately indicating the data to
             extract from the applicable input file(s).
+        nrg_stock_index (NrgStockIndex, optional): A grouped index of
+            'nrg_stock' used to look up the data for each leaf node.
 
     Returns:
         The fully populated JSON file (as a nested dict) to be output
@@ -704,7 +779,7 @@ def walk(nrg_stock, loads, json_dict, yrs_range, lt_factors, key_list=[]):
         # again to advance another level deeper into the data structure
         if isinstance(item, dict):
             walk(nrg_stock, loads, item, yrs_range,
-                 lt_factors, key_list + [key])
+                 lt_factors, key_list + [key], nrg_stock_index)
 
         # If a leaf node has been reached, check if the second entry in
         # the key list is one of the recognized building types, and if
@@ -716,7 +791,8 @@ def walk(nrg_stock, loads, json_dict, yrs_range, lt_factors, key_list=[]):
 
                 # Extract data from original data sources
                 data_dict = list_generator(nrg_stock, loads, leaf_node_keys,
-                                           yrs_range, lt_factors)
+                                           yrs_range, lt_factors,
+                                           nrg_stock_index)
 
                 # Set dict key to extracted data
                 json_dict[key] = data_dict
@@ -1143,13 +1219,16 @@ def dtype_array(data_file_path, delim_char=',', hl=None):
         return comb_dtypes
 
 
-def data_import(data_file_path, dtype_list, delim_char=',', skip_rows=[]):
+def data_import(data_file_path, dtype_list, delim_char=',', skip_rows=[],
+                cache=False):
     """Import data and convert to a numpy structured array.
 
     Read the contents of a data file with a header line and convert
     it into a numpy structured array using the provided dtype definition.
     If specified, also skip lines that have values in the first column
-    indicated by 'skip_rows.'
+    indicated by 'skip_rows.' The file is read in a single pass and the
+    rows are converted a chunk at a time, which limits memory use for
+    the large AEO data files.
 
     Args:
         data_file_path (str): The full path to the data file to be imported.
@@ -1159,12 +1238,32 @@ def data_import(data_file_path, dtype_list, delim_char=',', skip_rows=[]):
         delim_char (str, optional): The delimiting character, defaults to ','.
         skip_rows (list): A list of strings, one of which will appear
             in the first column of each row to be skipped.
+        cache (bool, optional): If True, reuse (or write) a binary copy
+            of the imported data stored next to the file, keyed by the
+            file contents, the import settings, and the importer version.
 
     Returns:
         A numpy structured array of the imported data file with the
         columns specified by dtype_list.
     """
 
+    # Use the binary copy of the data imported previously, if the file
+    # contents and import settings are unchanged
+    if cache:
+        cache_key = text_array_key(data_file_path, [
+            dtype_list, delim_char, list(skip_rows)])
+        final_struct = read_array_cache(data_file_path, cache_key)
+        if final_struct is not None:
+            return final_struct
+
+    def fix_consumption_dtype(chunk, dtype_list):
+        """Update the consumption column data type to float."""
+        # In the 2017 AEO data, some consumption data are reported
+        # as floating point numbers on the 0.5 for some reason;
+        # update the dtype for that column to float
+        dtype_list[7] = (dtype_list[7][0], 'f8')
+        return chunk, dtype_list
+
     # Open the target CSV formatted data file
     with open(data_file_path) as thefile:
 
@@ -1172,20 +1271,10 @@ def data_import(data_file_path, dtype_list, delim_char=',', skip_rows=[]):
         # quotechar '"' is appropriate; the skipinitialspace option
         # ensures proper reading of double-quoted text strings in the
         # AEO data that have the delimiter inside them (e.g., cooking
-        # equipment descriptions); the loop which csv.reader is called
-        # is used to detect NULL characters and act appropriately (by
-        # removing them prior to converting to a csv.reader object)
-        # if they are encountered
-        if '\0' in open(data_file_path).read():  # NULL bytes detected
-            filecont = csv.reader((x.replace('\0', '') for x in thefile),
-                                  delimiter=delim_char, skipinitialspace=True)
-        else:  # No NULL bytes, proceed normally
-            filecont = csv.reader(thefile,
-                                  delimiter=delim_char, skipinitialspace=True)
-
-        # Create list to be populated with tuples of each row of data
-        # from the data file
-        data = []
+        # equipment descriptions); any NULL characters are removed
+        # from the lines as the file is read
+        filecont = csv.reader(text_lines(thefile), delimiter=delim_char,
+                              skipinitialspace=True)
 
         # Skip first line of the file
         next(filecont)
@@ -1197,28 +1286,21 @@ def data_import(data_file_path, dtype_list, delim_char=',', skip_rows=[]):
         # expected based on the dtype, add a sufficient number of 0
         # values to complete the line (0 values are added since they
         # can be coerced to strings or floats and empty strings cannot)
-        for row in filecont:
-            if row[0].strip() not in skip_rows:
-                if len(tuple(row)) != len(dtype_list):
-                    row = row + [0]*(len(dtype_list)-len(row))
-                data.append(tuple(row))
-
-        # Convert data into numpy structured array, using a try/catch
-        # for the case where the data type for a particular column
-        # is not identified correctly by the dtype_array function
-        try:
-            final_struct = numpy.array(data, dtype=dtype_list)
-        # Target error "ValueError: invalid literal for int() with base 10: ''"
-        except ValueError:
-            # In the 2017 AEO data, some consumption data are reported
-            # as floating point numbers on the 0.5 for some reason;
-            # update the dtype for that column to float
-            dtype_list[7] = (dtype_list[7][0], 'f8')
+        rows = (tuple(row) if len(row) == len(dtype_list) else
+                tuple(row + [0]*(len(dtype_list)-len(row)))
+                for row in filecont if row[0].strip() not in skip_rows)
+
+        # Convert the data into a numpy structured array a chunk of
+        # rows at a time, updating the data type of the consumption
+        # column for the case where it is not identified correctly
+        # by the dtype_array function (target error "ValueError:
+        # invalid literal for int() with base 10: ''")
+        final_struct = fill_struct_array(rows, dtype_list,
+                                         fix_consumption_dtype)
 
-            # With the '' strings replaced with integer coercible
-            # values, create the numpy array as originally desired
-            final_struct = numpy.array(data, dtype=dtype_list)
-        return final_struct
+    if cache:
+        write_array_cache(data_file_path, cache_key, final_struct)
+    return final_struct
 
 
 def str_cleaner(data_array, column_name):
@@ -1359,7 +1441,7 @@ def main():
         # Import EIA RESDBOUT.txt energy use and stock file
         ns_dtypes = dtype_array(eiadata.res_energy, '\t')
         ns_data = data_import(eiadata.res_energy, ns_dtypes, '\t',
-                              ['SF', 'ST', 'FP'])
+                              ['SF', 'ST', 'FP'], cache=True)
     else:
         yrs_range = metajson['max year'] - metajson['min year'] + 1
         lt_skip_header = 37
@@ -1374,7 +1456,7 @@ def main():
         ns_dtypes = dtype_array(eiadata.res_energy)
         ns_data = data_import(eiadata.res_energy, ns_dtypes, ',',
                               ['SF', 'ST', 'FP', 'HSHE', 'HSHN',
-                               'HSHA', 'CSHA', 'CSHE', 'CSHN'])
+                               'HSHA', 'CSHA', 'CSHE', 'CSHN'], cache=True)
 
     # THIS APPROACH MAY NEED TO BE REVISITED IN THE FUTURE; AS IS,
     # IT DOES NOT ENSURE CONSISTENCY WITH THE OTHER AEO INPUT DATA
@@ -1388,7 +1470,7 @@ def main():
 
     # Import residential thermal load components data
     tl_dtypes = dtype_array(handyvars.res_tloads, '\t')
-    tl_data = data_import(handyvars.res_tloads, tl_dtypes, '\t')
+    tl_data = data_import(handyvars.res_tloads, tl_dtypes, '\t', cache=True)
 
     # Explicitly define the lighting data type (note that special)
     eia_lt_dtype = [('FirstYear', 'i4'), ('LastYear', 'i4'), ('Cost', 'f8'),
@@ -1443,7 +1525,10 @@ def main():
 
         # Run through JSON objects, determine replacement information
         # to mine from the imported data, and make the replacements
-        result = walk(ns_data, tl_data, msjson, yrs_range, lt_wt_fac)
+        # (group the energy and stock data by microsegment once, rather
+        # than searching the full array for each leaf node)
+        result = walk(ns_data, tl_data, msjson, yrs_range, lt_wt_fac,
+                      nrg_stock_index=NrgStockIndex(ns_data))
 
         # Write the updated dict of data to a new JSON file
         json.dump(result, jso, indent=2, default=fix_ints)
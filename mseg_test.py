@@ -390,6 +390,20 @@ class NumpyArrayReductionTest(unittest.TestCase):
             # Compare consumption
             self.assertEqual(b, self.EIA_nrg_stock_out[n][1])
 
+    # Test that data selected using an index of the EIA data shared
+    # across calls (and reused for repeated selections) are correct
+    def test_recording_of_EIA_data_tech_indexed(self):
+        index = rm.NrgStockIndex(self.EIA_nrg_stock)
+        for _ in range(2):
+            for n in range(0, len(self.EIA_nrg_stock_filter)):
+                (a, b) = rm.nrg_stock_select(self.EIA_nrg_stock,
+                                             self.EIA_nrg_stock_filter[n],
+                                             index)
+                # Compare equipment stock
+                self.assertEqual(a, self.EIA_nrg_stock_out[n][0])
+                # Compare consumption
+                self.assertEqual(b, self.EIA_nrg_stock_out[n][1])
+
     # Test restructuring of EIA data into a square footage list, confirming
     # that both the reported data and the reduced array with the remaining
     # data are correct
@@ -2,18 +2,20 @@
 import json
 import numpy
 import copy
-from numpy.linalg import LinAlgError
 from collections import OrderedDict
-import gzip
-import pickle
-from os import getcwd, path, pathsep, sep, environ, walk, devnull
+from os import getcwd, path, pathsep, sep, environ, walk, devnull, makedirs
 from ast import literal_eval
 import math
 from argparse import ArgumentParser
 import subprocess
 import sys
+import multiprocessing
 import warnings
+import hashlib
 import numpy_financial as npf
+from data_store import read_compete_data, hash_compete_data, \
+    read_cache_entry, write_cache_entry, write_json_chunks, \
+    write_result_columns, MarketArray, ContributingMsegs
 
 
 class UsefulInputFiles(object):
@@ -37,9 +39,12 @@ class UsefulInputFiles(object):
         self.meas_summary_data = \
             ("supporting_data", "ecm_prep.json")
         self.meas_compete_data = ("supporting_data", "ecm_competition_data")
+        self.compete_cache = ("supporting_data", "ecm_competition_cache")
         self.active_measures = "run_setup.json"
         self.meas_engine_out_ecms = ("results", "ecm_results.json")
         self.meas_engine_out_agg = ("results", "agg_results.json")
+        self.meas_engine_out_columns = ("results", "ecm_results.npz")
+        self.sweep_results = ("results", "sweep")
         # Set heating/cooling energy totals file conditional on: 1) regional
         # breakout used, and 2) whether site energy data, source energy data
         # (fossil equivalent site-source conversion), or source energy data
@@ -97,6 +102,8 @@ class UsefulVars(object):
             the building sector categories used in summarizing measure outputs.
         out_break_enduses (OrderedDict): Maps measure end use names to
             the end use categories used in summarizing measure outputs.
+        out_break_axes (list): Names of the levels of measure outputs broken
+            out by climate zone, building sector, and end use category.
         regions (str): Regions to use in geographically breaking out the data.
         region_check (dict): Acceptable input names for each region set.
         region_inout_namepairs (dict): Input/output region name pairs.
@@ -193,6 +200,8 @@ class UsefulVars(object):
             ('Other', [
                 "cooking", "drying", "ceiling fan", "fans & pumps",
                 "MELs", "other"])])
+        self.out_break_axes = [
+            "climate zone", "building sector", "end use", "year"]
 
 
 class Measure(object):
@@ -210,15 +219,21 @@ class Measure(object):
                microsegment (required later for measure competition).
             c) 'mseg_out_break': master microsegment breakdowns by key
                variables (e.g., climate zone, building type, end use, etc.)
+            Data are further grouped into 'uncompeted' and 'competed'
+            versions, where the latter shares values with the former until
+            they are adjusted by measure competition.
         savings (dict): Energy, carbon, and stock, energy, and carbon cost
             savings for measure over baseline technology case.
         portfolio_metrics (dict): Financial metrics relevant to assessing a
             large portfolio of efficiency measures (e.g., CCE, CCC).
         consumer_metrics (dict): Financial metrics relevant to the adoption
             decisions of individual consumers (e.g., unit costs, IRR, payback).
+        data_hash (string): Hash of the measure's prepared data, used to
+            reuse cached competition results (None if not set).
     """
 
     def __init__(self, handyvars, **kwargs):
+        self.data_hash = None
         # Read Measure object attributes from measures input JSON
         for key, value in kwargs.items():
             setattr(self, key, value)
@@ -232,10 +247,12 @@ class Measure(object):
         self.convert_to_numpy(self.markets)
         for adopt_scheme in handyvars.adopt_schemes:
             # Initialize 'uncompeted' and 'competed' versions of
-            # Measure markets (initially, they are identical)
+            # Measure markets (initially, they are identical); the 'competed'
+            # version shares all values with the 'uncompeted' version until
+            # measure competition adjusts them
             self.markets[adopt_scheme] = {
-                "uncompeted": copy.deepcopy(self.markets[adopt_scheme]),
-                "competed": copy.deepcopy(self.markets[adopt_scheme])}
+                "uncompeted": self.markets[adopt_scheme],
+                "competed": self.share_markets(self.markets[adopt_scheme])}
             self.update_results["savings and portfolio metrics"][
                 adopt_scheme] = {"uncompeted": True, "competed": True}
             self.savings[adopt_scheme] = {
@@ -297,6 +314,63 @@ class Measure(object):
                 "payback (w/ energy costs)": None,
                 "payback (w/ energy and carbon costs)": None}
 
+    def share_markets(self, markets):
+        """Copy the nested dict structure of measure markets, sharing values.
+
+        Notes:
+            Values at terminal/leaf nodes (e.g., numpy arrays) are shared
+            with the input dict rather than copied. The analysis engine
+            replaces (rather than modifies in place) any values that it
+            adjusts, such that only the adjusted values of the copy take up
+            additional memory.
+
+        Args:
+            markets (dict): Input dict of measure markets.
+
+        Returns:
+            Copy of the input dict that shares its terminal/leaf values.
+        """
+        markets_copy = markets.copy()
+        for (k, i) in markets_copy.items():
+            if isinstance(i, dict):
+                markets_copy[k] = self.share_markets(i)
+        return markets_copy
+
+    def clone(self):
+        """Copy a measure that has not yet been run for separate analyses.
+
+        Notes:
+            Uncompeted markets, which the analysis engine does not change,
+            are shared with the copy. The copy's competed markets have their
+            own nested dicts, but share the values in those dicts with the
+            measure (see 'share_markets'); measure competition replaces
+            rather than modifies these values, such that adjusting the
+            copy's competed markets leaves those of the measure unchanged.
+            Competition data (whose nested dicts measure competition
+            updates), savings, metrics, and update flags are copied.
+
+        Returns:
+            Copy of the measure that may be run independently.
+        """
+        m = copy.copy(self)
+        m.markets = {}
+        for adopt_scheme, mkts in self.markets.items():
+            m.markets[adopt_scheme] = {
+                "uncompeted": mkts["uncompeted"],
+                "competed": self.share_markets({
+                    k: v for k, v in mkts["competed"].items() if
+                    k != "mseg_adjust"})}
+            if "mseg_adjust" in mkts["competed"].keys():
+                m.markets[adopt_scheme]["competed"]["mseg_adjust"] = {
+                    k: (v.copy() if isinstance(v, ContributingMsegs) else
+                        copy.deepcopy(v)) for k, v in mkts["competed"][
+                        "mseg_adjust"].items()}
+        m.savings, m.portfolio_metrics, m.consumer_metrics, \
+            m.update_results = copy.deepcopy([
+                self.savings, self.portfolio_metrics, self.consumer_metrics,
+                self.update_results])
+        return m
+
     def convert_to_numpy(self, markets):
         """Convert terminal/leaf node lists in a dict to numpy arrays.
 
@@ -322,11 +396,17 @@ class Engine(object):
         output_all (OrderedDict): Summary results across all active measures;
             also stores data on energy output type (site, source (fossil
             equivalent site-source) or source (captured energy site-source).
+        compete_log (list): Adjustments to measure totals recorded (rather
+            than applied) when measures are competed in a worker process.
+        compete_cache (string): Directory of cached competition results by
+            group of contributing microsegments (None if not cached).
     """
 
     def __init__(self, handyvars, measure_objects, energy_out):
         self.handyvars = handyvars
         self.measures = measure_objects
+        self.compete_log = None
+        self.compete_cache = None
         self.output_ecms, self.output_all = (OrderedDict() for n in range(2))
         self.output_all["All ECMs"] = OrderedDict([
             ("Markets and Savings (Overall)", OrderedDict())])
@@ -403,6 +483,88 @@ class Engine(object):
                 self.output_ecms[m.name]["Financial Metrics"][
                     "Portfolio Level"][adopt_scheme] = OrderedDict()
 
+    def run_scheme(self, adopt_scheme, htcl_totals, workers=None):
+        """Calculate measure savings, metrics, and outputs for a scheme.
+
+        Args:
+            adopt_scheme (string): Assumed consumer adoption scenario.
+            htcl_totals (dict): Heating/cooling energy totals by climate
+                zone, building type, and structure type.
+            workers (int): Number of processes to use in competing measures.
+        """
+        # Calculate each measure's uncompeted savings and metrics,
+        # and print progress update to user
+        print("Calculating uncompeted '" + adopt_scheme +
+              "' savings/metrics...", end="", flush=True)
+        self.calc_savings_metrics(adopt_scheme, "uncompeted")
+        print("Calculations complete")
+        # Update each measure's competed markets to reflect the
+        # removal of savings overlaps with competing measures,
+        # and print progress update to user
+        print("Competing ECMs for '" + adopt_scheme + "' scenario...",
+              end="", flush=True)
+        self.compete_measures(adopt_scheme, htcl_totals, workers=workers)
+        print("Competition complete")
+        # Calculate each measure's competed measure savings and metrics
+        # using updated competed markets, and print progress update to user
+        print("Calculating competed '" + adopt_scheme +
+              "' savings/metrics...", end="", flush=True)
+        self.calc_savings_metrics(adopt_scheme, "competed")
+        print("Calculations complete")
+        # Write selected outputs to a summary JSON file for post-processing
+        self.finalize_outputs(adopt_scheme)
+
+    def run_schemes(self, htcl_totals):
+        """Calculate outputs for all adoption schemes in worker processes.
+
+        Notes:
+            Each adoption scheme is run in a forked worker process that
+            shares the measure data with all other workers copy-on-write
+            (measure data for each scheme are independent of those for the
+            other schemes). The outputs for each scheme are then merged into
+            the 'output_ecms' and 'output_all' attributes. Consumer-level
+            financial metrics are finalized with the uncompeted savings and
+            metrics of the first adoption scheme in serial execution, and are
+            used in competing measures under all later schemes; these savings
+            and metrics are therefore calculated before the workers are
+            forked. Measures are competed serially within each worker.
+
+        Args:
+            htcl_totals (dict): Heating/cooling energy totals by climate
+                zone, building type, and structure type.
+        """
+        # Finalize consumer-level financial metrics under the first adoption
+        # scheme, as in serial execution, such that all workers inherit them
+        self.calc_savings_metrics(
+            self.handyvars.adopt_schemes[0], "uncompeted")
+        # Register the engine and heating/cooling totals as module-level
+        # variables that are shared with the forked worker processes without
+        # being pickled
+        global _scheme_shared
+        _scheme_shared = (self, htcl_totals)
+        try:
+            with multiprocessing.get_context("fork").Pool(
+                    len(self.handyvars.adopt_schemes)) as pool:
+                outputs = pool.map(scheme_worker, self.handyvars.adopt_schemes)
+        finally:
+            _scheme_shared = None
+        # Merge the outputs for each adoption scheme
+        for adopt_scheme, (out_ecms, out_all) in zip(
+                self.handyvars.adopt_schemes, outputs):
+            for m_name, out_m in out_ecms.items():
+                out = self.output_ecms[m_name]
+                out["Markets and Savings (Overall)"][adopt_scheme] = out_m[
+                    "Markets and Savings (Overall)"]
+                out["Markets and Savings (by Category)"][adopt_scheme] = \
+                    out_m["Markets and Savings (by Category)"]
+                out["Financial Metrics"]["Portfolio Level"][adopt_scheme] = \
+                    out_m["Portfolio Level"]
+                if adopt_scheme == self.handyvars.adopt_schemes[0]:
+                    out["Financial Metrics"]["Consumer Level"] = out_m[
+                        "Consumer Level"]
+            self.output_all["All ECMs"]["Markets and Savings (Overall)"][
+                adopt_scheme] = out_all
+
     def calc_savings_metrics(self, adopt_scheme, comp_scheme):
         """Calculate and update measure savings and financial metrics.
 
@@ -460,6 +622,10 @@ class Engine(object):
             # Set measure master microsegments for the current adoption and
             # competition schemes
             markets = m.markets[adopt_scheme][comp_scheme]["master_mseg"]
+            # Initialize financial metrics inputs across all projection years
+            # and the position of each year's inputs (None for years in
+            # which financial metrics are not calculated)
+            metric_in, metric_pos = [[] for n in range(11)], {}
 
             # Calculate measure capital cost savings, energy/carbon savings,
             # energy/carbon cost savings, and financial metrics for each
@@ -548,44 +714,26 @@ class Engine(object):
                 elif type(life_meas) != numpy.ndarray and life_meas < 1:
                     life_meas = 1
 
-                # Calculate measure financial metrics
+                # Collect measure financial metrics inputs, which are run
+                # through the 'metric_arrays' function for all years below
 
                 # Create short name for number of captured measure stock units
                 nunits_meas = markets["stock"]["total"]["measure"][yr]
                 # If the total baseline stock is zero or no measure units
-                # have been captured for a given year, set financial metrics
-                # to 999
+                # have been captured for a given year, financial metrics are
+                # set to 999 below
                 if nunits_tot[yr] == 0 or (
                     type(nunits_meas) != numpy.ndarray and nunits_meas < 1 or
                         type(nunits_meas) == numpy.ndarray and all(
                             nunits_meas) < 1):
-                    if yr == self.handyvars.aeo_years[0]:
-                        stock_unit_cost_res[yr], energy_unit_cost_res[yr], \
-                            carb_unit_cost_res[yr], stock_unit_cost_com[yr], \
-                            energy_unit_cost_com[yr], carb_unit_cost_com[yr], \
-                            irr_e[yr], irr_ec[yr], payback_e[yr], \
-                            payback_ec[yr], cce[yr], cce_bens[yr], \
-                            ccc[yr], ccc_bens[yr] = [999 for n in range(14)]
-                    else:
-                        yr_prev = str(int(yr) - 1)
-                        stock_unit_cost_res[yr], energy_unit_cost_res[yr], \
-                            carb_unit_cost_res[yr], stock_unit_cost_com[yr], \
-                            energy_unit_cost_com[yr], carb_unit_cost_com[yr], \
-                            irr_e[yr], irr_ec[yr], payback_e[yr], \
-                            payback_ec[yr], cce[yr], cce_bens[yr], \
-                            ccc[yr], ccc_bens[yr] = [x[yr_prev] for x in [
-                                stock_unit_cost_res, energy_unit_cost_res,
-                                carb_unit_cost_res, stock_unit_cost_com,
-                                energy_unit_cost_com, carb_unit_cost_com,
-                                irr_e, irr_ec, payback_e, payback_ec, cce,
-                                cce_bens, ccc, ccc_bens]]
+                    metric_pos[yr] = None
                 # Otherwise, check whether any financial metric calculation
                 # inputs that can be arrays are in fact arrays
                 elif any(type(x) == numpy.ndarray for x in [
                         scostmeas_delt, esave[yr], life_meas]):
                     # Make copies of the above stock, energy, carbon, and cost
                     # variables for possible further manipulation below before
-                    # using as inputs to the "metric update" function
+                    # using as inputs to the "metric_arrays" function
                     scostmeas_delt_tmp, esave_tmp, ecostsave_tmp, csave_tmp, \
                         ccostsave_tmp, life_meas_tmp, scost_meas_tmp, \
                         ecost_meas_tmp, ccost_meas_tmp = [
@@ -594,16 +742,16 @@ class Engine(object):
                             scost_meas_tot[yr], ecost_meas_tot[yr],
                             ccost_meas_tot[yr]]
 
-                    # Ensure consistency in length of all "metric_update"
+                    # Ensure consistency in length of all "metric_arrays"
                     # inputs that can be arrays
 
                     # Determine the length that any array inputs to
-                    # "metric_update" should consistently have
+                    # "metric_arrays" should consistently have
                     len_arr = next((len(item) for item in [
                         scostmeas_delt, esave_tot[yr], life_meas] if
                         type(item) == numpy.ndarray), None)
 
-                    # Ensure all array inputs to "metric_update" are of the
+                    # Ensure all array inputs to "metric_arrays" are of the
                     # above length
 
                     # Check capital cost inputs
@@ -623,67 +771,95 @@ class Engine(object):
                     if type(life_meas_tmp) != numpy.ndarray:
                         life_meas_tmp = numpy.repeat(life_meas_tmp, len_arr)
 
-                    # Initialize numpy arrays for financial metrics outputs
-                    stock_unit_cost_res[yr], energy_unit_cost_res[yr], \
-                        carb_unit_cost_res[yr], stock_unit_cost_com[yr], \
-                        energy_unit_cost_com[yr], carb_unit_cost_com[yr], \
-                        irr_e[yr], irr_ec[yr], payback_e[yr], payback_ec[yr], \
-                        cce[yr], cce_bens[yr], ccc[yr], ccc_bens[yr] = (
-                            numpy.repeat(None, len(scostmeas_delt_tmp)) for
-                            v in range(14))
-
-                    # Run measure energy/carbon/cost savings and lifetime
-                    # inputs through "metric_update" function to yield
-                    # financial metric outputs. To handle inputs that are
-                    # arrays, use a for loop to generate an output for each
-                    # input array element one-by-one and append it to the
-                    # appropriate output list. Note that lifetime float
-                    # values are translated to integers, and all
+                    # Record the position of the year's inputs across all
+                    # years, and add an input for each element of the
+                    # incremental capital cost input array. Note that lifetime
+                    # float values are translated to integers, and all
                     # energy, carbon, and energy/carbon cost savings values
                     # are normalized by total applicable stock units
-                    for x in range(0, len(scostmeas_delt_tmp)):
-                        stock_unit_cost_res[yr][x], \
-                            energy_unit_cost_res[yr][x], \
-                            carb_unit_cost_res[yr][x], \
-                            stock_unit_cost_com[yr][x], \
-                            energy_unit_cost_com[yr][x], \
-                            carb_unit_cost_com[yr][x], \
-                            irr_e[yr][x], irr_ec[yr][x], \
-                            payback_e[yr][x], payback_ec[yr][x], \
-                            cce[yr][x], cce_bens[yr][x], ccc[yr][x], \
-                            ccc_bens[yr][x] = self.metric_update(
-                                m, int(round(life_base)),
-                                int(round(life_meas_tmp[x])),
-                                scostbase, scostmeas_delt_tmp[x],
-                                esave_tmp[x] / nunits_tot[yr],
-                                ecostsave_tmp[x] / nunits_tot[yr],
-                                csave_tmp[x] / nunits_tot[yr],
-                                ccostsave_tmp[x] / nunits_tot[yr],
-                                scost_meas_tmp[x] / nunits_tot[yr],
-                                ecost_meas_tmp[x] / nunits_tot[yr],
-                                ccost_meas_tmp[x] / nunits_tot[yr])
+                    len_in = len(scostmeas_delt_tmp)
+                    metric_pos[yr] = (
+                        len(metric_in[0]), len(metric_in[0]) + len_in, True)
+                    for ind, x in enumerate([
+                            [int(round(life_base))] * len_in,
+                            [int(round(x)) for x in life_meas_tmp[:len_in]],
+                            [scostbase] * len_in, scostmeas_delt_tmp,
+                            esave_tmp[:len_in] / nunits_tot[yr],
+                            ecostsave_tmp[:len_in] / nunits_tot[yr],
+                            csave_tmp[:len_in] / nunits_tot[yr],
+                            ccostsave_tmp[:len_in] / nunits_tot[yr],
+                            scost_meas_tmp[:len_in] / nunits_tot[yr],
+                            ecost_meas_tmp[:len_in] / nunits_tot[yr],
+                            ccost_meas_tmp[:len_in] / nunits_tot[yr]]):
+                        metric_in[ind].extend(x)
                 else:
-                    # Run measure energy/carbon/cost savings and lifetime
-                    # inputs through "metric_update" function to yield
-                    # financial metric outputs. Note that lifetime float
-                    # values are translated to integers, and all
-                    # energy, carbon, and energy/carbon cost savings values
-                    # are normalized by total applicable stock units
-                    stock_unit_cost_res[yr], energy_unit_cost_res[yr], \
-                        carb_unit_cost_res[yr], stock_unit_cost_com[yr], \
-                        energy_unit_cost_com[yr], carb_unit_cost_com[yr], \
-                        irr_e[yr], irr_ec[yr], payback_e[yr], payback_ec[yr], \
-                        cce[yr], cce_bens[yr], ccc[yr], ccc_bens[yr] = \
-                        self.metric_update(
-                            m, int(round(life_base)),
-                            int(round(life_meas)), scostbase, scostmeas_delt,
+                    # Record the position of the year's inputs across all
+                    # years, and add the inputs. Note that lifetime float
+                    # values are translated to integers, and all energy,
+                    # carbon, and energy/carbon cost savings values are
+                    # normalized by total applicable stock units
+                    metric_pos[yr] = (
+                        len(metric_in[0]), len(metric_in[0]) + 1, False)
+                    for ind, x in enumerate([
+                            int(round(life_base)), int(round(life_meas)),
+                            scostbase, scostmeas_delt,
                             esave_tot[yr] / nunits_tot[yr],
                             ecostsave_tot[yr] / nunits_tot[yr],
                             csave_tot[yr] / nunits_tot[yr],
                             ccostsave_tot[yr] / nunits_tot[yr],
                             scost_meas_tot[yr] / nunits_tot[yr],
                             ecost_meas_tot[yr] / nunits_tot[yr],
-                            ccost_meas_tot[yr] / nunits_tot[yr])
+                            ccost_meas_tot[yr] / nunits_tot[yr]]):
+                        metric_in[ind].append(x)
+
+            # Run measure energy/carbon/cost savings and lifetime inputs
+            # for all years through the "metric_arrays" function to yield
+            # financial metric outputs
+            if len(metric_in[0]) > 0:
+                metric_out = self.metric_arrays(m, *metric_in)
+            # Set financial metric outputs for each year
+            for yr in self.handyvars.aeo_years:
+                # Set financial metrics to 999 in years for which the total
+                # baseline stock is zero or no measure units have been
+                # captured (or to the previous year's metrics in years after
+                # the first)
+                if metric_pos[yr] is None:
+                    if yr == self.handyvars.aeo_years[0]:
+                        stock_unit_cost_res[yr], energy_unit_cost_res[yr], \
+                            carb_unit_cost_res[yr], stock_unit_cost_com[yr], \
+                            energy_unit_cost_com[yr], carb_unit_cost_com[yr], \
+                            irr_e[yr], irr_ec[yr], payback_e[yr], \
+                            payback_ec[yr], cce[yr], cce_bens[yr], \
+                            ccc[yr], ccc_bens[yr] = [999 for n in range(14)]
+                    else:
+                        yr_prev = str(int(yr) - 1)
+                        stock_unit_cost_res[yr], energy_unit_cost_res[yr], \
+                            carb_unit_cost_res[yr], stock_unit_cost_com[yr], \
+                            energy_unit_cost_com[yr], carb_unit_cost_com[yr], \
+                            irr_e[yr], irr_ec[yr], payback_e[yr], \
+                            payback_ec[yr], cce[yr], cce_bens[yr], \
+                            ccc[yr], ccc_bens[yr] = [x[yr_prev] for x in [
+                                stock_unit_cost_res, energy_unit_cost_res,
+                                carb_unit_cost_res, stock_unit_cost_com,
+                                energy_unit_cost_com, carb_unit_cost_com,
+                                irr_e, irr_ec, payback_e, payback_ec, cce,
+                                cce_bens, ccc, ccc_bens]]
+                    continue
+                # Set financial metric outputs for the year, as numpy arrays
+                # for years with array inputs
+                start, stop, is_arr = metric_pos[yr]
+                for x, x_out in zip([
+                        stock_unit_cost_res, energy_unit_cost_res,
+                        carb_unit_cost_res, stock_unit_cost_com,
+                        energy_unit_cost_com, carb_unit_cost_com, irr_e,
+                        irr_ec, payback_e, payback_ec, cce, cce_bens, ccc,
+                        ccc_bens], metric_out):
+                    if is_arr:
+                        x[yr] = numpy.repeat(None, stop - start)
+                        for ind in range(stop - start):
+                            x[yr][ind] = x_out[start + ind]
+                    else:
+                        x[yr] = x_out[start]
 
             # Record final measure savings figures and financial metrics
 
@@ -753,17 +929,13 @@ class Engine(object):
         Notes:
             Calculate internal rate of return, simple payback, and cost of
             conserved energy/carbon from cash flows and energy/carbon
-            savings across the measure lifetime. In the cash flows, represent
-            the benefits of longer lifetimes for lighting equipment ECMs over
-            comparable baseline technologies.
+            savings across the measure lifetime for a single set of inputs
+            (see 'metric_arrays').
 
         Args:
             m (object): Measure object.
-            nunits (int): Total competed baseline units in a given year.
-            nunits_meas (int): Total competed units captured by measure in
-                given year.
-            life_base (float): Baseline technology lifetime.
-            life_meas (float): Measure lifetime.
+            life_base (int): Baseline technology lifetime.
+            life_meas (int): Measure lifetime.
             scost_base (float): Per unit baseline capital cost in given year.
             scost_meas_delt (float): Per unit incremental capital
                 cost for measure over baseline unit in given year.
@@ -783,97 +955,134 @@ class Engine(object):
             Consumer and portfolio-level financial metrics for the given
             measure cost savings inputs.
         """
-        # Develop four initial cash flow scenarios over the measure life:
-        # 1) Cash flows considering capital costs only
-        # 2) Cash flows considering capital costs and energy costs
-        # 3) Cash flows considering capital costs and carbon costs
-        # 4) Cash flows considering capital, energy, and carbon costs
+        return tuple(x[0] for x in self.metric_arrays(
+            m, [life_base], [life_meas], [scost_base], [scost_meas_delt],
+            [esave], [ecostsave], [csave], [ccostsave], [scost_meas],
+            [ecost_meas], [ccost_meas]))
+
+    def metric_arrays(self, m, life_base, life_meas, scost_base,
+                      scost_meas_delt, esave, ecostsave, csave, ccostsave,
+                      scost_meas, ecost_meas, ccost_meas):
+        """Calculate measure financial metrics for a batch of inputs.
 
-        # For lighting equipment ECMs only: determine when over the course of
+        Notes:
+            Calculate internal rate of return, simple payback, and cost of
+            conserved energy/carbon from cash flows and energy/carbon
+            savings across the measure lifetime for each of a batch of
+            inputs (e.g., all projection years and samples of a measure).
+            Cash flows for each input are represented as rows of a matrix
+            that is padded with zeros to the longest lifetime in the batch,
+            such that net present values across all inputs are calculated
+            at once from a vector of discount factors. In the cash flows,
+            represent the benefits of longer lifetimes for lighting
+            equipment ECMs over comparable baseline technologies.
+
+        Args:
+            m (object): Measure object.
+            life_base (list): Baseline technology lifetime for each input.
+            life_meas (list): Measure lifetime for each input.
+            scost_base (list): Per unit baseline capital cost for each input.
+            scost_meas_delt (list): Per unit incremental capital cost for
+                measure over baseline unit for each input.
+            esave (list): Per unit annual energy savings over measure
+                lifetime for each input.
+            ecostsave (list): Per unit annual energy cost savings over
+                measure lifetime for each input.
+            csave (list): Per unit annual avoided carbon emissions over
+                measure lifetime for each input.
+            ccostsave (list): Per unit annual carbon cost savings over
+                measure lifetime for each input.
+            scost_meas (list): Per unit measure capital cost for each input.
+            ecost_meas (list): Per unit measure energy cost for each input.
+            ccost_meas (list): Per unit measure carbon cost for each input.
+
+        Returns:
+            Lists of consumer and portfolio-level financial metrics across
+            the inputs, in the order of the 'metric_update' outputs.
+        """
+        # Convert lifetime inputs to arrays
+        life_base, life_meas_init = [
+            numpy.array(x, dtype=int) for x in [life_base, life_meas]]
+        # If the measure lifetime is less than 1 year, set it to 1 year
+        # (a minimum for measure lifetime to work in below calculations)
+        life_meas = numpy.maximum(life_meas_init, 1)
+        # Convert cost and savings inputs to arrays
+        scost_base_arr, scost_meas_delt_arr, esave_arr, ecostsave_arr, \
+            csave_arr, ccostsave_arr, scost_meas_arr, ecost_meas_arr, \
+            ccost_meas_arr = [numpy.array(x, dtype=float) for x in [
+                scost_base, scost_meas_delt, esave, ecostsave, csave,
+                ccostsave, scost_meas, ecost_meas, ccost_meas]]
+        # Years of the cash flows across the longest measure lifetime in the
+        # batch (the first year is reserved for initial investment)
+        cf_yrs = numpy.arange(life_meas.max() + 1)
+        # Flag the years of the cash flows that fall within each measure
+        # lifetime (excluding initial investment)
+        in_life = (cf_yrs[None, :] >= 1) & (
+            cf_yrs[None, :] <= life_meas[:, None])
+
+        # For lighting equipment ECMs only: flag when over the course of
         # the ECM lifetime (if at all) a cost gain is realized from an avoided
         # purchase of the baseline lighting technology due to longer measure
-        # lifetime; store this information in a list of year indicators for
-        # subsequent use below.  Example: an LED bulb lasts 30 years compared
-        # to a baseline bulb's 10 years, meaning 3 purchases of the baseline
+        # lifetime.  Example: an LED bulb lasts 30 years compared to a
+        # baseline bulb's 10 years, meaning 3 purchases of the baseline
         # bulb would have occurred by the time the LED bulb has reached the
         # end of its life.
-        added_stockcost_gain_yrs = []
-        if (life_meas > life_base) and ("lighting" in m.end_use[
-            "primary"]) and (m.measure_type == "full service") and (
+        if any(life_meas_init > life_base) and (
+            "lighting" in m.end_use["primary"]) and (
+            m.measure_type == "full service") and (
                 m.technology_type["primary"] == "supply"):
-            for i in range(1, life_meas):
-                if i % life_base == 0:
-                    added_stockcost_gain_yrs.append(i - 1)
-
-        # If the measure lifetime is less than 1 year, set it to 1 year
-        # (a minimum for measure lifetime to work in below calculations)
-        if life_meas < 1:
-            life_meas = 1
-
-        # Construct capital cost cash flows across measure life
-
-        # Initialize incremental and total capital cost cash flows with
-        # upfront incremental and total capital cost
-        cashflows_s_delt = numpy.array(scost_meas_delt)
-        cashflows_s_tot = numpy.array(scost_meas)
-
-        for life_yr in range(0, life_meas):
-            # Check whether an avoided cost of the baseline technology should
-            # be added for given year; if not, set this term to zero
-            if life_yr in added_stockcost_gain_yrs:
-                scost_life = scost_base
-            else:
-                scost_life = 0
-
-            # Add avoided capital costs as appropriate (e.g., for an LED
-            # lighting measure with a longer lifetime than the comparable
-            # baseline lighting technology)
-            cashflows_s_delt = numpy.append(cashflows_s_delt, scost_life)
-            cashflows_s_tot = numpy.append(cashflows_s_tot, scost_life)
-
+            stockcost_gain = in_life & (cf_yrs[None, :] < life_meas[
+                :, None]) & (life_meas_init > life_base)[:, None] & (
+                life_base[:, None] > 0) & (cf_yrs[None, :] % numpy.maximum(
+                    life_base, 1)[:, None] == 0)
+        else:
+            stockcost_gain = numpy.zeros(in_life.shape, dtype=bool)
+
+        # Construct incremental and total capital cost cash flows across
+        # measure life, starting with upfront incremental and total capital
+        # cost and adding avoided capital costs as appropriate (e.g., for an
+        # LED lighting measure with a longer lifetime than the comparable
+        # baseline lighting technology)
+        cashflows_s_delt, cashflows_s_tot = [numpy.where(
+            stockcost_gain, scost_base_arr[:, None], 0.0) for n in range(2)]
+        cashflows_s_delt[:, 0] = scost_meas_delt_arr
+        cashflows_s_tot[:, 0] = scost_meas_arr
         # Construct complete incremental and total energy and carbon cash
         # flows across measure lifetime. First term (reserved for initial
         # investment) is zero
-        cashflows_e_delt, cashflows_c_delt = [
-            numpy.append(0, [x] * life_meas) for x in [ecostsave, ccostsave]]
-        cashflows_e_tot, cashflows_c_tot = [
-            numpy.append(0, [x] * life_meas) for x in [ecost_meas, ccost_meas]]
-
-        # Calculate net present values (NPVs) using the above cashflows
-        npv_s_delt, npv_e_delt, npv_c_delt = [
-            npf.npv(self.handyvars.discount_rate, x) for x in [
-                cashflows_s_delt, cashflows_e_delt, cashflows_c_delt]]
-
+        cashflows_e_delt, cashflows_c_delt, cashflows_e_tot, \
+            cashflows_c_tot = [numpy.where(in_life, x[:, None], 0.0) for x in [
+                ecostsave_arr, ccostsave_arr, ecost_meas_arr, ccost_meas_arr]]
         # Develop arrays of energy and carbon savings across measure
         # lifetime (for use in cost of conserved energy and carbon calcs).
-        # First term (reserved for initial investment figure) is zero, and
-        # each array is normalized by number of captured stock units
-        esave_array = numpy.append(0, [esave] * life_meas)
-        csave_array = numpy.append(0, [csave] * life_meas)
-
-        # Calculate Net Present Value and annuity equivalent Net Present Value
-        # of the above energy and carbon savings
-        npv_esave = npf.npv(self.handyvars.discount_rate, esave_array)
-        npv_csave = npf.npv(self.handyvars.discount_rate, csave_array)
-
-        # Calculate portfolio-level financial metrics
-
-        # Calculate cost of conserved energy w/ and w/o carbon cost savings
-        # benefits. Restrict denominator values less than or equal to zero
-        if npv_esave > 0:
-            cce = (-npv_s_delt / npv_esave)
-            cce_bens = (-(npv_s_delt + npv_c_delt) / npv_esave)
-        else:
-            cce, cce_bens = [999 for n in range(2)]
-
-        # Calculate cost of conserved carbon w/ and w/o energy cost savings
-        # benefits. Restrict denominator values less than or equal to zero
-        if npv_csave > 0:
-            ccc = (-npv_s_delt / (npv_csave * 1000000))
-            ccc_bens = (-(npv_s_delt + npv_e_delt) /
-                        (npv_csave * 1000000))
-        else:
-            ccc, ccc_bens = [999 for n in range(2)]
+        # First term (reserved for initial investment figure) is zero
+        esave_array, csave_array = [numpy.where(
+            in_life, x[:, None], 0.0) for x in [esave_arr, csave_arr]]
+
+        # Calculate net present values (NPVs) of the above cash flows and
+        # energy/carbon savings using a vector of discount factors across
+        # the cash flow years
+        discount = (1 + self.handyvars.discount_rate) ** -cf_yrs
+        npv_s_delt, npv_e_delt, npv_c_delt, npv_esave, npv_csave = [
+            x.dot(discount) for x in [
+                cashflows_s_delt, cashflows_e_delt, cashflows_c_delt,
+                esave_array, csave_array]]
+
+        # Calculate portfolio-level financial metrics; restrict
+        # denominator values less than or equal to zero
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            # Calculate cost of conserved energy w/ and w/o carbon cost
+            # savings benefits
+            cce, cce_bens = [[
+                x if y > 0 else 999 for x, y in zip(z, npv_esave)] for z in [
+                -npv_s_delt / npv_esave,
+                -(npv_s_delt + npv_c_delt) / npv_esave]]
+            # Calculate cost of conserved carbon w/ and w/o energy cost
+            # savings benefits
+            ccc, ccc_bens = [[
+                x if y > 0 else 999 for x, y in zip(z, npv_csave)] for z in [
+                -npv_s_delt / (npv_csave * 1000000),
+                -(npv_s_delt + npv_e_delt) / (npv_csave * 1000000)]]
 
         # Calculate consumer-level financial metrics
 
@@ -895,89 +1104,207 @@ class Engine(object):
             if any([x in ["single family home", "multi family home",
                           "mobile home"] for x in m.bldg_type]):
                 unit_cost_s_res, unit_cost_e_res, unit_cost_c_res = [
-                    scost_meas, ecost_meas, ccost_meas]
+                    list(scost_meas), list(ecost_meas), list(ccost_meas)]
             # If measure does not apply to residential sector, set residential
             # unit costs to 'None'
             else:
                 unit_cost_s_res, unit_cost_e_res, unit_cost_c_res = (
-                    None for n in range(3))
+                    [None] * len(life_meas) for n in range(3))
 
             # Populate unit costs for commercial sector
             # Check whether measure applies to commercial sector
             if any([x not in ["single family home", "multi family home",
                               "mobile home"] for x in m.bldg_type]):
-                unit_cost_s_com, unit_cost_e_com, unit_cost_c_com = (
-                    {} for n in range(3))
                 # Set unit cost values under 7 discount rate categories
-                try:
-                    for ind, tps in enumerate(
-                            self.handyvars.com_timeprefs["rates"]):
-                        unit_cost_s_com["rate " + str(ind + 1)],\
-                            unit_cost_e_com["rate " + str(ind + 1)],\
-                            unit_cost_c_com["rate " + str(ind + 1)] = \
-                            [npf.npv(tps, x) for x in [
-                             cashflows_s_tot, cashflows_e_tot,
-                             cashflows_c_tot]]
-                        if any([not math.isfinite(x) for x in [
-                                unit_cost_s_com["rate " + str(ind + 1)],
-                                unit_cost_e_com["rate " + str(ind + 1)],
-                                unit_cost_c_com["rate " + str(ind + 1)]]]):
-                            raise(ValueError)
-                except ValueError:
-                    unit_cost_s_com, unit_cost_e_com, unit_cost_c_com = (
-                        999 for n in range(3))
+                npv_com = [[x.dot((1 + tps) ** -cf_yrs) for x in [
+                    cashflows_s_tot, cashflows_e_tot, cashflows_c_tot]] for
+                    tps in self.handyvars.com_timeprefs["rates"]]
+                # Flag inputs with unit costs that cannot be calculated
+                com_finite = numpy.all(
+                    numpy.isfinite(numpy.array(npv_com)), axis=(0, 1))
+                unit_cost_s_com, unit_cost_e_com, unit_cost_c_com = ([{
+                    "rate " + str(ind + 1): x[n][ind_in] for
+                    ind, x in enumerate(npv_com)} if com_finite[ind_in] else
+                    999 for ind_in in range(len(life_meas))] for n in range(3))
             # If measure does not apply to commercial sector, set commercial
             # unit costs to 'None'
             else:
                 unit_cost_s_com, unit_cost_e_com, unit_cost_c_com = (
-                    None for n in range(3))
+                    [None] * len(life_meas) for n in range(3))
 
             # Calculate internal rate of return and simple payback for capital
-            # + energy and capital + energy + carbon cash flows.  Use try/
-            # except to handle cases where IRR/payback cannot be calculated
-
-            # IRR and payback given capital + energy cash flows
-            try:
-                irr_e = npf.irr(cashflows_s_delt + cashflows_e_delt)
-                if not math.isfinite(irr_e):
-                    raise(ValueError)
-            except ValueError:
-                irr_e = 999
-            try:
-                payback_e = self.payback(cashflows_s_delt + cashflows_e_delt)
-            except (ValueError, LinAlgError):
-                payback_e = 999
-            # IRR and payback given capital + energy + carbon cash flows
-            try:
-                irr_ec = npf.irr(
-                    cashflows_s_delt + cashflows_e_delt + cashflows_c_delt)
-                if not math.isfinite(irr_ec):
-                    raise(ValueError)
-            except ValueError:
-                irr_ec = 999
-            try:
-                payback_ec = \
-                    self.payback(
-                        cashflows_s_delt + cashflows_e_delt + cashflows_c_delt)
-            except (ValueError, LinAlgError):
-                payback_ec = 999
+            # + energy and capital + energy + carbon cash flows
+            cashflows_se = cashflows_s_delt + cashflows_e_delt
+            cashflows_sec = cashflows_se + cashflows_c_delt
+            irr_e, irr_ec = [self.irr_arrays(x, life_meas + 1) for x in [
+                cashflows_se, cashflows_sec]]
+            payback_e, payback_ec = [self.payback_arrays(
+                x, life_meas + 1) for x in [cashflows_se, cashflows_sec]]
         else:
             unit_cost_s_res, unit_cost_e_res, unit_cost_c_res, \
                 unit_cost_s_com, unit_cost_e_com, unit_cost_c_com, \
                 irr_e, irr_ec, payback_e, payback_ec = (
-                    None for n in range(10))
+                    [None] * len(life_meas) for n in range(10))
 
         # Return all updated economic metrics
         return unit_cost_s_res, unit_cost_e_res, unit_cost_c_res, \
             unit_cost_s_com, unit_cost_e_com, unit_cost_c_com, irr_e, \
             irr_ec, payback_e, payback_ec, cce, cce_bens, ccc, ccc_bens
 
+    def irr_arrays(self, cashflows, n_flows, tol=1e-13, max_iter=100):
+        """Calculate internal rates of return for a batch of cash flows.
+
+        Notes:
+            Where a series of cash flows changes sign once (e.g., an upfront
+            investment followed by savings), its net present value has
+            exactly one root in the discount factor (1 / (1 + IRR)) on
+            (0, inf). The root is found for all such series at once using
+            Newton iterations safeguarded by bisection within an upper bound
+            on the root. Remaining series, and any series that do not
+            converge within the maximum number of iterations, are handled
+            by 'numpy_financial.irr'. The IRR is set to 999 where it cannot
+            be calculated.
+
+        Args:
+            cashflows (numpy.ndarray): Cash flows, by series (rows) and
+                year (columns); series are padded with zeros.
+            n_flows (numpy.ndarray): Number of cash flows in each series.
+            tol (float): Convergence tolerance on the log of the discount
+                factor (i.e., relative to the discount factor).
+            max_iter (int): Maximum number of iterations.
+
+        Returns:
+            List of internal rates of return for each series.
+        """
+        # Find the sign of each cash flow and the number of sign changes
+        # across each series (ignoring zero cash flows)
+        signs = numpy.sign(cashflows)
+        # Position of the last non-zero cash flow up to each year
+        nz_pos = numpy.maximum.accumulate(numpy.where(
+            signs != 0, numpy.arange(cashflows.shape[1])[None, :], -1),
+            axis=1)
+        # Position of the last non-zero cash flow before each year
+        nz_pos_prev = numpy.concatenate([numpy.full(
+            (len(cashflows), 1), -1), nz_pos[:, :-1]], axis=1)
+        n_changes = ((signs != 0) & (nz_pos_prev >= 0) & (
+            signs != numpy.take_along_axis(
+                signs, numpy.maximum(nz_pos_prev, 0), axis=1))).sum(axis=1)
+        # Series with no sign changes have no IRR; series with one sign
+        # change and a non-zero initial cash flow are solved below
+        irr = numpy.full(len(cashflows), numpy.nan)
+        solve = (n_changes == 1) & (cashflows[:, 0] != 0)
+        converged = numpy.zeros(len(cashflows), dtype=bool)
+        if solve.any():
+            cf_solve = cashflows[solve]
+            # Bracket the root of the net present value as a polynomial in
+            # the discount factor using lower and upper bounds on the
+            # magnitude of all polynomial roots; the root is searched for on
+            # the log scale of the discount factor
+            cf_last = cf_solve[numpy.arange(len(cf_solve)), nz_pos[
+                solve, -1]]
+            cf_max = numpy.abs(cf_solve).max(axis=1)
+            lo = -numpy.log1p(cf_max / numpy.abs(cf_solve[:, 0]))
+            hi = numpy.log1p(cf_max / numpy.abs(cf_last))
+            sign_lo = numpy.sign(cf_solve[:, 0])
+            u = (lo + hi) / 2
+            # Size of the previous step
+            u_step = hi - lo
+            done = numpy.zeros(len(cf_solve), dtype=bool)
+            with numpy.errstate(all="ignore"):
+                for n in range(max_iter):
+                    # Evaluate the net present value and its derivative
+                    # with respect to the discount factor (Horner's method)
+                    x = numpy.exp(u)
+                    npv, d_npv = numpy.zeros(len(x)), numpy.zeros(len(x))
+                    for col in range(cf_solve.shape[1] - 1, -1, -1):
+                        d_npv = d_npv * x + npv
+                        npv = npv * x + cf_solve[:, col]
+                    # Narrow the bracket around the root
+                    below = numpy.sign(npv) == sign_lo
+                    lo = numpy.where(below, u, lo)
+                    hi = numpy.where(below, hi, u)
+                    # Take a Newton step on the log scale, or bisect the
+                    # bracket where the Newton step falls outside of it or
+                    # is not at least half the size of the previous step
+                    u_new = u - npv / (d_npv * x)
+                    u_new = numpy.where(
+                        numpy.isfinite(u_new) & (u_new > lo) & (
+                            u_new < hi) & (numpy.abs(u_new - u) <= numpy.abs(
+                                u_step) / 2), u_new, (lo + hi) / 2)
+                    u_step = u_new - u
+                    done = done | (npv == 0) | (numpy.abs(u_new - u) <= tol)
+                    u = numpy.where(done, u, u_new)
+                    if done.all():
+                        break
+                irr_solve = numpy.exp(-u) - 1
+            irr[solve] = numpy.where(done, irr_solve, numpy.nan)
+            converged[solve] = done
+        # Handle series with multiple sign changes and any series that did
+        # not converge above
+        for ind in numpy.where((n_changes > 1) | (
+                (n_changes == 1) & ~converged))[0]:
+            irr[ind] = npf.irr(cashflows[ind, :n_flows[ind]])
+
+        return [float(x) if math.isfinite(x) else 999 for x in irr]
+
+    def payback_arrays(self, cashflows, n_flows):
+        """Calculate simple payback periods for a batch of cash flows.
+
+        Notes:
+            Calculate the simple payback period given input cash flows,
+            which may be uneven, for each of multiple series of cash flows.
+
+        Args:
+            cashflows (numpy.ndarray): Cash flows, by series (rows) and
+                year (columns); series are padded with zeros.
+            n_flows (numpy.ndarray): Number of cash flows in each series.
+
+        Returns:
+            List of simple payback periods for each series.
+        """
+        # Separate initial investment and subsequent cash flows; extend
+        # subsequent cash flows up until 100 years out (using the last cash
+        # flow in each series) to ensure calculation of all paybacks under
+        # 100 years
+        investment = cashflows[:, 0]
+        n_after = numpy.maximum(n_flows - 1, 100)
+        after_yrs = numpy.arange(n_after.max())
+        cashflows_after = numpy.zeros((len(cashflows), len(after_yrs)))
+        cashflows_after[:, :cashflows.shape[1] - 1] = cashflows[:, 1:]
+        cashflows_after = numpy.where(
+            after_yrs[None, :] < (n_flows - 1)[:, None], cashflows_after,
+            cashflows[numpy.arange(len(cashflows)), n_flows - 1][:, None])
+        # Find cumulative cash flows and the number of years in which
+        # cumulative cash flows are less than the initial investment (only
+        # considering years before the end of each extended series)
+        cumulative = numpy.cumsum(cashflows_after, axis=1)
+        years = ((cumulative < numpy.abs(investment)[:, None]) & (
+            after_yrs[None, :] < n_after[:, None])).sum(axis=1)
+        # If investment pays back within the measure lifetime, calculate
+        # this payback period in years
+        rows = numpy.arange(len(cashflows))
+        b = numpy.where(
+            years > 0, numpy.abs(investment) - cumulative[
+                rows, numpy.maximum(years - 1, 0)], numpy.abs(investment))
+        c = numpy.where(
+            years > 0, cumulative[rows, numpy.minimum(
+                years, len(after_yrs) - 1)] - cumulative[
+                rows, numpy.maximum(years - 1, 0)], cumulative[:, 0])
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            payback_val = years + (b / c)
+        # If initial investment is positive, payback = 0; if investment does
+        # not pay back within measure lifetime, set payback period to
+        # artifically high number
+        return [0 if investment[ind] >= 0 else (
+            payback_val[ind] if years[ind] < n_after[ind] else 999) for
+            ind in range(len(cashflows))]
+
     def payback(self, cashflows):
         """Calculate simple payback period.
 
         Notes:
             Calculate the simple payback period given an input list of
-            cash flows, which may be uneven.
+            cash flows, which may be uneven (see 'payback_arrays').
 
         Args:
             cashflows (list): Cash flows across measure lifetime.
@@ -985,181 +1312,728 @@ class Engine(object):
         Returns:
             Simple payback period for the input cash flows.
         """
-        # Separate initial investment and subsequent cash flows
-        # from "cashflows" input; extend cashflows up until 100 years
-        # out to ensure calculation of all paybacks under 100 years
-        investment, cashflows = cashflows[0], list(
-            cashflows[1:]) + [cashflows[-1]] * (100 - len(cashflows[1:]))
-        # If initial investment is positive, payback = 0
-        if investment >= 0:
-            payback_val = 0
-        else:
-            # Find absolute value of initial investment to compare
-            # subsequent cash flows against
-            investment = abs(investment)
-            # Initialize cumulative cashflow and # years tracking
-            total, years, cumulative = 0, 0, []
-            # Add to years and cumulative cashflow trackers while cumulative
-            # cashflow < investment
-            for cashflow in cashflows:
-                total += cashflow
-                if total < investment:
-                    years += 1
-                cumulative.append(total)
-            # If investment pays back within the measure lifetime,
-            # calculate this payback period in years
-            if years < len(cashflows):
-                a = years
-                # Case where payback period < 1 year
-                if (years - 1) < 0:
-                    b = investment
-                    c = cumulative[0]
-                # Case where payback period >= 1 year
-                else:
-                    b = investment - cumulative[years - 1]
-                    c = cumulative[years] - cumulative[years - 1]
-                payback_val = a + (b / c)
-            # If investment does not pay back within measure lifetime,
-            # set payback period to artifically high number
-            else:
-                payback_val = 999
+        return self.payback_arrays(numpy.array([cashflows], dtype=float),
+                                   numpy.array([len(cashflows)]))[0]
 
-        # Return updated payback period value in years
-        return payback_val
-
-    def compete_measures(self, adopt_scheme, htcl_totals):
+    def compete_measures(self, adopt_scheme, htcl_totals, workers=None):
         """Compete/apportion total stock/energy/carbon/cost across measures.
 
         Notes:
             Adjust each competing measure's 'baseline' and 'efficient'
             energy/carbon/cost to reflect either a) direct competition between
             measures, or b) the indirect effects of measure competition.
+            Given multiple worker processes, independent groups of
+            contributing microsegments are competed in parallel, with results
+            identical to those of serial execution (see 'compete_groups').
+            Where competition results are cached, the cached results for any
+            group whose competing measures are unchanged are reused.
 
         Args:
             adopt_scheme (string): Assumed consumer adoption scenario.
+            htcl_totals (dict): Heating/cooling energy totals by climate
+                zone, building type, and structure type.
+            workers (int): Number of processes to use in competing measures.
         """
-        # Establish list of key chains and supporting competition data for all
-        # stock/energy/carbon/cost microsegments that contribute to a measure's
-        # total stock/energy/carbon/cost microsegments, across active measures
-        mseg_keys, mkts_adj = ([] for n in range(2))
-        for x in self.measures:
-            mseg_keys.extend(x.markets[adopt_scheme]["competed"][
-                "mseg_adjust"]["contributing mseg keys and values"].keys())
-            mkts_adj.append(x.markets[adopt_scheme]["competed"]["mseg_adjust"])
-
-        # Establish list of unique key chains in mseg_keys list above,
-        # ensuring that all 'primary' microsegments (e.g., relating to direct
-        # equipment replacement) are ordered and updated before 'secondary'
-        # microsegments (e.g., relating to indirect effects of equipment
-        # replacement, such as reduced waste heat from changes in lighting)
-        msegs = sorted(numpy.unique(mseg_keys))
+        # Index the competing measures and competition data for each unique
+        # contributing microsegment across all active measures
+        comp_index = self.compete_index(adopt_scheme)
 
         # Initialize a dict used to store data on overlaps between supply-side
         # heating/cooling ECMs (e.g., HVAC equipment) and demand-side
         # heating/cooling ECMs (e.g., envelope). If the current set of ECMs
         # does not affect both supply-side and demand-side heating/cooling
         # markets, this dict is set to None
-        if any(["supply" in x for x in msegs]) and \
-           any(["demand" in x for x in msegs]):
+        if any([x["supply"] for x in comp_index.values()]) and \
+           any([x["demand"] for x in comp_index.values()]):
             htcl_adj_data = {"supply": {}, "demand": {}}
         else:
             htcl_adj_data = None
-
-        # Run through all unique contributing microsegments in the above list,
+        # Find the subset of ECMs that applies to heating and cooling
+        measures_htcl_adj = [m for m in self.measures if any([
+            z[0] in ["heating", "cooling", "secondary heating"] for
+            z in m.end_use.values() if z is not None])]
+
+        # Compete independent groups of contributing microsegments in
+        # parallel where multiple worker processes are requested (parallel
+        # execution relies on forked processes inheriting the measure data,
+        # and therefore falls back to serial execution where fork is
+        # unavailable), or where competition results are cached by group
+        if self.compete_cache is not None or (
+                workers is not None and workers > 1 and len(set([
+                x["group"] for x in comp_index.values()])) > 1 and
+                "fork" in multiprocessing.get_all_start_methods()):
+            self.compete_groups(
+                adopt_scheme, comp_index, htcl_adj_data is not None,
+                htcl_totals, measures_htcl_adj, workers)
+            return
+
+        # Run through all unique contributing microsegments in the index,
         # determining how the initial measure stock/energy/carbon/cost data
         # associated with each should be adjusted to reflect the effects of
         # measure competition
-        for msu in msegs:
-
-            # Determine the subset of measures that pertain to the current
-            # contributing microsegment
-            measures_adj = [self.measures[x] for x in range(
-                0, len(self.measures)) if msu in mkts_adj[x][
-                "contributing mseg keys and values"].keys()]
-            # Create short name for all ECM competition data pertaining to
-            # current contributing microsegment
-            msu_mkts = [m.markets[adopt_scheme]["competed"][
-                "mseg_adjust"]["contributing mseg keys and values"][msu] for
-                m in measures_adj]
-
-            # If the current contributing microsegment is of the 'primary'
-            # type, directly compete the microsegment across applicable
-            # measures
-            if "primary" in msu:
-                # If multiple measures are competing for the primary
-                # microsegment, determine the market shares of each competing
-                # measure and adjust primary stock/energy/carbon/cost
-                # totals for each measure accordingly, using separate market
-                # share modeling routines for residential/commercial sectors.
-                if len(measures_adj) > 1 and any(x in msu for x in (
-                        'single family home', 'multi family home',
-                        'mobile home')):
-                    self.compete_res_primary(measures_adj, msu, adopt_scheme)
-                elif len(measures_adj) > 1 and all(x not in msu for x in (
-                        'single family home', 'multi family home',
-                        'mobile home')):
-                    self.compete_com_primary(measures_adj, msu, adopt_scheme)
-            # If the current contributing microsegment is of the 'secondary'
-            # type, adjust the microsegment across applicable measures as
-            # needed to reflect competition of associated primary
-            # contributing microsegment(s) for each measure
-            elif "secondary" in msu:
-                # Determine the climate zone, building type, and structure type
-                # needed to link the secondary microsegment and associated3
-                # primary microsegment(s)
-                cz_bldg_struct = literal_eval(msu)
-                secnd_mseg_adjkey = str((
-                    cz_bldg_struct[1], cz_bldg_struct[2], cz_bldg_struct[-1]))
-                # Determine the subset of measures pertaining to the given
-                # secondary microsegment that require total energy/carbon/cost
-                # adjustments due to changes in associated primary
-                # microsegment(s) (note that secondary microsegments do not
-                # affect stock totals, only energy/carbon and associated costs)
-                measures_adj_scnd = [self.measures[x] for x in range(
-                    0, len(self.measures)) if self.measures[x] in
-                    measures_adj and any(
-                    [(y[1] > 0) for y in mkts_adj[x][
-                        "secondary mseg adjustments"]["market share"][
-                        "original energy (total captured)"][
-                        secnd_mseg_adjkey].items()])]
-                # If at least one applicable measure requires adjustments to
-                # total secondary energy/carbon/cost, proceed with the
-                # adjustment calculation
-                if len(measures_adj_scnd) > 0:
-                    self.secondary_adj(measures_adj_scnd, msu,
-                                       secnd_mseg_adjkey, adopt_scheme)
-
-            # For any contributing microsegment that pertains to heating or
-            # cooling, record data needed for additional adjustments to remove
-            # overlaps between the supply-side and demand-side of heating
-            # and cooling energy (note that supply-side and demand-side heating
-            # and cooling ECMs are not directly competed). NOTE: EXCLUDE
-            # SECONDARY HEATING/COOLING MICROSEGMENTS FOR NOW UNTIL
-            # REASONABLE APPROACH FOR ADJUSTING THESE IS IMPLEMENTED
-
-            # Ensure the current contributing microsegment pertains to
-            # heating or cooling (marked by 'supply' or 'demand' keys) and
-            # that both supply and demand-side ECMs are present in the analysis
-            if ('primary' in msu and
-                ('supply' in msu or 'demand' in msu)) and \
-                    htcl_adj_data is not None:
-                htcl_adj_data = self.htcl_adj_rec(
-                    htcl_adj_data, msu, msu_mkts, htcl_totals)
+        for msu, msu_ind in comp_index.items():
+            htcl_adj_data = self.compete_mseg(
+                msu, msu_ind, adopt_scheme, htcl_adj_data, htcl_totals)
 
         # Once all direct competition is finished, remove all recorded
         # overlapping energy use and associated carbon/costs between
         # supply-side and demand-side heating and cooling ECMs, provided both
         # are present in the analysis
         if htcl_adj_data is not None:
-            # Find the subset of ECMs that applies to heating and cooling
-            measures_htcl_adj = [m for m in self.measures if any([
-                z[0] in ["heating", "cooling", "secondary heating"] for
-                z in m.end_use.values() if z is not None])]
-
             # Remove energy, carbon, and cost overlaps between supply-side and
             # demand-side heating/cooling ECMs
             self.htcl_adj(measures_htcl_adj, adopt_scheme, htcl_adj_data)
 
+    def compete_mseg(
+            self, msu, msu_ind, adopt_scheme, htcl_adj_data, htcl_totals):
+        """Compete measures for a single contributing microsegment.
+
+        Notes:
+            Determine how the initial measure stock/energy/carbon/cost data
+            associated with the contributing microsegment should be adjusted
+            to reflect the effects of measure competition.
+
+        Args:
+            msu (string): Contributing microsegment key.
+            msu_ind (dict): Competing measures and competition data for the
+                contributing microsegment (see 'compete_index').
+            adopt_scheme (string): Assumed consumer adoption scenario.
+            htcl_adj_data (dict): Overlapping supply or demand-side heating/
+                cooling energy use data recorded thus far (None if the
+                measures do not affect both sides of heating/cooling).
+            htcl_totals (dict): Heating/cooling energy totals by climate
+                zone, building type, and structure type.
+
+        Returns:
+            Overlapping supply or demand-side heating/cooling energy use data
+            updated with data for the contributing microsegment.
+        """
+        # Determine the subset of measures that pertain to the current
+        # contributing microsegment
+        measures_adj = [self.measures[x] for x in msu_ind["measures"]]
+
+        # If the current contributing microsegment is of the 'primary'
+        # type, directly compete the microsegment across applicable
+        # measures
+        if msu_ind["primary"]:
+            # If multiple measures are competing for the primary
+            # microsegment, determine the market shares of each competing
+            # measure and adjust primary stock/energy/carbon/cost
+            # totals for each measure accordingly, using separate market
+            # share modeling routines for residential/commercial sectors.
+            if len(measures_adj) > 1 and msu_ind["residential"]:
+                self.compete_res_primary(measures_adj, msu, adopt_scheme)
+            elif len(measures_adj) > 1:
+                self.compete_com_primary(measures_adj, msu, adopt_scheme)
+        # If the current contributing microsegment is of the 'secondary'
+        # type, adjust the microsegment across applicable measures as
+        # needed to reflect competition of associated primary
+        # contributing microsegment(s) for each measure
+        elif msu_ind["secondary"]:
+            # Climate zone, building type, and structure type needed to
+            # link the secondary microsegment and associated primary
+            # microsegment(s)
+            secnd_mseg_adjkey = msu_ind["secondary adjustment key"]
+            # Determine the subset of measures pertaining to the given
+            # secondary microsegment that require total energy/carbon/cost
+            # adjustments due to changes in associated primary
+            # microsegment(s) (note that secondary microsegments do not
+            # affect stock totals, only energy/carbon and associated costs)
+            measures_adj_scnd = [self.measures[x] for x in msu_ind[
+                "measures"] if any([(y[1] > 0) for y in self.measures[
+                    x].markets[adopt_scheme]["competed"]["mseg_adjust"][
+                    "secondary mseg adjustments"]["market share"][
+                    "original energy (total captured)"][
+                    secnd_mseg_adjkey].items()])]
+            # If at least one applicable measure requires adjustments to
+            # total secondary energy/carbon/cost, proceed with the
+            # adjustment calculation
+            if len(measures_adj_scnd) > 0:
+                self.secondary_adj(measures_adj_scnd, msu,
+                                   secnd_mseg_adjkey, adopt_scheme)
+
+        # For any contributing microsegment that pertains to heating or
+        # cooling, record data needed for additional adjustments to remove
+        # overlaps between the supply-side and demand-side of heating
+        # and cooling energy (note that supply-side and demand-side heating
+        # and cooling ECMs are not directly competed). NOTE: EXCLUDE
+        # SECONDARY HEATING/COOLING MICROSEGMENTS FOR NOW UNTIL
+        # REASONABLE APPROACH FOR ADJUSTING THESE IS IMPLEMENTED
+
+        # Ensure the current contributing microsegment pertains to
+        # heating or cooling (marked by 'supply' or 'demand' keys) and
+        # that both supply and demand-side ECMs are present in the analysis
+        if msu_ind["primary"] and (
+                msu_ind["supply"] or msu_ind["demand"]) and \
+                htcl_adj_data is not None:
+            # ECM competition data pertaining to the current contributing
+            # microsegment (read from each measure only where needed, such
+            # that contributing microsegment data held outside of memory
+            # are not restored for every microsegment)
+            msu_mkts = [m.markets[adopt_scheme]["competed"]["mseg_adjust"][
+                "contributing mseg keys and values"][msu] for
+                m in measures_adj]
+            htcl_adj_data = self.htcl_adj_rec(
+                htcl_adj_data, msu, msu_mkts, htcl_totals)
+
+        return htcl_adj_data
+
+    def compete_groups(self, adopt_scheme, comp_index, htcl, htcl_totals,
+                       measures_htcl_adj, workers):
+        """Compete independent groups of microsegments in worker processes.
+
+        Notes:
+            Contributing microsegments with a common climate zone, building
+            type, and structure type form a group: competition within a group
+            (including secondary microsegment and heating/cooling supply-
+            demand adjustments) does not depend on any other group. Each
+            group is competed in a forked worker process, which records
+            (rather than applies) the adjustments to measure overall and
+            breakout totals that are shared across groups. The recorded
+            adjustments are then applied to the totals in the order of
+            serial execution, such that results are bit-identical to those
+            of serial execution regardless of the number of workers. Where
+            competition results are cached, the results for each group are
+            stored under a key for the group's competing measures and their
+            prepared data (see 'group_cache_keys'), and the stored results are
+            reused in place of competing the group on later runs.
+
+        Args:
+            adopt_scheme (string): Assumed consumer adoption scenario.
+            comp_index (OrderedDict): Competing measures and competition data
+                by contributing microsegment (see 'compete_index').
+            htcl (boolean): Flag for the presence of both supply-side and
+                demand-side heating/cooling measures.
+            htcl_totals (dict): Heating/cooling energy totals by climate
+                zone, building type, and structure type.
+            measures_htcl_adj (list): Measures that apply to heating/cooling.
+            workers (int): Number of worker processes.
+        """
+        # Group contributing microsegments by climate zone, building type,
+        # and structure type (groups are ordered by first appearance)
+        groups = OrderedDict()
+        for msu, msu_ind in comp_index.items():
+            groups.setdefault(msu_ind["group"], []).append(msu)
+
+        # Index each measure's overall and breakout totals by year, which are
+        # adjusted across groups (see 'adj_totals'); totals are located by
+        # the identity of their dicts, which forked processes share
+        tot_dicts, tot_start = ([] for n in range(2))
+        for m in self.measures:
+            # Note the position of the measure's first total
+            tot_start.append(len(tot_dicts) * len(self.handyvars.aeo_years))
+            mkts = m.markets[adopt_scheme]["competed"]
+            for k in ["stock", "energy", "carbon", "cost"]:
+                tot_dicts.extend(self.year_dicts(mkts["master_mseg"][k]))
+            tot_dicts.extend(self.year_dicts(mkts["mseg_out_break"]))
+        tot_pos = {}
+        for ind, d in enumerate(tot_dicts):
+            tot_pos.setdefault(id(d), ind)
+
+        # Set the order in which heating/cooling supply-demand adjustments
+        # are made in serial execution (by measure, and by contributing
+        # microsegment for each measure)
+        if htcl:
+            meas_inds = {id(m): ind for ind, m in enumerate(self.measures)}
+            htcl_units = [(meas_inds[id(m)], k) for m in measures_htcl_adj
+                          for k in m.markets[adopt_scheme]["competed"][
+                          "mseg_adjust"][
+                          "contributing mseg keys and values"].keys() if
+                          "primary" in k and ("supply" in k or "demand" in k)]
+        else:
+            htcl_units = []
+
+        # Read cached competition results for each group, where available
+        if self.compete_cache is not None:
+            cache_keys = self.group_cache_keys(
+                adopt_scheme, comp_index, groups, htcl, htcl_totals)
+        else:
+            cache_keys = {}
+        cached = {}
+        for group, key in cache_keys.items():
+            cached_grp = read_cache_entry(path.join(self.compete_cache, key))
+            if cached_grp is not None:
+                cached[group] = self.unpack_group(cached_grp, tot_start)
+        # Groups to compete
+        groups_comp = [x for x in groups.keys() if x not in cached.keys()]
+
+        # Register the engine and competition inputs as module-level
+        # variables that are shared with the forked worker processes without
+        # being pickled
+        global _compete_shared
+        _compete_shared = (
+            self, adopt_scheme, comp_index, groups, tot_pos, htcl,
+            htcl_totals, set(htcl_units))
+        # Current values of all measure totals by year, and flags for the
+        # totals that are adjusted
+        tot_vals = numpy.empty(
+            len(tot_dicts) * len(self.handyvars.aeo_years), dtype=object)
+        for ind, d in enumerate(tot_dicts):
+            for ind_yr, yr in enumerate(self.handyvars.aeo_years):
+                tot_vals[ind * len(self.handyvars.aeo_years) + ind_yr] = \
+                    d.get(yr)
+        tot_adj = numpy.zeros(len(tot_vals), dtype=bool)
+        # Recorded adjustments by contributing microsegment and by heating/
+        # cooling supply-demand adjustment
+        comp_logs, htcl_logs = ({} for n in range(2))
+        pool = None
+        try:
+            # Compete groups in worker processes where multiple workers are
+            # requested (note that 'imap' returns group results in the order
+            # that groups are listed), and otherwise in this process
+            if workers is not None and workers > 1 and \
+                    len(groups_comp) > 1 and \
+                    "fork" in multiprocessing.get_all_start_methods():
+                pool = multiprocessing.get_context("fork").Pool(
+                    min(workers, len(groups_comp)))
+                results_comp = pool.imap(compete_worker, groups_comp)
+            else:
+                results_comp = map(compete_worker, groups_comp)
+            # Apply the adjustments recorded for each contributing
+            # microsegment in the order of serial execution, collecting
+            # further group results (cached or competed) as needed
+            groups_iter = iter(groups.keys())
+            for msu in comp_index.keys():
+                while msu not in comp_logs:
+                    group = next(groups_iter)
+                    if group in cached.keys():
+                        logs, h_logs, adj, secnd = cached.pop(group)
+                    else:
+                        group_comp, logs, h_logs, adj, secnd = next(
+                            results_comp)
+                        # Cache the competed results for the group
+                        if group in cache_keys.keys():
+                            write_cache_entry(path.join(
+                                self.compete_cache, cache_keys[group]),
+                                self.pack_group(
+                                    logs, h_logs, adj, secnd, tot_start))
+                    comp_logs.update(zip(groups[group], logs))
+                    htcl_logs.update(h_logs)
+                    # Update the contributing microsegment data and
+                    # secondary microsegment adjustment data for each
+                    # measure with the competed data for the group
+                    for (ind, k), v in adj.items():
+                        self.update_data(self.measures[ind].markets[
+                            adopt_scheme]["competed"]["mseg_adjust"][
+                            "contributing mseg keys and values"][k], v)
+                    for ind, v in secnd.items():
+                        mktshr = self.measures[ind].markets[adopt_scheme][
+                            "competed"]["mseg_adjust"][
+                            "secondary mseg adjustments"]["market share"]
+                        for k in v.keys():
+                            if group in mktshr[k].keys():
+                                self.update_data(mktshr[k][group], v[k])
+                            else:
+                                mktshr[k][group] = v[k]
+                self.apply_log(tot_vals, tot_adj, comp_logs.pop(msu))
+        finally:
+            if pool is not None:
+                pool.terminate()
+            _compete_shared = None
+        # Apply the adjustments recorded for each heating/cooling supply-
+        # demand adjustment in the order of serial execution
+        for unit in htcl_units:
+            if unit in htcl_logs:
+                self.apply_log(tot_vals, tot_adj, htcl_logs.pop(unit))
+
+        # Update the adjusted measure totals
+        for ind, d in enumerate(tot_dicts):
+            ind_tot = ind * len(self.handyvars.aeo_years)
+            if tot_adj[ind_tot:ind_tot + len(self.handyvars.aeo_years)].any():
+                for ind_yr, yr in enumerate(self.handyvars.aeo_years):
+                    if tot_adj[ind_tot + ind_yr]:
+                        d[yr] = tot_vals[ind_tot + ind_yr]
+
+    def update_data(self, data, data_new):
+        """Update the values of a nested dict in place.
+
+        Notes:
+            The nested dicts and unchanged values of the original data are
+            retained, such that any references to them elsewhere reflect the
+            updated data.
+
+        Args:
+            data (dict): Nested dict to update.
+            data_new (dict): Nested dict with updated values.
+        """
+        for k, v in data_new.items():
+            if isinstance(v, dict) and isinstance(data.get(k), dict):
+                self.update_data(data[k], v)
+            elif k not in data.keys() or type(v) is not type(data[k]):
+                data[k] = v
+            elif isinstance(v, numpy.ndarray):
+                if v.dtype != data[k].dtype or \
+                        not numpy.array_equal(v, data[k]):
+                    data[k] = v
+            elif isinstance(v, (int, float, str, type(None))):
+                if v != data[k]:
+                    data[k] = v
+            else:
+                data[k] = v
+
+    def year_dicts(self, data):
+        """Find all dicts of values by year in a nested dict.
+
+        Args:
+            data (dict): Nested dict with values by year at its leaves.
+
+        Returns:
+            List of the dicts of values by year.
+        """
+        if not isinstance(data, dict) or len(data) == 0:
+            return []
+        elif next(iter(data.keys())) in self.handyvars.aeo_years:
+            return [data]
+        else:
+            return [y for x in data.values() for y in self.year_dicts(x)]
+
+    def adj_totals(self, totals, yr, adj_vals):
+        """Subtract competition adjustments from measure totals for a year.
+
+        Notes:
+            When measures are competed in a worker process, the adjustments
+            are recorded rather than applied (see 'compete_groups').
+
+        Args:
+            totals (list): Dicts of measure overall or breakout totals by
+                year to adjust.
+            yr (string): Year of the totals to adjust.
+            adj_vals (list): Adjustment to subtract from each total.
+        """
+        if self.compete_log is None:
+            for x, y in zip(totals, adj_vals):
+                x[yr] = x[yr] - y
+        else:
+            self.compete_log.extend([
+                (x, yr, y) for x, y in zip(totals, adj_vals)])
+
+    def pack_log(self, tot_pos):
+        """Convert recorded adjustments to measure totals into arrays.
+
+        Args:
+            tot_pos (dict): Position of each dict of measure totals by year,
+                keyed by the identity of the dict.
+
+        Returns:
+            Positions of the adjusted totals (by dict and year) and the
+            adjustments to subtract from them.
+
+        Raises:
+            ValueError: If an adjusted dict is not among the measure totals.
+        """
+        yr_pos = {yr: ind for ind, yr in enumerate(self.handyvars.aeo_years)}
+        try:
+            pos = numpy.array([
+                tot_pos[id(x)] * len(yr_pos) + yr_pos[yr] for
+                x, yr, y in self.compete_log], dtype=int)
+        except KeyError:
+            raise ValueError(
+                "Adjusted measure data are not among the measure totals "
+                "indexed for parallel competition") from None
+        adj_vals = [y for x, yr, y in self.compete_log]
+        # Store adjustments of a single float type as a float array
+        if all([type(y) is float for y in adj_vals]):
+            adj_vals = ("float", numpy.array(adj_vals, dtype=float))
+        elif all([type(y) is numpy.float64 for y in adj_vals]):
+            adj_vals = ("numpy", numpy.array(adj_vals, dtype=float))
+        else:
+            adj_arr = numpy.empty(len(adj_vals), dtype=object)
+            for ind, y in enumerate(adj_vals):
+                adj_arr[ind] = y
+            adj_vals = ("object", adj_arr)
+        self.compete_log = []
+
+        return pos, adj_vals
+
+    def apply_log(self, tot_vals, tot_adj, log):
+        """Apply recorded adjustments to measure totals.
+
+        Args:
+            tot_vals (numpy.ndarray): Current values of measure totals (by
+                dict and year).
+            tot_adj (numpy.ndarray): Flags for the totals that are adjusted.
+            log (tuple): Positions of the adjusted totals and the adjustments
+                to subtract from them (see 'pack_log').
+        """
+        pos, (adj_type, adj_vals) = log
+        # Restore the type of each adjustment (python or numpy float) such
+        # that adjusted totals are of the same type as in serial execution
+        if adj_type != "object":
+            adj_arr = numpy.empty(len(adj_vals), dtype=object)
+            adj_arr[:] = adj_vals.tolist() if adj_type == "float" else \
+                list(adj_vals)
+        else:
+            adj_arr = adj_vals
+        # Subtract adjustments in the order they were recorded
+        numpy.subtract.at(tot_vals, pos, adj_arr)
+        tot_adj[pos] = True
+
+    def group_cache_keys(self, adopt_scheme, comp_index, groups, htcl,
+                         htcl_totals):
+        """Find the keys of cached competition results for each group.
+
+        Notes:
+            The key for a group of contributing microsegments is a hash of
+            the group's competing measures (those with contributing or
+            secondary microsegment data for the group, in measure order) and
+            their prepared data, together with all other inputs to measure
+            competition: the adoption scheme, modeling years, stock turnover
+            and discounting parameters, heating/cooling totals, and command
+            line options, and the source code of this module. Groups with any
+            measure that lacks a hash of its prepared data are not cached.
+
+        Args:
+            adopt_scheme (string): Assumed consumer adoption scenario.
+            comp_index (OrderedDict): Competing measures and competition data
+                by contributing microsegment (see 'compete_index').
+            groups (OrderedDict): Contributing microsegments by group.
+            htcl (boolean): Flag for the presence of both supply-side and
+                demand-side heating/cooling measures.
+            htcl_totals (dict): Heating/cooling energy totals by climate
+                zone, building type, and structure type.
+
+        Returns:
+            Dict of cache keys (file names) by group.
+        """
+        # Hash the inputs to measure competition that apply to all groups
+        # (excluding options that only affect how results are computed)
+        hasher = hashlib.sha256()
+        with open(__file__, 'rb') as fi:
+            hasher.update(fi.read())
+        hasher.update(json.dumps([
+            adopt_scheme, self.handyvars.aeo_years, htcl,
+            self.handyvars.retro_rate, self.handyvars.discount_rate,
+            self.handyvars.com_timeprefs,
+            self.output_all["Energy Output Type"], sorted([
+                x for x in vars(options).items() if x[0] not in [
+                    "verbose", "workers", "parallel_schemes", "incremental",
+                    "columnar", "sweep"]]), htcl_totals], sort_keys=True,
+            default=str).encode())
+        common = hasher.hexdigest()
+
+        # Find the competing measures for each group
+        group_meas = {x: set() for x in groups.keys()}
+        for msu_ind in comp_index.values():
+            group_meas[msu_ind["group"]].update(msu_ind["measures"])
+        for ind, m in enumerate(self.measures):
+            for v in m.markets[adopt_scheme]["competed"]["mseg_adjust"][
+                    "secondary mseg adjustments"]["market share"].values():
+                for group in [x for x in v.keys() if x in group_meas.keys()]:
+                    group_meas[group].add(ind)
+
+        cache_keys = {}
+        for group, meas_inds in group_meas.items():
+            meas = [self.measures[x] for x in sorted(meas_inds)]
+            if any([m.data_hash is None for m in meas]):
+                continue
+            cache_keys[group] = hashlib.sha256(json.dumps([
+                common, group, [[m.name, m.data_hash] for m in meas]]).encode(
+                )).hexdigest() + ".pkl"
+
+        return cache_keys
+
+    def pack_group(self, logs, htcl_logs, adj, secnd, tot_start):
+        """Convert a group's competition results for caching.
+
+        Notes:
+            Measures are given by name and adjusted totals by position among
+            each measure's own totals, such that cached results are
+            independent of the other measures in a run.
+
+        Args:
+            logs (list): Recorded adjustments for each contributing
+                microsegment in the group (see 'pack_log').
+            htcl_logs (dict): Recorded heating/cooling supply-demand
+                adjustments by measure and contributing microsegment.
+            adj (dict): Competed contributing microsegment data by measure
+                and contributing microsegment.
+            secnd (dict): Secondary microsegment adjustment data for the
+                group by measure.
+            tot_start (list): Position of each measure's first total.
+
+        Returns:
+            Competition results for the group in the cached format.
+        """
+        names = [m.name for m in self.measures]
+
+        def pack(log):
+            """Locate adjusted totals by measure."""
+            pos, adj_vals = log
+            inds = numpy.searchsorted(tot_start, pos, side="right") - 1
+            return ([names[x] for x in inds],
+                    pos - numpy.array(tot_start, dtype=int)[inds], adj_vals)
+
+        return ([pack(x) for x in logs],
+                {(names[x[0]], x[1]): pack(y) for x, y in htcl_logs.items()},
+                {(names[x[0]], x[1]): y for x, y in adj.items()},
+                {names[x]: y for x, y in secnd.items()})
+
+    def unpack_group(self, cached_grp, tot_start):
+        """Restore a group's competition results from the cached format.
+
+        Args:
+            cached_grp (tuple): Competition results for the group in the
+                cached format (see 'pack_group').
+            tot_start (list): Position of each measure's first total.
+
+        Returns:
+            Recorded adjustments for each contributing microsegment in the
+            group, recorded heating/cooling supply-demand adjustments,
+            competed contributing microsegment data, and secondary
+            microsegment adjustment data (as returned by 'compete_worker').
+        """
+        meas_inds = {m.name: ind for ind, m in enumerate(self.measures)}
+        logs, htcl_logs, adj, secnd = cached_grp
+
+        def unpack(log):
+            """Locate adjusted totals among all measure totals."""
+            meas, pos, adj_vals = log
+            return (numpy.array([tot_start[meas_inds[x]] for x in meas],
+                                dtype=int) + pos, adj_vals)
+
+        return ([unpack(x) for x in logs],
+                {(meas_inds[x[0]], x[1]): unpack(y) for
+                 x, y in htcl_logs.items()},
+                {(meas_inds[x[0]], x[1]): y for x, y in adj.items()},
+                {meas_inds[x]: y for x, y in secnd.items()})
+
+    def compete_index(self, adopt_scheme):
+        """Index competing measures by contributing microsegment.
+
+        Notes:
+            The index is built once per adoption scheme, such that the
+            measures that apply to a given contributing microsegment (and
+            the type of that microsegment) need not be determined by
+            scanning the contributing microsegments of all active measures
+            for each unique microsegment in turn.
+
+        Args:
+            adopt_scheme (string): Assumed consumer adoption scenario.
+
+        Returns:
+            OrderedDict keyed by each unique contributing microsegment key
+            string, where each value gives the parsed key tuple, the indices
+            of the measures that apply to the microsegment (in measure
+            order), and flags for the microsegment type (primary/secondary,
+            residential/commercial, supply-side/demand-side). Microsegments
+            are ordered such that all 'primary' microsegments (e.g., relating
+            to direct equipment replacement) are updated before 'secondary'
+            microsegments (e.g., relating to indirect effects of equipment
+            replacement, such as reduced waste heat from changes in
+            lighting).
+        """
+        # Map each contributing microsegment key to the indices of the
+        # measures that it applies to
+        mseg_meas = {}
+        for ind, m in enumerate(self.measures):
+            for msu in m.markets[adopt_scheme]["competed"]["mseg_adjust"][
+                    "contributing mseg keys and values"].keys():
+                mseg_meas.setdefault(msu, []).append(ind)
+
+        comp_index = OrderedDict()
+        for msu in sorted(mseg_meas.keys()):
+            msu_tuple = literal_eval(msu)
+            secnd = "primary" not in msu and "secondary" in msu
+            group = str((msu_tuple[1], msu_tuple[2], msu_tuple[-1]))
+            comp_index[msu] = {
+                "key": msu_tuple,
+                "measures": mseg_meas[msu],
+                "primary": "primary" in msu,
+                "secondary": secnd,
+                "residential": any(x in msu for x in (
+                    'single family home', 'multi family home',
+                    'mobile home')),
+                "supply": "supply" in msu,
+                "demand": "demand" in msu,
+                # Climate zone, building type, and structure type that group
+                # microsegments whose competition is interdependent (and that
+                # link a secondary microsegment to its primary
+                # microsegment(s))
+                "group": group,
+                "secondary adjustment key": group if secnd else None}
+
+        return comp_index
+
+    def compete_arrays(self, vals, on_mkt):
+        """Stack the annual inputs of competing measures into one array.
+
+        Args:
+            vals (list): Annual input values for each competing measure,
+                where each year's value is a point value, a list or dict of
+                values by discount rate category, or an array of sampled
+                point values or sampled dicts by discount rate category.
+            on_mkt (numpy.ndarray): Flags for the years (columns) in which
+                each competing measure (rows) is on the market.
+
+        Returns:
+            An array of input values with dimensions measures x years x
+            samples (x discount rate categories), where point values are
+            repeated across all samples and values for years in which a
+            measure is not on the market are zero, and flags for the years
+            in which at least one measure has sampled input values.
+        """
+        def row(x):
+            """Order a dict of values by discount rate category."""
+            if isinstance(x, dict):
+                return [x[k] for k in sorted(x.keys())]
+            else:
+                return x
+
+        # Convert each measure and year input to an array with a leading
+        # sample dimension (of length one for point values)
+        sampled = numpy.zeros(on_mkt.shape[1], dtype=bool)
+        entries = {}
+        for (ind, ind_l) in zip(*numpy.nonzero(on_mkt)):
+            val = vals[ind][self.handyvars.aeo_years[ind_l]]
+            if isinstance(val, numpy.ndarray):
+                sampled[ind_l] = True
+                if val.dtype == object:
+                    val = [row(x) for x in val]
+                entries[(ind, ind_l)] = numpy.asarray(val, dtype=float)
+            else:
+                entries[(ind, ind_l)] = numpy.asarray(
+                    row(val), dtype=float)[numpy.newaxis]
+        # Size the array to hold all samples (and discount rate categories)
+        if len(entries) > 0:
+            nsamples = max([x.shape[0] for x in entries.values()])
+            shape = next(iter(entries.values())).shape[1:]
+        else:
+            nsamples, shape = 1, ()
+        arr = numpy.zeros(on_mkt.shape + (nsamples,) + shape)
+        for (ind, ind_l), val in entries.items():
+            arr[ind, ind_l] = val
+
+        return arr, sampled
+
+    def compete_fracs(self, shares, on_mkt, sampled):
+        """Set the annual competed market shares for each competing measure.
+
+        Notes:
+            A measure that is not on the market in a given year either
+            splits the market with other competing measures if none of
+            those measures is on the market either, or else has a market
+            share of zero.
+
+        Args:
+            shares (numpy.ndarray): Market shares for competing measures
+                (measures x years x samples).
+            on_mkt (numpy.ndarray): Flags for the years (columns) in which
+                each competing measure (rows) is on the market.
+            sampled (numpy.ndarray): Flags for the years in which market
+                shares are reported as arrays of sampled values.
+
+        Returns:
+            List of dicts with each competing measure's market share by year.
+        """
+        # Market share for measures not on the market in a given year
+        off_mkt_frac = [0 if x else 1 / on_mkt.shape[0] for
+                        x in on_mkt.any(axis=0)]
+
+        return [{yr: (shares[ind, ind_l] if sampled[ind_l] else shares[
+            ind, ind_l, 0]) if on_mkt[ind, ind_l] else off_mkt_frac[ind_l]
+            for ind_l, yr in enumerate(self.handyvars.aeo_years)} for
+            ind in range(on_mkt.shape[0])]
+
     def compete_res_primary(self, measures_adj, mseg_key, adopt_scheme):
         """Apportion stock/energy/carbon/cost across residential measures.
 
@@ -1175,16 +2049,6 @@ class Engine(object):
                  ->structure type).
             adopt_scheme (string): Assumed consumer adoption scenario.
         """
-        # Initialize list of dicts that each store the annual market fractions
-        # captured by competing measures; also initialize a dict that sums
-        # market fractions by year across competing measures (used to normalize
-        # the measure market fractions such that they all sum to 1)
-        mkt_fracs = [{} for meas in range(0, len(measures_adj))]
-        mkt_fracs_tot = dict.fromkeys(self.handyvars.aeo_years, 0)
-
-        # Loop through competing measures and calculate market shares for each
-        # based on their annualized capital and operating costs.
-
         # Set abbreviated names for the dictionaries containing measure
         # capital and operating cost values, accessed further below
 
@@ -1194,6 +2058,10 @@ class Engine(object):
         # Unit operating cost dictionary
         unit_cost_e_in = [m.consumer_metrics["unit cost"]["energy cost"][
             "residential"] for m in measures_adj]
+        # Choice model parameters for the competed microsegment
+        choice_params = [m.markets[adopt_scheme]["competed"]["mseg_adjust"][
+            "competed choice parameters"][str(mseg_key)] for
+            m in measures_adj]
 
         # Find the year range in which at least one measure that applies
         # to the competed primary microsegment is on the market
@@ -1205,91 +2073,38 @@ class Engine(object):
         mkt_entry_yrs = [
             m.market_entry_year for m in measures_adj]
 
-        # Loop through competing measures and calculate market shares for
-        # each based on their annualized capital and operating costs
-        for ind, m in enumerate(measures_adj):
-            # Set measure markets and market adjustment information
-
-            # Loop through all years in time horizon
-            for yr in self.handyvars.aeo_years:
-                # Ensure measure is on the market in given year
-                if yr in m.yrs_on_mkt:
-                    # Set measure capital and operating cost inputs. * Note:
-                    # operating cost is set to just energy costs (for now), but
-                    # could be expanded to include maintenance and carbon costs
-
-                    # Set capital cost (handle as numpy array or point value)
-                    if type(unit_cost_s_in[ind][yr]) == numpy.ndarray:
-                        cap_cost = numpy.zeros(len(unit_cost_s_in[ind][yr]))
-                        for i in range(0, len(unit_cost_s_in[ind][yr])):
-                            cap_cost[i] = unit_cost_s_in[ind][yr][i]
-                    else:
-                        cap_cost = unit_cost_s_in[ind][yr]
-                    # Set operating cost (handle as numpy array or point value)
-                    if type(unit_cost_e_in[ind][yr]) == numpy.ndarray:
-                        op_cost = numpy.zeros(len(unit_cost_e_in[ind][yr]))
-                        for i in range(0, len(unit_cost_e_in[ind][yr])):
-                            op_cost[i] = unit_cost_e_in[ind][yr][i]
-                    else:
-                        op_cost = unit_cost_e_in[ind][yr]
-
-                    # Calculate measure market fraction using log-linear
-                    # regression equation that takes capital/operating
-                    # costs as inputs
-
-                    # Calculate weighted sum of incremental capital and
-                    # operating costs
-                    sum_wt = cap_cost * m.markets[adopt_scheme]["competed"][
-                        "mseg_adjust"]["competed choice parameters"][
-                            str(mseg_key)]["b1"][yr] + op_cost * \
-                        m.markets[adopt_scheme]["competed"]["mseg_adjust"][
-                        "competed choice parameters"][
-                            str(mseg_key)]["b2"][yr]
-
-                    # Guard against cases with very low weighted sums of
-                    # incremental capital and operating costs
-                    if type(sum_wt) != numpy.ndarray and sum_wt < -500:
-                        sum_wt = -500
-                    elif type(sum_wt) == numpy.ndarray and any([
-                            x < -500 for x in sum_wt]):
-                        sum_wt = [-500 if x < -500 else x for x in sum_wt]
-
-                    # Calculate market fraction
-                    mkt_fracs[ind][yr] = numpy.exp(sum_wt)
-
-                    # Add calculated market fraction to mkt fraction sum
-                    mkt_fracs_tot[yr] = \
-                        mkt_fracs_tot[yr] + mkt_fracs[ind][yr]
-
-        # Loop through competing measures to normalize their calculated
-        # market shares to the total market share sum; use normalized
-        # market shares to make adjustments to each measure's master
-        # microsegment values
-        for ind, m in enumerate(measures_adj):
-            # Set measure markets and market adjustment information
-            # Establish starting energy/carbon/cost totals, energy/carbon/cost
-            # results breakout information, and current contributing primary
-            # energy/carbon/cost information for measure
-            mast, mast_brk_base_energy, mast_brk_base_cost, \
-                mast_brk_base_carb, mast_brk_eff_energy, mast_brk_eff_cost, \
-                mast_brk_eff_carb, mast_brk_save_energy, mast_brk_save_cost, \
-                mast_brk_save_carb, adj, mast_list_base, mast_list_eff, \
-                adj_list_eff, adj_list_base = \
-                self.compete_adj_dicts(m, mseg_key, adopt_scheme)
-            # Calculate annual market share fraction for the measure and
-            # adjust measure's master microsegment values accordingly
-            for yr in self.handyvars.aeo_years:
-                # Ensure measure is on the market in given year; if not,
-                # the measure either splits the market with other
-                # competing measures if none of those measures is on
-                # the market either, or else has a market share of zero
-                if yr in m.yrs_on_mkt:
-                    mkt_fracs[ind][yr] = \
-                        mkt_fracs[ind][yr] / mkt_fracs_tot[yr]
-                elif yr not in years_on_mkt_all:
-                    mkt_fracs[ind][yr] = 1 / len(measures_adj)
-                else:
-                    mkt_fracs[ind][yr] = 0
+        # Flag the years in which each competing measure is on the market
+        on_mkt = numpy.array([[yr in x for yr in self.handyvars.aeo_years]
+                              for x in [set(m.yrs_on_mkt) for
+                                        m in measures_adj]], dtype=bool)
+
+        # Set measure capital and operating cost inputs and the choice
+        # model coefficients on these inputs (measures x years x samples).
+        # * Note: operating cost is set to just energy costs (for now), but
+        # could be expanded to include maintenance and carbon costs
+        (cap_cost, op_cost, b1, b2), sampled = zip(*[
+            self.compete_arrays(x, on_mkt) for x in [
+                unit_cost_s_in, unit_cost_e_in,
+                [x["b1"] for x in choice_params],
+                [x["b2"] for x in choice_params]]])
+        sampled = numpy.any(sampled, axis=0)
+
+        # Calculate measure market fractions using log-linear regression
+        # equation that takes capital/operating costs as inputs, guarding
+        # against cases with very low weighted sums of incremental capital
+        # and operating costs
+        mkt_fracs = numpy.where(on_mkt[:, :, numpy.newaxis], numpy.exp(
+            numpy.maximum(cap_cost * b1 + op_cost * b2, -500)), 0)
+        # Sum market fractions by year across competing measures (used to
+        # normalize the measure market fractions such that they all sum to 1)
+        mkt_fracs_tot = 0
+        for x in mkt_fracs:
+            mkt_fracs_tot = mkt_fracs_tot + x
+        # Normalize the calculated market shares to the total market share
+        # sum (for years in which at least one measure is on the market)
+        mkt_fracs = mkt_fracs / numpy.where(
+            mkt_fracs_tot == 0, 1, mkt_fracs_tot)
+        mkt_fracs = self.compete_fracs(mkt_fracs, on_mkt, sampled)
 
         # Check for competing ECMs that apply to but a fraction of the competed
         # market, and apportion the remaining fraction of this market across
@@ -1507,17 +2322,6 @@ class Engine(object):
                  ->structure type).
             adopt_scheme (string): Assumed consumer adoption scenario.
         """
-        # Initialize list of dicts that each store the annual market fractions
-        # captured by competing measures; also initialize a dict that records
-        # the total annualized capital + operating costs for each measure
-        # and discount rate level (used to choose which measure is adopted
-        # under each discount rate level)
-        mkt_fracs = [{} for meas in range(0, len(measures_adj))]
-        tot_cost = [{} for meas in range(0, len(measures_adj))]
-
-        # Calculate the total annualized cost (capital + operating) needed to
-        # determine market shares below
-
         # Set abbreviated names for the dictionaries containing measure
         # capital and operating cost values, accessed further below
 
@@ -1527,6 +2331,11 @@ class Engine(object):
         # Unit operating cost dictionary
         unit_cost_e_in = [m.consumer_metrics["unit cost"]["energy cost"][
             "commercial"] for m in measures_adj]
+        # Fractions of commercial adopters who fall into each discount rate
+        # category for this particular microsegment
+        mkt_dists = [m.markets[adopt_scheme]["competed"]["mseg_adjust"][
+            "competed choice parameters"][str(mseg_key)][
+            "rate distribution"] for m in measures_adj]
 
         # Find the year range in which at least one measure that applies
         # to the competed primary microsegment is on the market
@@ -1538,185 +2347,80 @@ class Engine(object):
         mkt_entry_yrs = [
             m.market_entry_year for m in measures_adj]
 
-        # Initialize a flag that indicates whether any competing measures
-        # have arrays of annualized capital and/or operating costs rather
-        # than point values (resultant of distributions on measure inputs),
-        # for each year in the range above
-        length_array = numpy.repeat(0, len(self.handyvars.aeo_years))
-
-        # Loop through all years in time horizon
-        for ind_l, yr in enumerate(self.handyvars.aeo_years):
-            # Determine whether any of the competing measures have
-            # arrays of annualized capital and/or operating costs for
-            # the given year; if so, find the array length. * Note: all
-            # array lengths should be equal to the 'nsamples' variable
-            # defined in 'ecm_prep.py'
-            if any([type(x[yr]) == numpy.ndarray or
-                    type(y[yr]) == numpy.ndarray for
-                    x, y in zip(unit_cost_s_in, unit_cost_e_in)]) is True:
-                length_array[ind_l] = next(
-                    (len(x[yr]) or len(y[yr]) for x, y in
-                     zip(unit_cost_s_in, unit_cost_e_in) if type(x[yr]) ==
-                     numpy.ndarray or type(y[yr]) == numpy.ndarray),
-                    length_array[ind_l])
-
-        # Loop through competing measures and calculate market shares for
-        # each based on their annualized capital and operating costs
-        for ind, m in enumerate(measures_adj):
-            # Set measure markets and market adjustment information
-            # Loop through all years in time horizon
-            for ind_l, yr in enumerate(self.handyvars.aeo_years):
-                # Ensure measure is on the market in given year
-                if yr in m.yrs_on_mkt:
-                    # Set measure capital and operating cost inputs. * Note:
-                    # operating cost is set to just energy costs (for now), but
-                    # could be expanded to include maintenance and carbon costs
-
-                    # Handle cases where capital and/or operating cost inputs
-                    # are specified as arrays for at least one of the competing
-                    # measures. In this case, the capital and operating costs
-                    # for all measures must be formatted consistently as arrays
-                    # of the same length
-                    if length_array[ind_l] > 0:
-                        cap_cost, op_cost = ([
-                            {} for n in range(length_array[ind_l])] for
-                            n in range(2))
-                        for i in range(length_array[ind_l]):
-                            # Set capital cost input array
-                            if type(unit_cost_s_in[ind][yr]) == numpy.ndarray:
-                                cap_cost[i] = unit_cost_s_in[ind][yr][i]
-                            else:
-                                cap_cost[i] = unit_cost_s_in[ind][yr]
-                            # Set operating cost input array
-                            if type(unit_cost_e_in[ind][yr]) == numpy.ndarray:
-                                op_cost[i] = unit_cost_e_in[ind][yr][i]
-                            else:
-                                op_cost[i] = unit_cost_e_in[ind][yr]
-                        # Sum capital and operating cost arrays and add to the
-                        # total cost dict entry for the given measure
-                        tot_cost[ind][yr] = [
-                            [] for n in range(length_array[ind_l])]
-                        for c_l in range(0, len(tot_cost[ind][yr])):
-                            for dr in sorted(cap_cost[c_l].keys()):
-                                tot_cost[ind][yr][c_l].append(
-                                    cap_cost[c_l][dr] + op_cost[c_l][dr])
-                    # Handle cases where capital and/or operating cost inputs
-                    # are specified as point values for all competing measures
-                    else:
-                        # Set capital cost point value
-                        cap_cost = unit_cost_s_in[ind][yr]
-                        # Set operating cost point value
-                        op_cost = unit_cost_e_in[ind][yr]
-
-                        # Sum capital and operating cost point values and add
-                        # to the total cost dict entry for the given measure
-                        tot_cost[ind][yr] = []
-                        for dr in sorted(cap_cost.keys()):
-                            tot_cost[ind][yr].append(
-                                cap_cost[dr] + op_cost[dr])
-
-        # Loop through competing measures and use total annualized capital
-        # + operating costs to determine the overall share of the market
-        # that is captured by each measure; use market shares to make
-        # adjustments to each measure's master microsegment values
-        for ind, m in enumerate(measures_adj):
-            # Calculate annual market share fraction for the measure and
-            # adjust measure's master microsegment values accordingly
-
-            # Loop through all years in time horizon
-            for ind_l, yr in enumerate(self.handyvars.aeo_years):
-                # Ensure measure is on the market in given year; if not,
-                # the measure either splits the market with other
-                # competing measures if none of those measures is on
-                # the market either, or else has a market share of zero
-                if yr in m.yrs_on_mkt:
-                    # Set the fractions of commericial adopters who fall into
-                    # each discount rate category for this particular
-                    # microsegment
-                    mkt_dists = m.markets[adopt_scheme]["competed"][
-                        "mseg_adjust"]["competed choice parameters"][
-                            str(mseg_key)]["rate distribution"][yr]
-                    # For each discount rate category, find which measure has
-                    # the lowest annualized cost and assign that measure the
-                    # share of commercial market adopters defined for that
-                    # category above
-
-                    # Handle cases where capital and/or operating cost inputs
-                    # are specified as lists for at least one of the competing
-                    # measures.
-                    if length_array[ind_l] > 0:
-                        mkt_fracs[ind][yr] = [
-                            [] for n in range(length_array[ind_l])]
-                        for c_l in range(length_array[ind_l]):
-                            for ind2, dr in enumerate(tot_cost[ind][yr][c_l]):
-                                # Find the lowest annualized cost for the given
-                                # set of competing measures and discount bin
-                                min_val = min([
-                                    tot_cost[x][yr][c_l][ind2] for x in
-                                    range(0, len(measures_adj)) if
-                                    yr in tot_cost[x].keys()])
-                                # Determine how many of the competing measures
-                                # have the lowest annualized cost under
-                                # the given discount rate bin
-                                min_val_ecms = [
-                                    x for x in range(0, len(measures_adj)) if
-                                    yr in tot_cost[x].keys() and
-                                    tot_cost[x][yr][c_l][ind2] == min_val]
-                                # If the current measure has the lowest
-                                # annualized cost, assign it the appropriate
-                                # market share for the current discount rate
-                                # category being looped through, divided by the
-                                # total number of competing measures that share
-                                # the lowest annualized cost
-                                if tot_cost[ind][yr][c_l][ind2] == min_val:
-                                    mkt_fracs[ind][yr][c_l].append(
-                                        mkt_dists[ind2] / len(min_val_ecms))
-                                # Otherwise, set its market share for that
-                                # discount rate bin to zero
-                                else:
-                                    mkt_fracs[ind][yr][c_l].append(0)
-                            mkt_fracs[ind][yr][c_l] = sum(
-                                mkt_fracs[ind][yr][c_l])
-                        # Convert market fractions list to numpy array for
-                        # use in compete_adj function below
-                        mkt_fracs[ind][yr] = numpy.array(
-                            mkt_fracs[ind][yr])
-                    # Handle cases where capital and/or operating cost inputs
-                    # are specified as point values for all competing measures
-                    else:
-                        mkt_fracs[ind][yr] = []
-                        for ind2, dr in enumerate(tot_cost[ind][yr]):
-                            # Find the lowest annualized cost for the given
-                            # set of competing measures and discount bin
-                            min_val = min([
-                                tot_cost[x][yr][ind2] for x in
-                                range(0, len(measures_adj)) if
-                                yr in tot_cost[x].keys()])
-                            # Determine how many of the competing measures
-                            # have the lowest annualized cost under
-                            # the given discount rate bin
-                            min_val_ecms = [
-                                x for x in range(0, len(measures_adj)) if
-                                yr in tot_cost[x].keys() and
-                                tot_cost[x][yr][ind2] == min_val]
-                            # If the current measure has the lowest
-                            # annualized cost, assign it the appropriate
-                            # market share for the current discount rate
-                            # category being looped through, divided by the
-                            # total number of competing measures that share
-                            # the lowest annualized cost
-                            if tot_cost[ind][yr][ind2] == min_val:
-                                mkt_fracs[ind][yr].append(
-                                    mkt_dists[ind2] / len(min_val_ecms))
-                            # Otherwise, set its market share for that
-                            # discount rate bin to zero
-                            else:
-                                mkt_fracs[ind][yr].append(0)
-                        mkt_fracs[ind][yr] = sum(mkt_fracs[ind][yr])
-                elif yr not in years_on_mkt_all:
-                    mkt_fracs[ind][yr] = 1 / len(measures_adj)
-                else:
-                    mkt_fracs[ind][yr] = 0
+        # Flag the years in which each competing measure is on the market
+        on_mkt = numpy.array([[yr in x for yr in self.handyvars.aeo_years]
+                              for x in [set(m.yrs_on_mkt) for
+                                        m in measures_adj]], dtype=bool)
+
+        # Determine whether any of the competing measures have arrays of
+        # annualized capital and/or operating costs rather than point values
+        # (resultant of distributions on measure inputs) for each year, and
+        # if so, find the array length. In such years, market shares for all
+        # competing measures must be formatted consistently as arrays of the
+        # same length. * Note: all array lengths should be equal to the
+        # 'nsamples' variable defined in 'ecm_prep.py'
+        length_array = [max([len(x[yr]) for x in (
+            unit_cost_s_in + unit_cost_e_in) if
+            isinstance(x[yr], numpy.ndarray)] + [0]) for
+            yr in self.handyvars.aeo_years]
+        sampled = numpy.array(length_array) > 0
+
+        # For years in which at least one measure is on the market, use total
+        # annualized capital + operating costs to determine the overall share
+        # of the market that is captured by each measure
+        if on_mkt.any():
+            # Sum measure capital and operating costs by discount rate
+            # category (measures x years x samples x categories). * Note:
+            # operating cost is set to just energy costs (for now), but could
+            # be expanded to include maintenance and carbon costs
+            (cap_cost, op_cost), _ = zip(*[
+                self.compete_arrays(x, on_mkt) for x in [
+                    unit_cost_s_in, unit_cost_e_in]])
+            tot_cost = cap_cost + op_cost
+            # Set the fractions of commercial adopters who fall into each
+            # discount rate category (measures x years x 1 x categories)
+            dr_dists = numpy.zeros(
+                on_mkt.shape + (1,) + tot_cost.shape[3:])
+            for (ind, ind_l) in zip(*numpy.nonzero(on_mkt)):
+                dr_dists[ind, ind_l, 0] = mkt_dists[ind][
+                    self.handyvars.aeo_years[ind_l]]
+            # For each discount rate category, find the lowest annualized
+            # cost across the competing measures that are on the market, and
+            # determine how many of these measures share the lowest cost
+            on_mkt_cost = on_mkt[:, :, numpy.newaxis, numpy.newaxis]
+            min_cost = numpy.where(
+                on_mkt_cost, tot_cost, numpy.inf).min(axis=0)
+            is_min = on_mkt_cost & (tot_cost == min_cost)
+            n_min = is_min.sum(axis=0)
+            # Assign each measure with the lowest annualized cost the share
+            # of commercial market adopters defined for each discount rate
+            # category, divided by the total number of competing measures
+            # that share the lowest annualized cost; otherwise, set its
+            # market share for that category to zero
+            dr_fracs = numpy.where(
+                is_min, dr_dists / numpy.maximum(n_min, 1), 0)
+            # Sum market shares across all discount rate categories
+            mkt_fracs = 0
+            for ind2 in range(dr_fracs.shape[-1]):
+                mkt_fracs = mkt_fracs + dr_fracs[..., ind2]
+            # Ensure that market shares span all samples in years where any
+            # competing measure has sampled costs
+            if mkt_fracs.shape[-1] < max(length_array):
+                mkt_fracs = numpy.repeat(
+                    mkt_fracs, max(length_array), axis=-1)
+            # Flag measures that are on the market but do not have the lowest
+            # annualized cost in any discount rate category (or sample)
+            no_fracs = on_mkt & ~is_min.any(axis=(2, 3))
+        else:
+            mkt_fracs = numpy.zeros(on_mkt.shape + (1,))
+            no_fracs = on_mkt
+        mkt_fracs = self.compete_fracs(mkt_fracs, on_mkt, sampled)
+        # Set an integer market share of zero for measures that capture no
+        # part of the market in a given year
+        for (ind, ind_l) in zip(*numpy.nonzero(no_fracs)):
+            yr = self.handyvars.aeo_years[ind_l]
+            mkt_fracs[ind][yr] = (
+                mkt_fracs[ind][yr].astype(int) if sampled[ind_l] else 0)
 
         # Check for competing ECMs that apply to but a fraction of the competed
         # market, and apportion the remaining fraction of this market across
@@ -1956,91 +2660,54 @@ class Engine(object):
             added_sbmkt_fracs = [{yr: 0 for yr in self.handyvars.aeo_years} for
                                  n in range(len_compete)]
         else:
-            # For each competed ECM, set the total unaffected market segment
-            # across all years in the analysis
-            noapply_sbsbmkt_distrib_fracs_yr = [{
-                yr: noapply_sbmkt_fracs[ind] * mkt_fracs[ind][yr] for
-                yr in self.handyvars.aeo_years} for
-                     ind in range(len(measures_adj))]
-
-            # Initialize a list of dicts where each dict represents the
-            # additional market fraction an ECM should receive to reflect the
-            # presence of sub-market scaling in the competing ECM set
-            added_sbmkt_fracs = [{yr: 0 for yr in self.handyvars.aeo_years} for
-                                 n in range(len_compete)]
-            # Loop through all competing ECMs, determining how to distribute
-            # the portion of the competed segment that the ECM does not apply
-            # to (if any) across other competing ECMs in the analysis
-            for m in range(len_compete):
-                # Loop through all years in the analysis
-                for yr in self.handyvars.aeo_years:
-                    # Set the current measure's unused portion of the segment
-                    # to redistribute in the current year
-                    seg_redist = noapply_sbsbmkt_distrib_fracs_yr[m][yr]
-                    # Determine which of the other competing ECMs is eligible
-                    # to receive the current ECM's inapplicable segment
-                    # portion. NOTE: it is assumed that competing ECMs that
-                    # also do not apply to the entire segment are ineligible
-                    distrib_inds = [1 if noapply_sbmkt_fracs[mc] == 0
-                                    else 0 for mc in range(0, len_compete)]
-
-                    # Case where one or more competing ECMs applies to the full
-                    # competed segment, but the market shares for these ECMs
-                    # are all zero
-                    if (type(mkt_fracs[0][yr]) != numpy.ndarray and all(
-                        [(mkt_fracs[x][yr] == 0) for
-                            x in range(0, len(distrib_inds)) if
-                            distrib_inds[x] == 1])) or \
-                       (type(mkt_fracs[0][yr]) == numpy.ndarray and all(
-                        [all([mkt_fracs[x][yr][y] == 0 for
-                             y in range(len(mkt_fracs[x][yr]))]) for
-                            x in range(0, len(distrib_inds)) if
-                            distrib_inds[x] == 1])):
-                        # Set weights to use in distributing the current ECM's
-                        # inapplicable segment portion across all other
-                        # competing ECMs that apply to the full competed
-                        # segment; since in this case the market shares for
-                        # these other ECMs are all zero, set weights such that
-                        # the re-distribution is even across these other ECMs
-                        if sum(distrib_inds) == 0:
-                            sbmkt_distrib_fracs_yr = [
-                                0 for n in range(len_compete)]
-                        else:
-                            even_frac = 1 / sum(distrib_inds)
-                            sbmkt_distrib_fracs_yr = [
-                                even_frac if distrib_inds[mc] == 1
-                                else 0 for mc in range(0, len_compete)]
-                    # All other cases
-                    else:
-                        # Set weights to use in distributing the current ECM's
-                        # inapplicable segment portion across all other
-                        # competing ECMs that apply to the full competed
-                        # segment, based on each ECM's competed market share
-                        sbmkt_distrib_fracs_yr = [
-                            mkt_fracs[mc][yr] if distrib_inds[mc] == 1
-                            else 0 for mc in range(0, len_compete)]
-                        # Re-normalize the weighting factors to ensure that
-                        # they sum to 1
-                        if (type(sbmkt_distrib_fracs_yr[0]) != numpy.ndarray
-                            and sum(sbmkt_distrib_fracs_yr) != 0) or \
-                           (type(sbmkt_distrib_fracs_yr[0]) == numpy.ndarray
-                            and all([sum(sbmkt_distrib_fracs_yr[x]) != 0 for
-                                    x in range(len(sbmkt_distrib_fracs_yr))])):
-                            sbmkt_distrib_fracs_yr = [
-                                x / sum(sbmkt_distrib_fracs_yr) for
-                                x in sbmkt_distrib_fracs_yr]
-                        else:
-                            sbmkt_distrib_fracs_yr = [
-                                0 for n in range(len(sbmkt_distrib_fracs_yr))]
-
-                    # Loop through all competing ECMs and set the portion of
-                    # the current ECM's inapplicable segment that goes to each
-                    for mn in range(len_compete):
-                        # For each competing ECM and year, multiply the total
-                        # inapplicable segment fraction by the ECM's
-                        # re-distribution weights calculated above
-                        added_sbmkt_fracs[mn][yr] += (
-                            seg_redist * (sbmkt_distrib_fracs_yr[mn]))
+            # Stack ECM market shares (ECMs x years x samples) and flag the
+            # years in which market shares are given as arrays
+            fracs_arr, sampled = self.compete_arrays(
+                mkt_fracs, numpy.ones(
+                    (len_compete, len(self.handyvars.aeo_years)), dtype=bool))
+            # Determine which of the competing ECMs are eligible to receive
+            # other ECMs' inapplicable segment portions. NOTE: it is assumed
+            # that competing ECMs that also do not apply to the entire segment
+            # are ineligible
+            distrib_inds = numpy.array([
+                x == 0 for x in noapply_sbmkt_fracs])[
+                    :, numpy.newaxis, numpy.newaxis]
+
+            # Set weights to use in distributing each ECM's inapplicable
+            # segment portion across all other competing ECMs that apply to
+            # the full competed segment, based on each ECM's competed market
+            # share; re-normalize the weighting factors to ensure that they
+            # sum to 1
+            sbmkt_distrib_fracs = numpy.where(distrib_inds, fracs_arr, 0)
+            sbmkt_distrib_tot = 0
+            for x in sbmkt_distrib_fracs:
+                sbmkt_distrib_tot = sbmkt_distrib_tot + x
+            sbmkt_distrib_fracs = numpy.where(
+                sbmkt_distrib_tot != 0, sbmkt_distrib_fracs / numpy.where(
+                    sbmkt_distrib_tot == 0, 1, sbmkt_distrib_tot), 0)
+            # Case where one or more competing ECMs applies to the full
+            # competed segment, but the market shares for these ECMs are all
+            # zero; set weights such that the re-distribution is even across
+            # these other ECMs
+            if distrib_inds.any():
+                sbmkt_distrib_fracs = numpy.where(
+                    numpy.all(numpy.where(
+                        distrib_inds, fracs_arr, 0) == 0, axis=0),
+                    numpy.where(distrib_inds, 1 / distrib_inds.sum(), 0),
+                    sbmkt_distrib_fracs)
+
+            # Loop through all competing ECMs, multiplying the ECM's total
+            # inapplicable segment fraction in each year by the other ECMs'
+            # re-distribution weights calculated above
+            added_sbmkt_fracs = 0
+            for ind, x in enumerate(noapply_sbmkt_fracs):
+                added_sbmkt_fracs = added_sbmkt_fracs + (
+                    x * fracs_arr[ind]) * sbmkt_distrib_fracs
+            added_sbmkt_fracs = [{
+                yr: added_sbmkt_fracs[ind, ind_l] if sampled[ind_l] else
+                added_sbmkt_fracs[ind, ind_l, 0] for ind_l, yr in
+                enumerate(self.handyvars.aeo_years)} for
+                ind in range(len_compete)]
 
         return added_sbmkt_fracs
 
@@ -2127,51 +2794,36 @@ class Engine(object):
                 # cost/carbon, and energy/cost/carbon savings totals
                 # grouped by climate zone, building type, and end use by
                 # the appropriate fraction
-
-                # Energy
-                # Baseline
-                mast_brk_base_energy[yr] = mast_brk_base_energy[yr] - (
-                    adj["energy"]["total"]["baseline"][yr]) * (
-                    1 - adj_frac_tot)
-                # Efficient
-                mast_brk_eff_energy[yr] = mast_brk_eff_energy[yr] - (
-                    adj["energy"]["total"]["efficient"][yr]) * (
-                    1 - adj_frac_tot)
-                # Savings
-                mast_brk_save_energy[yr] = mast_brk_save_energy[yr] - ((
-                    adj["energy"]["total"]["baseline"][yr] -
-                    adj["energy"]["total"]["efficient"][yr]) * (
-                    1 - adj_frac_tot))
-
-                # Cost
-                # Baseline
-                mast_brk_base_cost[yr] = mast_brk_base_cost[yr] - (
-                    adj["cost"]["energy"]["total"]["baseline"][yr]) * (
-                        1 - adj_frac_tot)
-                # Efficient
-                mast_brk_eff_cost[yr] = mast_brk_eff_cost[yr] - (
-                    adj["cost"]["energy"]["total"]["efficient"][yr]) * (
-                        1 - adj_frac_tot)
-                # Savings
-                mast_brk_save_cost[yr] = mast_brk_save_cost[yr] - ((
-                    adj["cost"]["energy"]["total"]["baseline"][yr] -
-                    adj["cost"]["energy"]["total"]["efficient"][yr]) * (
-                        1 - adj_frac_tot))
-
-                # Carbon
-                # Baseline
-                mast_brk_base_carb[yr] = mast_brk_base_carb[yr] - (
-                    adj["carbon"]["total"]["baseline"][yr]) * (
-                    1 - adj_frac_tot)
-                # Efficient
-                mast_brk_eff_carb[yr] = mast_brk_eff_carb[yr] - (
-                    adj["carbon"]["total"]["efficient"][yr]) * (
-                    1 - adj_frac_tot)
-                # Savings
-                mast_brk_save_carb[yr] = mast_brk_save_carb[yr] - ((
-                    adj["carbon"]["total"]["baseline"][yr] -
-                    adj["carbon"]["total"]["efficient"][yr]) * (
-                    1 - adj_frac_tot))
+                self.adj_totals([
+                    mast_brk_base_energy, mast_brk_eff_energy,
+                    mast_brk_save_energy, mast_brk_base_cost,
+                    mast_brk_eff_cost, mast_brk_save_cost,
+                    mast_brk_base_carb, mast_brk_eff_carb,
+                    mast_brk_save_carb], yr, [
+                    # Energy (baseline, efficient, savings)
+                    (adj["energy"]["total"]["baseline"][yr]) * (
+                        1 - adj_frac_tot),
+                    (adj["energy"]["total"]["efficient"][yr]) * (
+                        1 - adj_frac_tot),
+                    ((adj["energy"]["total"]["baseline"][yr] -
+                      adj["energy"]["total"]["efficient"][yr]) * (
+                        1 - adj_frac_tot)),
+                    # Cost (baseline, efficient, savings)
+                    (adj["cost"]["energy"]["total"]["baseline"][yr]) * (
+                        1 - adj_frac_tot),
+                    (adj["cost"]["energy"]["total"]["efficient"][yr]) * (
+                        1 - adj_frac_tot),
+                    ((adj["cost"]["energy"]["total"]["baseline"][yr] -
+                      adj["cost"]["energy"]["total"]["efficient"][yr]) * (
+                        1 - adj_frac_tot)),
+                    # Carbon (baseline, efficient, savings)
+                    (adj["carbon"]["total"]["baseline"][yr]) * (
+                        1 - adj_frac_tot),
+                    (adj["carbon"]["total"]["efficient"][yr]) * (
+                        1 - adj_frac_tot),
+                    ((adj["carbon"]["total"]["baseline"][yr] -
+                      adj["carbon"]["total"]["efficient"][yr]) * (
+                        1 - adj_frac_tot))])
 
                 # Adjust total and competed baseline and efficient
                 # data by the appropriate secondary adjustment factor
@@ -2186,18 +2838,10 @@ class Engine(object):
                     # associated cost savings by the secondary adjustment
                     # factor, both overall and for the current
                     # contributing microsegment
-                    mast["cost"]["energy"]["total"][x][yr], \
-                        mast["cost"]["carbon"]["total"][x][yr], \
-                        mast["energy"]["total"][x][yr], \
-                        mast["carbon"]["total"][x][yr] = [
-                            x[yr] - (y[yr] * (1 - adj_frac_tot)) for x, y in
-                            zip(mastlist[1:5], adjlist[1:5])]
-                    mast["cost"]["energy"]["competed"][x][yr], \
-                        mast["cost"]["carbon"]["competed"][x][yr], \
-                        mast["energy"]["competed"][x][yr], \
-                        mast["carbon"]["competed"][x][yr] = [
-                            x[yr] - (y[yr] * (1 - adj_frac_comp)) for x, y in
-                            zip(mastlist[6:], adjlist[6:])]
+                    self.adj_totals(mastlist[1:5], yr, [
+                        (y[yr] * (1 - adj_frac_tot)) for y in adjlist[1:5]])
+                    self.adj_totals(mastlist[6:], yr, [
+                        (y[yr] * (1 - adj_frac_comp)) for y in adjlist[6:]])
                     adj["cost"]["energy"]["total"][x][yr], \
                         adj["cost"]["carbon"]["total"][x][yr], \
                         adj["energy"]["total"][x][yr], \
@@ -2290,7 +2934,8 @@ class Engine(object):
 
         return htcl_adj_data
 
-    def htcl_adj(self, measures_htcl_adj, adopt_scheme, htcl_adj_data):
+    def htcl_adj(self, measures_htcl_adj, adopt_scheme, htcl_adj_data,
+                 mseg_keys=None):
         """Remove heating/cooling supply-demand energy/carbon/cost overlaps.
 
         Notes:
@@ -2304,6 +2949,8 @@ class Engine(object):
             htcl_adj_data (dict): Overlapping supply or demand-side heating/
                 cooling energy use data to use in scaling down energy/carbon/
                 cost overlaps.
+            mseg_keys (set): Contributing microsegments to restrict the
+                adjustments to (defaults to all contributing microsegments).
         """
         # Loop through all ECMs requiring additional energy/carbon/cost
         # adjustments
@@ -2314,222 +2961,215 @@ class Engine(object):
             # REASONABLE APPROACH FOR ADJUSTING THESE IS IMPLEMENTED
             htcl_keys = [k for k in m.markets[adopt_scheme]["competed"][
                 "mseg_adjust"]["contributing mseg keys and values"].keys() if
-                "primary" in k and ("supply" in k or "demand" in k)]
+                "primary" in k and ("supply" in k or "demand" in k) and (
+                    mseg_keys is None or k in mseg_keys)]
             # Loop through the ECM's supply-side or demand-side heating/cooling
             # contributing microsegments and scale down energy, carbon, and
             # cost data for that microsegment to remove previously recorded
             # overlaps across the heating/cooling supply-side and demand-side
             for mseg in htcl_keys:
-                # Convert contributing microsegment key chain string to a list
-                keys = literal_eval(mseg)
-                # Pull out climate zone, building type, structure type,
-                # fuel type, and end use
-                msu_split = [str(x) for x in [keys[1], keys[2], keys[-1],
-                                              keys[3], keys[4]]]
-                # Convert climate zone, building type, structure type, fuel
-                # type, and end use data into a string, to be used as a dict
-                # key below
-                msu_split_key = str(msu_split)
-                # Set the technology type of the current microsegment, as well
-                # as the technology types of overlapping microsegments (e.g.,
-                # if the current microsegment is on the supply-side of
-                # heating/cooling, overlapping microsegments are on the demand
-                # side, and vice versa)
-                if 'supply' in mseg:
-                    tech_typ, tech_typ_overlp = ["supply", "demand"]
-                else:
-                    tech_typ, tech_typ_overlp = ["demand", "supply"]
-                # If no overlapping energy use data exist for the current
-                # microsegment's climate zone, building type, structure
-                # type, fuel type, and end use combination, move to next
-                # contributing microsegment
-                if msu_split_key not in htcl_adj_data[tech_typ].keys():
-                    continue
+                self.htcl_adj_mseg(m, mseg, adopt_scheme, htcl_adj_data)
 
-                # If overlapping energy use data do exist for the current
-                # microsegment's climate zone, building type, structure
-                # type, fuel type, and end use combination, create short name
-                # for current microsegment energy data dict and overlapping
-                # energy data dict; Note: if no overlapping energy data dict
-                # can be found, move to next heating/cooling contributing
-                # microsegment in for loop
-                tech_data = htcl_adj_data[tech_typ][msu_split_key]
-                try:
-                    overlp_data = htcl_adj_data[tech_typ_overlp][msu_split_key]
-                except KeyError:
-                    continue
-                # Establish set of dicts used to adjust the contributing
-                # microsegment energy, carbon, and cost data and master energy,
-                # carbon, and cost data to remove the overlaps
-                mast, mast_brk_base_energy, mast_brk_base_cost, \
-                    mast_brk_base_carb, mast_brk_eff_energy, \
-                    mast_brk_eff_cost, mast_brk_eff_carb, \
-                    mast_brk_save_energy, mast_brk_save_cost, \
-                    mast_brk_save_carb, adj, mast_list_base, mast_list_eff, \
-                    adj_list_eff, adj_list_base = self.compete_adj_dicts(
-                        m, mseg, adopt_scheme)
-                # Adjust contributing and master energy/carbon/cost
-                # data to remove recorded supply-demand overlaps
-                for yr in self.handyvars.aeo_years:
-                    # Find the fraction of total possibly overlapping
-                    # heating/cooling energy for the given climate zone,
-                    # building type, and structure type combination that is
-                    # actually affected by ECMs in the analysis (e.g., if
-                    # looping through a supply-side contributing microsegment,
-                    # this is the portion of total energy affected by demand-
-                    # side microsegments in the analysis, and vice versa)
-                    if overlp_data["total"][yr] != 0:
-                        affected_frac = (overlp_data["total affected"][yr] /
-                                         overlp_data["total"][yr])
-                    else:
-                        affected_frac = 0
-                    # Find overall relative performance for the technology
-                    # type of the current contributing microsegment in the
-                    # given climate zone, building type, and structure type
-                    # combination
-                    if (type(tech_data["total affected"][yr]) !=
-                        numpy.ndarray and
-                        tech_data["total affected"][yr] != 0) or (
-                        type(tech_data[
-                            "total affected"][yr]) == numpy.ndarray and
-                        all([x != 0 for x in
-                             tech_data["total affected"][yr]])):
-                        rel_perf_tech = (1 - (
-                            tech_data["affected savings"][yr] /
-                            tech_data["total affected"][yr]))
-                    else:
-                        rel_perf_tech = 1
-                    # Find overall relative performance for the overlapping
-                    # technology type in the given climate zone, building
-                    # type, and structure type combination
-                    if (type(overlp_data["total affected"][yr]) !=
-                        numpy.ndarray and
-                        overlp_data["total affected"][yr] != 0) or (
-                        type(overlp_data[
-                            "total affected"][yr]) == numpy.ndarray and
-                        all([x != 0 for x in
-                             overlp_data["total affected"][yr]])):
-                        rel_perf_tech_overlp = (1 - (
-                            overlp_data["affected savings"][yr] /
-                            overlp_data["total affected"][yr]))
-                    else:
-                        rel_perf_tech_overlp = 1
-                    # Calculate the ratio of relative performances between the
-                    # current microsegment and overlapping microsegments'
-                    # technology types in the given climate zone, building
-                    # type, and structure type combination; ensure that
-                    # neither performance value is negative for the comparison
-                    if (all([type(x) != numpy.ndarray for x in [
-                        rel_perf_tech, rel_perf_tech_overlp]]) and
-                        (abs(1 - rel_perf_tech) +
-                         abs(1 - rel_perf_tech_overlp) != 0)) or (
-                        any([type(x) == numpy.ndarray for x in [
-                            rel_perf_tech, rel_perf_tech_overlp]]) and
-                        all([x != 0 for x in (
-                            abs(1 - rel_perf_tech) +
-                            abs(1 - rel_perf_tech_overlp))])):
-                        save_ratio = abs(1 - rel_perf_tech) / (abs(
-                            1 - rel_perf_tech) + abs(1 - rel_perf_tech_overlp))
-                    else:
-                        save_ratio = 0.5
-
-                    # Calculate baseline and efficient adjustment fractions
-
-                    # Adjust baseline data to reflect the fraction of energy
-                    # use affected by the overlapping microsegments, plus the
-                    # portion of affected energy use saved by the overlapping
-                    # microsegments
-                    adj_frac_base = (1 - affected_frac) + \
-                        affected_frac * save_ratio
-
-                    # Adjust efficient data in the same way as baseline data,
-                    # but with additional consideration for the energy savings
-                    # benefits of the overlapping microsegments
-                    adj_frac_eff = (1 - affected_frac) + \
-                        affected_frac * save_ratio * rel_perf_tech_overlp
-
-                    # Use the baseline/efficient adjustment fractions above to
-                    # adjust the ECM's current contributing and master energy,
-                    # carbon, and cost data and remove any overlaps
-                    for x in ["baseline", "efficient"]:
-                        # Determine appropriate adjustment data and factors to
-                        # use for baseline or efficient case
-                        if x == "baseline":
-                            mastlist, adjlist = [mast_list_base, adj_list_base]
-                            # Set adj. fraction from above to baseline case
-                            adj_frac = adj_frac_base
-                        else:
-                            mastlist, adjlist = [mast_list_eff, adj_list_eff]
-                            # Set adj. fraction from above to efficient case
-                            adj_frac = adj_frac_eff
-                        # Adjust the total and competed energy, carbon, and
-                        # associated cost data for both the ECM's current
-                        # contributing microsegment and master microsegment
-                        mast["cost"]["energy"]["total"][x][yr], \
-                            mast["cost"]["carbon"]["total"][x][yr], \
-                            mast["energy"]["total"][x][yr],\
-                            mast["carbon"]["total"][x][yr] = [
-                                x[yr] - (y[yr] * (1 - adj_frac))
-                                for x, y in zip(mastlist[1:5], adjlist[1:5])]
-                        mast["cost"]["energy"]["competed"][x][yr], \
-                            mast["cost"]["carbon"]["competed"][x][yr], \
-                            mast["energy"]["competed"][x][yr],\
-                            mast["carbon"]["competed"][x][yr] = [
-                                x[yr] - (y[yr] * (1 - adj_frac))
-                                for x, y in zip(mastlist[6:], adjlist[6:])]
-
-                    # Adjust baseline energy/cost/carbon, efficient energy/
-                    # cost/carbon, and energy/cost/carbon savings totals
-                    # grouped by climate zone, building type, and end use by
-                    # the appropriate fraction
-
-                    # Energy
-                    # Baseline - use baseline adjustment fraction
-                    mast_brk_base_energy[yr] = mast_brk_base_energy[yr] - (
-                        adj["energy"]["total"]["baseline"][yr]) * (
-                        1 - adj_frac_base)
-                    # Efficient - use efficient adjustment fraction
-                    mast_brk_eff_energy[yr] = mast_brk_eff_energy[yr] - (
-                        adj["energy"]["total"]["efficient"][yr]) * (
-                        1 - adj_frac_eff)
-                    # Savings - use both baseline/efficient fractions
-                    mast_brk_save_energy[yr] = mast_brk_save_energy[yr] - (
-                        adj["energy"]["total"]["baseline"][yr] * (
-                            1 - adj_frac_base) -
-                        adj["energy"]["total"]["efficient"][yr] * (
-                            1 - adj_frac_eff))
-
-                    # Cost
-                    # Baseline - use baseline adjustment fraction
-                    mast_brk_base_cost[yr] = mast_brk_base_cost[yr] - (
-                        adj["cost"]["energy"]["total"]["baseline"][yr]) * (
-                        1 - adj_frac_base)
-                    # Efficient - use efficient adjustment fraction
-                    mast_brk_eff_cost[yr] = mast_brk_eff_cost[yr] - (
-                        adj["cost"]["energy"]["total"]["efficient"][yr]) * (
-                        1 - adj_frac_eff)
-                    # Savings - use both baseline/efficient fractions
-                    mast_brk_save_cost[yr] = mast_brk_save_cost[yr] - (
-                        adj["cost"]["energy"]["total"]["baseline"][yr] * (
-                            1 - adj_frac_base) -
-                        adj["cost"]["energy"]["total"]["efficient"][yr] * (
-                            1 - adj_frac_eff))
-
-                    # Carbon
-                    # Baseline - use baseline adjustment fraction
-                    mast_brk_base_carb[yr] = mast_brk_base_carb[yr] - (
-                        adj["carbon"]["total"]["baseline"][yr]) * (
-                        1 - adj_frac_base)
-                    # Efficient - use efficient adjustment fraction
-                    mast_brk_eff_carb[yr] = mast_brk_eff_carb[yr] - (
-                        adj["carbon"]["total"]["efficient"][yr]) * (
-                        1 - adj_frac_eff)
-                    # Savings - use both baseline/efficient fractions
-                    mast_brk_save_carb[yr] = mast_brk_save_carb[yr] - (
-                        adj["carbon"]["total"]["baseline"][yr] * (
-                            1 - adj_frac_base) -
-                        adj["carbon"]["total"]["efficient"][yr] * (
-                            1 - adj_frac_eff))
+    def htcl_adj_mseg(self, m, mseg, adopt_scheme, htcl_adj_data):
+        """Remove supply-demand overlaps for one contributing microsegment.
+
+        Args:
+            m (object): Measure requiring supply-demand adjustments to
+                energy/carbon/cost totals.
+            mseg (string): Supply-side or demand-side heating/cooling
+                contributing microsegment key to adjust.
+            adopt_scheme (string): Assumed consumer adoption scenario.
+            htcl_adj_data (dict): Overlapping supply or demand-side heating/
+                cooling energy use data to use in scaling down energy/carbon/
+                cost overlaps.
+        """
+        # Convert contributing microsegment key chain string to a list
+        keys = literal_eval(mseg)
+        # Pull out climate zone, building type, structure type,
+        # fuel type, and end use
+        msu_split = [str(x) for x in [keys[1], keys[2], keys[-1],
+                                      keys[3], keys[4]]]
+        # Convert climate zone, building type, structure type, fuel
+        # type, and end use data into a string, to be used as a dict
+        # key below
+        msu_split_key = str(msu_split)
+        # Set the technology type of the current microsegment, as well
+        # as the technology types of overlapping microsegments (e.g.,
+        # if the current microsegment is on the supply-side of
+        # heating/cooling, overlapping microsegments are on the demand
+        # side, and vice versa)
+        if 'supply' in mseg:
+            tech_typ, tech_typ_overlp = ["supply", "demand"]
+        else:
+            tech_typ, tech_typ_overlp = ["demand", "supply"]
+        # If no overlapping energy use data exist for the current
+        # microsegment's climate zone, building type, structure
+        # type, fuel type, and end use combination, no adjustment is
+        # needed for the contributing microsegment
+        if msu_split_key not in htcl_adj_data[tech_typ].keys():
+            return
+
+        # If overlapping energy use data do exist for the current
+        # microsegment's climate zone, building type, structure
+        # type, fuel type, and end use combination, create short name
+        # for current microsegment energy data dict and overlapping
+        # energy data dict; Note: if no overlapping energy data dict
+        # can be found, no adjustment is needed for the heating/cooling
+        # contributing microsegment
+        tech_data = htcl_adj_data[tech_typ][msu_split_key]
+        try:
+            overlp_data = htcl_adj_data[tech_typ_overlp][msu_split_key]
+        except KeyError:
+            return
+        # Establish set of dicts used to adjust the contributing
+        # microsegment energy, carbon, and cost data and master energy,
+        # carbon, and cost data to remove the overlaps
+        mast, mast_brk_base_energy, mast_brk_base_cost, \
+            mast_brk_base_carb, mast_brk_eff_energy, \
+            mast_brk_eff_cost, mast_brk_eff_carb, \
+            mast_brk_save_energy, mast_brk_save_cost, \
+            mast_brk_save_carb, adj, mast_list_base, mast_list_eff, \
+            adj_list_eff, adj_list_base = self.compete_adj_dicts(
+                m, mseg, adopt_scheme)
+        # Adjust contributing and master energy/carbon/cost
+        # data to remove recorded supply-demand overlaps
+        for yr in self.handyvars.aeo_years:
+            # Find the fraction of total possibly overlapping
+            # heating/cooling energy for the given climate zone,
+            # building type, and structure type combination that is
+            # actually affected by ECMs in the analysis (e.g., if
+            # looping through a supply-side contributing microsegment,
+            # this is the portion of total energy affected by demand-
+            # side microsegments in the analysis, and vice versa)
+            if overlp_data["total"][yr] != 0:
+                affected_frac = (overlp_data["total affected"][yr] /
+                                 overlp_data["total"][yr])
+            else:
+                affected_frac = 0
+            # Find overall relative performance for the technology
+            # type of the current contributing microsegment in the
+            # given climate zone, building type, and structure type
+            # combination
+            if (type(tech_data["total affected"][yr]) !=
+                numpy.ndarray and
+                tech_data["total affected"][yr] != 0) or (
+                type(tech_data[
+                    "total affected"][yr]) == numpy.ndarray and
+                all([x != 0 for x in
+                     tech_data["total affected"][yr]])):
+                rel_perf_tech = (1 - (
+                    tech_data["affected savings"][yr] /
+                    tech_data["total affected"][yr]))
+            else:
+                rel_perf_tech = 1
+            # Find overall relative performance for the overlapping
+            # technology type in the given climate zone, building
+            # type, and structure type combination
+            if (type(overlp_data["total affected"][yr]) !=
+                numpy.ndarray and
+                overlp_data["total affected"][yr] != 0) or (
+                type(overlp_data[
+                    "total affected"][yr]) == numpy.ndarray and
+                all([x != 0 for x in
+                     overlp_data["total affected"][yr]])):
+                rel_perf_tech_overlp = (1 - (
+                    overlp_data["affected savings"][yr] /
+                    overlp_data["total affected"][yr]))
+            else:
+                rel_perf_tech_overlp = 1
+            # Calculate the ratio of relative performances between the
+            # current microsegment and overlapping microsegments'
+            # technology types in the given climate zone, building
+            # type, and structure type combination; ensure that
+            # neither performance value is negative for the comparison
+            if (all([type(x) != numpy.ndarray for x in [
+                rel_perf_tech, rel_perf_tech_overlp]]) and
+                (abs(1 - rel_perf_tech) +
+                 abs(1 - rel_perf_tech_overlp) != 0)) or (
+                any([type(x) == numpy.ndarray for x in [
+                    rel_perf_tech, rel_perf_tech_overlp]]) and
+                all([x != 0 for x in (
+                    abs(1 - rel_perf_tech) +
+                    abs(1 - rel_perf_tech_overlp))])):
+                save_ratio = abs(1 - rel_perf_tech) / (abs(
+                    1 - rel_perf_tech) + abs(1 - rel_perf_tech_overlp))
+            else:
+                save_ratio = 0.5
+
+            # Calculate baseline and efficient adjustment fractions
+
+            # Adjust baseline data to reflect the fraction of energy
+            # use affected by the overlapping microsegments, plus the
+            # portion of affected energy use saved by the overlapping
+            # microsegments
+            adj_frac_base = (1 - affected_frac) + \
+                affected_frac * save_ratio
+
+            # Adjust efficient data in the same way as baseline data,
+            # but with additional consideration for the energy savings
+            # benefits of the overlapping microsegments
+            adj_frac_eff = (1 - affected_frac) + \
+                affected_frac * save_ratio * rel_perf_tech_overlp
+
+            # Use the baseline/efficient adjustment fractions above to
+            # adjust the ECM's current contributing and master energy,
+            # carbon, and cost data and remove any overlaps
+            for x in ["baseline", "efficient"]:
+                # Determine appropriate adjustment data and factors to
+                # use for baseline or efficient case
+                if x == "baseline":
+                    mastlist, adjlist = [mast_list_base, adj_list_base]
+                    # Set adj. fraction from above to baseline case
+                    adj_frac = adj_frac_base
+                else:
+                    mastlist, adjlist = [mast_list_eff, adj_list_eff]
+                    # Set adj. fraction from above to efficient case
+                    adj_frac = adj_frac_eff
+                # Adjust the total and competed energy, carbon, and
+                # associated cost data for both the ECM's current
+                # contributing microsegment and master microsegment
+                self.adj_totals(mastlist[1:5] + mastlist[6:], yr, [
+                    (y[yr] * (1 - adj_frac)) for
+                    y in adjlist[1:5] + adjlist[6:]])
+
+            # Adjust baseline energy/cost/carbon, efficient energy/
+            # cost/carbon, and energy/cost/carbon savings totals
+            # grouped by climate zone, building type, and end use by
+            # the appropriate fraction
+
+            self.adj_totals([
+                mast_brk_base_energy, mast_brk_eff_energy,
+                mast_brk_save_energy, mast_brk_base_cost, mast_brk_eff_cost,
+                mast_brk_save_cost, mast_brk_base_carb, mast_brk_eff_carb,
+                mast_brk_save_carb], yr, [
+                # Energy (baseline and efficient, using baseline and
+                # efficient adjustment fractions; savings, using both)
+                (adj["energy"]["total"]["baseline"][yr]) * (
+                    1 - adj_frac_base),
+                (adj["energy"]["total"]["efficient"][yr]) * (
+                    1 - adj_frac_eff),
+                (adj["energy"]["total"]["baseline"][yr] * (
+                    1 - adj_frac_base) -
+                 adj["energy"]["total"]["efficient"][yr] * (
+                    1 - adj_frac_eff)),
+                # Cost (baseline, efficient, savings)
+                (adj["cost"]["energy"]["total"]["baseline"][yr]) * (
+                    1 - adj_frac_base),
+                (adj["cost"]["energy"]["total"]["efficient"][yr]) * (
+                    1 - adj_frac_eff),
+                (adj["cost"]["energy"]["total"]["baseline"][yr] * (
+                    1 - adj_frac_base) -
+                 adj["cost"]["energy"]["total"]["efficient"][yr] * (
+                    1 - adj_frac_eff)),
+                # Carbon (baseline, efficient, savings)
+                (adj["carbon"]["total"]["baseline"][yr]) * (
+                    1 - adj_frac_base),
+                (adj["carbon"]["total"]["efficient"][yr]) * (
+                    1 - adj_frac_eff),
+                (adj["carbon"]["total"]["baseline"][yr] * (
+                    1 - adj_frac_base) -
+                 adj["carbon"]["total"]["efficient"][yr] * (
+                    1 - adj_frac_eff))])
 
     def compete_adj_dicts(self, m, mseg_key, adopt_scheme):
         """Set the initial measure market data needed to adjust for overlaps.
@@ -2878,76 +3518,56 @@ class Engine(object):
                 secnd_adj_mktshr = measure.markets[adopt_scheme][
                     "competed"]["mseg_adjust"]["secondary mseg adjustments"][
                     "market share"]
-                # Total captured stock
-                secnd_adj_mktshr["original energy (total captured)"][
-                    secnd_mseg_adjkey][yr] += \
-                    adj["energy"]["total"]["efficient"][yr]
-                # Competed and captured stock
-                secnd_adj_mktshr["original energy (competed and captured)"][
-                    secnd_mseg_adjkey][yr] += \
-                    adj["energy"]["competed"]["efficient"][yr]
-                # Adjusted total captured stock
-                secnd_adj_mktshr["adjusted energy (total captured)"][
-                    secnd_mseg_adjkey][yr] += \
-                    (adj["energy"]["total"]["efficient"][yr] * adj_frac_tot)
-                # Adjusted competed and captured stock
-                secnd_adj_mktshr["adjusted energy (competed and captured)"][
-                    secnd_mseg_adjkey][yr] += (
-                        adj["energy"]["competed"]["efficient"][yr] *
-                        adj_frac_comp)
+                # Update the market share data by replacing (rather than
+                # modifying in place) each value, which may be shared with
+                # the measure's uncompeted markets
+                for (k, i) in [
+                    ("original energy (total captured)",
+                     adj["energy"]["total"]["efficient"][yr]),
+                    ("original energy (competed and captured)",
+                     adj["energy"]["competed"]["efficient"][yr]),
+                    ("adjusted energy (total captured)",
+                     adj["energy"]["total"]["efficient"][yr] * adj_frac_tot),
+                    ("adjusted energy (competed and captured)",
+                     adj["energy"]["competed"]["efficient"][yr] *
+                     adj_frac_comp)]:
+                    secnd_adj_mktshr[k][secnd_mseg_adjkey][yr] = \
+                        secnd_adj_mktshr[k][secnd_mseg_adjkey][yr] + i
 
         # Adjust baseline energy, efficient energy, and energy savings totals
         # grouped by climate zone, building type, and end use by the
         # appropriate fraction
-
-        # Energy
-        # Baseline
-        mast_brk_base_energy[yr] = mast_brk_base_energy[yr] - (
-            adj["energy"]["total"]["baseline"][yr]) * (1 - adj_frac_tot)
-        # Efficient
-        mast_brk_eff_energy[yr] = mast_brk_eff_energy[yr] - (
-            adj["energy"]["total"]["efficient"][yr]) * (1 - adj_frac_tot)
-        # Savings
-        mast_brk_save_energy[yr] = mast_brk_save_energy[yr] - ((
-            adj["energy"]["total"]["baseline"][yr] -
-            adj["energy"]["total"]["efficient"][yr]) * (1 - adj_frac_tot))
-
-        # Cost
-        # Baseline
-        mast_brk_base_cost[yr] = mast_brk_base_cost[yr] - (
-            adj["cost"]["energy"]["total"]["baseline"][yr]) * (
-                1 - adj_frac_tot)
-        # Efficient
-        mast_brk_eff_cost[yr] = mast_brk_eff_cost[yr] - (
-            adj["cost"]["energy"]["total"]["efficient"][yr]) * (
-                1 - adj_frac_tot)
-        # Savings
-        mast_brk_save_cost[yr] = mast_brk_save_cost[yr] - ((
-            adj["cost"]["energy"]["total"]["baseline"][yr] -
-            adj["cost"]["energy"]["total"]["efficient"][yr]) * (
-                1 - adj_frac_tot))
-
-        # Carbon
-        # Baseline
-        mast_brk_base_carb[yr] = mast_brk_base_carb[yr] - (
-            adj["carbon"]["total"]["baseline"][yr]) * (1 - adj_frac_tot)
-        # Efficient
-        mast_brk_eff_carb[yr] = mast_brk_eff_carb[yr] - (
-            adj["carbon"]["total"]["efficient"][yr]) * (1 - adj_frac_tot)
-        # Savings
-        mast_brk_save_carb[yr] = mast_brk_save_carb[yr] - ((
-            adj["carbon"]["total"]["baseline"][yr] -
-            adj["carbon"]["total"]["efficient"][yr]) * (1 - adj_frac_tot))
+        self.adj_totals([
+            mast_brk_base_energy, mast_brk_eff_energy, mast_brk_save_energy,
+            mast_brk_base_cost, mast_brk_eff_cost, mast_brk_save_cost,
+            mast_brk_base_carb, mast_brk_eff_carb, mast_brk_save_carb], yr, [
+            # Energy (baseline, efficient, savings)
+            (adj["energy"]["total"]["baseline"][yr]) * (1 - adj_frac_tot),
+            (adj["energy"]["total"]["efficient"][yr]) * (1 - adj_frac_tot),
+            ((adj["energy"]["total"]["baseline"][yr] -
+              adj["energy"]["total"]["efficient"][yr]) * (1 - adj_frac_tot)),
+            # Cost (baseline, efficient, savings)
+            (adj["cost"]["energy"]["total"]["baseline"][yr]) * (
+                1 - adj_frac_tot),
+            (adj["cost"]["energy"]["total"]["efficient"][yr]) * (
+                1 - adj_frac_tot),
+            ((adj["cost"]["energy"]["total"]["baseline"][yr] -
+              adj["cost"]["energy"]["total"]["efficient"][yr]) * (
+                1 - adj_frac_tot)),
+            # Carbon (baseline, efficient, savings)
+            (adj["carbon"]["total"]["baseline"][yr]) * (1 - adj_frac_tot),
+            (adj["carbon"]["total"]["efficient"][yr]) * (1 - adj_frac_tot),
+            ((adj["carbon"]["total"]["baseline"][yr] -
+              adj["carbon"]["total"]["efficient"][yr]) * (1 - adj_frac_tot))])
 
         # Adjust the total and competed stock captured by the measure by
         # the appropriate measure market share, both overall and for the
         # current contributing microsegment
-        mast["stock"]["total"]["measure"][yr] = \
-            mast["stock"]["total"]["measure"][yr] - \
-            adj["stock"]["total"]["measure"][yr] * (1 - adj_frac_tot)
-        mast["stock"]["competed"]["measure"][yr] = \
-            mast["stock"]["competed"]["measure"][yr] - \
-            adj["stock"]["competed"]["measure"][yr] * (1 - adj_frac_comp)
+        self.adj_totals([
+            mast["stock"]["total"]["measure"],
+            mast["stock"]["competed"]["measure"]], yr, [
+            adj["stock"]["total"]["measure"][yr] * (1 - adj_frac_tot),
+            adj["stock"]["competed"]["measure"][yr] * (1 - adj_frac_comp)])
         adj["stock"]["total"]["measure"][yr] = \
             adj["stock"]["total"]["measure"][yr] * adj_frac_tot
         adj["stock"]["competed"]["measure"][yr] = \
@@ -2966,20 +3586,10 @@ class Engine(object):
             # Adjust the total and competed energy, carbon, and associated cost
             # savings by the appropriate measure market share, both overall
             # and for the current contributing microsegment
-            mast["cost"]["stock"]["total"][x][yr], \
-                mast["cost"]["energy"]["total"][x][yr], \
-                mast["cost"]["carbon"]["total"][x][yr], \
-                mast["energy"]["total"][x][yr], \
-                mast["carbon"]["total"][x][yr] = [
-                    x[yr] - (y[yr] * (1 - adj_frac_tot)) for x, y in
-                    zip(mastlist[0:5], adjlist[0:5])]
-            mast["cost"]["stock"]["competed"][x][yr], \
-                mast["cost"]["energy"]["competed"][x][yr], \
-                mast["cost"]["carbon"]["competed"][x][yr], \
-                mast["energy"]["competed"][x][yr], \
-                mast["carbon"]["competed"][x][yr] = [
-                    x[yr] - (y[yr] * (1 - adj_frac_comp)) for x, y in
-                    zip(mastlist[5:], adjlist[5:])]
+            self.adj_totals(mastlist[0:5], yr, [
+                (y[yr] * (1 - adj_frac_tot)) for y in adjlist[0:5]])
+            self.adj_totals(mastlist[5:], yr, [
+                (y[yr] * (1 - adj_frac_comp)) for y in adjlist[5:]])
             adj["cost"]["stock"]["total"][x][yr], \
                 adj["cost"]["energy"]["total"][x][yr], \
                 adj["cost"]["carbon"]["total"][x][yr], \
@@ -3124,36 +3734,40 @@ class Engine(object):
             # measure (all post-competition); this yields fractions to use
             # in apportioning energy, carbon, and cost results by category
 
+            # Import the measure's post-competition results by output
+            # breakout category as dense arrays, such that fractions and
+            # partitioned results are found with single array operations
+            out_break = {
+                key: {var: MarketArray.from_dict(
+                    m.markets[adopt_scheme]["competed"]["mseg_out_break"][
+                        key][var], self.handyvars.out_break_axes) for var in [
+                        "baseline", "efficient", "savings"]} for
+                key in ["energy", "cost", "carbon"]}
+
             # Energy
             # Calculate baseline energy fractions by output breakout category
-            frac_base_energy = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"]["mseg_out_break"][
-                    "energy"]["baseline"], energy_base_avg, divide=True)
+            frac_base_energy = out_break["energy"]["baseline"].divide(
+                energy_base_avg)
             # Calculate efficient energy fractions by output breakout category
-            frac_eff_energy = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"]["mseg_out_break"][
-                    "energy"]["efficient"], energy_eff_avg, divide=True)
+            frac_eff_energy = out_break["energy"]["efficient"].divide(
+                energy_eff_avg)
             # Determine total energy savings to use as normalization factor
             norm_save_energy = {
                 yr: (energy_base_avg[yr] - energy_eff_avg[yr]) for
                 yr in self.handyvars.aeo_years}
             # Calculate energy savings fractions by output breakout category
-            frac_save_energy = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"][
-                    "mseg_out_break"]["energy"]["savings"],
-                norm_save_energy, divide=True)
+            frac_save_energy = out_break["energy"]["savings"].divide(
+                norm_save_energy)
 
             # Cost
             # Calculate baseline energy cost fractions by output breakout
             # category
-            frac_base_cost = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"]["mseg_out_break"][
-                    "cost"]["baseline"], energy_cost_base_avg, divide=True)
+            frac_base_cost = out_break["cost"]["baseline"].divide(
+                energy_cost_base_avg)
             # Calculate efficient energy cost fractions by output breakout
             # category
-            frac_eff_cost = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"]["mseg_out_break"][
-                    "cost"]["efficient"], energy_cost_eff_avg, divide=True)
+            frac_eff_cost = out_break["cost"]["efficient"].divide(
+                energy_cost_eff_avg)
             # Determine total energy cost savings to use as normalization
             # factor
             norm_save_cost = {
@@ -3161,29 +3775,23 @@ class Engine(object):
                 yr in self.handyvars.aeo_years}
             # Calculate energy cost savings fractions by output breakout
             # category
-            frac_save_cost = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"][
-                    "mseg_out_break"]["cost"]["savings"],
-                norm_save_cost, divide=True)
+            frac_save_cost = out_break["cost"]["savings"].divide(
+                norm_save_cost)
 
             # Carbon
             # Calculate baseline carbon fractions by output breakout category
-            frac_base_carb = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"]["mseg_out_break"][
-                    "carbon"]["baseline"], carb_base_avg, divide=True)
+            frac_base_carb = out_break["carbon"]["baseline"].divide(
+                carb_base_avg)
             # Calculate efficient carbon fractions by output breakout category
-            frac_eff_carb = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"]["mseg_out_break"][
-                    "carbon"]["efficient"], carb_eff_avg, divide=True)
+            frac_eff_carb = out_break["carbon"]["efficient"].divide(
+                carb_eff_avg)
             # Determine total carbon savings to use as normalization factor
             norm_save_carb = {
                 yr: (carb_base_avg[yr] - carb_eff_avg[yr]) for
                 yr in self.handyvars.aeo_years}
             # Calculate carbon savings fractions by output breakout category
-            frac_save_carb = self.out_break_walk(
-                m.markets[adopt_scheme]["competed"][
-                    "mseg_out_break"]["carbon"]["savings"],
-                norm_save_carb, divide=True)
+            frac_save_carb = out_break["carbon"]["savings"].divide(
+                norm_save_carb)
 
             # Create shorthand variable for results by breakout category
             mkt_save_brk = self.output_ecms[m.name][
@@ -3196,53 +3804,36 @@ class Engine(object):
                 if "Baseline" in k:
                     # Energy results
                     if "Energy Use" in k:
-                        mkt_save_brk[k] = self.out_break_walk(
-                            copy.deepcopy(frac_base_energy), mkt_save_brk[k],
-                            divide=False)
+                        frac_brk = frac_base_energy
                     # Energy cost results
                     elif "Energy Cost" in k:
-                        mkt_save_brk[k] = self.out_break_walk(
-                            copy.deepcopy(frac_base_cost), mkt_save_brk[k],
-                            divide=False)
+                        frac_brk = frac_base_cost
                     # Carbon results
                     else:
-                        mkt_save_brk[k] = self.out_break_walk(
-                            copy.deepcopy(frac_base_carb), mkt_save_brk[k],
-                            divide=False)
+                        frac_brk = frac_base_carb
                 # Apply efficient partitioning fractions to efficient values
                 elif "Efficient" in k:
                     # Energy results
                     if "Energy Use" in k:
-                        mkt_save_brk[k] = self.out_break_walk(
-                            copy.deepcopy(frac_eff_energy), mkt_save_brk[k],
-                            divide=False)
+                        frac_brk = frac_eff_energy
                     # Energy cost results
                     elif "Energy Cost" in k:
-                        mkt_save_brk[k] = self.out_break_walk(
-                            copy.deepcopy(frac_eff_cost), mkt_save_brk[k],
-                            divide=False)
+                        frac_brk = frac_eff_cost
                     # Carbon results
                     else:
-                        mkt_save_brk[k] = self.out_break_walk(
-                            copy.deepcopy(frac_eff_carb), mkt_save_brk[k],
-                            divide=False)
+                        frac_brk = frac_eff_carb
                 # Apply savings partitioning fractions to savings values
                 else:
                     # Energy results
                     if ("Energy" in k and "Cost" not in k):
-                        mkt_save_brk[k] = self.out_break_walk(
-                           copy.deepcopy(frac_save_energy), mkt_save_brk[k],
-                           divide=False)
+                        frac_brk = frac_save_energy
                     # Energy cost results
                     elif "Energy Cost" in k:
-                        mkt_save_brk[k] = self.out_break_walk(
-                           copy.deepcopy(frac_save_cost), mkt_save_brk[k],
-                           divide=False)
+                        frac_brk = frac_save_cost
                     # Carbon results
                     else:
-                        mkt_save_brk[k] = self.out_break_walk(
-                           copy.deepcopy(frac_save_carb), mkt_save_brk[k],
-                           divide=False)
+                        frac_brk = frac_save_carb
+                mkt_save_brk[k] = frac_brk.multiply(mkt_save_brk[k]).to_dict()
 
             # Record low and high estimates on markets, if available
 
@@ -3455,36 +4046,299 @@ class Engine(object):
             mkt_sv_all["Efficient CO2 Cost (high) (USD)".translate(sub)] = \
                 carb_cost_eff_all_high
 
-    def out_break_walk(self, adjust_dict, adjust_vals, divide):
-        """Partition measure results by climate, building sector, and end use.
 
-        Args:
-            adjust_dict (dict): Results partitioning structure and fractions
-                for climate zone, building sector, and end use.
-            adjust_vals (dict): Unpartitioned energy, carbon, and cost
-                markets/savings.
-            divide (boolean): Optional flag to divide terminal values instead
-                of multiplying them (the default option).
+# Engine and competition inputs shared with forked competition worker
+# processes (see 'Engine.compete_groups')
+_compete_shared = None
 
-        Returns:
-            Measure results partitioned by climate, building sector, and
-            end use.
-        """
-        for (k, i) in sorted(adjust_dict.items()):
-            if isinstance(i, dict):
-                self.out_break_walk(i, adjust_vals, divide)
-            else:
-                # Apply appropriate climate zone/building type/end use
-                # partitioning fraction to the overall market/savings
-                # value
-                if divide is False:
-                    adjust_dict[k] = adjust_dict[k] * adjust_vals[k]
-                else:
-                    if adjust_vals[k] != 0:
-                        adjust_dict[k] = adjust_dict[k] / adjust_vals[k]
-                    else:
-                        adjust_dict[k] = 0
-        return adjust_dict
+
+def compete_worker(group):
+    """Compete a group of contributing microsegments in a worker process.
+
+    Notes:
+        Adjustments to measure totals are recorded rather than applied, and
+        returned to the parent process along with the competed data for
+        the group (see 'Engine.compete_groups').
+
+    Args:
+        group (string): Climate zone, building type, and structure type of
+            the group of contributing microsegments to compete.
+
+    Returns:
+        The group, the recorded adjustments for each contributing
+        microsegment in the group, the recorded heating/cooling supply-demand
+        adjustments by measure and contributing microsegment, the competed
+        contributing microsegment data by measure and contributing
+        microsegment, and the secondary microsegment adjustment data for the
+        group by measure.
+    """
+    (engine, adopt_scheme, comp_index, groups, tot_pos, htcl, htcl_totals,
+     htcl_units) = _compete_shared
+    # Heating/cooling supply-demand overlap data for the group
+    htcl_adj_data = {"supply": {}, "demand": {}} if htcl else None
+    logs, htcl_logs, adj = [], {}, {}
+    # Compete each contributing microsegment in the group, recording the
+    # adjustments to measure totals
+    for msu in groups[group]:
+        engine.compete_log = []
+        htcl_adj_data = engine.compete_mseg(
+            msu, comp_index[msu], adopt_scheme, htcl_adj_data, htcl_totals)
+        logs.append(engine.pack_log(tot_pos))
+    # Remove heating/cooling supply-demand overlaps for the group, recording
+    # the adjustments to measure totals
+    if htcl:
+        for ind, m in enumerate(engine.measures):
+            for msu in [x for x in groups[group] if (ind, x) in htcl_units]:
+                engine.compete_log = []
+                engine.htcl_adj_mseg(m, msu, adopt_scheme, htcl_adj_data)
+                htcl_logs[(ind, msu)] = engine.pack_log(tot_pos)
+    engine.compete_log = None
+    # Find the competed contributing microsegment data and secondary
+    # microsegment adjustment data for the group
+    secnd = {}
+    for msu in groups[group]:
+        for ind in comp_index[msu]["measures"]:
+            adj[(ind, msu)] = engine.measures[ind].markets[adopt_scheme][
+                "competed"]["mseg_adjust"][
+                "contributing mseg keys and values"][msu]
+    for ind, m in enumerate(engine.measures):
+        mktshr = m.markets[adopt_scheme]["competed"]["mseg_adjust"][
+            "secondary mseg adjustments"]["market share"]
+        secnd_grp = {k: v[group] for k, v in mktshr.items() if group in v}
+        if len(secnd_grp) > 0:
+            secnd[ind] = secnd_grp
+
+    return group, logs, htcl_logs, adj, secnd
+
+
+# Engine and heating/cooling totals shared with forked adoption scheme worker
+# processes (see 'Engine.run_schemes')
+_scheme_shared = None
+
+
+def scheme_worker(adopt_scheme):
+    """Calculate outputs for an adoption scheme in a worker process.
+
+    Args:
+        adopt_scheme (string): Assumed consumer adoption scenario.
+
+    Returns:
+        Outputs for the adoption scheme by measure, and outputs for the
+        adoption scheme across all measures.
+    """
+    engine, htcl_totals = _scheme_shared
+    # Suppress progress updates, which are printed by the parent process
+    with open(devnull, "w") as fnull:
+        sys.stdout = fnull
+        try:
+            engine.run_scheme(adopt_scheme, htcl_totals)
+        finally:
+            sys.stdout = sys.__stdout__
+    # Find the outputs for the adoption scheme
+    out_ecms = {m_name: {
+        "Markets and Savings (Overall)": out["Markets and Savings (Overall)"][
+            adopt_scheme],
+        "Markets and Savings (by Category)": out[
+            "Markets and Savings (by Category)"][adopt_scheme],
+        "Portfolio Level": out["Financial Metrics"]["Portfolio Level"][
+            adopt_scheme],
+        "Consumer Level": out["Financial Metrics"]["Consumer Level"]} for
+        m_name, out in engine.output_ecms.items()}
+
+    return out_ecms, engine.output_all["All ECMs"][
+        "Markets and Savings (Overall)"][adopt_scheme]
+
+
+def write_outputs(a_run, ecms_file, agg_file, columns_file=None):
+    """Write summary outputs for individual measures and across measures.
+
+    Args:
+        a_run (Engine): Analysis engine with finalized outputs.
+        ecms_file (string): Path of the JSON of outputs by measure.
+        agg_file (string): Path of the JSON of outputs across measures.
+        columns_file (string): Path of the columnar file of all outputs
+            (not written if None).
+    """
+    # Write summary outputs for individual measures to a JSON, encoding the
+    # outputs of one measure at a time
+    write_json_chunks(ecms_file, a_run.output_ecms)
+    # Write summary outputs across all measures to a JSON
+    write_json_chunks(agg_file, a_run.output_all)
+    # Write summary outputs for individual measures and across all measures
+    # in a compact columnar format
+    if columns_file is not None:
+        write_result_columns(columns_file, OrderedDict(
+            list(a_run.output_ecms.items()) + [
+                ("All ECMs", a_run.output_all["All ECMs"])]),
+            a_run.handyvars.adopt_schemes)
+
+
+def read_sweep(file_path, handyvars):
+    """Read and check the parameter variants of a scenario sweep.
+
+    Notes:
+        Each variant is given as a dict with a 'name' (which names the
+        folder of the variant's results) and any of the parameters
+        'discount_rate', 'retro_rate', and 'adopt_schemes', which replace
+        the default values of these parameters for the variant. Energy
+        output types (site/source energy) are set when ECMs are prepared
+        and therefore cannot vary across a sweep.
+
+    Args:
+        file_path (string): Path of the JSON list of variants.
+        handyvars (object): Global variables useful across class methods.
+
+    Returns:
+        List of parameter variants.
+
+    Raises:
+        ValueError: If the variants cannot be read or are invalid.
+    """
+    with open(file_path, 'r') as sjs:
+        try:
+            variants = json.load(sjs)
+        except ValueError as e:
+            raise ValueError(
+                "Error reading in '" + file_path + "': " + str(e)) from None
+    if not isinstance(variants, list) or len(variants) == 0 or not all([
+            isinstance(x, dict) for x in variants]):
+        raise ValueError(
+            "Scenario sweep file '" + file_path + "' must give a non-empty "
+            "list of parameter variants")
+    names = [x.get("name") for x in variants]
+    if not all([isinstance(x, str) and len(x) > 0 and x not in [".", ".."]
+                and sep not in x and "/" not in x for x in names]) or \
+            len(set(names)) != len(names):
+        raise ValueError(
+            "Each scenario sweep variant must have a unique 'name' that is "
+            "usable as a folder name")
+    for variant in variants:
+        params = [x for x in variant.keys() if x != "name"]
+        if any([x not in ["discount_rate", "retro_rate", "adopt_schemes"]
+                for x in params]):
+            raise ValueError(
+                "Scenario sweep variant '" + variant["name"] + "' sets "
+                "unsupported parameter(s) " + str(params) + "; only "
+                "'discount_rate', 'retro_rate', and 'adopt_schemes' may vary "
+                "(energy output types are set when ECMs are prepared)")
+        if "adopt_schemes" in variant.keys() and (
+                not isinstance(variant["adopt_schemes"], list) or
+                len(variant["adopt_schemes"]) == 0 or any([
+                    x not in handyvars.adopt_schemes for
+                    x in variant["adopt_schemes"]])):
+            raise ValueError(
+                "Scenario sweep variant '" + variant["name"] + "' must set "
+                "'adopt_schemes' to a list drawn from " +
+                str(handyvars.adopt_schemes))
+
+    return variants
+
+
+def run_variant(variant, handyvars, measures, energy_out, htcl_totals,
+                out_dirs, compete_cache=None, workers=None):
+    """Calculate and write outputs for a scenario sweep variant.
+
+    Args:
+        variant (dict): Parameter variant (see 'read_sweep').
+        handyvars (object): Global variables useful across class methods.
+        measures (list): Active measure objects, not yet run (each variant
+            runs its own copies of the measures).
+        energy_out (list): Energy output type.
+        htcl_totals (dict): Heating/cooling energy totals by climate
+            zone, building type, and structure type.
+        out_dirs (tuple): Folder of results for all variants, and paths of
+            the JSON and columnar results files within each variant's
+            folder (the columnar file path is None if not written).
+        compete_cache (string): Directory of cached competition results
+            (None if not cached).
+        workers (int): Number of processes to use in competing measures.
+    """
+    # Set the parameters of the variant
+    handyvars_var = copy.copy(handyvars)
+    for k, v in variant.items():
+        if k != "name":
+            setattr(handyvars_var, k, v)
+    a_run = Engine(handyvars_var, [m.clone() for m in measures], energy_out)
+    a_run.compete_cache = compete_cache
+    for adopt_scheme in handyvars_var.adopt_schemes:
+        a_run.run_scheme(adopt_scheme, htcl_totals, workers=workers)
+    # Write outputs to the folder of the variant
+    var_dir = path.join(out_dirs[0], variant["name"])
+    makedirs(var_dir, exist_ok=True)
+    write_outputs(a_run, *[(path.join(var_dir, x) if x is not None else
+                            None) for x in out_dirs[1:]])
+
+
+# Inputs to scenario sweep variants shared with forked worker processes (see
+# 'run_sweep')
+_sweep_shared = None
+
+
+def sweep_worker(variant):
+    """Calculate and write outputs for a sweep variant in a worker process.
+
+    Args:
+        variant (dict): Parameter variant (see 'read_sweep').
+
+    Returns:
+        Name of the variant.
+    """
+    # Suppress progress updates, which are printed by the parent process
+    with open(devnull, "w") as fnull:
+        sys.stdout = fnull
+        try:
+            run_variant(variant, *_sweep_shared)
+        finally:
+            sys.stdout = sys.__stdout__
+    return variant["name"]
+
+
+def run_sweep(variants, handyvars, measures, energy_out, htcl_totals,
+              out_dirs, compete_cache=None, workers=None):
+    """Calculate and write outputs for all variants of a scenario sweep.
+
+    Notes:
+        Measures are loaded once and copied for each variant, sharing all
+        data that analysis runs do not change (see 'Measure.clone'). Given
+        multiple worker processes, variants are run in parallel, each in a
+        forked worker process that shares the loaded measures with all
+        other workers copy-on-write; measures are then competed serially
+        within each variant.
+
+    Args:
+        variants (list): Parameter variants (see 'read_sweep').
+        handyvars (object): Global variables useful across class methods.
+        measures (list): Active measure objects, not yet run.
+        energy_out (list): Energy output type.
+        htcl_totals (dict): Heating/cooling energy totals by climate
+            zone, building type, and structure type.
+        out_dirs (tuple): Folder of results for all variants, and paths of
+            the JSON and columnar results files within each variant's
+            folder (see 'run_variant').
+        compete_cache (string): Directory of cached competition results
+            (None if not cached).
+        workers (int): Number of processes to use.
+    """
+    if workers is not None and workers > 1 and len(variants) > 1 and \
+            "fork" in multiprocessing.get_all_start_methods():
+        # Register the variant inputs as module-level variables that are
+        # shared with the forked worker processes without being pickled
+        global _sweep_shared
+        _sweep_shared = (handyvars, measures, energy_out, htcl_totals,
+                         out_dirs, compete_cache)
+        try:
+            with multiprocessing.get_context("fork").Pool(
+                    min(workers, len(variants))) as pool:
+                for name in pool.imap_unordered(sweep_worker, variants):
+                    print("Scenario sweep variant '" + name + "' complete")
+        finally:
+            _sweep_shared = None
+    else:
+        for variant in variants:
+            print("Running scenario sweep variant '" + variant["name"] +
+                  "'...")
+            run_variant(variant, handyvars, measures, energy_out, htcl_totals,
+                        out_dirs, compete_cache, workers)
 
 
 def main(base_dir):
@@ -3507,6 +4361,9 @@ def main(base_dir):
     handyfiles = UsefulInputFiles(energy_out=energy_out, regions="AIA")
     # Instantiate useful variables object (AIA climate regions used by default)
     handyvars = UsefulVars(base_dir, handyfiles, regions="AIA")
+    # Read the parameter variants of a scenario sweep, if desired by the user
+    if options.sweep is not None:
+        variants = read_sweep(options.sweep, handyvars)
 
     # Import measure files
     with open(path.join(base_dir, *handyfiles.meas_summary_data), 'r') as mjs:
@@ -3696,23 +4553,34 @@ def main(base_dir):
     else:
         print('Importing ECM competition data...', end="", flush=True)
 
+    # Map each active measure to its summary data, used in finding a hash
+    # of each measure's prepared data for incremental runs
+    meas_summary_active = {m["name"]: m for m in meas_summary if
+                           m["name"] in active_meas_all}
     for m in measures_objlist:
         # Assemble folder path for measure competition data
         meas_folder_name = path.join(*handyfiles.meas_compete_data)
-        # Assemble file name for measure competition data
-        meas_file_name = m.name + ".pkl.gz"
-        with gzip.open(path.join(
-                base_dir, meas_folder_name, meas_file_name), 'r') as zp:
-            try:
-                meas_comp_data = pickle.load(zp)
-            except Exception as e:
-                raise Exception(
-                    "Error reading in competition data of " +
-                    "ECM '" + m.name + "': " + str(e)) from None
+        # Read the measure's competition data store; the data for each
+        # contributing microsegment are only restored from the (memory
+        # mapped) store when the microsegment is first accessed
+        try:
+            meas_comp_data = read_compete_data(
+                path.join(base_dir, meas_folder_name, m.name))
+        except Exception as e:
+            raise Exception(
+                "Error reading in competition data of " +
+                "ECM '" + m.name + "': " + str(e)) from None
 
         for adopt_scheme in handyvars.adopt_schemes:
             m.markets[adopt_scheme]["competed"]["mseg_adjust"] = \
                 meas_comp_data[adopt_scheme]
+        # Find a hash of the measure's summary and competition data, which
+        # marks the measure's cached competition results as reusable
+        if options.incremental:
+            m.data_hash = hashlib.sha256((json.dumps(
+                meas_summary_active[m.name], sort_keys=True) +
+                hash_compete_data(path.join(
+                    base_dir, meas_folder_name, m.name))).encode()).hexdigest()
         # Print data import message for each ECM if in verbose mode
         verboseprint("Imported ECM '" + m.name + "' competition data")
 
@@ -3734,45 +4602,61 @@ def main(base_dir):
     else:
         print('Data load complete')
 
+    # Set the directory of cached competition results for incremental runs
+    if options.incremental:
+        compete_cache = path.join(base_dir, *handyfiles.compete_cache)
+        makedirs(compete_cache, exist_ok=True)
+    else:
+        compete_cache = None
+    # Set the output files (the columnar output file is only written if
+    # desired by the user)
+    out_files = [handyfiles.meas_engine_out_ecms,
+                 handyfiles.meas_engine_out_agg,
+                 handyfiles.meas_engine_out_columns if options.columnar else
+                 None]
+
+    # Calculate and write outputs for each variant of a scenario sweep, if
+    # desired by the user; outputs for each variant are written to their own
+    # folder and are not plotted
+    if options.sweep is not None:
+        run_sweep(variants, handyvars, measures_objlist, energy_out,
+                  htcl_totals, tuple([path.join(
+                      base_dir, *handyfiles.sweep_results)] + [
+                      x[-1] if x is not None else None for x in out_files]),
+                  compete_cache, options.workers)
+        print("Scenario sweep complete; outputs written to '" + path.join(
+            *handyfiles.sweep_results) + "'")
+        return
+
     # Instantiate an Engine object using active measures list
     a_run = Engine(handyvars, measures_objlist, energy_out)
+    a_run.compete_cache = compete_cache
 
     # Calculate uncompeted and competed measure savings and financial
-    # metrics, and write key outputs to JSON file
-    for adopt_scheme in handyvars.adopt_schemes:
-        # Calculate each measure's uncompeted savings and metrics,
-        # and print progress update to user
-        print("Calculating uncompeted '" + adopt_scheme +
-              "' savings/metrics...", end="", flush=True)
-        a_run.calc_savings_metrics(adopt_scheme, "uncompeted")
-        print("Calculations complete")
-        # Update each measure's competed markets to reflect the
-        # removal of savings overlaps with competing measures,
-        # and print progress update to user
-        print("Competing ECMs for '" + adopt_scheme + "' scenario...",
-              end="", flush=True)
-        a_run.compete_measures(adopt_scheme, htcl_totals)
-        print("Competition complete")
-        # Calculate each measure's competed measure savings and metrics
-        # using updated competed markets, and print progress update to user
-        print("Calculating competed '" + adopt_scheme +
-              "' savings/metrics...", end="", flush=True)
-        a_run.calc_savings_metrics(adopt_scheme, "competed")
+    # metrics, and write key outputs to JSON file; adoption schemes are run in
+    # parallel if desired by the user (parallel execution relies on forked
+    # processes inheriting the measure data, and therefore falls back to
+    # serial execution where fork is unavailable)
+    if options.parallel_schemes is True and \
+            len(handyvars.adopt_schemes) > 1 and \
+            "fork" in multiprocessing.get_all_start_methods():
+        print("Calculating savings/metrics for '" +
+              "', '".join(handyvars.adopt_schemes) + "' scenarios in "
+              "parallel...", end="", flush=True)
+        a_run.run_schemes(htcl_totals)
         print("Calculations complete")
-        # Write selected outputs to a summary JSON file for post-processing
-        a_run.finalize_outputs(adopt_scheme)
+    else:
+        for adopt_scheme in handyvars.adopt_schemes:
+            a_run.run_scheme(
+                adopt_scheme, htcl_totals, workers=options.workers)
 
     # Notify user that all analysis engine calculations are completed
     print("All calculations complete; writing output data...", end="",
           flush=True)
-    # Write summary outputs for individual measures to a JSON
-    with open(path.join(
-            base_dir, *handyfiles.meas_engine_out_ecms), "w") as jso:
-        json.dump(a_run.output_ecms, jso, indent=2)
-    # Write summary outputs across all measures to a JSON
-    with open(path.join(
-            base_dir, *handyfiles.meas_engine_out_agg), "w") as jso:
-        json.dump(a_run.output_all, jso, indent=2)
+    # Write summary outputs for individual measures and across all measures
+    # (in a compact columnar format as well, if desired by the user)
+    write_outputs(a_run, *[path.join(base_dir, *x) if x is not None else
+                           None for x in out_files])
     print("Data writing complete")
 
     # # Plot output data in R when using AIA climate regions OR when using EMM
@@ -3884,7 +4768,30 @@ if __name__ == '__main__':
     # Optional flag to calculate site (rather than source) energy outputs
     parser.add_argument("--mkt_fracs", action="store_true",
                         help="Flag market penetration outputs")
+    # Optional number of processes across which to compete ECMs
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of processes to use in ECM competition")
+    # Optional flag to run consumer adoption schemes in parallel
+    parser.add_argument("--parallel_schemes", action="store_true",
+                        help="Run adoption schemes in separate processes")
+    # Optional flag to reuse cached competition results for unchanged ECMs
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse cached ECM competition results where "
+                             "competing ECMs are unchanged")
+    # Optional file of parameter variants to run as a scenario sweep
+    parser.add_argument("--sweep", type=str, default=None,
+                        help="JSON file of parameter variants to run")
+    # Optional flag to also write results in a compact columnar format
+    parser.add_argument("--columnar", action="store_true",
+                        help="Also write results to a columnar NPZ file")
     options = parser.parse_args()
+    # Adoption schemes run in parallel compete ECMs serially, as each scheme
+    # is run in a worker process that cannot start worker processes of its
+    # own; reject a request for both forms of parallel execution
+    if options.parallel_schemes is True and options.workers is not None and \
+            options.workers > 1:
+        parser.error("argument --parallel_schemes: not allowed with "
+                     "argument --workers greater than 1")
     # Set function that only prints message when in verbose mode
     verboseprint = print if options.verbose else lambda *a, **k: None
     main(base_dir)
@@ -11,6 +11,12 @@ import numpy
 import copy
 import itertools
 import os
+import json
+import tempfile
+import argparse
+import io
+import multiprocessing
+from unittest import mock
 import numpy_financial as npf
 
 
@@ -346,73 +352,6 @@ class TestMeasureInit(unittest.TestCase):
                 self.attribute_dict[key], self.sample_measure[key])
 
 
-class OutputBreakoutDictWalkTest(unittest.TestCase, CommonMethods):
-    """Test operation of 'out_break_walk' function.
-
-    Verify that function properly applies a climate zone/building
-    type/end use partition to a total energy or carbon
-    market/savings value.
-
-    Attributes:
-        a_run (object): Sample analysis engine object.
-        ok_total (dict): Sample unpartitioned measure results data.
-        ok_partitions (dict): Sample results partitioning fraction.
-        ok_out (dict): Sample partitioned measure results data.
-    """
-
-    @classmethod
-    def setUpClass(cls):
-        """Define objects/variables for use across all class functions."""
-        base_dir = os.getcwd()
-        handyvars = run.UsefulVars(base_dir, run.UsefulInputFiles(
-            energy_out=[
-                "fossil_equivalent", "NA", "NA", "NA", "NA"],
-            regions="AIA"), regions="AIA")
-        sample_measure = CommonTestMeasures().sample_measure
-        measure_list = [run.Measure(handyvars, **sample_measure)]
-        cls.a_run = run.Engine(
-            handyvars, measure_list, energy_out=[
-                "fossil_equivalent", "NA", "NA", "NA", "NA"])
-        cls.ok_total = {"2009": 100, "2010": 100}
-        cls.ok_partitions = {
-            "AIA CZ1": {
-                "Residential": {
-                    "Heating": {"2009": .10, "2010": .10},
-                    "Cooling": {"2009": .15, "2010": .15}},
-                "Commercial": {
-                    "Heating": {"2009": .20, "2010": .20},
-                    "Cooling": {"2009": .25, "2010": .25}}},
-            "AIA CZ2": {
-                "Residential": {
-                    "Heating": {"2009": .30, "2010": .30},
-                    "Cooling": {"2009": .35, "2010": .35}},
-                "Commercial": {
-                    "Heating": {"2009": .40, "2010": .40},
-                    "Cooling": {"2009": .45, "2010": .45}}}}
-        cls.ok_out = {
-            "AIA CZ1": {
-                "Residential": {
-                    "Heating": {"2009": 10, "2010": 10},
-                    "Cooling": {"2009": 15, "2010": 15}},
-                "Commercial": {
-                    "Heating": {"2009": 20, "2010": 20},
-                    "Cooling": {"2009": 25, "2010": 25}}},
-            "AIA CZ2": {
-                "Residential": {
-                    "Heating": {"2009": 30, "2010": 30},
-                    "Cooling": {"2009": 35, "2010": 35}},
-                "Commercial": {
-                    "Heating": {"2009": 40, "2010": 40},
-                    "Cooling": {"2009": 45, "2010": 45}}}}
-
-    def test_ok(self):
-        """Test for correct function output given valid inputs."""
-        dict1 = self.a_run.out_break_walk(
-            self.ok_partitions, self.ok_total, divide=False)
-        dict2 = self.ok_out
-        self.dict_check(dict1, dict2)
-
-
 class PrioritizationMetricsTest(unittest.TestCase, CommonMethods):
     """Test the operation of the 'calc_savings_metrics' function.
 
@@ -26886,6 +26825,229 @@ class AddedSubMktFractionsTest(unittest.TestCase, CommonMethods):
                                 measures_sbmkt_frac_data[ind_out])
 
 
+class SweepTest(unittest.TestCase, CommonMethods):
+    """Test reading scenario sweep variants and copying measures for them.
+
+    Verify that invalid scenario sweep variants are rejected and that the
+    measure copies run for each variant do not share any data that the
+    analysis engine changes.
+
+    Attributes:
+        handyvars (object): Useful variables across the class.
+        sample_measure (dict): Sample measure data.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        base_dir = os.getcwd()
+        cls.handyvars = run.UsefulVars(base_dir, run.UsefulInputFiles(
+            energy_out=[
+                "fossil_equivalent", "NA", "NA", "NA", "NA"],
+            regions="AIA"), regions="AIA")
+        cls.sample_measure = {
+            "name": "sample measure",
+            "markets": {
+                "Technical potential": {
+                    "master_mseg": {"energy": {"2009": 10, "2010": 20}}},
+                "Max adoption potential": {
+                    "master_mseg": {"energy": {"2009": 5, "2010": 10}}}}}
+
+    def setUp(self):
+        """Set up a temporary directory to hold sweep files."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.tmp_dir.cleanup()
+
+    def test_read_sweep(self):
+        """Test reading valid and invalid scenario sweep variants."""
+        file_path = os.path.join(self.tmp_dir.name, "sweep.json")
+        valid = [{"name": "base"}, {
+            "name": "low rates", "discount_rate": 0.03, "retro_rate": 0,
+            "adopt_schemes": ["Technical potential"]}]
+        invalid = [
+            [], [{"discount_rate": 0.03}], [{"name": "a"}, {"name": "a"}],
+            [{"name": "a/b"}], [{"name": "a", "site_energy": True}],
+            [{"name": "a", "adopt_schemes": ["Other potential"]}]]
+        with open(file_path, 'w') as sjs:
+            json.dump(valid, sjs)
+        self.assertEqual(run.read_sweep(file_path, self.handyvars), valid)
+        for variants in invalid:
+            with open(file_path, 'w') as sjs:
+                json.dump(variants, sjs)
+            with self.assertRaises(ValueError):
+                run.read_sweep(file_path, self.handyvars)
+
+    def test_clone(self):
+        """Test that measure copies run independently of each other."""
+        measure = run.Measure(self.handyvars, **copy.deepcopy(
+            self.sample_measure))
+        for adopt_scheme in self.handyvars.adopt_schemes:
+            measure.markets[adopt_scheme]["competed"]["mseg_adjust"] = {
+                "contributing mseg keys and values": {
+                    "mseg": {"energy": {"2009": 1, "2010": 2}}}}
+        measure_init = copy.deepcopy(measure)
+        measure_copy = measure.clone()
+        # Adjust the copy's data as the analysis engine would
+        mkts = measure_copy.markets["Technical potential"]["competed"]
+        mkts["master_mseg"]["energy"]["2009"] = 0
+        mkts["mseg_adjust"]["contributing mseg keys and values"]["mseg"][
+            "energy"]["2010"] = 0
+        measure_copy.update_results["consumer metrics"] = False
+        for attr in ["markets", "update_results"]:
+            self.dict_check(getattr(measure, attr),
+                            getattr(measure_init, attr))
+        # Check that uncompeted markets are shared with the copy
+        self.assertTrue(
+            measure_copy.markets["Technical potential"]["uncompeted"] is
+            measure.markets["Technical potential"]["uncompeted"])
+
+
+class ParallelCompeteTest(unittest.TestCase):
+    """Test competing measures in worker processes against serial runs.
+
+    Verify that the summary outputs of 'run_scheme' are identical for any
+    number of worker processes used to compete independent groups of
+    contributing microsegments, for a set of measures that includes
+    competing primary microsegments, a secondary microsegment, and both
+    supply-side and demand-side heating/cooling microsegments; verify that
+    competing the measures leaves their uncompeted markets unchanged; and
+    verify that the outputs of 'run_schemes', which runs each adoption
+    scheme in a worker process, are identical to those of serial runs of
+    all adoption schemes with scheme-specific market data.
+
+    Attributes:
+        handyvars (object): Useful variables across the class.
+        test_adopt_scheme (string): Sample consumer adoption scheme.
+        test_htcl_totals (dict): Sample heating/cooling energy totals.
+        measures_all (list): Sample residential and commercial measures
+            with point value inputs.
+        measures_all_dist (list): Sample residential and commercial
+            measures including some measures with array inputs.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Define objects/variables for use across all class functions."""
+        # Use the sample measures of the residential and commercial
+        # competition tests, which fall into separate groups of contributing
+        # microsegments
+        ResCompeteTest.setUpClass()
+        ComCompeteTest.setUpClass()
+        cls.handyvars = ResCompeteTest.handyvars
+        cls.test_adopt_scheme = "Max adoption potential"
+        cls.test_htcl_totals = {"AIA_CZ1": {"single family home": {
+            "existing": {"electricity": {"cooling": {
+                yr: 100 for yr in cls.handyvars.aeo_years}}}}}}
+        cls.measures_all = ResCompeteTest.measures_all + \
+            ComCompeteTest.measures_all
+        cls.measures_all_dist = ResCompeteTest.measures_all_dist + \
+            ComCompeteTest.measures_all_dist
+
+    def run_outputs(self, measures, workers):
+        """Find summary outputs for copies of measures."""
+        a_run = run.Engine(
+            self.handyvars, copy.deepcopy(measures), energy_out=[
+                "fossil_equivalent", "NA", "NA", "NA", "NA"])
+        # Check that the measures apply to multiple groups, including
+        # secondary and heating/cooling supply/demand microsegments
+        comp_index = a_run.compete_index(self.test_adopt_scheme)
+        self.assertTrue(len(set([
+            x["group"] for x in comp_index.values()])) > 1)
+        for flag in ["secondary", "supply", "demand"]:
+            self.assertTrue(any([x[flag] for x in comp_index.values()]))
+        with mock.patch.object(run, "options", argparse.Namespace(
+                mkt_fracs=False), create=True), \
+                mock.patch("sys.stdout", new_callable=io.StringIO):
+            a_run.run_scheme(
+                self.test_adopt_scheme, self.test_htcl_totals, workers)
+        return a_run.output_ecms
+
+    def test_parallel_point(self):
+        """Test outcomes given sample measures w/ point value inputs."""
+        out_serial = self.run_outputs(self.measures_all, None)
+        for workers in [2, 3]:
+            numpy.testing.assert_equal(
+                self.run_outputs(self.measures_all, workers), out_serial)
+
+    def test_parallel_dist(self):
+        """Test outcomes given sample measures w/ some array inputs."""
+        out_serial = self.run_outputs(self.measures_all_dist, None)
+        for workers in [2, 3]:
+            numpy.testing.assert_equal(
+                self.run_outputs(self.measures_all_dist, workers),
+                out_serial)
+
+    def scale_costs(self, data, factor):
+        """Scale all cost values in a nested dict of market data in place.
+
+        Args:
+            data (dict): Market data to scale.
+            factor (float): Scaling factor.
+        """
+        for k, v in data.items():
+            if isinstance(v, dict):
+                self.scale_costs(v, factor)
+            elif isinstance(v, (int, float, numpy.ndarray)):
+                data[k] = v * factor
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(),
+                         "requires forked worker processes")
+    def test_parallel_schemes(self):
+        """Test outcomes of adoption schemes run in worker processes."""
+        measures = copy.deepcopy(self.measures_all)
+        # Make the uncompeted capital costs under technical potential differ
+        # from those under the other adoption schemes, such that consumer-
+        # level financial metrics depend on the adoption scheme under which
+        # they are finalized
+        for m in measures:
+            self.scale_costs(m.markets["Technical potential"]["uncompeted"][
+                "master_mseg"]["cost"]["stock"], 2)
+        outputs = []
+        for parallel in [False, True]:
+            a_run = run.Engine(
+                self.handyvars, copy.deepcopy(measures), energy_out=[
+                    "fossil_equivalent", "NA", "NA", "NA", "NA"])
+            with mock.patch.object(run, "options", argparse.Namespace(
+                    mkt_fracs=False), create=True), \
+                    mock.patch("sys.stdout", new_callable=io.StringIO):
+                if parallel is True:
+                    a_run.run_schemes(self.test_htcl_totals)
+                else:
+                    for adopt_scheme in self.handyvars.adopt_schemes:
+                        a_run.run_scheme(adopt_scheme, self.test_htcl_totals)
+            outputs.append([a_run.output_ecms, a_run.output_all])
+        # Check that the outputs differ across the adoption schemes
+        m_out = outputs[0][0][measures[0].name]
+        with self.assertRaises(AssertionError):
+            numpy.testing.assert_equal(*[m_out[
+                "Financial Metrics"]["Portfolio Level"][x] for x in
+                self.handyvars.adopt_schemes])
+        numpy.testing.assert_equal(outputs[1], outputs[0])
+
+    def test_uncompeted_unchanged(self):
+        """Test that competition does not change uncompeted markets."""
+        for measures in [self.measures_all, self.measures_all_dist]:
+            for workers in [None, 2]:
+                a_run = run.Engine(
+                    self.handyvars, copy.deepcopy(measures), energy_out=[
+                        "fossil_equivalent", "NA", "NA", "NA", "NA"])
+                mkts_init = copy.deepcopy([m.markets[self.test_adopt_scheme][
+                    "uncompeted"] for m in a_run.measures])
+                a_run.compete_measures(
+                    self.test_adopt_scheme, self.test_htcl_totals, workers)
+                # Check that competition has adjusted the competed markets
+                with self.assertRaises(AssertionError):
+                    numpy.testing.assert_equal([m.markets[
+                        self.test_adopt_scheme]["competed"]["master_mseg"] for
+                        m in a_run.measures], [
+                        x["master_mseg"] for x in mkts_init])
+                numpy.testing.assert_equal([m.markets[self.test_adopt_scheme][
+                    "uncompeted"] for m in a_run.measures], mkts_init)
+
+
 # Offer external code execution (include all lines below this point in all
 # test files)
 def main():